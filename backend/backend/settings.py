@@ -10,6 +10,7 @@ Die vollständige Liste der Einstellungen und ihrer Werte finden Sie unter:
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Pfade innerhalb des Projekts so aufbauen: BASE_DIR / 'subdir'.
@@ -53,12 +54,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'curriculum.middleware.QueryInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'curriculum.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -89,15 +92,95 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 
 # Datenbank
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+# DJANGO_DATABASE_PATH ersetzt die Datenbankdatei, z. B. für den Lasttest (load_test)
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('DJANGO_DATABASE_PATH') or BASE_DIR / 'db.sqlite3',
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Der Alias 'curriculum' hält die serialisierten Lehrplanbäume (siehe curriculum/cache.py). Die
+# Schlüssel enthalten die Lehrplanversion, sodass auch der LocMemCache je Worker-Prozess nach einer
+# Änderung in einem anderen Prozess keinen veralteten Baum ausliefert. Mit CURRICULUM_REDIS_URL
+# (z. B. redis://localhost:6379/1) teilen sich alle Worker einen Redis-Cache und bauen jeden Baum
+# nur einmal auf; das Backend benötigt das Paket redis (siehe requirements.txt). Einträge alter
+# Versionen laufen nach CURRICULUM_CACHE_TIMEOUT Sekunden ab.
+
+CURRICULUM_CACHE_TIMEOUT = 60 * 60
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'curriculum': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'curriculum-trees',
+        'TIMEOUT': CURRICULUM_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+if os.environ.get('CURRICULUM_REDIS_URL'):
+    CACHES['curriculum'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['CURRICULUM_REDIS_URL'],
+        'TIMEOUT': CURRICULUM_CACHE_TIMEOUT,
+    }
+
+CURRICULUM_CACHE_ALIAS = 'curriculum'
+
+# Anzahl der Lehrpläne, die /curricula/all/?stream=1 pro Block lädt und kodiert
+CURRICULUM_STREAM_CHUNK_SIZE = 50
+# Ob /curricula/all/?stream=1 neu aufgebaute Bäume im Cache ablegt (Standard: nein, damit ein
+# vollständiger Abruf die häufig abgefragten Bäume nicht verdrängt)
+CURRICULUM_STREAM_POPULATE_CACHE = False
+
+# Maximale Anzahl an IDs für /curricula/batch/?ids=...
+CURRICULUM_BATCH_MAX_SIZE = 50
+
+# Asynchrone Varianten der Lehrplan-Views unter /curriculum/async/ (nur für Messungen mit
+# "python manage.py benchmark_asgi"; mit SQLite und LocMemCache ohne Vorteil, siehe
+# curriculum/views/async_views.py)
+CURRICULUM_ASYNC_VIEWS = False
+
+# Server-Sent Events unter /async/curricula/events/: Abfrageintervall des Änderungsprotokolls
+# je Prozess, Abstand der Lebenszeichen und Dauer einer Verbindung (jeweils in Sekunden)
+CURRICULUM_EVENTS_POLL_INTERVAL = 1.0
+CURRICULUM_EVENTS_HEARTBEAT = 15
+CURRICULUM_EVENTS_MAX_DURATION = 300
+
+# Aufbewahrung des Änderungsprotokolls (/curriculum/changes/) in Tagen; ältere Einträge löscht
+# "python manage.py prune_aenderungen", ältere Tokens werden danach mit Status 410 abgelehnt
+CURRICULUM_AENDERUNGEN_RETENTION_DAYS = 30
+
+# Messung je Anfrage (curriculum.middleware): Überschrittene Abfragebudgets der Views werden
+# protokolliert (Tests mit QueryBudgetTestMixin lösen stattdessen QueryBudgetExceeded aus);
+# Server-Timing-Header nur für Staff
+CURRICULUM_QUERY_BUDGET_RAISE = False
+CURRICULUM_SERVER_TIMING = False
+CURRICULUM_SLOW_QUERY_COUNT = 3
+
+# Profile einzelner Anfragen für Staff per ?_profile=text|pstats|store (curriculum.middleware)
+CURRICULUM_PROFILE_DIR = None
+CURRICULUM_PROFILE_LIMIT = 40
+
+# Kennzahlen unter /metrics (curriculum.metrics): Mit Verzeichnis werden die Werte aller
+# Worker-Prozesse summiert; mit Token wird "Authorization: Bearer <Token>" verlangt
+CURRICULUM_METRICS_DIR = None
+CURRICULUM_METRICS_FLUSH_INTERVAL = 1.0
+CURRICULUM_METRICS_TOKEN = None
+
+# Gesamtimport im Admin (import-all): CSV-Dateien per bulk_create() statt zeilenweise schreiben
+# (curriculum.bulk_import); Dateien, die sich so nicht übernehmen lassen, werden zeilenweise importiert
+CURRICULUM_BULK_IMPORT = True
+
+
 # Passwortvalidierung
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
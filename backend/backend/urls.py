@@ -17,6 +17,7 @@ Eine andere URLconf einbinden
 from django.contrib import admin
 from django.urls import path, include
 from curriculum.admin import curriculum_admin
+from curriculum.views import MetricsView
 
 urlpatterns = [
     #path("grappelli/", include("grappelli.urls")), 
@@ -26,4 +27,5 @@ urlpatterns = [
     path('admin-curriculum/', curriculum_admin.urls),
     path('user/', include('user.urls')),
     path('curriculum/', include('curriculum.urls')), 
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
@@ -5,6 +5,7 @@ from import_export import resources, fields, formats
 from import_export.widgets import ForeignKeyWidget
 from django.http import HttpResponse
 import csv
+import json
 import zipfile
 import io
 from django.contrib.admin import AdminSite
@@ -15,12 +16,20 @@ from .models import (
     Lehrplan, Lernbereich, Lernziel, LernzielBeschreibung,
     Teilziel, TeilzielBeschreibung, Lerninhalt, LerninhaltBeschreibung
 )
+from .views.serializers import CurriculumSerializer
 import tablib
 from django.urls import reverse
 from django.urls import reverse_lazy
 from django.http import HttpResponseRedirect
 from django.contrib import messages
 from django.utils.safestring import mark_safe
+import logging
+import time
+from .metrics import EXPORT_SIZE, record_admin_operation, record_import
+from .bulk_import import BulkImportNotSupported, bulk_import
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 # ========== Import-Export Resources ==========
 
@@ -34,7 +43,22 @@ class BaseResource(resources.ModelResource):
     def get_instance(self, instance_loader, row):
         """Überschreiben um neue Instanzen zu erzeugen statt bestehende zu aktualisieren"""
         return None
+
+    def before_import(self, dataset, **kwargs):
+        """Merkt sich den Beginn des Imports für die Kennzahlen"""
+        self.import_started = time.perf_counter()
+        super().before_import(dataset, **kwargs)
+
+    def after_import(self, dataset, result, **kwargs):
+        """Erfasst Zeilen und Dauer eines echten Imports (ohne Dry-Run) in den Kennzahlen"""
+        super().after_import(dataset, result, **kwargs)
+        if result.total_rows and not self._is_dry_run(kwargs):
+            record_import(self, result, self.import_started)
         
+    def clean_row(self, row):
+        """Prüft und bereinigt eine Zeile vor dem Import; wird auch vom Bulk-Import verwendet"""
+        pass
+
     def save_instance(self, instance, *args, **kwargs):
         """Speichert die Instanz und mapped die ID"""
         try:
@@ -53,12 +77,12 @@ class BaseResource(resources.ModelResource):
                     new_id = instance.id
                     if new_id is not None:
                         self.old_id_to_new_id[old_id] = new_id
-                        print(f"Mapped ID {old_id} zu {new_id}")
+                        logger.debug("Mapped ID %s zu %s", old_id, new_id)
                     else:
-                        print(f"Warnung: Neue ID für {old_id} ist None!")
+                        logger.debug("Warnung: Neue ID für %s ist None!", old_id)
             return instance
         except Exception as e:
-            print(f"Fehler beim Speichern der Instanz: {str(e)}")
+            logger.debug("Fehler beim Speichern der Instanz: %s", e)
             raise
 
     def import_data(self, dataset, dry_run=False, *args, **kwargs):
@@ -66,11 +90,11 @@ class BaseResource(resources.ModelResource):
         result = super().import_data(dataset, dry_run, *args, **kwargs)
         
         if not dry_run and not result.has_errors():
-            print(f"Import erfolgreich. ID Mappings: {self.old_id_to_new_id}")
+            logger.debug("Import erfolgreich. ID-Mappings: %d", len(self.old_id_to_new_id))
             # Überprüfe ob alle IDs korrekt gemappt wurden
             for old_id, new_id in self.old_id_to_new_id.items():
                 if new_id is None:
-                    print(f"Warnung: ID {old_id} wurde nicht korrekt gemappt!")
+                    logger.debug("Warnung: ID %s wurde nicht korrekt gemappt!", old_id)
         
         return result
 
@@ -95,10 +119,10 @@ class BaseResource(resources.ModelResource):
             # Hole die Modelklasse
             model_class = self._meta.model
             
-            # Entferne die ID und Primärschlüsselfelder
+            # Entferne die ID, Primärschlüsselfelder und automatisch gepflegte Felder
             filter_args = {}
             for field in model_class._meta.fields:
-                if field.name == 'id' or field.primary_key:
+                if field.name == 'id' or field.primary_key or not field.editable:
                     continue
                 
                 if hasattr(instance, field.name):
@@ -119,18 +143,18 @@ class BaseResource(resources.ModelResource):
                 return False
             
             # Führe die Datenbankabfrage durch
-            print(f"Suche nach existierendem {model_class.__name__} mit: {filter_args}")
+            logger.debug("Suche nach existierendem %s mit: %s", model_class.__name__, filter_args)
             exists = model_class.objects.filter(**filter_args).exists()
             
             if exists:
-                print(f"ÜBERSPRINGE existierenden {model_class.__name__}: {filter_args}")
+                logger.debug("ÜBERSPRINGE existierenden %s: %s", model_class.__name__, filter_args)
                 return True
             
-            print(f"Importiere neuen {model_class.__name__}: {filter_args}")
+            logger.debug("Importiere neuen %s: %s", model_class.__name__, filter_args)
             return False
             
         except Exception as e:
-            print(f"Fehler bei der Duplikatsprüfung: {str(e)}")
+            logger.debug("Fehler bei der Duplikatsprüfung: %s", e)
             return False
 
 class ForeignKeyMappingResource(BaseResource):
@@ -162,9 +186,9 @@ class ForeignKeyMappingResource(BaseResource):
         if fk_column in row:
             try:
                 old_id = int(row[fk_column])
-                print(f"\nVerarbeite {self._meta.model.__name__}-Zeile:")
-                print(f"Originale Zeile: {row}")
-                print(f"Suche {self.foreign_key_model.__name__} mit ID: {old_id}")
+                logger.debug("Verarbeite %s-Zeile:", self._meta.model.__name__)
+                logger.debug("Originale Zeile: %s", row)
+                logger.debug("Suche %s mit ID: %s", self.foreign_key_model.__name__, old_id)
                 
                 # Hole das ID-Mapping aus der korrekten Resource-Instanz
                 previous_resource = kwargs.get('resource_instance')
@@ -172,36 +196,36 @@ class ForeignKeyMappingResource(BaseResource):
                     found_in_mapping = False
                     if old_id in previous_resource.old_id_to_new_id:
                         new_id = previous_resource.old_id_to_new_id[old_id]
-                        print(f"Mapped {self.foreign_key_field}_id {old_id} zu {new_id}")
+                        logger.debug("Mapped %s_id %s zu %s", self.foreign_key_field, old_id, new_id)
                         
                         # Überprüfe ob das Objekt existiert
                         try:
                             obj = self.foreign_key_model.objects.get(id=new_id)
-                            print(f"{self.foreign_key_model.__name__} gefunden über Mapping: {obj}")
+                            logger.debug("%s gefunden über Mapping: %s", self.foreign_key_model.__name__, obj)
                             row[fk_column] = str(new_id)
                             found_in_mapping = True
                         except self.foreign_key_model.DoesNotExist:
-                            print(f"Warnung: {self.foreign_key_model.__name__} mit gemappter ID {new_id} existiert nicht in der Datenbank.")
+                            logger.debug("Warnung: %s mit gemappter ID %s existiert nicht in der Datenbank.", self.foreign_key_model.__name__, new_id)
                     
                     # Wenn kein Mapping gefunden wurde, versuche direkt in der DB zu suchen
                     if not found_in_mapping:
                         # Versuche die ursprüngliche ID direkt in der Datenbank zu finden
                         try:
                             obj = self.foreign_key_model.objects.get(id=old_id)
-                            print(f"{self.foreign_key_model.__name__} direkt mit ID {old_id} gefunden: {obj}")
+                            logger.debug("%s direkt mit ID %s gefunden: %s", self.foreign_key_model.__name__, old_id, obj)
                             row[fk_column] = str(old_id)
                             # Füge diese ID zum Mapping hinzu für nachfolgende Datensätze
                             previous_resource.old_id_to_new_id[old_id] = old_id
                             found_in_mapping = True
                         except self.foreign_key_model.DoesNotExist:
-                            print(f"{self.foreign_key_model.__name__} mit ID {old_id} nicht in der Datenbank gefunden.")
+                            logger.debug("%s mit ID %s nicht in der Datenbank gefunden.", self.foreign_key_model.__name__, old_id)
                     
                     if not found_in_mapping:
                         error_msg = (
-                            f"Keine Mapping-Information für {self.foreign_key_model.__name__}-ID {old_id} gefunden.\n"
-                            f"Verfügbare Mappings: {previous_resource.old_id_to_new_id}"
+                            f"Keine Mapping-Information für {self.foreign_key_model.__name__}-ID {old_id} gefunden "
+                            f"({len(previous_resource.old_id_to_new_id)} Mappings verfügbar)."
                         )
-                        print(error_msg)
+                        logger.debug(error_msg)
                         raise Exception(error_msg)
                 else:
                     raise Exception("Keine Resource-Instance für ID-Mapping verfügbar!")
@@ -214,6 +238,11 @@ class LehrplanResource(ForeignKeyMappingResource):
     
     def before_import_row(self, row, **kwargs):
         """Validiere und bereinige die Daten vor dem Import"""
+        self.clean_row(row)
+        logger.debug("Validiere Zeile: %s", row)
+
+    def clean_row(self, row):
+        """Prüft Pflichtfelder und ID und entfernt Leerzeichen aus den Klassenstufen"""
         try:
             # Stelle sicher, dass alle erforderlichen Felder vorhanden sind
             required_fields = ['id', 'klassenstufen', 'bundesland', 'fach']
@@ -234,36 +263,34 @@ class LehrplanResource(ForeignKeyMappingResource):
             # Bereinige Klassenstufen (entferne Leerzeichen)
             if 'klassenstufen' in row:
                 row['klassenstufen'] = row['klassenstufen'].replace(' ', '')
-
-            print(f"Validiere Zeile: {row}")
         except Exception as e:
             raise Exception(f"Fehler in Zeile mit ID {row.get('id', 'unbekannt')}: {str(e)}")
 
     def import_row(self, row, instance_loader, **kwargs):
         """Überschreibe import_row um bessere Fehlerbehandlung zu haben"""
         try:
-            print(f"Importiere Zeile: {row}")
+            logger.debug("Importiere Zeile: %s", row)
             result = super().import_row(row, instance_loader, **kwargs)
             
             # Überprüfe ob der Import erfolgreich war
             if result.import_type == result.IMPORT_TYPE_NEW:
                 if hasattr(result, 'object'):
                     instance = result.object
-                    print(f"Neue Instanz erstellt: ID={instance.id}, Fach={instance.fach}, Bundesland={instance.bundesland}, Klassenstufen={instance.klassenstufen}")
+                    logger.debug("Neue Instanz erstellt: ID=%s, Fach=%s, Bundesland=%s, Klassenstufen=%s", instance.id, instance.fach, instance.bundesland, instance.klassenstufen)
                 else:
-                    print("Warnung: Keine Instanz im Ergebnis gefunden")
+                    logger.debug("Warnung: Keine Instanz im Ergebnis gefunden")
             elif result.import_type == result.IMPORT_TYPE_UPDATE:
-                print(f"Bestehende Instanz aktualisiert")
+                logger.debug("Bestehende Instanz aktualisiert")
             elif result.import_type == result.IMPORT_TYPE_DELETE:
-                print(f"Instanz gelöscht")
+                logger.debug("Instanz gelöscht")
             elif result.import_type == result.IMPORT_TYPE_SKIP:
-                print(f"Zeile übersprungen")
+                logger.debug("Zeile übersprungen")
             else:
-                print(f"Unbekannter Import-Typ: {result.import_type}")
+                logger.debug("Unbekannter Import-Typ: %s", result.import_type)
             
             return result
         except Exception as e:
-            print(f"Fehler beim Import der Zeile: {str(e)}")
+            logger.debug("Fehler beim Import der Zeile: %s", e)
             raise
 
     class Meta:
@@ -465,6 +492,8 @@ class LehrplanAdmin(nested_admin.NestedModelAdmin, ImportExportModelAdmin):
     list_filter = ["bundesland", "fach"]
     inlines = [LernbereichInline]
     save_on_top = True
+    # Abfragebudget je Admin-View (siehe curriculum.instrumentation)
+    query_budgets = {'changelist': 14}
     
     class Media:
         css = {
@@ -483,42 +512,49 @@ class LernbereichAdmin(ImportExportModelAdmin):
     """Admin-Oberfläche für Lernbereiche"""
     list_display = ("name", "nummer", "unterrichtsstunden", "lehrplan")
     resource_class = LernbereichResource
+    query_budgets = {'changelist': 6}
 
 @admin.register(Lernziel)
 class LernzielAdmin(ImportExportModelAdmin):
     """Admin-Oberfläche für Lernziele"""
     list_display = ("name", "lernbereich")
     resource_class = LernzielResource
+    query_budgets = {'changelist': 6}
 
 @admin.register(LernzielBeschreibung)
 class LernzielBeschreibungAdmin(ImportExportModelAdmin):
     """Admin-Oberfläche für Lernzielbeschreibungen"""
     list_display = ("text", "lernziel")
     resource_class = LernzielBeschreibungResource
+    query_budgets = {'changelist': 6}
 
 @admin.register(Teilziel)
 class TeilzielAdmin(ImportExportModelAdmin):
     """Admin-Oberfläche für Teilziele"""
     list_display = ("name", "lernziel")
     resource_class = TeilzielResource
+    query_budgets = {'changelist': 6}
 
 @admin.register(TeilzielBeschreibung)
 class TeilzielBeschreibungAdmin(ImportExportModelAdmin):
     """Admin-Oberfläche für Teilzielbeschreibungen"""
     list_display = ("text", "teilziel")
     resource_class = TeilzielBeschreibungResource
+    query_budgets = {'changelist': 6}
 
 @admin.register(Lerninhalt)
 class LerninhaltAdmin(ImportExportModelAdmin):
     """Admin-Oberfläche für Lerninhalte"""
     list_display = ("name", "teilziel")
     resource_class = LerninhaltResource
+    query_budgets = {'changelist': 6}
 
 @admin.register(LerninhaltBeschreibung)
 class LerninhaltBeschreibungAdmin(ImportExportModelAdmin):
     """Admin-Oberfläche für Lerninhaltsbeschreibungen"""
     list_display = ("text", "lerninhalt")
     resource_class = LerninhaltBeschreibungResource
+    query_budgets = {'changelist': 6}
 
 # ========== Custom AdminSite ==========
 
@@ -552,16 +588,16 @@ class CurriculumAdminSite(admin.AdminSite):
             dataset = tablib.Dataset().load(csv_content, format='csv')
             
             if len(dataset) == 0:
-                print("Warnung: CSV-Datei ist leer!")
+                logger.debug("Warnung: CSV-Datei ist leer!")
                 return csv_content
                 
             # Überprüfe die Kopfzeilen
             headers = dataset.headers
-            print(f"Gefundene Kopfzeilen: {headers}")
+            logger.debug("Gefundene Kopfzeilen: %s", headers)
             
             if expected_headers and not all(header in headers for header in expected_headers):
                 missing = [h for h in expected_headers if h not in headers]
-                print(f"Warnung: Fehlende erwartete Kopfzeilen: {missing}")
+                logger.debug("Warnung: Fehlende erwartete Kopfzeilen: %s", missing)
             
             # Überprüfe auf typische Probleme:
             # 1. Prüfen, ob die erste Zeile Daten enthält, die wie Kopfzeilen aussehen
@@ -574,7 +610,7 @@ class CurriculumAdminSite(admin.AdminSite):
                     value = first_row[idx].lower()
                     if value in ('klassenstufe', 'klassenstufen'):
                         first_row_contains_headers = True
-                        print("Warnung: Erste Datenzeile enthält wahrscheinlich Kopfzeilen")
+                        logger.debug("Warnung: Erste Datenzeile enthält wahrscheinlich Kopfzeilen")
             
             # Wenn die erste Zeile Kopfzeilen zu enthalten scheint, entferne sie
             if first_row_contains_headers:
@@ -582,20 +618,50 @@ class CurriculumAdminSite(admin.AdminSite):
                 for i in range(1, len(dataset)):
                     new_dataset.append(dataset[i])
                 dataset = new_dataset
-                print("Erste Zeile entfernt, da sie Kopfzeilen enthielt")
+                logger.debug("Erste Zeile entfernt, da sie Kopfzeilen enthielt")
             
             # Konvertiere zurück zu CSV
             return dataset.export('csv')
         except Exception as e:
-            print(f"Fehler bei der CSV-Validierung: {str(e)}")
+            logger.debug("Fehler bei der CSV-Validierung: %s", e)
             # Gib im Fehlerfall den Original-Inhalt zurück
             return csv_content
 
+    def _import_dataset(self, resource, dataset, **kwargs):
+        """
+        Importiert eine CSV-Datei und liefert die Ergebnisse von Dry-Run und Import.
+        
+        Mit CURRICULUM_BULK_IMPORT (Standard) wird die Datei per Bulk-Import
+        (curriculum.bulk_import) geschrieben; dessen Ergebnis dient zugleich als Ergebnis
+        des Dry-Runs. Lässt sich die Datei nicht per Bulk-Import übernehmen, oder ist der
+        Bulk-Import abgeschaltet, wird sie wie bisher zeilenweise mit import_data() importiert.
+        
+        Args:
+            resource: Die Resource der Datei
+            dataset: Der tablib-Datensatz der Datei
+            **kwargs: Weitere Argumente für import_data(), z. B. resource_instance
+            
+        Returns:
+            tuple: (Ergebnis des Dry-Runs, Ergebnis des Imports)
+        """
+        if getattr(settings, 'CURRICULUM_BULK_IMPORT', True):
+            try:
+                result = bulk_import(resource, dataset, resource_instance=kwargs.get('resource_instance'))
+                return result, result
+            except BulkImportNotSupported as e:
+                logger.debug("Bulk-Import nicht möglich, importiere zeilenweise: %s", e)
+        
+        dry_run_result = resource.import_data(dataset, dry_run=True, raise_errors=False, **kwargs)
+        result = resource.import_data(dataset, dry_run=False, raise_errors=False, **kwargs)
+        return dry_run_result, result
+
     def import_all(self, request):
         """Import all curriculum data from uploaded CSV files"""
         if request.method == 'POST':
+            started = time.perf_counter()
             if 'zip_file' not in request.FILES:
                 messages.error(request, 'Bitte wählen Sie eine ZIP-Datei aus.')
+                record_admin_operation('import', 'error', started)
                 return HttpResponseRedirect('.')
 
             zip_file = request.FILES['zip_file']
@@ -603,7 +669,7 @@ class CurriculumAdminSite(admin.AdminSite):
             try:
                 with zipfile.ZipFile(zip_file) as z:
                     filenames = sorted(z.namelist())
-                    print(f"\nGefundene Dateien im ZIP: {filenames}")
+                    logger.debug("Gefundene Dateien im ZIP: %s", filenames)
                     
                     expected_files = [
                         '01_lehrplan.csv',
@@ -622,6 +688,7 @@ class CurriculumAdminSite(admin.AdminSite):
                             request, 
                             f'Folgende Dateien fehlen im ZIP: {", ".join(missing_files)}'
                         )
+                        record_admin_operation('import', 'error', started)
                         return HttpResponseRedirect('.')
 
                     # Erwartete Spaltenüberschriften pro Datei
@@ -660,7 +727,7 @@ class CurriculumAdminSite(admin.AdminSite):
 
                     # Importiere zuerst nur die Lehrpläne
                     try:
-                        print(f"\nImportiere Lehrpläne...")
+                        logger.debug("Importiere Lehrpläne...")
                         csv_content = z.read('01_lehrplan.csv').decode('utf-8-sig')
                         
                         # Validiere und korrigiere die CSV-Datei
@@ -670,22 +737,21 @@ class CurriculumAdminSite(admin.AdminSite):
                         )
                         
                         dataset = tablib.Dataset().load(corrected_csv, format='csv')
-                        print(f"Lehrplan CSV Inhalt:")
-                        print(f"Spalten: {dataset.headers}")
-                        print(f"Anzahl Zeilen: {len(dataset)}")
+                        logger.debug("Lehrplan CSV Inhalt:")
+                        logger.debug("Spalten: %s", dataset.headers)
+                        logger.debug("Anzahl Zeilen: %s", len(dataset))
                         
-                        # Führe Dry-Run durch
-                        print("\nStarte Dry-Run...")
-                        result = resources['01_lehrplan.csv'].import_data(
-                            dataset, 
-                            dry_run=True,
-                            raise_errors=False,
+                        # Führe Dry-Run und Import durch
+                        logger.debug("Starte Import der Lehrpläne...")
+                        dry_run_result, result = self._import_dataset(
+                            resources['01_lehrplan.csv'],
+                            dataset,
                             use_transactions=True
                         )
                         
-                        if result.has_errors():
+                        if dry_run_result.has_errors():
                             errors = []
-                            for row in result.row_errors():
+                            for row in dry_run_result.row_errors():
                                 row_number = row[0] + 1
                                 row_errors = row[1]
                                 for error in row_errors:
@@ -694,30 +760,20 @@ class CurriculumAdminSite(admin.AdminSite):
                                     else:
                                         errors.append(f"Zeile {row_number}: {str(error)}")
                             warning_msg = "Warnung beim Validieren der Lehrplan-Daten:\n" + "\n".join(errors)
-                            print(warning_msg)
+                            logger.debug(warning_msg)
                             error_messages.append(warning_msg)
                             error_counts['01_lehrplan.csv'] = error_counts.get('01_lehrplan.csv', 0) + len(errors)
                         
-                        if result.has_validation_errors():
+                        if dry_run_result.has_validation_errors():
                             validation_errors = []
-                            for invalid_row in result.invalid_rows:
+                            for invalid_row in dry_run_result.invalid_rows:
                                 row_number = invalid_row.number + 1
                                 validation_errors.append(f"Zeile {row_number}: {str(invalid_row.error)}")
                             warning_msg = "Validierungswarnung in den Lehrplan-Daten:\n" + "\n".join(validation_errors)
-                            print(warning_msg)
+                            logger.debug(warning_msg)
                             error_messages.append(warning_msg)
                             error_counts['01_lehrplan.csv'] = error_counts.get('01_lehrplan.csv', 0) + len(validation_errors)
                         
-                        print("Import der Lehrpläne wird durchgeführt...")
-                        
-                        # Importiere die Lehrpläne
-                        result = resources['01_lehrplan.csv'].import_data(
-                            dataset, 
-                            dry_run=False,
-                            raise_errors=False,
-                            use_transactions=True
-                        )
-                        
                         # Zähle neue und übersprungene Einträge
                         totals = result.totals
                         if hasattr(result, 'totals'):
@@ -727,30 +783,17 @@ class CurriculumAdminSite(admin.AdminSite):
                                 skipped_stats['01_lehrplan.csv'] = totals.get('skip', 0)
                                 
                         id_mappings['01_lehrplan.csv'] = resources['01_lehrplan.csv'].old_id_to_new_id
-                        print(f"Lehrplan-Mappings: {id_mappings['01_lehrplan.csv']}")
+                        logger.debug("Lehrplan-Mappings: %d", len(id_mappings['01_lehrplan.csv']))
                         
                         # Überprüfe ob Lehrpläne importiert wurden
-                        if id_mappings['01_lehrplan.csv']:
-                            imported_count = 0
-                            for old_id, new_id in id_mappings['01_lehrplan.csv'].items():
-                                try:
-                                    lehrplan = Lehrplan.objects.get(id=new_id)
-                                    print(f"Lehrplan {new_id} (war {old_id}) wurde erfolgreich importiert: {lehrplan.fach} ({lehrplan.bundesland})")
-                                    imported_count += 1
-                                except Lehrplan.DoesNotExist:
-                                    print(f"Warnung: Lehrplan mit ID {new_id} (war {old_id}) wurde nicht gefunden.")
-                            
-                            # Falls die Totals nicht richtig erfasst wurden, verwenden wir den manuellen Zähler
-                            if '01_lehrplan.csv' not in import_stats and imported_count > 0:
-                                import_stats['01_lehrplan.csv'] = imported_count
-                        else:
+                        if not id_mappings['01_lehrplan.csv']:
                             warning_msg = "Keine Lehrpläne wurden importiert oder alle wurden übersprungen."
-                            print(warning_msg)
+                            logger.debug(warning_msg)
                             error_messages.append(warning_msg)
                             
                     except Exception as e:
                         error_msg = f"Fehler beim Import der Lehrpläne: {str(e)}"
-                        print(error_msg)
+                        logger.debug(error_msg)
                         error_messages.append(error_msg)
                         error_counts['01_lehrplan.csv'] = error_counts.get('01_lehrplan.csv', 0) + 1
                         import_success = False
@@ -758,7 +801,7 @@ class CurriculumAdminSite(admin.AdminSite):
                     # Importiere die restlichen Dateien
                     for filename in expected_files[1:]:  # Überspringe 01_lehrplan.csv
                         try:
-                            print(f"\nVerarbeite Datei: {filename}")
+                            logger.debug("Verarbeite Datei: %s", filename)
                             csv_content = z.read(filename).decode('utf-8-sig')
                             
                             # Validiere und korrigiere die CSV-Datei
@@ -768,7 +811,7 @@ class CurriculumAdminSite(admin.AdminSite):
                             )
                             
                             dataset = tablib.Dataset().load(corrected_csv, format='csv')
-                            print(f"Anzahl Zeilen in {filename}: {len(dataset)}")
+                            logger.debug("Anzahl Zeilen in %s: %s", filename, len(dataset))
                             
                             # Hole die passende Resource
                             resource = resources[filename]
@@ -796,12 +839,11 @@ class CurriculumAdminSite(admin.AdminSite):
                             # Zähle Abhängigkeitsfehler
                             dependency_error_count = 0
                                 
-                            # Führe einen Dry-Run durch
-                            dry_run_result = resource.import_data(
-                                dataset, 
-                                dry_run=True,
-                                resource_instance=previous_resource,
-                                raise_errors=False
+                            # Führe Dry-Run und Import durch
+                            dry_run_result, result = self._import_dataset(
+                                resource,
+                                dataset,
+                                resource_instance=previous_resource
                             )
                             if dry_run_result.has_errors():
                                 errors = []
@@ -814,17 +856,9 @@ class CurriculumAdminSite(admin.AdminSite):
                                         if "Keine Mapping-Information" in error_str:
                                             dependency_error_count += 1
                                 warning_msg = f"Warnung beim Import von {filename}:\n" + "\n".join(errors)
-                                print(warning_msg)
+                                logger.debug(warning_msg)
                                 error_messages.append(warning_msg)
                             
-                            # Führe den tatsächlichen Import durch
-                            result = resource.import_data(
-                                dataset, 
-                                dry_run=False,
-                                resource_instance=previous_resource,
-                                raise_errors=False
-                            )
-                            
                             # Zähle neue und übersprungene Einträge
                             if hasattr(result, 'totals'):
                                 totals = result.totals
@@ -839,11 +873,11 @@ class CurriculumAdminSite(admin.AdminSite):
                             
                             # Speichere das ID-Mapping für die nächste Resource
                             id_mappings[filename] = resource.old_id_to_new_id
-                            print(f"Gespeicherte Mappings für {filename}: {id_mappings[filename]}")
+                            logger.debug("Gespeicherte Mappings für %s: %d", filename, len(id_mappings[filename]))
 
                         except Exception as e:
                             error_msg = f"Fehler beim Import von {filename}: {str(e)}"
-                            print(error_msg)
+                            logger.debug(error_msg)
                             error_messages.append(error_msg)
                             error_counts[filename] = error_counts.get(filename, 0) + 1
                             continue
@@ -890,6 +924,7 @@ class CurriculumAdminSite(admin.AdminSite):
                         request,
                         mark_safe(f'Import teilweise abgeschlossen!<br/>{summary_text}')
                     )
+                record_admin_operation('import', 'success' if import_success else 'partial', started)
 
                 return HttpResponseRedirect('.')
 
@@ -898,6 +933,7 @@ class CurriculumAdminSite(admin.AdminSite):
                     request,
                     f'Kritischer Fehler beim Import: {str(e)}'
                 )
+                record_admin_operation('import', 'error', started)
                 return HttpResponseRedirect('.')
 
         context = dict(
@@ -908,6 +944,12 @@ class CurriculumAdminSite(admin.AdminSite):
 
     def export_all(self, request):
         """Export all curriculum data as CSV files in a ZIP archive"""
+        started = time.perf_counter()
+        if request.GET.get('format') == 'json':
+            response = self.export_all_json(request)
+            record_admin_operation('export', 'success', started)
+            return response
+
         # Create a ZIP file in memory
         zip_buffer = io.BytesIO()
         
@@ -958,9 +1000,21 @@ Wichtige Hinweise:
         zip_buffer.seek(0)
         response = HttpResponse(zip_buffer.read(), content_type='application/zip')
         response['Content-Disposition'] = 'attachment; filename="curriculum_export.zip"'
+        record_admin_operation('export', 'success', started)
+        EXPORT_SIZE.observe(len(response.content))
         
         return response
 
+    def export_all_json(self, request):
+        """Export all Lehrpläne as one hierarchical JSON document (same shape as the API)"""
+        trees = CurriculumSerializer.serialize_curricula()
+        response = HttpResponse(
+            json.dumps(trees, indent=2, ensure_ascii=False),
+            content_type='application/json; charset=utf-8'
+        )
+        response['Content-Disposition'] = 'attachment; filename="curriculum_export.json"'
+        return response
+
     def index(self, request, extra_context=None):
         """Override index to add export button"""
         extra_context = extra_context or {}
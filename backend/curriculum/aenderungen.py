@@ -0,0 +1,185 @@
+"""
+Änderungsprotokoll für den inkrementellen Abgleich gespiegelter Datenbestände.
+
+Die Signal-Handler in ``curriculum.signals`` hängen beim Anlegen, Ändern und Löschen eines
+Objekts der acht Curriculum-Modelle einen Eintrag ``Aenderung`` an. Der Eintrag wird in
+derselben Transaktion wie die Änderung geschrieben; seine fortlaufende ID dient als Token.
+Ein Client merkt sich das Token der letzten Antwort und fragt mit ``since=<token>`` nur die
+seitdem geänderten Objekte ab (siehe ``load_aenderungen()``).
+
+Hinweis: Unter SQLite werden Schreibtransaktionen nacheinander ausgeführt, sodass die IDs in
+der Reihenfolge der Commits vergeben werden. Bei Datenbanken mit parallelen
+Schreibtransaktionen kann ein später committeter Eintrag eine kleinere ID haben als ein
+bereits ausgelieferter; dort müsste das Token hinter der ältesten offenen Transaktion
+zurückbleiben.
+
+``QuerySet.update()`` und ``bulk_create()`` lösen keine Signale aus; wer diese Methoden
+verwendet, protokolliert die betroffenen Objekte mit ``record_aenderungen()``.
+
+Das Protokoll wächst mit jeder Änderung. ``prune_aenderungen()`` (Befehl
+``prune_aenderungen``) löscht Einträge außerhalb des Aufbewahrungszeitraums und vermerkt die
+höchste gelöschte ID in ``AenderungsBereinigung``. Tokens unterhalb dieses Horizonts
+(``get_horizont()``) können nicht mehr vollständig beantwortet werden; der Client muss neu
+laden. Mehrere Einträge desselben Objekts werden dabei bewusst nicht zusammengefasst: Der
+erste Eintrag bestimmt die Reihenfolge (Eltern vor Kindern), ein späterer ist für Clients
+nötig, deren Token dazwischen liegt.
+
+Einstellungen:
+    CURRICULUM_AENDERUNGEN_RETENTION_DAYS: Aufbewahrungszeitraum in Tagen (Standard: 30)
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .hierarchy import CURRICULUM_MODELS
+from .models import Aenderung, AenderungsBereinigung
+
+# Modellname im Protokoll -> Modellklasse
+MODELLE = {model.__name__: model for model in CURRICULUM_MODELS}
+
+
+def record_aenderungen(aenderungen):
+    """
+    Hängt Einträge für mehrere Objekte mit einer Abfrage an das Protokoll an.
+
+    Args:
+        aenderungen: Iterierbare Menge von Tupeln (Modellklasse, Objekt-ID, Art) mit
+                     Art = Aenderung.ART_ANGELEGT, ART_GEAENDERT oder ART_GELOESCHT
+    """
+    Aenderung.objects.bulk_create([
+        Aenderung(modell=model.__name__, knoten_id=knoten_id, art=art) for model, knoten_id, art in aenderungen
+    ], batch_size=500)
+
+
+def get_token():
+    """
+    Liefert das Token des aktuellen Stands.
+
+    Returns:
+        int: Die ID des letzten Eintrags bzw. 0, wenn das Protokoll leer ist
+    """
+    return Aenderung.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def get_horizont():
+    """
+    Liefert das älteste Token, ab dem das Protokoll vollständig ist.
+
+    Returns:
+        int: Die höchste bei einer Bereinigung gelöschte ID bzw. 0, wenn nie bereinigt wurde
+    """
+    return AenderungsBereinigung.objects.aggregate(bis=Max('bis'))['bis'] or 0
+
+
+def get_retention():
+    """Liefert den Aufbewahrungszeitraum des Protokolls."""
+    return timedelta(days=getattr(settings, 'CURRICULUM_AENDERUNGEN_RETENTION_DAYS', 30))
+
+
+def prune_aenderungen(before=None):
+    """
+    Löscht die Einträge, die vor einem Zeitpunkt geschrieben wurden.
+
+    Gelöscht wird immer ein Anfang des Protokolls bis zur höchsten ID vor dem Zeitpunkt,
+    damit der Horizont eindeutig ist. Der neueste Eintrag bleibt stets erhalten, sodass
+    get_token() nicht zurückfällt und unter SQLite keine IDs neu vergeben werden.
+
+    Args:
+        before (datetime): Der Zeitpunkt; Standard: jetzt abzüglich des Aufbewahrungszeitraums
+
+    Returns:
+        tuple: (Anzahl der gelöschten Einträge, neuer Horizont)
+    """
+    if before is None:
+        before = timezone.now() - get_retention()
+    bis = (
+        Aenderung.objects.filter(zeitpunkt__lt=before, id__lt=get_token())
+        .aggregate(bis=Max('id'))['bis']
+    )
+    if bis is None:
+        return 0, get_horizont()
+    anzahl, _ = Aenderung.objects.filter(id__lte=bis).delete()
+    AenderungsBereinigung.objects.create(bis=bis, anzahl=anzahl)
+    return anzahl, bis
+
+
+def get_fields(model):
+    """
+    Liefert die Spalten, mit denen ein Objekt im Abgleich ausgegeben wird.
+
+    Args:
+        model: Eine Curriculum-Modellklasse
+
+    Returns:
+        list: Die Attributnamen aller Datenbankfelder, Fremdschlüssel als '<feld>_id'
+    """
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def load_aenderungen(since, limit):
+    """
+    Liefert die Objekte, die nach einem Token angelegt, geändert oder gelöscht wurden.
+
+    Es werden höchstens ``limit`` Einträge des Protokolls gelesen. Mehrere Einträge desselben
+    Objekts werden zu einem zusammengefasst, der an der Stelle des ersten Eintrags steht, damit
+    Elternknoten vor ihren Kindern angelegt werden. Für vorhandene Objekte werden die aktuellen
+    Werte mit einer Abfrage je Modell geladen; wurde ein Objekt inzwischen gelöscht, wird es
+    bereits hier als gelöscht gemeldet.
+
+    Art ist 'angelegt', wenn das Objekt seit dem Token neu ist, 'geaendert', wenn es geändert
+    wurde, und 'geloescht', wenn es nicht mehr existiert. Ein Client kann 'angelegt' und
+    'geaendert' gleich behandeln (Einfügen oder Überschreiben).
+
+    Ein Token unterhalb von get_horizont() prüft der Aufrufer vorher; die gelöschten
+    Einträge fehlen sonst stillschweigend.
+
+    Args:
+        since (int): Das Token der letzten Abfrage
+        limit (int): Die Höchstzahl der gelesenen Protokolleinträge
+
+    Returns:
+        dict: Die Objekte ('aenderungen', Dictionaries mit modell, id, art und daten),
+              das neue Token ('token') und ob weitere Einträge vorliegen ('has_more')
+    """
+    rows = list(
+        Aenderung.objects.filter(id__gt=since).order_by('id')
+        .values_list('id', 'modell', 'knoten_id', 'art')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Objekt -> Art seines ersten Eintrags, in der Reihenfolge der ersten Einträge
+    erste_arten = {}
+    for _, modell, knoten_id, art in rows:
+        erste_arten.setdefault((modell, knoten_id), art)
+
+    ids = {}
+    for modell, knoten_id in erste_arten:
+        ids.setdefault(modell, []).append(knoten_id)
+    daten = {}
+    for modell, knoten_ids in ids.items():
+        model = MODELLE.get(modell)
+        if model is None:
+            continue
+        for values in model.objects.order_by().filter(pk__in=knoten_ids).values(*get_fields(model)):
+            daten[(modell, values['id'])] = values
+
+    aenderungen = []
+    for (modell, knoten_id), erste_art in erste_arten.items():
+        values = daten.get((modell, knoten_id))
+        if values is None:
+            art = Aenderung.ART_GELOESCHT
+        elif erste_art == Aenderung.ART_ANGELEGT:
+            art = Aenderung.ART_ANGELEGT
+        else:
+            art = Aenderung.ART_GEAENDERT
+        aenderungen.append({'modell': modell, 'id': knoten_id, 'art': art, 'daten': values})
+
+    return {
+        'aenderungen': aenderungen,
+        'token': rows[-1][0] if rows else since,
+        'has_more': has_more,
+    }
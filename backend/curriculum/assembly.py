@@ -0,0 +1,235 @@
+"""
+Flache Baum-Assemblierung für Lehrpläne.
+
+Dieses Modul erzeugt dieselbe hierarchische JSON-Struktur wie
+``CurriculumSerializer.serialize_curriculum``, lädt dafür aber jede Ebene mit einer
+einzigen ``values_list()``-Abfrage, die nur die benötigten Spalten enthält. Die Zeilen
+werden in Dictionaries nach Eltern-ID gruppiert und von unten nach oben zusammengesetzt,
+ohne dass Modellinstanzen erzeugt werden.
+
+Alle Abfragen sortieren nach ``<eltern>_id, id`` und werden bei einer Einschränkung auf
+bestimmte Lehrpläne über verschachtelte ``<eltern>_id IN (SELECT id ...)``-Unterabfragen
+statt über Joins gefiltert. So wird jede Ebene als Bereichssuche über den
+zusammengesetzten Index ``(<eltern>_id, id)`` gelesen, ohne nachträgliche Sortierung.
+"""
+
+from collections import defaultdict
+
+from .hierarchy import PARENT_FIELDS, get_parent_model
+from .instrumentation import timed
+from .models import (
+    Lehrplan, Lernbereich, Lernziel, LernzielBeschreibung,
+    Teilziel, TeilzielBeschreibung, Lerninhalt, LerninhaltBeschreibung
+)
+
+
+class CurriculumTreeAssembler:
+    """
+    Setzt Lehrplanbäume aus flachen Abfragen pro Hierarchieebene zusammen.
+
+    Für n Lehrpläne werden unabhängig von n höchstens acht Abfragen ausgeführt. Die Klasse
+    wird wie der CurriculumSerializer ohne Instanziierung verwendet.
+
+    Verwendungsbeispiel:
+        trees = CurriculumTreeAssembler.assemble([1, 2, 3])
+        alle = CurriculumTreeAssembler.assemble()
+        navigation = CurriculumTreeAssembler.assemble(depth=1)
+    """
+
+    MAX_DEPTH = 4
+
+    @classmethod
+    def _scope(cls, model, lehrplan_ids):
+        """
+        Baut das QuerySet einer Ebene, eingeschränkt auf die angegebenen Lehrpläne.
+
+        Die Einschränkung erfolgt über die Eltern-IDs der Ebene darüber (rekursiv als
+        Unterabfrage), sodass die Abfrage den Index ``(<eltern>_id, id)`` nutzt.
+
+        Args:
+            model: Die Modellklasse der Ebene
+            lehrplan_ids: Liste der Lehrplan-IDs oder None für alle Lehrpläne
+
+        Returns:
+            QuerySet: Das ungeordnete QuerySet der Ebene
+        """
+        queryset = model.objects.order_by()
+        if lehrplan_ids is None:
+            return queryset
+        if model is Lehrplan:
+            return queryset.filter(id__in=lehrplan_ids)
+        parent_field = PARENT_FIELDS[model]
+        parent_model = get_parent_model(model)
+        if parent_model is Lehrplan:
+            return queryset.filter(**{f"{parent_field}_id__in": lehrplan_ids})
+        return queryset.filter(**{
+            f"{parent_field}_id__in": cls._scope(parent_model, lehrplan_ids).values('id')
+        })
+
+    @classmethod
+    def _querysets(cls, lehrplan_ids, depth, beschreibungen, stamps=False):
+        """
+        Baut die flachen Abfragen aller benötigten Ebenen.
+
+        Args:
+            lehrplan_ids: Liste der Lehrplan-IDs oder None für alle Lehrpläne
+            depth (int): Anzahl der Ebenen unterhalb des Lehrplans
+            beschreibungen (bool): Ob die Beschreibungstexte geladen werden sollen
+            stamps (bool): Ob die Lehrplanzeilen zusätzlich Version und Änderungszeitpunkt enthalten
+
+        Returns:
+            dict: Ebenenname -> QuerySet mit values_list()-Zeilen
+        """
+        levels = [
+            (1, 'lernbereiche', Lernbereich, ('lehrplan_id', 'nummer'),
+             ('id', 'lehrplan_id', 'nummer', 'name', 'unterrichtsstunden')),
+            (2, 'lernziele', Lernziel, ('lernbereich_id', 'id'), ('id', 'lernbereich_id', 'name')),
+            (3, 'teilziele', Teilziel, ('lernziel_id', 'id'), ('id', 'lernziel_id', 'name')),
+            (4, 'lerninhalte', Lerninhalt, ('teilziel_id', 'id'), ('id', 'teilziel_id', 'name')),
+        ]
+        texts = [
+            (2, 'lernziel_texte', LernzielBeschreibung, 'lernziel_id'),
+            (3, 'teilziel_texte', TeilzielBeschreibung, 'teilziel_id'),
+            (4, 'lerninhalt_texte', LerninhaltBeschreibung, 'lerninhalt_id'),
+        ]
+
+        # Einzelne Lehrpläne werden über den Primärschlüssel gelesen und erst in _build
+        # sortiert; alle Lehrpläne in der Reihenfolge des Sortierindex
+        lehrplan_ordering = ('id',) if lehrplan_ids is not None else (*Lehrplan._meta.ordering, 'id')
+        querysets = {
+            'lehrplaene': cls._scope(Lehrplan, lehrplan_ids)
+            .order_by(*lehrplan_ordering)
+            .values_list('id', 'klassenstufen', 'bundesland', 'fach', *(('version', 'geaendert_am') if stamps else ())),
+        }
+        for level, name, model, ordering, columns in levels:
+            if depth >= level:
+                querysets[name] = cls._scope(model, lehrplan_ids).order_by(*ordering).values_list(*columns)
+        if beschreibungen:
+            for level, name, model, parent_column in texts:
+                if depth >= level:
+                    querysets[name] = (
+                        cls._scope(model, lehrplan_ids)
+                        .order_by(parent_column, 'id')
+                        .values_list(parent_column, 'text')
+                    )
+        return querysets
+
+    @classmethod
+    @timed('serialize')
+    def _build(cls, rows, depth, beschreibungen):
+        """
+        Setzt die geladenen Zeilen von unten nach oben zu Bäumen zusammen.
+
+        Args:
+            rows (dict): Ebenenname -> Liste der Zeilen (siehe _querysets)
+            depth (int): Anzahl der Ebenen unterhalb des Lehrplans
+            beschreibungen (bool): Ob die Beschreibungstexte ausgegeben werden sollen
+
+        Returns:
+            list: Die serialisierten Lehrpläne
+        """
+        def texts(name):
+            grouped = defaultdict(list)
+            for parent_id, text in rows.get(name, ()):
+                grouped[parent_id].append(text)
+            return grouped
+
+        lerninhalte = defaultdict(list)
+        if depth >= 4:
+            lerninhalt_texts = texts('lerninhalt_texte')
+            for li_id, teilziel_id, name in rows['lerninhalte']:
+                li_data = {
+                    "Lerninhalt_id": li_id,
+                    "Lerninhalt_name": name,
+                }
+                if beschreibungen:
+                    li_data["Lerninhalt_beschreibungen"] = lerninhalt_texts.get(li_id, [])
+                lerninhalte[teilziel_id].append(li_data)
+
+        teilziele = defaultdict(list)
+        if depth >= 3:
+            teilziel_texts = texts('teilziel_texte')
+            for tz_id, lernziel_id, name in rows['teilziele']:
+                tz_data = {
+                    "Teilziel_id": tz_id,
+                    "Teilziel_name": name,
+                }
+                if beschreibungen:
+                    tz_data["Teilziel_beschreibungen"] = teilziel_texts.get(tz_id, [])
+                if depth >= 4:
+                    tz_data["Lerninhalte"] = lerninhalte.get(tz_id, [])
+                teilziele[lernziel_id].append(tz_data)
+
+        lernziele = defaultdict(list)
+        if depth >= 2:
+            lernziel_texts = texts('lernziel_texte')
+            for lz_id, lernbereich_id, name in rows['lernziele']:
+                lz_data = {
+                    "Lernziel_id": lz_id,
+                    "Lernziel_name": name,
+                }
+                if beschreibungen:
+                    lz_data["Lernziel_Beschreibungen"] = lernziel_texts.get(lz_id, [])
+                if depth >= 3:
+                    lz_data["Teilziele"] = teilziele.get(lz_id, [])
+                lernziele[lernbereich_id].append(lz_data)
+
+        lernbereiche = defaultdict(list)
+        if depth >= 1:
+            for lb_id, lehrplan_id, nummer, name, unterrichtsstunden in rows['lernbereiche']:
+                lb_data = {
+                    "Lernbereich_id": lb_id,
+                    "Lernbereich_Nummer": nummer,
+                    "Lernbereich_name": name,
+                    "Unterrichtsstunden": unterrichtsstunden,
+                }
+                if depth >= 2:
+                    lb_data["Lernziele"] = lernziele.get(lb_id, [])
+                lernbereiche[lehrplan_id].append(lb_data)
+
+        # Standardsortierung (bundesland, fach, klassenstufen, id)
+        lehrplaene = sorted(rows['lehrplaene'], key=lambda row: (row[2], row[3], row[1], row[0]))
+
+        result = []
+        for lp_id, klassenstufen, bundesland, fach, *_ in lehrplaene:
+            lp_data = {
+                "Lehrplan_id": lp_id,
+                "Klassenstufen": klassenstufen,
+                "Bundesland": bundesland,
+                "Fach": fach,
+            }
+            if depth >= 1:
+                lp_data["Lernbereiche"] = lernbereiche.get(lp_id, [])
+            result.append(lp_data)
+        return result
+
+    @classmethod
+    def assemble(cls, lehrplan_ids=None, depth=None, beschreibungen=True, stamps=None):
+        """
+        Serialisiert Lehrpläne mit ihrer Struktur bis zur angegebenen Tiefe.
+
+        Ebenen unterhalb der Tiefe und (mit beschreibungen=False) die drei
+        Beschreibungstabellen werden gar nicht abgefragt.
+
+        Args:
+            lehrplan_ids: Iterierbare Menge von Lehrplan-IDs oder None für alle Lehrpläne
+            depth (int): Anzahl der Ebenen unterhalb des Lehrplans (0-4, None = alle)
+            beschreibungen (bool): Ob die Beschreibungstexte geladen werden sollen
+            stamps (dict): Wird, falls angegeben, mit Lehrplan-ID -> (version, geaendert_am)
+                           gefüllt; die Werte kommen ohne zusätzliche Abfrage aus der Lehrplanzeile
+
+        Returns:
+            list: Die serialisierten Lehrpläne in der Standardsortierung des Lehrplan-Modells.
+                  Nicht existierende IDs werden ausgelassen.
+        """
+        depth = cls.MAX_DEPTH if depth is None else depth
+        if lehrplan_ids is not None:
+            lehrplan_ids = list(lehrplan_ids)
+            if not lehrplan_ids:
+                return []
+
+        querysets = cls._querysets(lehrplan_ids, depth, beschreibungen, stamps=stamps is not None)
+        rows = {name: list(queryset) for name, queryset in querysets.items()}
+        if stamps is not None:
+            stamps.update((row[0], tuple(row[4:6])) for row in rows['lehrplaene'])
+        return cls._build(rows, depth, beschreibungen)
@@ -0,0 +1,144 @@
+"""
+Benachrichtigungen über geänderte Lehrpläne für Server-Sent Events.
+
+Als Kanal zwischen den Worker-Prozessen dient das Änderungsprotokoll ``Aenderung`` (siehe
+``curriculum.aenderungen``). Jede Änderung an einem Knoten protokolliert auch seinen Lehrplan;
+der Eintrag wird in derselben Transaktion geschrieben und ist damit erst nach dem Commit
+sichtbar, egal ob die Änderung aus dem Admin, einem CSV-Import oder einem anderen Prozess
+stammt. Jeder Prozess liest neue Einträge mit einer Bereichsabfrage über den Primärschlüssel
+und verteilt sie an die in diesem Prozess verbundenen Clients (``LehrplanBroadcaster``). Ein
+eigener Broker ist nicht nötig, da alle Prozesse dieselbe Datenbank sehen.
+
+Einstellungen:
+    CURRICULUM_EVENTS_POLL_INTERVAL: Sekunden zwischen zwei Abfragen je Prozess (Standard: 1)
+"""
+
+import asyncio
+import logging
+
+from django.conf import settings
+
+from .models import Aenderung, Lehrplan
+
+logger = logging.getLogger(__name__)
+
+# Höchstzahl der Protokolleinträge je Abfrage
+POLL_LIMIT = 1000
+
+
+def get_poll_interval():
+    """Liefert den Abstand zwischen zwei Abfragen des Protokolls in Sekunden."""
+    return getattr(settings, 'CURRICULUM_EVENTS_POLL_INTERVAL', 1.0)
+
+
+async def aget_token():
+    """
+    Liefert das Token des aktuellen Stands (asynchrone Variante von aenderungen.get_token).
+
+    Returns:
+        int: Die ID des letzten Protokolleintrags bzw. 0
+    """
+    return await Aenderung.objects.order_by('-id').values_list('id', flat=True).afirst() or 0
+
+
+async def aload_lehrplan_events(since, limit=POLL_LIMIT):
+    """
+    Liest die nach einem Token geänderten Lehrpläne mit ihrer aktuellen Version.
+
+    Jeder Lehrplan erscheint höchstens einmal, mit dem Token seines letzten Eintrags.
+
+    Args:
+        since (int): Das Token, ab dem gelesen wird
+        limit (int): Die Höchstzahl der gelesenen Protokolleinträge
+
+    Returns:
+        tuple: (Ereignisse, neues Token, ob weitere Einträge vorliegen); Ereignisse sind
+               Dictionaries mit token, lehrplan_id und version (None für gelöschte
+               Lehrpläne), sortiert nach Token
+    """
+    rows = [
+        row async for row in
+        Aenderung.objects.filter(id__gt=since).order_by('id').values_list('id', 'modell', 'knoten_id')[:limit]
+    ]
+    tokens = {}
+    for aenderung_id, modell, knoten_id in rows:
+        if modell == Lehrplan.__name__:
+            tokens[knoten_id] = aenderung_id
+
+    versionen = {}
+    if tokens:
+        versionen = {
+            lehrplan_id: version async for lehrplan_id, version in
+            Lehrplan.objects.order_by().filter(pk__in=list(tokens)).values_list('id', 'version')
+        }
+    events = sorted(
+        ({'token': token, 'lehrplan_id': lehrplan_id, 'version': versionen.get(lehrplan_id)}
+         for lehrplan_id, token in tokens.items()),
+        key=lambda event: event['token']
+    )
+    return events, rows[-1][0] if rows else since, len(rows) == limit
+
+
+class LehrplanBroadcaster:
+    """
+    Verteilt die Benachrichtigungen an die Clients eines Prozesses.
+
+    Solange mindestens ein Client verbunden ist, liest eine Aufgabe im Event-Loop das
+    Protokoll im Abstand von CURRICULUM_EVENTS_POLL_INTERVAL Sekunden. Die Kosten sind damit
+    eine Abfrage je Intervall und Prozess, unabhängig von der Anzahl der Clients.
+
+    Jeder Client erhält eine Warteschlange mit Tupeln (Ereignisse, Token). Die Aufgabe
+    beginnt beim Token des ersten Clients; spätere Clients holen ältere Ereignisse selbst
+    nach (siehe ``subscribe()``).
+    """
+
+    def __init__(self):
+        self.queues = set()
+        self.task = None
+        self.loop = None
+        self.token = 0
+
+    def subscribe(self, since):
+        """
+        Meldet einen Client an und startet bei Bedarf die Abfrageaufgabe.
+
+        Args:
+            since (int): Das Token, ab dem der Client Ereignisse erwartet
+
+        Returns:
+            tuple: (Warteschlange, Token); die Warteschlange erhält alle Ereignisse nach dem
+                   Token, ältere muss der Client bei Bedarf mit aload_lehrplan_events nachladen
+        """
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.loop is not loop:
+            self.queues = set()
+            self.loop = loop
+            self.token = since
+            self.task = loop.create_task(self.run())
+        queue = asyncio.Queue()
+        self.queues.add(queue)
+        return queue, self.token
+
+    def unsubscribe(self, queue):
+        """Meldet einen Client ab; ohne Clients endet die Abfrageaufgabe nach dem nächsten Intervall."""
+        self.queues.discard(queue)
+
+    async def run(self):
+        """Liest das Protokoll, solange Clients verbunden sind, und verteilt neue Ereignisse."""
+        while self.queues:
+            has_more = False
+            try:
+                events, token, has_more = await aload_lehrplan_events(self.token)
+            except Exception:
+                logger.exception("Änderungsprotokoll konnte nicht gelesen werden")
+            else:
+                # Token und Verteilung ohne await dazwischen, damit neue Clients nichts verpassen
+                self.token = token
+                if events:
+                    for queue in self.queues:
+                        queue.put_nowait((events, token))
+            if not has_more:
+                await asyncio.sleep(get_poll_interval())
+
+
+broadcaster = LehrplanBroadcaster()
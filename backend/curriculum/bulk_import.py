@@ -0,0 +1,420 @@
+"""
+Bulk-Import der CSV-Dateien des Gesamtimports (``CurriculumAdminSite.import_all``).
+
+Der zeilenweise Import über ``import_data()`` speichert jede Zeile einzeln, prüft Fremdschlüssel
+und Duplikate mit eigenen Abfragen je Zeile und durchläuft für jede Zeile alle Signal-Handler.
+``bulk_import()`` liefert dasselbe Ergebnis mit wenigen Abfragen je Datei:
+
+- Die Zeilen werden im Speicher geprüft und umgewandelt: Pflichtfelder über
+  ``clean_row()`` der Resource, Feldwerte über ihre Widgets, Fremdschlüssel über das
+  ID-Mapping der vorherigen Resource bzw. vorhandene IDs (wie
+  ``ForeignKeyMappingResource.before_import_row()``); die vorhandenen IDs werden vorab
+  blockweise geladen.
+- Duplikate werden wie in ``BaseResource.skip_row()`` erkannt, gegen die Datenbank und gegen
+  die vorangehenden Zeilen derselben Datei.
+- Jede Datei wird in einer Transaktion per ``bulk_create()`` geschrieben. Das Mapping alte ID
+  -> neue ID steht danach wie bisher in ``resource.old_id_to_new_id``.
+- Enthält eine Datei fehlerhafte Zeilen, wird sie wie bisher vollständig zurückgerollt.
+- Die abgeleiteten Daten, die sonst die Signal-Handler in ``curriculum.signals`` je Zeile
+  fortschreiben, werden je Datei gesammelt nachgeführt.
+
+Das Ergebnis hat die Form des Ergebnisses von ``import_data()`` (``totals``,
+``row_errors()``, ``invalid_rows``), sodass ``import_all`` es unverändert auswerten kann.
+Dateien, die sich nicht per Bulk-Import abbilden lassen (fehlende Spalten, Werte, die die
+Datenbank ablehnt), werden mit ``BulkImportNotSupported`` gemeldet und sind zeilenweise zu
+importieren.
+"""
+
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.encoding import force_str
+from import_export.results import Error, Result, RowResult
+
+from .aenderungen import record_aenderungen
+from .facets import refresh_facetten
+from .hashes import chunked, get_hashes, invalidate_hashes, refresh_hashes
+from .hierarchy import EBENEN, get_parent_model
+from .klassenstufen import sync_klassenstufen
+from .metrics import record_import
+from .models import Aenderung, HierarchiePfad, Lehrplan, LehrplanStatistik, Lernbereich
+from .search import KNOTENTYPEN, CurriculumSearchIndex
+from .signals import apply_statistik_deltas
+from .statistik import COUNTER_FIELDS
+from .vergleich import refresh_kennzahlen
+
+BATCH_SIZE = 500
+
+
+class BulkImportNotSupported(Exception):
+    """Die Datei lässt sich nicht per Bulk-Import übernehmen und ist zeilenweise zu importieren."""
+
+
+def get_compare_fields(model):
+    """
+    Liefert die Spalten der Duplikatsprüfung wie in BaseResource.skip_row().
+
+    Returns:
+        list: Attributnamen aller bearbeitbaren Felder außer dem Primärschlüssel,
+              Fremdschlüssel als '<feld>_id'
+    """
+    return [
+        field.attname for field in model._meta.fields
+        if field.name != 'id' and not field.primary_key and field.editable
+    ]
+
+
+class DuplicateIndex:
+    """
+    Vorhandene Zeilen eines Modells für die Duplikatsprüfung, gruppiert nach Elternknoten.
+
+    Eine Zeile gilt wie in BaseResource.skip_row() als Duplikat, wenn eine gespeicherte Zeile in
+    allen Feldern übereinstimmt; Felder ohne Wert (None) werden dabei nicht verglichen.
+    """
+
+    def __init__(self, compare_fields, group_field=None):
+        self.compare_fields = compare_fields
+        self.group_index = compare_fields.index(group_field) if group_field else None
+        self.rows = defaultdict(set)
+
+    def get_group(self, values):
+        return values[self.group_index] if self.group_index is not None else None
+
+    def load(self, model, group_ids=None):
+        """
+        Lädt die gespeicherten Zeilen eines Modells, bei Kindmodellen nur die der angegebenen Elternknoten.
+
+        Args:
+            model: Die Modellklasse
+            group_ids: Iterierbare Menge von Eltern-IDs oder None für alle Zeilen
+        """
+        if group_ids is None:
+            querysets = [model.objects.order_by()]
+        else:
+            group_field = self.compare_fields[self.group_index]
+            querysets = [
+                model.objects.order_by().filter(**{f"{group_field}__in": chunk})
+                for chunk in chunked(group_ids)
+            ]
+        for queryset in querysets:
+            for values in queryset.values_list(*self.compare_fields):
+                self.add(values)
+
+    def add(self, values):
+        self.rows[self.get_group(values)].add(values)
+
+    def contains(self, values):
+        if all(value is None for value in values):
+            return False
+        rows = self.rows.get(self.get_group(values), ())
+        if None not in values:
+            return values in rows
+        return any(
+            all(value is None or value == stored for value, stored in zip(values, row))
+            for row in rows
+        )
+
+
+def load_existing_ids(model, ids):
+    """Liefert die IDs, zu denen ein Objekt des Modells existiert, mit einer Abfrage je Block."""
+    existing = set()
+    for chunk in chunked(ids):
+        existing.update(model.objects.order_by().filter(pk__in=chunk).values_list('pk', flat=True))
+    return existing
+
+
+def load_vorfahren(model, ids):
+    """
+    Liefert die gespeicherten Vorfahren mehrerer Knoten aus der Closure-Tabelle.
+
+    Args:
+        model: Eine Knotenmodellklasse aus EBENEN
+        ids: Iterierbare Menge von Knoten-IDs
+
+    Returns:
+        dict: Knoten-ID -> Liste der Tupel (Ebene, ID) einschließlich des Knotens selbst
+    """
+    vorfahren = defaultdict(list)
+    for chunk in chunked(ids):
+        rows = (
+            HierarchiePfad.objects.order_by()
+            .filter(nachfahr_ebene=EBENEN[model], nachfahr_id__in=chunk)
+            .values_list('nachfahr_id', 'vorfahr_ebene', 'vorfahr_id')
+        )
+        for knoten_id, vorfahr_ebene, vorfahr_id in rows:
+            vorfahren[knoten_id].append((vorfahr_ebene, vorfahr_id))
+    return vorfahren
+
+
+class ForeignKeyResolver:
+    """
+    Löst die Fremdschlüssel einer Datei wie ForeignKeyMappingResource.before_import_row() auf.
+
+    Eine alte ID wird über das Mapping der vorherigen Resource übersetzt, sofern das Ziel
+    existiert, andernfalls unverändert übernommen, wenn ein Objekt mit dieser ID existiert
+    (und dann ins Mapping eingetragen). Die Existenz aller in Frage kommenden IDs wird vorab
+    geladen.
+    """
+
+    def __init__(self, resource, previous_resource, dataset):
+        self.model = resource.foreign_key_model
+        self.column = f"{resource.foreign_key_field}_id"
+        self.mapping = previous_resource.old_id_to_new_id
+
+        candidates = set()
+        for value in dataset[self.column]:
+            try:
+                old_id = int(value)
+            except (TypeError, ValueError):
+                continue
+            candidates.add(old_id)
+            if old_id in self.mapping:
+                candidates.add(self.mapping[old_id])
+        self.existing = load_existing_ids(self.model, candidates)
+
+    def resolve(self, row):
+        """
+        Liefert die neue ID des Elternknotens einer Zeile.
+
+        Raises:
+            Exception: Mit derselben Meldung wie der zeilenweise Import, wenn die ID ungültig
+                       ist oder sich nicht zuordnen lässt
+        """
+        try:
+            old_id = int(row[self.column])
+        except ValueError as e:
+            raise Exception(f"Ungültige {self.model.__name__}-ID: {str(e)}")
+        if old_id in self.mapping and self.mapping[old_id] in self.existing:
+            return self.mapping[old_id]
+        if old_id in self.existing:
+            self.mapping[old_id] = old_id
+            return old_id
+        raise Exception(f"Keine Mapping-Information für {self.model.__name__}-ID {old_id} gefunden.")
+
+
+def read_rows(resource, dataset, resolver, result):
+    """
+    Prüft die Zeilen einer Datei und legt für jede zu importierende Zeile eine Instanz an.
+
+    Die Reihenfolge der Prüfungen entspricht Resource.import_row(): Zeilenprüfung bzw.
+    Fremdschlüssel (Fehler), Feldwerte, Duplikatsprüfung (übersprungen), ungültige Feldwerte.
+    Wie bei import_data() erhält das Ergebnis für jede nicht übersprungene Zeile ein
+    RowResult, nach dessen Position sich die Zeilennummern in row_errors() richten.
+
+    Returns:
+        list: Tupel (alte ID, ungespeicherte Instanz) in der Reihenfolge der Datei
+    """
+    model = resource._meta.model
+    fk_field = f"{resource.foreign_key_field}_id" if resolver else None
+    import_fields = [
+        field for field in resource.get_import_fields()
+        if field.attribute and field.attribute != resource.foreign_key_field
+    ]
+    compare_fields = get_compare_fields(model)
+
+    # Tupel (Nummer, Zeile, Instanz, Vergleichswerte, ungültige Felder, Fehler)
+    rows = []
+    for number, values in enumerate(dataset, 1):
+        row = OrderedDict(zip(dataset.headers, values))
+        try:
+            resource.clean_row(row)
+            instance = model()
+            if resolver:
+                setattr(instance, fk_field, resolver.resolve(row))
+            errors = {}
+            for field in import_fields:
+                try:
+                    resource.import_field(field, instance, row)
+                except ValueError as e:
+                    errors[field.attribute] = ValidationError(force_str(e), code="invalid")
+            rows.append((number, row, instance, tuple(getattr(instance, name) for name in compare_fields), errors, None))
+        except Exception as e:
+            rows.append((number, row, None, None, None, e))
+
+    duplicates = DuplicateIndex(compare_fields, fk_field)
+    if fk_field:
+        duplicates.load(model, {getattr(instance, fk_field) for _, _, instance, *_ in rows if instance is not None})
+    else:
+        duplicates.load(model)
+
+    instances = []
+    for number, row, instance, values, errors, error in rows:
+        row_result = RowResult()
+        if error is not None:
+            row_result.import_type = RowResult.IMPORT_TYPE_ERROR
+            row_result.errors.append(Error(error, row=row, number=number))
+            result.append_error_row(number, row, row_result.errors)
+        elif duplicates.contains(values):
+            result.totals[RowResult.IMPORT_TYPE_SKIP] += 1
+            continue
+        elif errors:
+            row_result.import_type = RowResult.IMPORT_TYPE_INVALID
+            row_result.validation_error = ValidationError(errors)
+            result.append_invalid_row(number, row, row_result.validation_error)
+        else:
+            row_result.import_type = RowResult.IMPORT_TYPE_NEW
+            duplicates.add(values)
+            instances.append((instance.id, instance))
+        result.increment_row_result_total(row_result)
+        result.append_row_result(row_result)
+    return instances
+
+
+def bump_versions_by(counts):
+    """Erhöht die Versionen der Lehrpläne um die Anzahl ihrer neuen Knoten, wie es je Zeile geschähe."""
+    lehrplaene = defaultdict(list)
+    for lehrplan_id, anzahl in counts.items():
+        lehrplaene[anzahl].append(lehrplan_id)
+    now = timezone.now()
+    for anzahl, lehrplan_ids in lehrplaene.items():
+        for chunk in chunked(lehrplan_ids):
+            Lehrplan.objects.filter(pk__in=chunk).update(version=F('version') + anzahl, geaendert_am=now)
+
+
+def index_on_commit(model, knoten_ids):
+    """Erneuert die Dokumente der Knoten im Volltextindex nach dem Commit, blockweise."""
+    for chunk in chunked(knoten_ids):
+        transaction.on_commit(lambda chunk=chunk: CurriculumSearchIndex.index_nodes(model, chunk))
+
+
+def update_lehrplaene(lehrplaene):
+    """Schreibt die abgeleiteten Daten neuer Lehrpläne wie die Signal-Handler beim Anlegen."""
+    ids = [lehrplan.id for lehrplan in lehrplaene]
+    HierarchiePfad.objects.bulk_create([
+        HierarchiePfad(vorfahr_ebene=EBENEN[Lehrplan], vorfahr_id=lehrplan_id, nachfahr_ebene=EBENEN[Lehrplan], nachfahr_id=lehrplan_id)
+        for lehrplan_id in ids
+    ], batch_size=BATCH_SIZE)
+    LehrplanStatistik.objects.bulk_create([LehrplanStatistik(lehrplan_id=lehrplan_id) for lehrplan_id in ids], batch_size=BATCH_SIZE)
+    sync_klassenstufen(lehrplaene)
+    refresh_kennzahlen((lehrplan.bundesland, lehrplan.fach) for lehrplan in lehrplaene)
+    refresh_facetten((lehrplan.bundesland, lehrplan.fach, lehrplan.klassenstufen) for lehrplan in lehrplaene)
+    record_aenderungen((Lehrplan, lehrplan_id, Aenderung.ART_ANGELEGT) for lehrplan_id in ids)
+    transaction.on_commit(lambda: get_hashes((EBENEN[Lehrplan], lehrplan_id) for lehrplan_id in ids))
+
+
+def update_kinder(model, fk_field, instances):
+    """
+    Schreibt die abgeleiteten Daten neuer Kindobjekte wie die Signal-Handler beim Anlegen.
+
+    Closure-Tabelle, Versionen, Änderungsprotokoll, Inhaltshashes, Kennzahlen und Suchindex
+    werden für alle Objekte einer Datei zusammen nachgeführt; die Versionen steigen wie beim
+    zeilenweisen Import um eins je neuem Objekt.
+    """
+    parent_model = get_parent_model(model)
+    parent_ids = {getattr(instance, fk_field) for instance in instances}
+    vorfahren = load_vorfahren(parent_model, parent_ids)
+    lehrplan_ids = {
+        parent_id: next((vorfahr_id for ebene, vorfahr_id in keys if ebene == EBENEN[Lehrplan]), None)
+        for parent_id, keys in vorfahren.items()
+    }
+
+    if model in EBENEN:
+        ebene = EBENEN[model]
+        HierarchiePfad.objects.bulk_create([
+            HierarchiePfad(vorfahr_ebene=vorfahr_ebene, vorfahr_id=vorfahr_id, nachfahr_ebene=ebene, nachfahr_id=instance.pk)
+            for instance in instances
+            for vorfahr_ebene, vorfahr_id in [*vorfahren.get(getattr(instance, fk_field), []), (ebene, instance.pk)]
+        ], batch_size=BATCH_SIZE)
+
+    knoten_lehrplan = [(instance, lehrplan_ids.get(getattr(instance, fk_field))) for instance in instances]
+    counts = Counter(lehrplan_id for _, lehrplan_id in knoten_lehrplan if lehrplan_id is not None)
+    bump_versions_by(counts)
+
+    aenderungen = []
+    for instance, lehrplan_id in knoten_lehrplan:
+        aenderungen.append((model, instance.pk, Aenderung.ART_ANGELEGT))
+        if lehrplan_id is not None:
+            aenderungen.append((Lehrplan, lehrplan_id, Aenderung.ART_GEAENDERT))
+    record_aenderungen(aenderungen)
+
+    parent_ebene = EBENEN[parent_model]
+    hash_keys = [(parent_ebene, parent_id) for parent_id in parent_ids]
+    if model in EBENEN:
+        hash_keys += [(EBENEN[model], instance.pk) for instance in instances]
+    invalidated = set()
+    for chunk in chunked(hash_keys):
+        invalidated |= invalidate_hashes(chunk)
+    transaction.on_commit(lambda: refresh_hashes(invalidated))
+
+    if model in COUNTER_FIELDS:
+        deltas = defaultdict(Counter)
+        for instance, lehrplan_id in knoten_lehrplan:
+            deltas[lehrplan_id][COUNTER_FIELDS[model]] += 1
+            if model is Lernbereich:
+                deltas[lehrplan_id]['unterrichtsstunden'] += instance.unterrichtsstunden or 0
+        for lehrplan_id, lehrplan_deltas in deltas.items():
+            apply_statistik_deltas(lehrplan_id, lehrplan_deltas)
+
+    if model in KNOTENTYPEN:
+        index_on_commit(model, [instance.pk for instance in instances])
+    elif parent_model in KNOTENTYPEN:
+        index_on_commit(parent_model, parent_ids)
+
+
+def bulk_import(resource, dataset, resource_instance=None):
+    """
+    Importiert eine CSV-Datei des Gesamtimports mit bulk_create().
+
+    Args:
+        resource: Die Resource der Datei (BaseResource); ihr Mapping alte ID -> neue ID wird
+                  neu gefüllt
+        dataset: Der tablib-Datensatz der Datei
+        resource_instance: Die Resource der Elterndatei mit deren ID-Mapping (bei Kinddateien)
+
+    Returns:
+        Result: Ergebnis wie von import_data() mit totals, Fehlern und ungültigen Zeilen
+
+    Raises:
+        BulkImportNotSupported: Wenn Spalten fehlen, die Datenbank keine IDs aus
+                                bulk_create() liefert oder Werte ablehnt; es wurde nichts
+                                geschrieben
+    """
+    started = time.perf_counter()
+    model = resource._meta.model
+    if not connection.features.can_return_rows_from_bulk_insert:
+        raise BulkImportNotSupported("Die Datenbank liefert bei bulk_create() keine IDs")
+    missing = [
+        field.column_name for field in resource.get_import_fields()
+        if field.attribute and field.column_name not in (dataset.headers or [])
+    ]
+    if missing:
+        raise BulkImportNotSupported(f"Fehlende Spalten: {', '.join(missing)}")
+
+    resolver = None
+    if resource.foreign_key_field:
+        if resource_instance is None:
+            raise BulkImportNotSupported("Keine Resource-Instance für ID-Mapping verfügbar")
+        resolver = ForeignKeyResolver(resource, resource_instance, dataset)
+
+    result = Result()
+    result.total_rows = len(dataset)
+    instances = read_rows(resource, dataset, resolver, result)
+
+    mapping = {}
+    try:
+        with transaction.atomic():
+            for _, instance in instances:
+                instance.id = None
+            model.objects.bulk_create([instance for _, instance in instances], batch_size=BATCH_SIZE)
+            if result.has_errors():
+                # Wie beim zeilenweisen Import wird die Datei bei fehlerhaften Zeilen verworfen
+                transaction.set_rollback(True)
+            elif instances:
+                for old_id, instance in instances:
+                    if old_id is not None:
+                        mapping[old_id] = instance.pk
+                if model is Lehrplan:
+                    update_lehrplaene([instance for _, instance in instances])
+                else:
+                    update_kinder(model, f"{resource.foreign_key_field}_id", [instance for _, instance in instances])
+    except DatabaseError as e:
+        raise BulkImportNotSupported(str(e)) from e
+
+    resource.old_id_to_new_id = mapping
+    if result.total_rows:
+        record_import(resource, result, started)
+    return result
@@ -0,0 +1,168 @@
+"""
+Cache für serialisierte Lehrplanbäume.
+
+Die vollständig serialisierten Lehrplanstrukturen werden pro Lehrplan in einem
+austauschbaren Django-Cache-Backend abgelegt (Einstellung ``CURRICULUM_CACHE_ALIAS``).
+Die Versionsstempel der Lehrpläne werden nicht gecacht, sondern je Anfrage gelesen (siehe
+``curriculum.versioning``).
+
+Der Schlüssel eines Baums enthält die Version des Lehrplans, aus der er aufgebaut wurde.
+Jede Änderung am Lehrplan oder an einem seiner Knoten erhöht die Version in derselben
+Transaktion (siehe ``curriculum.signals``), sodass Leser danach den Schlüssel der neuen
+Version abfragen. Das gilt für alle Worker-Prozesse, auch wenn jeder seinen eigenen
+LocMemCache hat, und ohne Invalidierung nach dem Commit: Ein Leser, der parallel zu einer
+Änderung noch den alten Stand lädt, legt ihn unter der alten Version ab, die niemand mehr
+abfragt. Einträge alter Versionen laufen nach ``CURRICULUM_CACHE_TIMEOUT`` Sekunden ab.
+Treffer und Fehlzugriffe beim Lesen werden in ``curriculum_cache_requests_total`` gezählt
+(siehe ``curriculum.metrics``).
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import CACHE_REQUESTS
+from .models import Lehrplan
+
+
+class CurriculumCache:
+    """
+    Hilfsklasse für das Lesen, Schreiben und Invalidieren gecachter Lehrplanbäume.
+
+    Wie der CurriculumSerializer wird diese Klasse ohne Instanziierung verwendet.
+    """
+
+    KEY_PREFIX = 'curriculum:lehrplan'
+
+    @staticmethod
+    def get_backend():
+        """
+        Gibt das konfigurierte Cache-Backend zurück.
+
+        Returns:
+            BaseCache: Das Backend aus ``settings.CACHES[CURRICULUM_CACHE_ALIAS]``
+        """
+        return caches[getattr(settings, 'CURRICULUM_CACHE_ALIAS', 'default')]
+
+    @staticmethod
+    def get_timeout():
+        """
+        Gibt die Lebensdauer der Einträge in Sekunden zurück (Standard: eine Stunde).
+        """
+        return getattr(settings, 'CURRICULUM_CACHE_TIMEOUT', 60 * 60)
+
+    @staticmethod
+    def count_lookups(cache, hits, total):
+        """
+        Zählt Treffer und Fehlzugriffe eines Lesezugriffs.
+
+        Args:
+            cache (str): Die Eintragsart ('tree' für Bäume)
+            hits (int): Anzahl der gefundenen Einträge
+            total (int): Anzahl der gesuchten Einträge
+        """
+        if hits:
+            CACHE_REQUESTS.inc(hits, cache=cache, result='hit')
+        if total > hits:
+            CACHE_REQUESTS.inc(total - hits, cache=cache, result='miss')
+
+    @classmethod
+    def make_key(cls, lehrplan_id, version):
+        """
+        Erzeugt den Cache-Schlüssel für einen Lehrplan in einer bestimmten Version.
+
+        Args:
+            lehrplan_id: Die ID des Lehrplans
+            version: Die Version des Lehrplans (``Lehrplan.version``)
+
+        Returns:
+            str: Der Cache-Schlüssel
+        """
+        return f"{cls.KEY_PREFIX}:{int(lehrplan_id)}:{int(version)}"
+
+    @classmethod
+    def get(cls, lehrplan_id, version):
+        """
+        Liest einen serialisierten Lehrplanbaum aus dem Cache.
+
+        Args:
+            lehrplan_id: Die ID des Lehrplans
+            version: Die aktuelle Version des Lehrplans
+
+        Returns:
+            dict: Der serialisierte Baum oder None, wenn kein Eintrag für diese Version existiert
+        """
+        tree = cls.get_backend().get(cls.make_key(lehrplan_id, version))
+        cls.count_lookups('tree', tree is not None, 1)
+        return tree
+
+    @classmethod
+    def get_many(cls, versions):
+        """
+        Liest mehrere serialisierte Lehrplanbäume mit einem Cache-Zugriff.
+
+        Args:
+            versions (dict): Lehrplan-ID -> aktuelle Version des Lehrplans
+
+        Returns:
+            dict: Lehrplan-ID -> serialisierter Baum, nur für vorhandene Einträge
+        """
+        keys = {cls.make_key(lehrplan_id, version): lehrplan_id for lehrplan_id, version in versions.items()}
+        if not keys:
+            return {}
+        found = cls.get_backend().get_many(list(keys))
+        cls.count_lookups('tree', len(found), len(keys))
+        return {keys[key]: tree for key, tree in found.items()}
+
+    @classmethod
+    async def aget_many(cls, versions):
+        """
+        Asynchrone Variante von get_many() über die async-Schnittstelle des Cache-Backends.
+        """
+        keys = {cls.make_key(lehrplan_id, version): lehrplan_id for lehrplan_id, version in versions.items()}
+        if not keys:
+            return {}
+        found = await cls.get_backend().aget_many(list(keys))
+        cls.count_lookups('tree', len(found), len(keys))
+        return {keys[key]: tree for key, tree in found.items()}
+
+    @classmethod
+    def set(cls, lehrplan_id, version, tree):
+        """
+        Legt einen serialisierten Lehrplanbaum im Cache ab.
+
+        Args:
+            lehrplan_id: Die ID des Lehrplans
+            version: Die Version des Lehrplans, aus der der Baum aufgebaut wurde
+            tree (dict): Der serialisierte Baum
+        """
+        cls.get_backend().set(cls.make_key(lehrplan_id, version), tree, cls.get_timeout())
+
+    @classmethod
+    def set_many(cls, trees, versions):
+        """
+        Legt mehrere serialisierte Lehrplanbäume im Cache ab.
+
+        Args:
+            trees (dict): Lehrplan-ID -> serialisierter Baum
+            versions (dict): Lehrplan-ID -> Version, aus der der Baum aufgebaut wurde
+        """
+        if trees:
+            cls.get_backend().set_many(
+                {cls.make_key(lehrplan_id, versions[lehrplan_id]): tree for lehrplan_id, tree in trees.items()},
+                cls.get_timeout()
+            )
+
+    @classmethod
+    def invalidate(cls, lehrplan_ids):
+        """
+        Entfernt die Bäume der aktuellen Versionen der angegebenen Lehrpläne aus dem Cache.
+
+        Für Änderungen ist das nicht nötig (siehe oben); gedacht für Messungen mit leerem Cache.
+
+        Args:
+            lehrplan_ids: Iterierbare Menge von Lehrplan-IDs (None-Werte werden ignoriert)
+        """
+        lehrplan_ids = {lehrplan_id for lehrplan_id in lehrplan_ids if lehrplan_id is not None}
+        if lehrplan_ids:
+            versions = Lehrplan.objects.filter(pk__in=lehrplan_ids).values_list('id', 'version')
+            cls.get_backend().delete_many([cls.make_key(lehrplan_id, version) for lehrplan_id, version in versions])
@@ -0,0 +1,113 @@
+"""
+Facettenzählungen für die Filterleiste.
+
+Die Tabelle ``LehrplanFacette`` enthält je Kombination aus Bundesland, Fach und
+Klassenstufen-Text die Anzahl der Lehrpläne. Sie ist klein (eine Zeile je Kombination) und
+wird über die Signal-Handler in ``curriculum.signals`` bei jedem Speichern und Löschen
+eines Lehrplans für die betroffenen Kombinationen neu gezählt. Die Zählung je Klassenstufe
+stammt aus der normalisierten Tabelle ``LehrplanKlassenstufe`` (siehe
+``curriculum.klassenstufen``); Klassenstufen-Texte werden dabei nicht mehr je Anfrage
+zerlegt.
+"""
+
+from collections import Counter
+
+from django.db.models import Count
+
+from .klassenstufen import build_klassenstufe_filter
+from .models import Lehrplan, LehrplanFacette, LehrplanKlassenstufe
+
+DIMENSIONS = ('bundesland', 'fach', 'klassenstufe')
+
+
+def refresh_facetten(kombinationen):
+    """
+    Zählt die Lehrpläne der angegebenen Kombinationen neu.
+
+    Kombinationen ohne Lehrpläne werden entfernt.
+
+    Args:
+        kombinationen: Iterierbare Menge von Tupeln (bundesland, fach, klassenstufen)
+    """
+    for bundesland, fach, klassenstufen in set(kombinationen):
+        kombination = {'bundesland': bundesland, 'fach': fach, 'klassenstufen': klassenstufen}
+        anzahl = Lehrplan.objects.filter(**kombination).count()
+        facette = LehrplanFacette.objects.filter(**kombination)
+        if not anzahl:
+            facette.delete()
+        elif not facette.update(anzahl=anzahl):
+            LehrplanFacette.objects.create(**kombination, anzahl=anzahl)
+
+
+def rebuild_facetten():
+    """
+    Berechnet die gesamte Facettentabelle aus den Lehrplänen neu.
+
+    Returns:
+        int: Die Anzahl der Kombinationen
+    """
+    rows = (
+        Lehrplan.objects.order_by()
+        .values_list('bundesland', 'fach', 'klassenstufen')
+        .annotate(anzahl=Count('id'))
+    )
+    LehrplanFacette.objects.all().delete()
+    facetten = LehrplanFacette.objects.bulk_create([
+        LehrplanFacette(bundesland=bundesland, fach=fach, klassenstufen=klassenstufen, anzahl=anzahl)
+        for bundesland, fach, klassenstufen, anzahl in rows
+    ])
+    return len(facetten)
+
+
+def count_facets(bundesland=None, fach=None, klassenstufe=None):
+    """
+    Zählt die Lehrpläne je Bundesland, Fach und Klassenstufe.
+
+    Die Zählung einer Dimension berücksichtigt die Filter aller anderen Dimensionen, nicht
+    aber den eigenen; so zeigt die Filterleiste auch die Alternativen zum gewählten Wert.
+    Ein Lehrplan für mehrere Klassenstufen zählt bei jeder dieser Stufen einmal.
+
+    Bundesland, Fach und Gesamtzahl stammen aus der Facettentabelle. Der Klassenstufen-Filter
+    wählt darin die Klassenstufen-Texte aus, zu denen ``LehrplanKlassenstufe`` eine passende
+    Stufe enthält; gleiche Texte ergeben stets dieselben Stufen. Die Zählung je Stufe ist eine
+    Aggregatabfrage auf ``LehrplanKlassenstufe``.
+
+    Args:
+        bundesland (str): Filter auf das Bundesland oder None
+        fach (str): Filter auf das Fach oder None
+        klassenstufe (str): Filter wie beim Parameter klassenstufe der Liste (z. B. '5-7') oder None
+
+    Returns:
+        dict: {'total': Anzahl mit allen Filtern, 'facets': {Dimension: {Wert: Anzahl}}}
+
+    Raises:
+        BadRequest: Bei einem ungültigen Klassenstufen-Filter
+    """
+    facetten = LehrplanFacette.objects.order_by()
+    if klassenstufe:
+        texte = LehrplanKlassenstufe.objects.filter(build_klassenstufe_filter(klassenstufe)).values('lehrplan__klassenstufen')
+        facetten = facetten.filter(klassenstufen__in=texte)
+
+    counts = {dimension: Counter() for dimension in DIMENSIONS}
+    total = 0
+    for row_bundesland, row_fach, anzahl in facetten.values_list('bundesland', 'fach', 'anzahl'):
+        if not bundesland or row_bundesland == bundesland:
+            counts['fach'][row_fach] += anzahl
+            if not fach or row_fach == fach:
+                total += anzahl
+        if not fach or row_fach == fach:
+            counts['bundesland'][row_bundesland] += anzahl
+
+    stufen = LehrplanKlassenstufe.objects.order_by()
+    if bundesland:
+        stufen = stufen.filter(lehrplan__bundesland=bundesland)
+    if fach:
+        stufen = stufen.filter(lehrplan__fach=fach)
+    counts['klassenstufe'].update(dict(
+        stufen.values_list('stufe').annotate(anzahl=Count('lehrplan_id', distinct=True))
+    ))
+
+    return {
+        'total': total,
+        'facets': {dimension: dict(sorted(counts[dimension].items())) for dimension in DIMENSIONS},
+    }
@@ -0,0 +1,436 @@
+"""
+Inhaltshashes (Merkle-Baum) über die Lehrplan-Hierarchie.
+
+Für jeden Knoten (Lehrplan, Lernbereich, Lernziel, Teilziel, Lerninhalt) enthält die
+Tabelle ``KnotenHash`` zwei Hashes:
+
+- ``eigen``: über die eigenen Felder des Knotens (siehe HASH_FIELDS) und die Texte seiner
+  Beschreibungen
+- ``baum``: über ``eigen`` und die Baum-Hashes der Kinder in ihrer Standardsortierung
+
+IDs fließen nicht ein, sodass inhaltsgleiche Teilbäume verschiedener Lehrpläne denselben
+Hash haben. Stimmen die Baum-Hashes zweier Knoten überein, sind ihre Teilbäume gleich; ein
+Vergleich steigt daher nur in Teilbäume mit unterschiedlichem Hash ab (``diff_knoten``).
+
+Bei jedem Schreibzugriff löschen die Signal-Handler in ``curriculum.signals`` die Hashes
+des betroffenen Knotens und seiner Vorfahren (``invalidate_hashes``) und berechnen sie nach
+dem Commit neu (``refresh_hashes``). Fehlende Hashes werden außerdem beim Lesen berechnet
+(``get_hashes``); dabei werden nur die fehlenden Knoten neu berechnet, für alle übrigen gilt
+der gespeicherte Hash. Ist ein Hash gespeichert, sind es daher auch die Hashes aller Nachfahren.
+
+Ein Leser, der den Stand vor einem Schreibzugriff gelesen hat, kann seine Hashes erst nach
+dem Verwerfen speichern. Lesende Zugriffe überschreiben daher nie einen gespeicherten Hash,
+während die Neuberechnung nach dem Commit die gespeicherten Werte der verworfenen Knoten
+weder übernimmt noch beibehält, sondern sie überschreibt.
+"""
+
+import hashlib
+import json
+from collections import Counter, defaultdict
+
+from django.db.models import Exists, OuterRef, Q
+
+from .hierarchy import EBENEN, EBENEN_MODELLE, PARENT_FIELDS, get_parent_model
+from .models import HierarchiePfad, KnotenHash, Lehrplan, Lernbereich, Lernziel, Teilziel, Lerninhalt
+
+# Knotenmodell -> Felder, die in den eigenen Hash eingehen
+HASH_FIELDS = {
+    Lehrplan: ('bundesland', 'fach', 'klassenstufen'),
+    Lernbereich: ('nummer', 'name', 'unterrichtsstunden'),
+    Lernziel: ('name',),
+    Teilziel: ('name',),
+    Lerninhalt: ('name',),
+}
+
+# Knotenmodell -> Modell seiner Beschreibungen bzw. seiner Kinder
+BESCHREIBUNG_MODELLE = {get_parent_model(model): model for model in PARENT_FIELDS if model not in EBENEN}
+KIND_MODELLE = {get_parent_model(model): model for model in PARENT_FIELDS if model in EBENEN}
+
+# Felder, über die Kinder zweier Knoten beim Vergleich einander zugeordnet werden, je Ebene
+DIFF_KEYS = {
+    1: 'nummer',
+    2: 'name',
+    3: 'name',
+    4: 'name',
+}
+
+# Höchstzahl von IDs je IN-Abfrage
+CHUNK_SIZE = 500
+
+
+def chunked(ids):
+    """Teilt IDs in Listen von höchstens CHUNK_SIZE Einträgen auf."""
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def group_keys(keys):
+    """Gruppiert Tupel (Ebene, ID) nach Ebene."""
+    grouped = defaultdict(set)
+    for ebene, knoten_id in keys:
+        grouped[ebene].add(knoten_id)
+    return grouped
+
+
+def hash_values(values):
+    """
+    Bildet einen Hash über eine JSON-serialisierbare Liste.
+
+    Args:
+        values (list): Die Werte
+
+    Returns:
+        str: 32 Hexadezimalzeichen
+    """
+    data = json.dumps(values, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def load_children(ebene, parent_ids, fields=()):
+    """
+    Lädt die Kinder mehrerer Knoten einer Ebene in ihrer Standardsortierung.
+
+    Args:
+        ebene (int): Die Ebene der Elternknoten (0 bis 3)
+        parent_ids: Iterierbare Menge von IDs der Elternknoten
+        fields (tuple): Zusätzlich zu ladende Felder der Kinder
+
+    Returns:
+        dict: Eltern-ID -> Liste von Tupeln (Kind-ID, *fields)
+    """
+    model = KIND_MODELLE[EBENEN_MODELLE[ebene]]
+    parent_field = PARENT_FIELDS[model]
+    children = defaultdict(list)
+    for chunk in chunked(parent_ids):
+        rows = model.objects.filter(**{f'{parent_field}_id__in': chunk}).values_list(f'{parent_field}_id', 'id', *fields)
+        for parent_id, *child in rows:
+            children[parent_id].append(tuple(child))
+    return children
+
+
+def load_own_values(ebene, ids):
+    """
+    Lädt die Werte, die in den eigenen Hash der Knoten eingehen.
+
+    Args:
+        ebene (int): Die Ebene der Knoten
+        ids: Iterierbare Menge von Knoten-IDs
+
+    Returns:
+        dict: Knoten-ID -> {Feldname: Wert}, bei Knoten mit Beschreibungen zusätzlich 'beschreibungen'
+    """
+    model = EBENEN_MODELLE[ebene]
+    beschreibung_model = BESCHREIBUNG_MODELLE.get(model)
+    values = {}
+    for chunk in chunked(ids):
+        for knoten_id, *felder in model.objects.filter(id__in=chunk).order_by().values_list('id', *HASH_FIELDS[model]):
+            values[knoten_id] = dict(zip(HASH_FIELDS[model], felder))
+            if beschreibung_model is not None:
+                values[knoten_id]['beschreibungen'] = []
+    if beschreibung_model is not None:
+        parent_field = PARENT_FIELDS[beschreibung_model]
+        for chunk in chunked(values):
+            rows = (
+                beschreibung_model.objects
+                .filter(**{f'{parent_field}_id__in': chunk})
+                .values_list(f'{parent_field}_id', 'text')
+            )
+            for knoten_id, text in rows:
+                values[knoten_id]['beschreibungen'].append(text)
+    return values
+
+
+def load_hashes(keys):
+    """
+    Lädt die gespeicherten Hashes der angegebenen Knoten.
+
+    Args:
+        keys: Iterierbare Menge von Tupeln (Ebene, Knoten-ID)
+
+    Returns:
+        dict: (Ebene, Knoten-ID) -> (eigen, baum); Knoten ohne gespeicherten Hash fehlen
+    """
+    hashes = {}
+    for ebene, ids in group_keys(keys).items():
+        for chunk in chunked(ids):
+            rows = KnotenHash.objects.filter(ebene=ebene, knoten_id__in=chunk).values_list('knoten_id', 'eigen', 'baum')
+            hashes.update({(ebene, knoten_id): (eigen, baum) for knoten_id, eigen, baum in rows})
+    return hashes
+
+
+def compute_hashes(keys, known, use_stored=True, stale=()):
+    """
+    Berechnet die Hashes der angegebenen Knoten und aller Nachfahren, deren Hash nicht bekannt ist.
+
+    Zunächst werden von oben nach unten die Kinder der fehlenden Knoten und deren
+    gespeicherte Hashes geladen, anschließend von den Blättern aufwärts gerechnet. Je Ebene
+    fallen etwa vier Abfragen an (bei mehr als CHUNK_SIZE Knoten entsprechend mehr).
+
+    Args:
+        keys: Iterierbare Menge von Tupeln (Ebene, Knoten-ID)
+        known (dict): (Ebene, Knoten-ID) -> (eigen, baum) bereits bekannter Knoten
+        use_stored (bool): Ob gespeicherte Hashes der Nachfahren übernommen werden; bei False
+                           werden alle Nachfahren neu berechnet
+        stale: Menge von Tupeln (Ebene, Knoten-ID), deren gespeicherte Hashes nicht übernommen
+               werden
+
+    Returns:
+        dict: (Ebene, Knoten-ID) -> (eigen, baum) der neu berechneten Knoten; nicht existierende
+              Knoten fehlen
+    """
+    known = dict(known)
+    pending = group_keys(key for key in keys if key not in known)
+    children = {}
+    for ebene in range(max(EBENEN_MODELLE)):
+        if not pending.get(ebene):
+            continue
+        children[ebene] = load_children(ebene, pending[ebene])
+        child_keys = [(ebene + 1, child_id) for kinder in children[ebene].values() for child_id, in kinder]
+        if use_stored:
+            known.update((key, value) for key, value in load_hashes(child_keys).items() if key not in stale)
+        pending[ebene + 1].update(child_id for key, child_id in child_keys if (key, child_id) not in known)
+
+    computed = {}
+    for ebene in sorted(pending, reverse=True):
+        model = EBENEN_MODELLE[ebene]
+        for knoten_id, values in load_own_values(ebene, pending[ebene]).items():
+            eigen = hash_values([model.__name__, *values.values()])
+            kinder = children.get(ebene, {}).get(knoten_id, [])
+            baum = hash_values([eigen, [known[(ebene + 1, child_id)][1] for child_id, in kinder]])
+            known[(ebene, knoten_id)] = computed[(ebene, knoten_id)] = (eigen, baum)
+    return computed
+
+
+def get_hashes(keys):
+    """
+    Liefert die Hashes der angegebenen Knoten und berechnet fehlende bei Bedarf.
+
+    Neu berechnete Hashes (auch die von Nachfahren) werden gespeichert.
+
+    Args:
+        keys: Iterierbare Menge von Tupeln (Ebene, Knoten-ID)
+
+    Returns:
+        dict: (Ebene, Knoten-ID) -> (eigen, baum); nicht existierende Knoten fehlen
+    """
+    keys = set(keys)
+    hashes = load_hashes(keys)
+    computed = compute_hashes(keys, hashes)
+    store_hashes(computed)
+    hashes.update(computed)
+    return {key: hashes[key] for key in keys if key in hashes}
+
+
+def refresh_hashes(keys):
+    """
+    Berechnet die Hashes der angegebenen Knoten ohne ihre gespeicherten Werte neu und überschreibt sie.
+
+    Wird nach dem Commit eines Schreibzugriffs mit den von invalidate_hashes verworfenen
+    Knoten aufgerufen, sodass ein zwischenzeitlich von einem Leser gespeicherter alter Hash
+    nicht bestehen bleibt. Nachfahren ohne gespeicherten Hash werden mit berechnet.
+
+    Args:
+        keys: Iterierbare Menge von Tupeln (Ebene, Knoten-ID)
+
+    Returns:
+        dict: (Ebene, Knoten-ID) -> (eigen, baum) der neu berechneten Knoten
+    """
+    keys = set(keys)
+    computed = compute_hashes(keys, {}, stale=keys)
+    store_hashes(computed, overwrite=True)
+    return computed
+
+
+def store_hashes(hashes, overwrite=False):
+    """
+    Speichert berechnete Hashes.
+
+    Args:
+        hashes (dict): (Ebene, Knoten-ID) -> (eigen, baum)
+        overwrite (bool): Ob gespeicherte Hashes überschrieben werden; sonst bleiben sie erhalten
+    """
+    if not hashes:
+        return
+    if overwrite:
+        options = {'update_conflicts': True, 'unique_fields': ['ebene', 'knoten_id'], 'update_fields': ['eigen', 'baum']}
+    else:
+        options = {'ignore_conflicts': True}
+    KnotenHash.objects.bulk_create([
+        KnotenHash(ebene=ebene, knoten_id=knoten_id, eigen=eigen, baum=baum)
+        for (ebene, knoten_id), (eigen, baum) in hashes.items()
+    ], batch_size=CHUNK_SIZE, **options)
+
+
+def invalidate_hashes(keys, vorfahren=None):
+    """
+    Löscht die gespeicherten Hashes der angegebenen Knoten und ihrer Vorfahren.
+
+    Die Vorfahren werden mit einer Abfrage auf die Closure-Tabelle ermittelt, sofern der
+    Aufrufer sie nicht bereits kennt.
+
+    Args:
+        keys: Iterierbare Menge von Tupeln (Ebene, Knoten-ID)
+        vorfahren: Iterierbare Menge der Vorfahren aller Knoten als Tupel (Ebene, Knoten-ID)
+                   oder None, um sie zu laden
+
+    Returns:
+        set: Die verworfenen Knoten einschließlich der Vorfahren, z. B. für refresh_hashes
+    """
+    keys = set(keys)
+    if not keys:
+        return keys
+    if vorfahren is None:
+        condition = Q()
+        for ebene, ids in group_keys(keys).items():
+            condition |= Q(nachfahr_ebene=ebene, nachfahr_id__in=ids)
+        vorfahren = HierarchiePfad.objects.filter(condition).values_list('vorfahr_ebene', 'vorfahr_id')
+    keys.update(vorfahren)
+
+    condition = Q()
+    for ebene, ids in group_keys(keys).items():
+        condition |= Q(ebene=ebene, knoten_id__in=ids)
+    KnotenHash.objects.filter(condition).delete()
+    return keys
+
+
+def invalidate_subtree_hashes(ebene, knoten_id, vorfahren):
+    """
+    Löscht die gespeicherten Hashes eines Teilbaums und seiner Vorfahren mit einer Abfrage.
+
+    Die Nachfahren werden über die Closure-Tabelle ermittelt, deren Einträge für den
+    Teilbaum daher noch bestehen müssen.
+
+    Args:
+        ebene (int): Die Ebene des obersten Knotens des Teilbaums
+        knoten_id: Die ID des obersten Knotens
+        vorfahren: Iterierbare Menge der Vorfahren als Tupel (Ebene, Knoten-ID)
+    """
+    teilbaum = HierarchiePfad.objects.filter(
+        vorfahr_ebene=ebene, vorfahr_id=knoten_id,
+        nachfahr_ebene=OuterRef('ebene'), nachfahr_id=OuterRef('knoten_id')
+    )
+    condition = Exists(teilbaum)
+    for vorfahr_ebene, ids in group_keys(vorfahren).items():
+        condition |= Q(ebene=vorfahr_ebene, knoten_id__in=ids)
+    KnotenHash.objects.filter(condition).delete()
+
+
+def find_hash_abweichungen():
+    """
+    Vergleicht die gespeicherten Hashes mit einer vollständigen Neuberechnung.
+
+    Fehlende Einträge gelten nicht als Abweichung, da sie bei Bedarf berechnet werden.
+
+    Returns:
+        dict: (Ebene, Knoten-ID) -> (gespeichert, berechnet oder None für nicht existierende Knoten)
+    """
+    stored = {
+        (ebene, knoten_id): (eigen, baum)
+        for ebene, knoten_id, eigen, baum in KnotenHash.objects.values_list('ebene', 'knoten_id', 'eigen', 'baum')
+    }
+    computed = compute_hashes(
+        ((0, lehrplan_id) for lehrplan_id in Lehrplan.objects.values_list('id', flat=True)), {}, use_stored=False
+    )
+    return {
+        key: (hashes, computed.get(key))
+        for key, hashes in stored.items()
+        if computed.get(key) != hashes
+    }
+
+
+def rebuild_hashes():
+    """
+    Berechnet die Hashes aller Knoten neu.
+
+    Returns:
+        int: Die Anzahl der gespeicherten Hashes
+    """
+    KnotenHash.objects.all().delete()
+    return len(get_hashes((0, lehrplan_id) for lehrplan_id in Lehrplan.objects.values_list('id', flat=True)))
+
+
+def match_children(kinder):
+    """
+    Ordnet Kindern einen Schlüssel für den Vergleich zu.
+
+    Gleiche Werte werden in der Reihenfolge ihres Auftretens durchnummeriert.
+
+    Args:
+        kinder (list): Tupel (Kind-ID, Vergleichswert) in Standardsortierung
+
+    Returns:
+        dict: (Vergleichswert, laufende Nummer) -> Kind-ID, in Standardsortierung
+    """
+    counts = Counter()
+    matched = {}
+    for child_id, value in kinder:
+        matched[(value, counts[value])] = child_id
+        counts[value] += 1
+    return matched
+
+
+def diff_knoten(ebene, a_id, b_id):
+    """
+    Vergleicht zwei Knoten derselben Ebene samt ihrer Teilbäume.
+
+    Es wird nur in Teilbäume abgestiegen, deren Baum-Hashes sich unterscheiden; die Kinder
+    werden über DIFF_KEYS einander zugeordnet. Je Ebene mit Unterschieden fallen einige
+    Abfragen an, unabhängig von der Anzahl der Knoten.
+
+    Args:
+        ebene (int): Die Ebene der beiden Knoten
+        a_id: Die ID des ersten Knotens
+        b_id: Die ID des zweiten Knotens
+
+    Returns:
+        list: Dictionaries mit den Schlüsseln 'art' ('geaendert', 'hinzugefuegt' oder 'entfernt'),
+              'ebene', 'a' und 'b' (Knoten-IDs oder None), 'pfad' (Liste von Tupeln
+              (Ebene, ID in a, ID in b) der Vorfahren) sowie 'werte' (Tupel der eigenen Werte in
+              a und b oder None); None, wenn einer der Knoten nicht existiert
+    """
+    known = get_hashes([(ebene, a_id), (ebene, b_id)])
+    if (ebene, a_id) not in known or (ebene, b_id) not in known:
+        return None
+
+    changes = []
+    pairs = [(a_id, b_id, [])]
+    einzeln = []
+    while pairs or einzeln:
+        geaendert = [(a, b, pfad) for a, b, pfad in pairs if known[(ebene, a)][0] != known[(ebene, b)][0]]
+        values = load_own_values(ebene, {
+            knoten_id for a, b, _ in geaendert for knoten_id in (a, b)
+        } | {knoten_id for _, knoten_id, _ in einzeln})
+        for a, b, pfad in geaendert:
+            changes.append({
+                'art': 'geaendert', 'ebene': ebene, 'a': a, 'b': b, 'pfad': pfad,
+                'werte': (values.get(a), values.get(b)),
+            })
+        for art, knoten_id, pfad in einzeln:
+            entfernt = art == 'entfernt'
+            changes.append({
+                'art': art, 'ebene': ebene, 'pfad': pfad,
+                'a': knoten_id if entfernt else None,
+                'b': None if entfernt else knoten_id,
+                'werte': (values.get(knoten_id), None) if entfernt else (None, values.get(knoten_id)),
+            })
+
+        descend = [(a, b, pfad) for a, b, pfad in pairs if known[(ebene, a)][1] != known[(ebene, b)][1]]
+        if not descend or ebene == max(EBENEN_MODELLE):
+            break
+        children = load_children(ebene, {knoten_id for a, b, _ in descend for knoten_id in (a, b)}, (DIFF_KEYS[ebene + 1],))
+        known.update(get_hashes((ebene + 1, child_id) for kinder in children.values() for child_id, _ in kinder))
+
+        pairs, einzeln = [], []
+        for a, b, pfad in descend:
+            kinder_a, kinder_b = match_children(children.get(a, [])), match_children(children.get(b, []))
+            kind_pfad = pfad + [(ebene, a, b)]
+            for key, kind_a in kinder_a.items():
+                kind_b = kinder_b.get(key)
+                if kind_b is None:
+                    einzeln.append(('entfernt', kind_a, kind_pfad))
+                elif known[(ebene + 1, kind_a)][1] != known[(ebene + 1, kind_b)][1]:
+                    pairs.append((kind_a, kind_b, kind_pfad))
+            einzeln += [('hinzugefuegt', kind_b, kind_pfad) for key, kind_b in kinder_b.items() if key not in kinder_a]
+        ebene += 1
+    return changes
@@ -0,0 +1,251 @@
+"""
+Beschreibung der Lehrplan-Hierarchie.
+
+Dieses Modul beschreibt, wie die acht Curriculum-Modelle miteinander verknüpft sind
+(Lehrplan → Lernbereich → Lernziel → Teilziel → Lerninhalt, jeweils mit Beschreibungen),
+und stellt Hilfsfunktionen bereit, um zu einem beliebigen Knoten den besitzenden
+Lehrplan und die Vorfahren zu ermitteln.
+
+Die Abfragen nutzen die Closure-Tabelle ``HierarchiePfad`` (gepflegt in ``curriculum.pfade``),
+sodass der Lehrplan eines Knotens, seine Vorfahren und sein Teilbaum unabhängig von der Ebene
+mit einer indizierten Abfrage ohne Joins über die Zwischenebenen ermittelt werden. Fehlen die
+Einträge eines Knotens (z. B. nach ``bulk_create()`` ohne ``rebuild_pfade``), wird der
+Lehrplan über die Fremdschlüssel aufgelöst.
+"""
+
+from django.db import connection
+
+from .models import (
+    HierarchiePfad, Lehrplan, Lernbereich, Lernziel, LernzielBeschreibung,
+    Teilziel, TeilzielBeschreibung, Lerninhalt, LerninhaltBeschreibung
+)
+
+# Modell -> Name des ForeignKey-Feldes auf das Elternmodell
+PARENT_FIELDS = {
+    Lernbereich: 'lehrplan',
+    Lernziel: 'lernbereich',
+    LernzielBeschreibung: 'lernziel',
+    Teilziel: 'lernziel',
+    TeilzielBeschreibung: 'teilziel',
+    Lerninhalt: 'teilziel',
+    LerninhaltBeschreibung: 'lerninhalt',
+}
+
+CURRICULUM_MODELS = (Lehrplan,) + tuple(PARENT_FIELDS)
+
+# Knotenmodell -> Ebene in der Closure-Tabelle (Beschreibungen sind keine Knoten)
+EBENEN = {
+    Lehrplan: 0,
+    Lernbereich: 1,
+    Lernziel: 2,
+    Teilziel: 3,
+    Lerninhalt: 4,
+}
+
+# Ebene -> Knotenmodell
+EBENEN_MODELLE = {ebene: model for model, ebene in EBENEN.items()}
+
+
+def get_parent_model(model):
+    """
+    Gibt das Elternmodell eines Curriculum-Modells zurück.
+
+    Args:
+        model: Eine Curriculum-Modellklasse
+
+    Returns:
+        Model: Die Elternmodellklasse oder None für Lehrplan
+    """
+    parent_field = PARENT_FIELDS.get(model)
+    if parent_field is None:
+        return None
+    return model._meta.get_field(parent_field).related_model
+
+
+def get_lehrplan_lookup(model):
+    """
+    Baut den ORM-Lookup-Pfad von einem Modell bis zur Lehrplan-ID auf.
+
+    Beispiel:
+        get_lehrplan_lookup(Lerninhalt) == 'teilziel__lernziel__lernbereich__lehrplan_id'
+
+    Args:
+        model: Eine Curriculum-Modellklasse
+
+    Returns:
+        str: Der Lookup-Pfad, 'id' für Lehrplan selbst
+    """
+    parts = []
+    while model in PARENT_FIELDS:
+        parts.append(PARENT_FIELDS[model])
+        model = get_parent_model(model)
+    if not parts:
+        return 'id'
+    return '__'.join(parts) + '_id'
+
+
+def get_node_lehrplan_id(model, pk):
+    """
+    Ermittelt die ID des Lehrplans, zu dem ein gespeicherter Knoten gehört.
+
+    Args:
+        model: Eine Knotenmodellklasse aus EBENEN
+        pk: Die ID des Knotens
+
+    Returns:
+        int: Die Lehrplan-ID oder None, wenn der Knoten nicht existiert
+    """
+    if model is Lehrplan:
+        return pk
+    lehrplan_id = (
+        HierarchiePfad.objects
+        .filter(nachfahr_ebene=EBENEN[model], nachfahr_id=pk, vorfahr_ebene=0)
+        .values_list('vorfahr_id', flat=True)
+        .first()
+    )
+    if lehrplan_id is None:
+        lehrplan_id = (
+            model.objects
+            .filter(pk=pk)
+            .values_list(get_lehrplan_lookup(model), flat=True)
+            .order_by('pk')
+            .first()
+        )
+    return lehrplan_id
+
+
+def get_lehrplan_id(instance):
+    """
+    Ermittelt die ID des Lehrplans, zu dem ein Knoten gehört.
+
+    Die Auflösung erfolgt über das Elternobjekt, sodass sie auch für bereits gelöschte
+    Instanzen funktioniert, solange die Vorfahren noch existieren. Es wird höchstens
+    eine Datenbankabfrage auf die Closure-Tabelle ausgeführt (bzw. eine weitere, falls
+    deren Einträge fehlen).
+
+    Args:
+        instance: Eine Instanz eines der acht Curriculum-Modelle
+
+    Returns:
+        int: Die Lehrplan-ID oder None, wenn die Kette nicht (mehr) aufgelöst werden kann
+    """
+    model = type(instance)
+    if model is Lehrplan:
+        return instance.pk
+
+    parent_field = PARENT_FIELDS.get(model)
+    if parent_field is None:
+        return None
+
+    parent_id = getattr(instance, f"{parent_field}_id")
+    if parent_id is None:
+        return None
+    return get_node_lehrplan_id(get_parent_model(model), parent_id)
+
+
+def get_stored_ancestor_ids(instance):
+    """
+    Ermittelt die aktuell in der Closure-Tabelle gespeicherten Vorfahren eines Knotens.
+
+    Wird vor dem Speichern verwendet, um zu erkennen, ob ein Knoten verschoben wird.
+
+    Args:
+        instance: Eine Instanz eines Knotenmodells aus EBENEN
+
+    Returns:
+        dict: Ebene -> ID des Vorfahren (ohne den Knoten selbst); leer für neue Instanzen
+    """
+    if instance.pk is None:
+        return {}
+    ebene = EBENEN[type(instance)]
+    return dict(
+        HierarchiePfad.objects
+        .filter(nachfahr_ebene=ebene, nachfahr_id=instance.pk, vorfahr_ebene__lt=ebene)
+        .values_list('vorfahr_ebene', 'vorfahr_id')
+    )
+
+
+def get_stored_lehrplan_id(instance):
+    """
+    Ermittelt die Lehrplan-ID, die aktuell für diese Instanz in der Datenbank gespeichert ist.
+
+    Wird vor dem Speichern verwendet, um zu erkennen, ob ein Knoten in einen anderen
+    Lehrplan verschoben wird.
+
+    Args:
+        instance: Eine Instanz eines der acht Curriculum-Modelle
+
+    Returns:
+        int: Die gespeicherte Lehrplan-ID oder None für neue Instanzen
+    """
+    if instance.pk is None:
+        return None
+    model = type(instance)
+    if model in EBENEN:
+        return get_node_lehrplan_id(model, instance.pk)
+    return (
+        model.objects
+        .filter(pk=instance.pk)
+        .values_list(get_lehrplan_lookup(model), flat=True)
+        .order_by('pk')
+        .first()
+    )
+
+
+def get_paths(keys, fields):
+    """
+    Lädt die Pfade mehrerer Knoten vom Lehrplan bis zum Knoten selbst mit einer Abfrage.
+
+    Die Einträge der Closure-Tabelle werden per LEFT JOIN mit der Tabelle ihrer Ebene
+    verbunden, sodass die Felder aller Vorfahren ohne weitere Abfragen zur Verfügung stehen.
+
+    Args:
+        keys: Iterierbare Menge von Tupeln (Ebene, Knoten-ID)
+        fields (list): Je Ebene die zu ladenden Feldnamen (einschließlich 'id')
+
+    Returns:
+        dict: (Ebene, Knoten-ID) -> Liste der Felder-Dictionaries vom Lehrplan bis zum Knoten;
+              Knoten ohne Einträge fehlen
+    """
+    ids_by_ebene = {}
+    for ebene, knoten_id in keys:
+        ids_by_ebene.setdefault(ebene, set()).add(knoten_id)
+    if not ids_by_ebene:
+        return {}
+
+    quote = connection.ops.quote_name
+    columns, joins, slices = [], [], {}
+    for ebene, model in sorted(EBENEN_MODELLE.items()):
+        alias = f't{ebene}'
+        level_fields = ['id'] + [field for field in fields[ebene] if field != 'id']
+        slices[ebene] = (level_fields, len(columns))
+        columns += [f'{alias}.{quote(model._meta.get_field(field).column)}' for field in level_fields]
+        joins.append(
+            f'LEFT JOIN {quote(model._meta.db_table)} {alias} '
+            f'ON p.vorfahr_ebene = {ebene} AND {alias}.id = p.vorfahr_id'
+        )
+    conditions, params = [], []
+    for ebene, ids in sorted(ids_by_ebene.items()):
+        conditions.append(f"(p.nachfahr_ebene = %s AND p.nachfahr_id IN ({', '.join(['%s'] * len(ids))}))")
+        params += [ebene, *sorted(ids)]
+    sql = (
+        f"SELECT p.nachfahr_ebene, p.nachfahr_id, p.vorfahr_ebene, {', '.join(columns)} "
+        f"FROM {quote(HierarchiePfad._meta.db_table)} p {' '.join(joins)} "
+        f"WHERE {' OR '.join(conditions)}"
+    )
+
+    rows = {}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for nachfahr_ebene, nachfahr_id, vorfahr_ebene, *values in cursor.fetchall():
+            level_fields, offset = slices[vorfahr_ebene]
+            level_values = values[offset:offset + len(level_fields)]
+            if level_values[0] is None:
+                # Veralteter Eintrag, der Vorfahre existiert nicht mehr
+                continue
+            rows.setdefault((nachfahr_ebene, nachfahr_id), {})[vorfahr_ebene] = dict(zip(level_fields, level_values))
+    return {
+        key: [levels[ebene] for ebene in sorted(levels)]
+        for key, levels in rows.items()
+        if key[0] in levels
+    }
@@ -0,0 +1,160 @@
+"""
+Messung von SQL-Abfragen und Laufzeiten je Anfrage.
+
+``RequestMetrics`` sammelt für eine Anfrage die Anzahl und Dauer der SQL-Abfragen, die
+langsamsten Statements und die Zeit in mit ``timed()`` markierten Abschnitten (z. B. dem
+Aufbau der Lehrplanbäume). Die Middleware ``curriculum.middleware.QueryInstrumentationMiddleware``
+legt die Messung für jede Anfrage an, gibt sie für Staff-Benutzer als ``Server-Timing``-Header
+aus und prüft die Abfragebudgets der Views.
+
+Ein Abfragebudget ist die Höchstzahl an SQL-Abfragen einer Anfrage, unabhängig von der
+Datenmenge. Klassenbasierte Views deklarieren es als Attribut ``query_budget``, Admin-Klassen
+als Dictionary ``query_budgets`` je Admin-View (z. B. ``{'changelist': 6}``). Wird ein Budget
+überschritten, wird eine Warnung protokolliert bzw. mit ``CURRICULUM_QUERY_BUDGET_RAISE``
+``QueryBudgetExceeded`` ausgelöst.
+
+Für Tests stellt ``QueryBudgetTestMixin`` die Prüfung ``assertMaxQueries()`` bereit und
+aktiviert ``CURRICULUM_QUERY_BUDGET_RAISE`` für die Testklasse.
+"""
+
+import heapq
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext, override_settings
+
+# Messung der laufenden Anfrage
+current_metrics = ContextVar('curriculum_request_metrics', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Eine Anfrage hat mehr SQL-Abfragen ausgeführt, als ihr Budget erlaubt."""
+
+
+class RequestMetrics:
+    """
+    Messwerte einer Anfrage.
+
+    Eine Instanz wird per ``connection.execute_wrapper()`` um jede SQL-Abfrage gelegt.
+
+    Attribute:
+        query_count (int): Anzahl der SQL-Abfragen
+        sql_time (float): Summe der Abfragedauern in Sekunden
+        timings (dict): Abschnittsname -> Dauer in Sekunden ohne enthaltene SQL-Zeit
+    """
+
+    def __init__(self, slow_query_count=3):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.slow_query_count = slow_query_count
+        self.slow_queries = []
+        self.timings = {}
+        self.active_sections = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.query_count += 1
+            self.sql_time += duration
+            # Min-Heap der langsamsten Abfragen; der Zähler macht die Einträge vergleichbar
+            entry = (duration, self.query_count, sql)
+            if len(self.slow_queries) < self.slow_query_count:
+                heapq.heappush(self.slow_queries, entry)
+            elif self.slow_query_count:
+                heapq.heappushpop(self.slow_queries, entry)
+
+    def get_slowest_queries(self):
+        """
+        Liefert die langsamsten Abfragen.
+
+        Returns:
+            list: Tupel (Dauer in Sekunden, SQL), die langsamste zuerst
+        """
+        return [(duration, sql) for duration, _, sql in sorted(self.slow_queries, reverse=True)]
+
+    def get_total_time(self):
+        """Liefert die bisherige Dauer der Anfrage in Sekunden."""
+        return time.perf_counter() - self.started
+
+
+@contextmanager
+def timed(name):
+    """
+    Misst die Dauer eines Abschnitts für die laufende Anfrage, ohne die SQL-Zeit darin.
+
+    Ohne laufende Messung (z. B. in Management-Kommandos) hat der Abschnitt keine Wirkung.
+    Verschachtelte Abschnitte gleichen Namens werden nur einmal gezählt. Kann auch als
+    Dekorator verwendet werden.
+
+    Args:
+        name (str): Der Name des Abschnitts im Server-Timing-Header, z. B. 'serialize'
+    """
+    metrics = current_metrics.get()
+    if metrics is None or name in metrics.active_sections:
+        yield
+        return
+    metrics.active_sections.add(name)
+    start, sql_start = time.perf_counter(), metrics.sql_time
+    try:
+        yield
+    finally:
+        metrics.active_sections.discard(name)
+        duration = time.perf_counter() - start - (metrics.sql_time - sql_start)
+        metrics.timings[name] = metrics.timings.get(name, 0.0) + duration
+
+
+def get_query_budget(view_func, url_name=None):
+    """
+    Ermittelt das Abfragebudget einer View.
+
+    Args:
+        view_func: Die aufgelöste View-Funktion
+        url_name (str): Der Name der URL, für Admin-Views z. B. 'curriculum_lernziel_changelist'
+
+    Returns:
+        int: Das Budget oder None, wenn die View keines deklariert
+    """
+    view_class = getattr(view_func, 'view_class', None)
+    if view_class is not None:
+        return getattr(view_class, 'query_budget', None)
+    # ModelAdmin.get_urls() hängt die Admin-Instanz an die View-Funktion
+    model_admin = getattr(view_func, 'model_admin', None)
+    if model_admin is not None and url_name:
+        return getattr(model_admin, 'query_budgets', {}).get(url_name.rsplit('_', 1)[-1])
+    return None
+
+
+class QueryBudgetTestMixin:
+    """
+    Mixin für TestCase mit Prüfungen auf Abfragebudgets.
+
+    Anders als ``assertNumQueries`` wird nur eine Obergrenze geprüft, sodass eine Optimierung
+    den Test nicht bricht. Bei einer Überschreitung werden alle Abfragen ausgegeben. Zusätzlich
+    gilt für die Testklasse ``CURRICULUM_QUERY_BUDGET_RAISE = True``, sodass jeder Aufruf eines
+    Endpunkts mit Budget dieses auch prüft.
+
+    Verwendungsbeispiel:
+        class MyTests(QueryBudgetTestMixin, TestCase):
+            def test_detail(self):
+                with self.assertMaxQueries(8):
+                    self.client.get('/curriculum/curriculum/1/')
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.enterClassContext(override_settings(CURRICULUM_QUERY_BUDGET_RAISE=True))
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using='default'):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        if len(context) > budget:
+            queries = '\n'.join(f"{index}. {query['sql']}" for index, query in enumerate(context.captured_queries, 1))
+            self.fail(f"{len(context)} Abfragen, Budget {budget}:\n{queries}")
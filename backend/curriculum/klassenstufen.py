@@ -0,0 +1,121 @@
+"""
+Normalisierte Klassenstufen.
+
+``Lehrplan.klassenstufen`` ist ein Freitextfeld wie ``'3, 4, 5a'`` oder ``'7-9'``. Dieses
+Modul zerlegt den Text in einzelne Stufen (Zahl plus optionaler Zusatz) und pflegt daraus
+die Tabelle ``LehrplanKlassenstufe``, über deren Index die API nach Klassenstufen filtert.
+Die Synchronisation erfolgt über die Signal-Handler in ``curriculum.signals``.
+"""
+
+import re
+
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+
+from .models import LehrplanKlassenstufe
+
+# Einzelne Stufe ('5', '5a', '11 b') oder Bereich ('5-7', '5 bis 7')
+STUFE_PATTERN = re.compile(r'^(\d{1,2})\s*([a-zA-Z]{0,20})$')
+BEREICH_PATTERN = re.compile(r'^(\d{1,2})\s*(?:-|–|bis)\s*(\d{1,2})$')
+
+
+def parse_klassenstufen(value):
+    """
+    Zerlegt den Text eines Lehrplans in einzelne Klassenstufen.
+
+    Beispiel:
+        parse_klassenstufen('3, 4, 5a') == [(3, ''), (4, ''), (5, 'a')]
+        parse_klassenstufen('7-9') == [(7, ''), (8, ''), (9, '')]
+
+    Args:
+        value (str): Der Inhalt von Lehrplan.klassenstufen
+
+    Returns:
+        list: Sortierte, eindeutige Tupel (stufe, zusatz); nicht erkannte Angaben werden ignoriert
+    """
+    stufen = set()
+    for token in re.split(r'[,;/]', value or ''):
+        token = token.strip()
+        bereich = BEREICH_PATTERN.match(token)
+        if bereich:
+            start, end = sorted((int(bereich.group(1)), int(bereich.group(2))))
+            stufen.update((stufe, '') for stufe in range(start, end + 1))
+            continue
+        stufe = STUFE_PATTERN.match(token)
+        if stufe:
+            stufen.add((int(stufe.group(1)), stufe.group(2).lower()))
+    return sorted(stufen)
+
+
+def sync_klassenstufen(lehrplaene):
+    """
+    Schreibt die normalisierten Klassenstufen der angegebenen Lehrpläne neu.
+
+    Args:
+        lehrplaene: Iterierbare Menge von Lehrplan-Instanzen (oder Objekten mit id und klassenstufen)
+    """
+    lehrplaene = list(lehrplaene)
+    if not lehrplaene:
+        return
+    LehrplanKlassenstufe.objects.filter(lehrplan_id__in=[lehrplan.id for lehrplan in lehrplaene]).delete()
+    LehrplanKlassenstufe.objects.bulk_create([
+        LehrplanKlassenstufe(lehrplan_id=lehrplan.id, stufe=stufe, zusatz=zusatz)
+        for lehrplan in lehrplaene
+        for stufe, zusatz in parse_klassenstufen(lehrplan.klassenstufen)
+    ])
+
+
+def parse_klassenstufe_filter(value):
+    """
+    Zerlegt den Wert des API-Parameters klassenstufe in einzelne Bedingungen.
+
+    Unterstützt einzelne Stufen ('5'), Stufen mit Zusatz ('5a'), Bereiche ('5-7')
+    und kommaseparierte Kombinationen davon ('5,7-9').
+
+    Args:
+        value (str): Der Wert des Parameters
+
+    Returns:
+        list: Tupel (von, bis, zusatz); zusatz ist None, wenn jeder Zusatz passt
+
+    Raises:
+        BadRequest: Wenn der Wert nicht erkannt wird
+    """
+    conditions = []
+    for token in value.split(','):
+        token = token.strip()
+        bereich = BEREICH_PATTERN.match(token)
+        stufe = STUFE_PATTERN.match(token)
+        if bereich:
+            start, end = sorted((int(bereich.group(1)), int(bereich.group(2))))
+            conditions.append((start, end, None))
+        elif stufe:
+            conditions.append((int(stufe.group(1)), int(stufe.group(1)), stufe.group(2).lower() or None))
+        else:
+            raise BadRequest(f"Ungültige Klassenstufe: '{token}' (erlaubt z. B. 5, 5a, 5-7 oder 5,7)")
+    return conditions
+
+
+def build_klassenstufe_filter(value):
+    """
+    Baut die Filterbedingung für den API-Parameter klassenstufe (siehe parse_klassenstufe_filter).
+
+    Args:
+        value (str): Der Wert des Parameters
+
+    Returns:
+        Q: Bedingung auf LehrplanKlassenstufe
+
+    Raises:
+        BadRequest: Wenn der Wert nicht erkannt wird
+    """
+    condition = Q()
+    for start, end, zusatz in parse_klassenstufe_filter(value):
+        if start != end:
+            condition |= Q(stufe__range=(start, end))
+        elif zusatz:
+            condition |= Q(stufe=start, zusatz=zusatz)
+        else:
+            condition |= Q(stufe=start)
+    return condition
+
@@ -0,0 +1,165 @@
+"""
+Benchmark: synchrone vs. asynchrone Curriculum-Views unter ASGI.
+
+Die Anfragen werden nebenläufig direkt an ``backend.asgi.application`` gesendet, also an
+dieselbe Anwendung, die ein ASGI-Server (uvicorn, daphne) ausführt. So wird das
+Verhalten des ASGI-Handlers gemessen (Thread-Executor für synchrone Views, Event-Loop für
+asynchrone Views), ohne Netzwerk- und Serverkosten mitzumessen. Die asynchronen Views
+werden für die Dauer der Messung über CURRICULUM_ASYNC_VIEWS freigeschaltet.
+
+Verwendung:
+    python manage.py benchmark_asgi
+    python manage.py benchmark_asgi --requests 2000 --concurrency 100
+    python manage.py benchmark_asgi --use-existing --endpoint list
+"""
+
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from curriculum.cache import CurriculumCache
+from curriculum.models import Lehrplan
+from .benchmark_tree_assembly import Command as TreeAssemblyBenchmark
+
+
+ENDPOINTS = {
+    'detail': ('/curriculum/curriculum/{id}/', '/curriculum/async/curriculum/{id}/'),
+    'list': ('/curriculum/curricula/list/?page_size=20', '/curriculum/async/curricula/list/?page_size=20'),
+    'all': ('/curriculum/curricula/all/?stream=1&depth=1', '/curriculum/async/curricula/all/?stream=1&depth=1'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Misst Durchsatz und Latenz der synchronen und asynchronen Lehrplan-Views bei "
+        "nebenläufigen Anfragen an die ASGI-Anwendung."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help="Anzahl der Anfragen pro Variante")
+        parser.add_argument('--concurrency', type=int, default=50, help="Gleichzeitig offene Anfragen")
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='detail', help="Gemessener Endpunkt")
+        parser.add_argument('--lehrplaene', type=int, default=20, help="Anzahl generierter Lehrpläne")
+        parser.add_argument('--fanout', type=int, default=3, help="Kinder pro Knoten auf jeder Ebene")
+        parser.add_argument(
+            '--use-existing', action='store_true',
+            help="Vorhandene Daten messen statt Testdaten zu generieren"
+        )
+
+    def handle(self, *args, **options):
+        if options['use_existing']:
+            lehrplan_ids = list(Lehrplan.objects.values_list('id', flat=True))
+            if not lehrplan_ids:
+                raise CommandError("Keine Lehrpläne in der Datenbank vorhanden.")
+            self.run_benchmark(lehrplan_ids, options)
+            return
+
+        # Die Daten müssen committet sein, da die Views in anderen Threads eigene Verbindungen nutzen
+        lehrplan_ids = TreeAssemblyBenchmark(stdout=self.stdout, stderr=self.stderr).generate(
+            options['lehrplaene'], options['fanout']
+        )[Lehrplan]
+        try:
+            self.run_benchmark(lehrplan_ids, options)
+        finally:
+            Lehrplan.objects.filter(id__in=lehrplan_ids).delete()
+            CurriculumCache.invalidate(lehrplan_ids)
+            self.stdout.write("Generierte Testdaten wurden entfernt.")
+
+    def run_benchmark(self, lehrplan_ids, options):
+        """Misst beide Varianten nacheinander mit vorgewärmtem Cache."""
+        from backend.asgi import application
+
+        sync_path, async_path = ENDPOINTS[options['endpoint']]
+        results = {}
+        with override_settings(CURRICULUM_ASYNC_VIEWS=True):
+            for label, template in (('sync', sync_path), ('async', async_path)):
+                results[label] = self.measure(application, label, template, lehrplan_ids, options)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Durchsatz async/sync: {results['async'] / results['sync']:.2f}x "
+            f"({options['endpoint']}, {options['concurrency']} gleichzeitige Anfragen)"
+        ))
+
+    def measure(self, application, label, template, lehrplan_ids, options):
+        """
+        Misst eine Variante nach einem Durchlauf zum Vorwärmen des Caches.
+
+        Returns:
+            float: Der Durchsatz in Anfragen pro Sekunde
+        """
+        paths = [template.format(id=lehrplan_ids[i % len(lehrplan_ids)]) for i in range(options['requests'])]
+        asyncio.run(self.drive(application, paths[:len(lehrplan_ids)], options['concurrency']))
+        elapsed, latencies = asyncio.run(self.drive(application, paths, options['concurrency']))
+        throughput = options['requests'] / elapsed
+        latencies.sort()
+        self.stdout.write(
+            f"{label:>5}: {throughput:8.1f} Anfragen/s, "
+            f"Median {statistics.median(latencies) * 1000:7.1f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms"
+        )
+        return throughput
+
+    async def drive(self, application, paths, concurrency):
+        """
+        Sendet alle Anfragen mit höchstens ``concurrency`` gleichzeitig offenen Anfragen.
+
+        Returns:
+            tuple: (Gesamtdauer in Sekunden, Liste der Latenzen in Sekunden)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one(path):
+            async with semaphore:
+                start = time.perf_counter()
+                status = await self.request(application, path)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    raise CommandError(f"{path} lieferte Status {status}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(path) for path in paths))
+        return time.perf_counter() - start, latencies
+
+    @staticmethod
+    async def request(application, path):
+        """Führt eine GET-Anfrage über das ASGI-Protokoll aus und liefert den Statuscode."""
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode('ascii'),
+            'query_string': query.encode('ascii'),
+            'root_path': '',
+            'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        disconnected = asyncio.Event()
+        sent_request = False
+        status = None
+
+        async def receive():
+            nonlocal sent_request
+            if not sent_request:
+                sent_request = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+                disconnected.set()
+
+        await application(scope, receive, send)
+        return status
@@ -0,0 +1,323 @@
+"""
+Benchmark-Suite für API, Export und Import auf synthetischen Daten.
+
+Gemessen werden LehrplanDetailView (mit leerem und mit gefülltem Cache), LehrplanListView,
+LehrplanAllView sowie CurriculumAdminSite.export_all und import_all. Je Szenario werden
+Latenz-Perzentile, die Anzahl der SQL-Abfragen und der höchste Speicherbedarf ausgegeben.
+Der Speicher wird in einem zusätzlichen, nicht gemessenen Durchlauf mit tracemalloc
+ermittelt und umfasst nur Allokationen des Python-Interpreters.
+
+Die Daten werden mit ``curriculum.synthetic`` erzeugt und am Ende zusammen mit allen
+Änderungen der Szenarien zurückgerollt. Der Import läuft je Durchlauf in einem Savepoint
+gegen eine leere Datenbank; das Löschen des Bestands davor wird nicht mitgemessen.
+
+Mit --output werden die Ergebnisse als JSON geschrieben, um Läufe über mehrere Commits
+zu vergleichen.
+
+Verwendung:
+    python manage.py benchmark_curricula
+    python manage.py benchmark_curricula --lehrplaene 100 --fanout 6,4,3,2 --repeat 50
+    python manage.py benchmark_curricula --scenarios detail,list --output benchmark.json
+    python manage.py benchmark_curricula --use-existing --scenarios export,import
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections import namedtuple
+
+import django
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, RequestFactory
+from django.utils import timezone
+
+from curriculum.admin import curriculum_admin
+from curriculum.cache import CurriculumCache
+from curriculum.hierarchy import CURRICULUM_MODELS
+from curriculum.instrumentation import RequestMetrics
+from curriculum.models import Lehrplan
+from curriculum.synthetic import generate_curricula, parse_fanout
+
+# setup und teardown laufen vor bzw. nach jedem Durchlauf außerhalb der Zeitmessung
+Scenario = namedtuple('Scenario', ['run', 'setup', 'teardown', 'repeat'])
+
+SCENARIOS = ('detail', 'detail_cached', 'list', 'all', 'export', 'import')
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Rollback(Exception):
+    """Bricht die Benchmark-Transaktion ab, damit generierte Daten verworfen werden."""
+
+
+def percentile(values, p):
+    """
+    Liefert das p-Perzentil nach dem Nearest-Rank-Verfahren.
+
+    Args:
+        values (list): Aufsteigend sortierte Messwerte
+        p (int): Das Perzentil (0-100)
+
+    Returns:
+        float: Der Messwert
+    """
+    index = max(0, -(-len(values) * p // 100) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def get_commit():
+    """Liefert den aktuellen Git-Commit des Projekts oder None."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Misst Detail-, Listen- und Gesamtansicht der Lehrpläne sowie den Export und Import "
+        "aller Daten auf synthetischen Lehrplänen und gibt Latenz-Perzentile, Abfragen und "
+        "Speicherbedarf aus."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lehrplaene', type=int, default=20, help="Anzahl generierter Lehrpläne")
+        parser.add_argument(
+            '--fanout', default='3',
+            help="Kinder je Knoten: eine Zahl für alle Ebenen oder vier Zahlen, z. B. 6,4,3,2"
+        )
+        parser.add_argument(
+            '--beschreibungen', type=int, default=2,
+            help="Beschreibungen je Lernziel, Teilziel und Lerninhalt"
+        )
+        parser.add_argument('--text-length', type=int, default=120, help="Ungefähre Länge einer Beschreibung in Zeichen")
+        parser.add_argument('--seed', type=int, default=0, help="Seed des Datengenerators")
+        parser.add_argument('--repeat', type=int, default=30, help="Durchläufe je API-Szenario")
+        parser.add_argument('--io-repeat', type=int, default=3, help="Durchläufe für Export und Import")
+        parser.add_argument(
+            '--scenarios', default=','.join(SCENARIOS),
+            help=f"Kommaseparierte Auswahl aus {', '.join(SCENARIOS)}"
+        )
+        parser.add_argument('--output', help="Pfad der JSON-Datei für die Ergebnisse")
+        parser.add_argument(
+            '--use-existing', action='store_true',
+            help="Vorhandene Daten messen statt Testdaten zu generieren"
+        )
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unbekannte Szenarien: {', '.join(sorted(unknown))}")
+        try:
+            fanout = parse_fanout(options['fanout'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        lehrplan_ids = []
+        try:
+            with transaction.atomic():
+                if options['use_existing']:
+                    lehrplan_ids = list(Lehrplan.objects.values_list('id', flat=True))
+                    if not lehrplan_ids:
+                        raise CommandError("Keine Lehrpläne in der Datenbank vorhanden.")
+                else:
+                    lehrplan_ids = generate_curricula(
+                        options['lehrplaene'], fanout, beschreibungen=options['beschreibungen'],
+                        text_length=options['text_length'], seed=options['seed']
+                    )[Lehrplan]
+                dataset = {model.__name__: model.objects.count() for model in CURRICULUM_MODELS}
+                self.stdout.write("Datenbestand: " + ', '.join(f"{count} {name}" for name, count in dataset.items()))
+
+                results = {}
+                for name in scenarios:
+                    results[name] = self.measure(getattr(self, f"scenario_{name}")(lehrplan_ids, options))
+                    self.report(name, results[name])
+                raise Rollback()
+        except Rollback:
+            pass
+        finally:
+            # Die IDs zurückgerollter Lehrpläne können erneut vergeben werden
+            if not options['use_existing']:
+                CurriculumCache.invalidate(lehrplan_ids)
+
+        if options['output']:
+            parameters = {
+                key: options[key]
+                for key in ('lehrplaene', 'beschreibungen', 'text_length', 'seed', 'repeat', 'io_repeat', 'use_existing')
+            }
+            document = {
+                'created_at': timezone.now().isoformat(),
+                'commit': get_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'parameters': {**parameters, 'fanout': list(fanout)},
+                'dataset': dataset,
+                'scenarios': results,
+            }
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Ergebnisse geschrieben nach {options['output']}")
+
+    def measure(self, scenario):
+        """
+        Führt ein Szenario aus und fasst die Messwerte zusammen.
+
+        Der erste Durchlauf dient zum Aufwärmen und wird nicht gewertet.
+
+        Returns:
+            dict: Perzentile und Mittelwert der Latenz in Millisekunden, Abfragen je Durchlauf,
+                  Antwortgröße in Bytes und höchster Speicherbedarf in KiB
+        """
+        def run(index, traced=False):
+            if scenario.setup:
+                scenario.setup(index)
+            try:
+                if traced:
+                    tracemalloc.start()
+                    try:
+                        scenario.run(index)
+                        return tracemalloc.get_traced_memory()[1]
+                    finally:
+                        tracemalloc.stop()
+                # Zählt auch über das Limit des Query-Logs von 9000 Einträgen hinaus (Import)
+                metrics = RequestMetrics(slow_query_count=0)
+                with connection.execute_wrapper(metrics):
+                    start = time.perf_counter()
+                    size = scenario.run(index)
+                    return time.perf_counter() - start, metrics.query_count, size
+            finally:
+                if scenario.teardown:
+                    scenario.teardown(index)
+
+        run(0)
+        latencies, queries, sizes = [], [], []
+        for index in range(scenario.repeat):
+            latency, count, size = run(index)
+            latencies.append(latency * 1000)
+            queries.append(count)
+            sizes.append(size)
+        peak = run(0, traced=True)
+
+        latencies.sort()
+        return {
+            'runs': len(latencies),
+            **{f'p{p}_ms': round(percentile(latencies, p), 3) for p in PERCENTILES},
+            'max_ms': round(latencies[-1], 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries_median': statistics.median(queries),
+            'queries_max': max(queries),
+            'response_bytes': statistics.median(sizes),
+            'peak_memory_kib': round(peak / 1024, 1),
+        }
+
+    def report(self, name, result):
+        """Gibt die Ergebnisse eines Szenarios in einer Zeile aus."""
+        self.stdout.write(
+            f"{name:>13}: p50 {result['p50_ms']:9.2f} ms, p95 {result['p95_ms']:9.2f} ms, "
+            f"p99 {result['p99_ms']:9.2f} ms, {result['queries_max']:6} Abfragen, "
+            f"Peak {result['peak_memory_kib']:9.1f} KiB"
+        )
+
+    def get(self, client, path):
+        """
+        Führt eine GET-Anfrage aus und liefert die Größe der Antwort.
+
+        Raises:
+            CommandError: Wenn die Anfrage nicht mit Status 200 beantwortet wird
+        """
+        response = client.get(path)
+        if response.status_code != 200:
+            raise CommandError(f"{path} lieferte Status {response.status_code}")
+        if response.streaming:
+            return sum(len(chunk) for chunk in response.streaming_content)
+        return len(response.content)
+
+    def scenario_detail(self, lehrplan_ids, options):
+        """Detailansicht eines Lehrplans bei leerem Cache."""
+        client = Client(SERVER_NAME='localhost')
+        return Scenario(
+            run=lambda index: self.get(client, f'/curriculum/curriculum/{lehrplan_ids[index % len(lehrplan_ids)]}/'),
+            setup=lambda index: CurriculumCache.invalidate([lehrplan_ids[index % len(lehrplan_ids)]]),
+            teardown=None,
+            repeat=options['repeat'],
+        )
+
+    def scenario_detail_cached(self, lehrplan_ids, options):
+        """Detailansicht eines Lehrplans, dessen Baum im Cache liegt."""
+        client = Client(SERVER_NAME='localhost')
+        for lehrplan_id in lehrplan_ids:
+            self.get(client, f'/curriculum/curriculum/{lehrplan_id}/')
+        return Scenario(
+            run=lambda index: self.get(client, f'/curriculum/curriculum/{lehrplan_ids[index % len(lehrplan_ids)]}/'),
+            setup=None,
+            teardown=None,
+            repeat=options['repeat'],
+        )
+
+    def scenario_list(self, lehrplan_ids, options):
+        """Erste Seite der Lehrplanliste."""
+        client = Client(SERVER_NAME='localhost')
+        return Scenario(
+            run=lambda index: self.get(client, '/curriculum/curricula/list/?page_size=20'),
+            setup=None,
+            teardown=None,
+            repeat=options['repeat'],
+        )
+
+    def scenario_all(self, lehrplan_ids, options):
+        """Alle Lehrpläne mit vollständigen Bäumen bei leerem Cache."""
+        client = Client(SERVER_NAME='localhost')
+        all_ids = list(Lehrplan.objects.values_list('id', flat=True))
+        return Scenario(
+            run=lambda index: self.get(client, '/curriculum/curricula/all/'),
+            setup=lambda index: CurriculumCache.invalidate(all_ids),
+            teardown=None,
+            repeat=options['repeat'],
+        )
+
+    def scenario_export(self, lehrplan_ids, options):
+        """CSV-Export aller Daten als ZIP-Archiv über die Admin-Site."""
+        request = RequestFactory().get('/admin-curriculum/export-all/')
+        return Scenario(
+            run=lambda index: len(curriculum_admin.export_all(request).content),
+            setup=None,
+            teardown=None,
+            repeat=options['io_repeat'],
+        )
+
+    def scenario_import(self, lehrplan_ids, options):
+        """Import des CSV-Exports aller Daten in eine leere Datenbank über die Admin-Site."""
+        archive = curriculum_admin.export_all(RequestFactory().get('/admin-curriculum/export-all/')).content
+        savepoints = []
+
+        def setup(index):
+            savepoints.append(transaction.savepoint())
+            Lehrplan.objects.all().delete()
+
+        def run(index):
+            request = RequestFactory().post('/admin-curriculum/import-all/', {
+                'zip_file': SimpleUploadedFile('curriculum_export.zip', archive, content_type='application/zip'),
+            })
+            request._messages = CookieStorage(request)
+            curriculum_admin.import_all(request)
+            return len(archive)
+
+        def teardown(index):
+            imported = Lehrplan.objects.exists()
+            transaction.savepoint_rollback(savepoints.pop())
+            if not imported:
+                raise CommandError("Der Import hat keine Lehrpläne angelegt.")
+
+        return Scenario(run=run, setup=setup, teardown=teardown, repeat=options['io_repeat'])
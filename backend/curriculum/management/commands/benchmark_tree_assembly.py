@@ -0,0 +1,90 @@
+"""
+Benchmark: Prefetch-Serialisierung vs. flache Baum-Assemblierung.
+
+Verwendung:
+    python manage.py benchmark_tree_assembly
+    python manage.py benchmark_tree_assembly --lehrplaene 50 --fanout 5 --repeat 10
+    python manage.py benchmark_tree_assembly --use-existing
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from curriculum.assembly import CurriculumTreeAssembler
+from curriculum.models import Lehrplan
+from curriculum.synthetic import generate_curricula
+from curriculum.views.serializers import CurriculumSerializer
+
+
+class Rollback(Exception):
+    """Bricht die Benchmark-Transaktion ab, damit generierte Daten verworfen werden."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Vergleicht CurriculumSerializer.serialize_curriculum (Prefetch-Pfad) mit dem "
+        "CurriculumTreeAssembler (flache Abfragen). Generierte Testdaten werden anschließend verworfen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lehrplaene', type=int, default=20, help="Anzahl generierter Lehrpläne")
+        parser.add_argument('--fanout', type=int, default=4, help="Kinder pro Knoten auf jeder Ebene")
+        parser.add_argument('--repeat', type=int, default=5, help="Anzahl der Messdurchläufe")
+        parser.add_argument(
+            '--use-existing', action='store_true',
+            help="Vorhandene Daten messen statt Testdaten zu generieren"
+        )
+
+    def handle(self, *args, **options):
+        if options['use_existing']:
+            if not Lehrplan.objects.exists():
+                raise CommandError("Keine Lehrpläne in der Datenbank vorhanden.")
+            self.run_benchmark(options['repeat'])
+            return
+
+        try:
+            with transaction.atomic():
+                self.generate(options['lehrplaene'], options['fanout'])
+                self.run_benchmark(options['repeat'])
+                raise Rollback()
+        except Rollback:
+            self.stdout.write("Generierte Testdaten wurden verworfen.")
+
+    def generate(self, lehrplan_count, fanout):
+        """Erzeugt einen gleichmäßig verzweigten Datenbestand (siehe curriculum.synthetic)."""
+        created = generate_curricula(lehrplan_count, fanout)
+        self.stdout.write("Generiert: " + ', '.join(f"{len(ids)} {model.__name__}" for model, ids in created.items()))
+        return created
+
+    def run_benchmark(self, repeat):
+        """Misst beide Pfade und prüft, dass sie identische Strukturen liefern."""
+        def prefetch_path():
+            lehrplaene = Lehrplan.objects.prefetch_related(*CurriculumSerializer.get_prefetch_related_fields())
+            return [CurriculumSerializer.serialize_curriculum(lehrplan) for lehrplan in lehrplaene]
+
+        def assembly_path():
+            return CurriculumTreeAssembler.assemble()
+
+        results = {}
+        outputs = {}
+        for label, func in (('prefetch', prefetch_path), ('assembly', assembly_path)):
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    outputs[label] = func()
+                    timings.append(time.perf_counter() - start)
+            results[label] = (statistics.median(timings), len(queries))
+            self.stdout.write(
+                f"{label:>9}: Median {results[label][0] * 1000:8.1f} ms, {results[label][1]} Abfragen"
+            )
+
+        if outputs['prefetch'] != outputs['assembly']:
+            raise CommandError("Die beiden Pfade liefern unterschiedliche Ergebnisse!")
+
+        speedup = results['prefetch'][0] / results['assembly'][0] if results['assembly'][0] else float('inf')
+        self.stdout.write(self.style.SUCCESS(f"Identische Ausgabe, Beschleunigung: {speedup:.1f}x"))
@@ -0,0 +1,46 @@
+"""
+Legt synthetische Lehrpläne für Benchmarks und Lasttests an.
+
+Verwendung:
+    python manage.py generate_curricula
+    python manage.py generate_curricula --lehrplaene 200 --fanout 6,4,3,2 --beschreibungen 3
+    python manage.py generate_curricula --text-length 400 --seed 7
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from curriculum.synthetic import generate_curricula, parse_fanout
+
+
+class Command(BaseCommand):
+    help = (
+        "Legt deterministisch erzeugte Lehrpläne mit vollständiger Hierarchie an und schreibt "
+        "die abgeleiteten Daten (Kennzahlen, Closure-Tabelle, Suchindex, ...) für sie mit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lehrplaene', type=int, default=20, help="Anzahl der Lehrpläne")
+        parser.add_argument(
+            '--fanout', default='3',
+            help="Kinder je Knoten: eine Zahl für alle Ebenen oder vier Zahlen, z. B. 6,4,3,2"
+        )
+        parser.add_argument(
+            '--beschreibungen', type=int, default=2,
+            help="Beschreibungen je Lernziel, Teilziel und Lerninhalt"
+        )
+        parser.add_argument('--text-length', type=int, default=120, help="Ungefähre Länge einer Beschreibung in Zeichen")
+        parser.add_argument('--seed', type=int, default=0, help="Seed des Zufallsgenerators")
+
+    def handle(self, *args, **options):
+        try:
+            fanout = parse_fanout(options['fanout'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        created = generate_curricula(
+            options['lehrplaene'], fanout, beschreibungen=options['beschreibungen'],
+            text_length=options['text_length'], seed=options['seed']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            "Angelegt: " + ', '.join(f"{len(ids)} {model.__name__}" for model, ids in created.items())
+        ))
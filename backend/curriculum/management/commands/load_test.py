@@ -0,0 +1,574 @@
+"""
+Lasttest der API und des Admin-Imports gegen einen lokal gestarteten Server.
+
+Anders als ``benchmark_curricula`` misst dieses Kommando das Verhalten des gesamten
+Deployments unter Nebenläufigkeit: Es legt eine temporäre SQLite-Datenbank an, füllt sie mit
+``generate_curricula``, startet das Projekt auf einem lokalen Port und lässt viele Clients
+gleichzeitig eine gewichtete Mischung aus Detailansicht, Lehrplanliste, ``/all/`` und
+Admin-Import abrufen. Je Endpunkt werden Durchsatz, Latenz-Perzentile und Fehlerquote
+ausgegeben, damit sich Worker- und Threadzahlen aus echten Messwerten ableiten lassen.
+
+Server:
+    runserver  Djangos Entwicklungsserver (ein Prozess, ein Thread je Verbindung)
+    gunicorn   WSGI mit --workers Prozessen und --threads Threads je Prozess
+    uvicorn    ASGI mit --workers Prozessen
+
+gunicorn und uvicorn sind optional und müssen installiert sein. Der Lehrplan-Cache liegt im
+LocMemCache und damit je Worker-Prozess getrennt vor.
+
+Jeder Import lädt die ersten --import-lehrplaene Lehrpläne aus dem Export mit einem
+fortlaufend geänderten Fach hoch, damit die Zeilen nicht als Duplikate übersprungen werden.
+Ein Import zählt als Fehler, wenn die Admin-Seite danach keine Erfolgsmeldung anzeigt;
+die Abfrage dieser Meldung wird nicht mitgemessen. So werden auch Sperrkonflikte von
+SQLite sichtbar, die der Import sonst nur als Teilerfolg meldet.
+
+Verwendung:
+    python manage.py load_test
+    python manage.py load_test --clients 32 --duration 60 --mix detail=60,list=25,all=10,import=5
+    python manage.py load_test --server gunicorn --workers 4 --threads 4 --output load.json
+    python manage.py load_test --server uvicorn --workers 4 --mix detail=1
+"""
+
+import csv
+import http.client
+import importlib.util
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import secrets
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from curriculum.synthetic import parse_fanout
+
+from .benchmark_curricula import get_commit, percentile
+
+ENDPOINTS = ('detail', 'list', 'all', 'import')
+
+DEFAULT_MIX = 'detail=60,list=25,all=10,import=5'
+
+SERVERS = ('runserver', 'gunicorn', 'uvicorn')
+
+PERCENTILES = (50, 95, 99)
+
+ADMIN_USERNAME = 'loadtest'
+
+# Übergeordnete Datei und Fremdschlüsselspalte je CSV-Datei des Exports
+IMPORT_PARENTS = {
+    '02_lernbereich.csv': ('01_lehrplan.csv', 'lehrplan_id'),
+    '03_lernziel.csv': ('02_lernbereich.csv', 'lernbereich_id'),
+    '04_lernziel_beschreibung.csv': ('03_lernziel.csv', 'lernziel_id'),
+    '05_teilziel.csv': ('03_lernziel.csv', 'lernziel_id'),
+    '06_teilziel_beschreibung.csv': ('05_teilziel.csv', 'teilziel_id'),
+    '07_lerninhalt.csv': ('05_teilziel.csv', 'teilziel_id'),
+    '08_lerninhalt_beschreibung.csv': ('07_lerninhalt.csv', 'lerninhalt_id'),
+}
+
+Response = namedtuple('Response', ['status', 'headers', 'body', 'elapsed'])
+
+# Eine Anfrage des Lasttests; error ist None bei Erfolg
+Sample = namedtuple('Sample', ['endpoint', 'elapsed', 'status', 'error'])
+
+
+def parse_mix(value):
+    """
+    Liest die Gewichtung der Endpunkte.
+
+    Beispiel:
+        parse_mix('detail=60,list=25,import=5') == {'detail': 60, 'list': 25, 'import': 5}
+
+    Args:
+        value (str): Kommaseparierte Paare Endpunkt=Gewicht
+
+    Returns:
+        dict: Endpunkt -> Gewicht, nur Endpunkte mit positivem Gewicht
+
+    Raises:
+        ValueError: Bei unbekannten Endpunkten, ungültigen Gewichten oder ohne positives Gewicht
+    """
+    mix = {}
+    for part in value.split(','):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unbekannter Endpunkt '{name}', erlaubt: {', '.join(ENDPOINTS)}")
+        weight = int(weight) if weight.strip() else 1
+        if weight < 0:
+            raise ValueError(f"Negatives Gewicht für '{name}'")
+        if weight:
+            mix[name] = weight
+    if not mix:
+        raise ValueError("Mindestens ein Endpunkt braucht ein positives Gewicht")
+    return mix
+
+
+def find_free_port(host):
+    """Liefert einen freien TCP-Port auf dem Host."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class HttpClient:
+    """
+    HTTP-Client mit einer Keep-Alive-Verbindung und eigenen Cookies.
+
+    Jeder Lasttest-Client benutzt eine eigene Instanz; schließt der Server die Verbindung,
+    wird sie bei der nächsten Anfrage neu aufgebaut.
+    """
+
+    def __init__(self, host, port, timeout=60):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        self.cookies = {}
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Führt eine Anfrage aus und liest die Antwort vollständig.
+
+        Returns:
+            Response: Status, Header, Inhalt und Dauer in Sekunden bis zum letzten Byte
+        """
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except Exception:
+            self.connection.close()
+            raise
+        elapsed = time.perf_counter() - start
+        for header in response.headers.get_all('Set-Cookie') or ():
+            for name, morsel in SimpleCookie(header).items():
+                if morsel.value and morsel['max-age'] != '0':
+                    self.cookies[name] = morsel.value
+                else:
+                    self.cookies.pop(name, None)
+        return Response(response.status, response.headers, content, elapsed)
+
+    def close(self):
+        self.connection.close()
+
+
+class ImportPayload:
+    """
+    Erzeugt die ZIP-Archive für den Admin-Import aus einem Export.
+
+    Das Archiv enthält nur die ersten Lehrpläne des Exports und ihre Hierarchie. Jedes
+    erzeugte Archiv bekommt ein eigenes Fach, damit der Import die Lehrpläne neu anlegt.
+    """
+
+    def __init__(self, archive, lehrplaene):
+        self.files = {}
+        self.counter = itertools.count(1)
+        with zipfile.ZipFile(io.BytesIO(archive)) as z:
+            for filename in sorted(z.namelist()):
+                if not filename.endswith('.csv'):
+                    continue
+                rows = list(csv.DictReader(io.StringIO(z.read(filename).decode('utf-8-sig'))))
+                if filename in IMPORT_PARENTS:
+                    parent, column = IMPORT_PARENTS[filename]
+                    parent_ids = {row['id'] for row in self.files[parent]}
+                    rows = [row for row in rows if row[column] in parent_ids]
+                else:
+                    rows = rows[:lehrplaene]
+                self.files[filename] = rows
+        if not self.files.get('01_lehrplan.csv'):
+            raise CommandError("Der Export enthält keine Lehrpläne für den Import.")
+
+    def build(self):
+        """Liefert ein neues Importarchiv als Bytes."""
+        nummer = next(self.counter)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as z:
+            for filename, rows in self.files.items():
+                if filename == '01_lehrplan.csv':
+                    rows = [{**row, 'fach': f"{row['fach']} (Lasttest {nummer})"} for row in rows]
+                content = io.StringIO()
+                writer = csv.DictWriter(content, fieldnames=list(rows[0]) if rows else ['id'])
+                writer.writeheader()
+                writer.writerows(rows)
+                z.writestr(filename, '\ufeff'.encode('utf-8') + content.getvalue().encode('utf-8'))
+        return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Startet das Projekt mit synthetischen Lehrplänen auf einem lokalen Port, erzeugt Last "
+        "aus vielen gleichzeitigen Clients und gibt Durchsatz, Latenz-Perzentile und "
+        "Fehlerquote je Endpunkt aus."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=SERVERS, default='runserver', help="Zu startender Server")
+        parser.add_argument('--workers', type=int, default=1, help="Worker-Prozesse (gunicorn, uvicorn)")
+        parser.add_argument('--threads', type=int, default=1, help="Threads je Worker (gunicorn)")
+        parser.add_argument('--host', default='127.0.0.1', help="Adresse des Servers")
+        parser.add_argument('--port', type=int, default=0, help="Port des Servers (0: freien Port wählen)")
+        parser.add_argument('--clients', type=int, default=16, help="Anzahl gleichzeitiger Clients")
+        parser.add_argument('--duration', type=float, default=30, help="Dauer der Lastphase in Sekunden")
+        parser.add_argument(
+            '--mix', default=DEFAULT_MIX,
+            help=f"Gewichtung der Endpunkte {', '.join(ENDPOINTS)}, z. B. {DEFAULT_MIX}"
+        )
+        parser.add_argument('--lehrplaene', type=int, default=50, help="Anzahl generierter Lehrpläne")
+        parser.add_argument(
+            '--fanout', default='3',
+            help="Kinder je Knoten: eine Zahl für alle Ebenen oder vier Zahlen, z. B. 6,4,3,2"
+        )
+        parser.add_argument(
+            '--beschreibungen', type=int, default=2,
+            help="Beschreibungen je Lernziel, Teilziel und Lerninhalt"
+        )
+        parser.add_argument('--text-length', type=int, default=120, help="Ungefähre Länge einer Beschreibung in Zeichen")
+        parser.add_argument('--import-lehrplaene', type=int, default=1, help="Lehrpläne je Import")
+        parser.add_argument('--seed', type=int, default=0, help="Seed für Datengenerator und Clients")
+        parser.add_argument('--timeout', type=float, default=60, help="Timeout einer Anfrage in Sekunden")
+        parser.add_argument('--output', help="Pfad der JSON-Datei für die Ergebnisse")
+        parser.add_argument(
+            '--keep', action='store_true',
+            help="Temporäres Verzeichnis mit Datenbank und Serverprotokoll nicht löschen"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+            fanout = parse_fanout(options['fanout'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options['clients'] < 1 or options['duration'] <= 0:
+            raise CommandError("--clients und --duration müssen positiv sein.")
+        if options['server'] != 'runserver' and importlib.util.find_spec(options['server']) is None:
+            raise CommandError(f"{options['server']} ist nicht installiert.")
+
+        self.host = options['host']
+        self.port = options['port'] or find_free_port(self.host)
+        self.timeout = options['timeout']
+        workdir = tempfile.mkdtemp(prefix='curriculum-loadtest-')
+        self.env = {
+            **os.environ,
+            'DJANGO_DATABASE_PATH': os.path.join(workdir, 'db.sqlite3'),
+            'DJANGO_SUPERUSER_PASSWORD': secrets.token_urlsafe(16),
+        }
+        server = None
+        try:
+            self.stdout.write(f"Lege Testdatenbank in {workdir} an ...")
+            self.manage('migrate', '--noinput')
+            self.manage(
+                'generate_curricula', '--lehrplaene', str(options['lehrplaene']),
+                '--fanout', ','.join(map(str, fanout)), '--beschreibungen', str(options['beschreibungen']),
+                '--text-length', str(options['text_length']), '--seed', str(options['seed'])
+            )
+            if 'import' in mix:
+                self.manage('createsuperuser', '--noinput', '--username', ADMIN_USERNAME, '--email', 'loadtest@example.com')
+
+            log_path = os.path.join(workdir, 'server.log')
+            server = self.start_server(options, log_path)
+            self.wait_for_server(server, log_path)
+            lehrplan_ids = self.get_lehrplan_ids()
+            admin_cookies, payload = self.prepare_import(options) if 'import' in mix else ({}, None)
+
+            self.stdout.write(
+                f"Last: {options['clients']} Clients, {options['duration']:g} s, "
+                f"{options['server']} auf Port {self.port}, Mix {', '.join(f'{k}={v}' for k, v in mix.items())}"
+            )
+            samples, elapsed = self.run_load(options, mix, lehrplan_ids, admin_cookies, payload)
+            if server.poll() is not None:
+                raise CommandError(f"Der Server wurde während des Lasttests beendet.\n{self.read_log(log_path)}")
+        finally:
+            if server is not None:
+                self.stop_server(server)
+            if options['keep']:
+                self.stdout.write(f"Datenbank und Serverprotokoll bleiben in {workdir}")
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        results = self.summarize(samples, elapsed)
+        for name, result in results.items():
+            self.report(name, result)
+
+        if options['output']:
+            parameters = {
+                key: options[key]
+                for key in (
+                    'server', 'workers', 'threads', 'clients', 'duration', 'lehrplaene', 'beschreibungen',
+                    'text_length', 'import_lehrplaene', 'seed', 'timeout'
+                )
+            }
+            document = {
+                'created_at': timezone.now().isoformat(),
+                'commit': get_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'parameters': {**parameters, 'fanout': list(fanout), 'mix': mix},
+                'elapsed_s': round(elapsed, 3),
+                'endpoints': results,
+            }
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Ergebnisse geschrieben nach {options['output']}")
+
+    def manage(self, *args):
+        """
+        Führt ein Management-Kommando gegen die Testdatenbank aus.
+
+        Raises:
+            CommandError: Wenn das Kommando fehlschlägt
+        """
+        result = subprocess.run(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), *args],
+            cwd=settings.BASE_DIR, env=self.env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f"manage.py {args[0]} ist fehlgeschlagen:\n{result.stderr or result.stdout}")
+
+    def start_server(self, options, log_path):
+        """Startet den Server als Unterprozess; die Ausgabe landet in log_path."""
+        address = f"{self.host}:{self.port}"
+        if options['server'] == 'gunicorn':
+            command = [
+                sys.executable, '-m', 'gunicorn', 'backend.wsgi:application', '--bind', address,
+                '--workers', str(options['workers']), '--threads', str(options['threads']),
+                '--log-level', 'warning',
+            ]
+        elif options['server'] == 'uvicorn':
+            command = [
+                sys.executable, '-m', 'uvicorn', 'backend.asgi:application', '--host', self.host,
+                '--port', str(self.port), '--workers', str(options['workers']), '--log-level', 'warning',
+            ]
+        else:
+            command = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'runserver', address, '--noreload']
+        with open(log_path, 'wb') as log:
+            return subprocess.Popen(
+                command, cwd=settings.BASE_DIR, env={**self.env, 'PYTHONUNBUFFERED': '1'},
+                stdout=log, stderr=subprocess.STDOUT
+            )
+
+    def stop_server(self, server):
+        """Beendet den Server und wartet auf das Ende des Prozesses."""
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    def read_log(self, log_path, lines=20):
+        """Liefert die letzten Zeilen des Serverprotokolls."""
+        with open(log_path, encoding='utf-8', errors='replace') as f:
+            return ''.join(f.readlines()[-lines:])
+
+    def wait_for_server(self, server, log_path, timeout=30):
+        """
+        Wartet, bis der Server die Lehrplanliste ausliefert.
+
+        Raises:
+            CommandError: Wenn der Server sich beendet oder nicht rechtzeitig antwortet
+        """
+        deadline = time.monotonic() + timeout
+        client = HttpClient(self.host, self.port, timeout=5)
+        try:
+            while time.monotonic() < deadline:
+                if server.poll() is not None:
+                    raise CommandError(f"Der Server konnte nicht gestartet werden.\n{self.read_log(log_path)}")
+                try:
+                    if client.request('GET', '/curriculum/curricula/list/').status == 200:
+                        return
+                except (OSError, http.client.HTTPException):
+                    pass
+                time.sleep(0.2)
+        finally:
+            client.close()
+        raise CommandError(f"Der Server antwortet nicht nach {timeout} s.\n{self.read_log(log_path)}")
+
+    def get_lehrplan_ids(self):
+        """Liest die IDs aller Lehrpläne über die Listenansicht."""
+        client = HttpClient(self.host, self.port, self.timeout)
+        lehrplan_ids = []
+        try:
+            for page in itertools.count(1):
+                response = client.request('GET', f'/curriculum/curricula/list/?page_size=100&page={page}')
+                if response.status != 200:
+                    raise CommandError(f"Lehrplanliste lieferte Status {response.status}")
+                data = json.loads(response.body)
+                lehrplan_ids.extend(item['id'] for item in data['results'])
+                if page >= data['pagination']['total_pages']:
+                    break
+        finally:
+            client.close()
+        if not lehrplan_ids:
+            raise CommandError("Der Server liefert keine Lehrpläne.")
+        return lehrplan_ids
+
+    def prepare_import(self, options):
+        """
+        Meldet den Admin-Benutzer an und lädt den Export für die Importarchive.
+
+        Returns:
+            tuple: (Cookies der Admin-Sitzung, ImportPayload)
+
+        Raises:
+            CommandError: Wenn Anmeldung oder Export fehlschlagen
+        """
+        client = HttpClient(self.host, self.port, self.timeout)
+        try:
+            client.request('GET', '/admin-curriculum/login/')
+            response = client.request(
+                'POST', '/admin-curriculum/login/',
+                body=urlencode({
+                    'username': ADMIN_USERNAME,
+                    'password': self.env['DJANGO_SUPERUSER_PASSWORD'],
+                    'csrfmiddlewaretoken': client.cookies.get('csrftoken', ''),
+                    'next': '/admin-curriculum/',
+                }),
+                headers={'Content-Type': 'application/x-www-form-urlencoded'},
+            )
+            if response.status != 302 or 'sessionid' not in client.cookies:
+                raise CommandError(f"Anmeldung an der Admin-Site fehlgeschlagen (Status {response.status}).")
+            response = client.request('GET', '/admin-curriculum/export-all/')
+            if response.status != 200:
+                raise CommandError(f"Export lieferte Status {response.status}")
+            return dict(client.cookies), ImportPayload(response.body, options['import_lehrplaene'])
+        finally:
+            client.close()
+
+    def run_load(self, options, mix, lehrplan_ids, admin_cookies, payload):
+        """
+        Lässt die Clients bis zum Ende der Lastphase Anfragen stellen.
+
+        Returns:
+            tuple: (Liste der Samples, tatsächliche Dauer der Lastphase in Sekunden)
+        """
+        names, weights = list(mix), list(mix.values())
+        samples = []
+        start = time.perf_counter()
+        deadline = start + options['duration']
+        barrier = threading.Barrier(options['clients'])
+
+        def run_client(index):
+            rng = random.Random(options['seed'] * 100003 + index)
+            client = HttpClient(self.host, self.port, self.timeout)
+            client.cookies.update(admin_cookies)
+            barrier.wait()
+            try:
+                while time.perf_counter() < deadline:
+                    name = rng.choices(names, weights)[0]
+                    started = time.perf_counter()
+                    try:
+                        response, error = getattr(self, f'request_{name}')(client, rng, lehrplan_ids, payload)
+                        samples.append(Sample(name, response.elapsed, response.status, error))
+                    except (OSError, http.client.HTTPException) as e:
+                        samples.append(Sample(name, time.perf_counter() - started, None, type(e).__name__))
+            finally:
+                client.close()
+
+        with ThreadPoolExecutor(max_workers=options['clients']) as executor:
+            for future in [executor.submit(run_client, index) for index in range(options['clients'])]:
+                future.result()
+        return samples, time.perf_counter() - start
+
+    def check_status(self, response, expected=200):
+        """Liefert die Fehlerbeschreibung einer Antwort oder None."""
+        return None if response.status == expected else f"HTTP {response.status}"
+
+    def request_detail(self, client, rng, lehrplan_ids, payload):
+        """Detailansicht eines zufälligen Lehrplans."""
+        response = client.request('GET', f'/curriculum/curriculum/{rng.choice(lehrplan_ids)}/')
+        return response, self.check_status(response)
+
+    def request_list(self, client, rng, lehrplan_ids, payload):
+        """Eine zufällige Seite der Lehrplanliste."""
+        page = rng.randint(1, -(-len(lehrplan_ids) // 20))
+        response = client.request('GET', f'/curriculum/curricula/list/?page_size=20&page={page}')
+        return response, self.check_status(response)
+
+    def request_all(self, client, rng, lehrplan_ids, payload):
+        """Alle Lehrpläne mit vollständigen Bäumen."""
+        response = client.request('GET', '/curriculum/curricula/all/')
+        return response, self.check_status(response)
+
+    def request_import(self, client, rng, lehrplan_ids, payload):
+        """CSV-Import über die Admin-Site; das Ergebnis wird an der Meldung der Folgeseite erkannt."""
+        boundary = uuid.uuid4().hex
+        body = b''.join([
+            f'--{boundary}\r\nContent-Disposition: form-data; name="csrfmiddlewaretoken"\r\n\r\n'.encode(),
+            client.cookies.get('csrftoken', '').encode(), b'\r\n',
+            f'--{boundary}\r\nContent-Disposition: form-data; name="zip_file"; filename="import.zip"\r\n'.encode(),
+            b'Content-Type: application/zip\r\n\r\n', payload.build(), b'\r\n',
+            f'--{boundary}--\r\n'.encode(),
+        ])
+        response = client.request(
+            'POST', '/admin-curriculum/import-all/', body=body,
+            headers={'Content-Type': f'multipart/form-data; boundary={boundary}'}
+        )
+        error = self.check_status(response, expected=302)
+        if error is None:
+            page = client.request('GET', '/admin-curriculum/import-all/')
+            if b'class="success"' not in page.body:
+                error = 'Import fehlgeschlagen' if page.status == 200 else f"HTTP {page.status} (Meldung)"
+        return response, error
+
+    def summarize(self, samples, elapsed):
+        """
+        Fasst die Samples je Endpunkt und insgesamt zusammen.
+
+        Returns:
+            dict: Endpunkt -> Anfragen, Durchsatz pro Sekunde, Fehlerquote, Fehlerarten und
+                  Latenz-Perzentile in Millisekunden (über alle Anfragen einschließlich Fehlern)
+        """
+        groups = {}
+        for sample in samples:
+            groups.setdefault(sample.endpoint, []).append(sample)
+        groups = {name: groups[name] for name in ENDPOINTS if name in groups}
+        if samples:
+            groups['total'] = samples
+
+        results = {}
+        for name, group in groups.items():
+            latencies = sorted(sample.elapsed * 1000 for sample in group)
+            errors = Counter(sample.error for sample in group if sample.error)
+            results[name] = {
+                'requests': len(group),
+                'throughput_rps': round(len(group) / elapsed, 2),
+                'errors': sum(errors.values()),
+                'error_rate': round(sum(errors.values()) / len(group), 4),
+                'error_types': dict(errors.most_common()),
+                **{f'p{p}_ms': round(percentile(latencies, p), 3) for p in PERCENTILES},
+                'max_ms': round(latencies[-1], 3),
+                'mean_ms': round(statistics.fmean(latencies), 3),
+            }
+        return results
+
+    def report(self, name, result):
+        """Gibt die Ergebnisse eines Endpunkts in einer Zeile aus."""
+        self.stdout.write(
+            f"{name:>6}: {result['requests']:7} Anfragen, {result['throughput_rps']:8.1f}/s, "
+            f"p50 {result['p50_ms']:9.2f} ms, p95 {result['p95_ms']:9.2f} ms, p99 {result['p99_ms']:9.2f} ms, "
+            f"Fehler {result['error_rate'] * 100:5.1f} %"
+        )
+        if result['error_types']:
+            self.stdout.write('        ' + ', '.join(f"{error}: {count}" for error, count in result['error_types'].items()))
@@ -0,0 +1,39 @@
+"""
+Löscht alte Einträge des Änderungsprotokolls.
+
+Verwendung:
+    python manage.py prune_aenderungen
+    python manage.py prune_aenderungen --days 7
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from curriculum.aenderungen import get_retention, prune_aenderungen
+
+
+class Command(BaseCommand):
+    help = (
+        "Löscht Einträge des Änderungsprotokolls, die älter als der Aufbewahrungszeitraum sind "
+        "(CURRICULUM_AENDERUNGEN_RETENTION_DAYS). Clients mit einem älteren Token erhalten danach "
+        "Status 410 und müssen den Datenbestand neu laden."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            help="Aufbewahrungszeitraum in Tagen (Standard: CURRICULUM_AENDERUNGEN_RETENTION_DAYS)"
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError("--days darf nicht negativ sein.")
+        retention = get_retention() if options['days'] is None else timedelta(days=options['days'])
+        with transaction.atomic():
+            anzahl, horizont = prune_aenderungen(timezone.now() - retention)
+        self.stdout.write(self.style.SUCCESS(
+            f"{anzahl} Einträge des Änderungsprotokolls gelöscht; Tokens ab {horizont} bleiben gültig."
+        ))
@@ -0,0 +1,39 @@
+"""
+Berechnet die Inhaltshashes aller Lehrplanknoten neu.
+
+Verwendung:
+    python manage.py rebuild_hashes
+    python manage.py rebuild_hashes --check
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from curriculum.hashes import find_hash_abweichungen, rebuild_hashes
+
+
+class Command(BaseCommand):
+    help = (
+        "Verwirft alle gespeicherten Inhaltshashes und berechnet sie neu, z. B. nach Massenimporten "
+        "per bulk_create() oder update(), die keine Signale auslösen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Nur vergleichen und Abweichungen ausgeben; Fehlerstatus, falls welche gefunden werden"
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            abweichungen = find_hash_abweichungen()
+            for (ebene, knoten_id), (stored, computed) in sorted(abweichungen.items()):
+                self.stdout.write(f"Knoten {ebene}:{knoten_id}: gespeichert {stored}, berechnet {computed}")
+            if abweichungen:
+                raise CommandError(f"{len(abweichungen)} Knoten mit veralteten Hashes.")
+            self.stdout.write(self.style.SUCCESS("Alle gespeicherten Hashes sind aktuell."))
+            return
+
+        with transaction.atomic():
+            count = rebuild_hashes()
+        self.stdout.write(self.style.SUCCESS(f"Hashes für {count} Lehrpläne neu berechnet."))
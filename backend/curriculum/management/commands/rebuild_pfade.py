@@ -0,0 +1,43 @@
+"""
+Baut die Closure-Tabelle der Lehrplan-Hierarchie neu auf.
+
+Verwendung:
+    python manage.py rebuild_pfade
+    python manage.py rebuild_pfade --check
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from curriculum.pfade import find_pfad_abweichungen, rebuild_pfade
+
+
+class Command(BaseCommand):
+    help = (
+        "Berechnet die Einträge der Closure-Tabelle (Vorfahren und Nachfahren aller Knoten) aus den "
+        "Fremdschlüsseln neu, z. B. nach Massenimporten per bulk_create() oder update(), die keine "
+        "Signale auslösen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Nur vergleichen und Abweichungen ausgeben; Fehlerstatus, falls welche gefunden werden"
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            fehlend, ueberzaehlig = find_pfad_abweichungen()
+            for label, eintraege in (("fehlt", fehlend), ("überzählig", ueberzaehlig)):
+                for vorfahr_ebene, vorfahr_id, nachfahr_ebene, nachfahr_id in sorted(eintraege):
+                    self.stdout.write(f"{label}: {vorfahr_ebene}:{vorfahr_id} -> {nachfahr_ebene}:{nachfahr_id}")
+            if fehlend or ueberzaehlig:
+                raise CommandError(
+                    f"{len(fehlend)} fehlende und {len(ueberzaehlig)} überzählige Einträge in der Closure-Tabelle."
+                )
+            self.stdout.write(self.style.SUCCESS("Die Closure-Tabelle ist konsistent."))
+            return
+
+        with transaction.atomic():
+            count = rebuild_pfade()
+        self.stdout.write(self.style.SUCCESS(f"{count} Einträge in der Closure-Tabelle angelegt."))
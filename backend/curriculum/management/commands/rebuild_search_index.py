@@ -0,0 +1,25 @@
+"""
+Baut den Volltextindex der Curriculum-Suche neu auf.
+
+Verwendung:
+    python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from curriculum.search import CurriculumSearchIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Baut den FTS5-Index über Lernziele, Teilziele und Lerninhalte neu auf, z. B. nach "
+        "Massenimporten per bulk_create() oder update(), die keine Signale auslösen."
+    )
+
+    def handle(self, *args, **options):
+        if not CurriculumSearchIndex.is_available():
+            raise CommandError("Die Volltextsuche ist auf dieser Datenbank nicht verfügbar.")
+        with transaction.atomic():
+            count = CurriculumSearchIndex.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{count} Dokumente indiziert."))
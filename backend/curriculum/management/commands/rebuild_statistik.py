@@ -0,0 +1,58 @@
+"""
+Berechnet die denormalisierten Kennzahlen der Lehrpläne und den Vergleichswürfel neu.
+
+Verwendung:
+    python manage.py rebuild_statistik
+    python manage.py rebuild_statistik --check
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from curriculum.statistik import find_abweichungen, rebuild_statistiken
+from curriculum.vergleich import find_kennzahl_abweichungen, refresh_kennzahlen
+
+
+class Command(BaseCommand):
+    help = (
+        "Zählt Lernbereiche, Lernziele, Teilziele, Lerninhalte und Unterrichtsstunden je Lehrplan "
+        "neu, überschreibt die gespeicherten Kennzahlen und berechnet daraus den Vergleichswürfel, "
+        "z. B. nach Massenimporten per bulk_create() oder update(), die keine Signale auslösen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Nur vergleichen und Abweichungen ausgeben; Fehlerstatus, falls welche gefunden werden"
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            abweichungen = find_abweichungen()
+            for lehrplan_id, felder in sorted(abweichungen.items()):
+                details = ', '.join(
+                    f"{field}: gespeichert {stored}, gezählt {counted}"
+                    for field, (stored, counted) in felder.items()
+                )
+                self.stdout.write(f"Lehrplan {lehrplan_id}: {details}")
+            zellen = find_kennzahl_abweichungen()
+            for (bundesland, fach, stufe), (stored, computed) in sorted(
+                zellen.items(), key=lambda item: (item[0][0], item[0][1], item[0][2] or 0)
+            ):
+                self.stdout.write(
+                    f"Vergleich {bundesland} / {fach} / {stufe or 'alle'}: "
+                    f"gespeichert {stored}, berechnet {computed}"
+                )
+            if abweichungen or zellen:
+                raise CommandError(
+                    f"{len(abweichungen)} Lehrpläne und {len(zellen)} Vergleichszellen mit abweichenden Kennzahlen."
+                )
+            self.stdout.write(self.style.SUCCESS("Alle Kennzahlen sind konsistent."))
+            return
+
+        with transaction.atomic():
+            count = rebuild_statistiken()
+            zellen = refresh_kennzahlen()
+        self.stdout.write(self.style.SUCCESS(
+            f"Kennzahlen für {count} Lehrpläne und {zellen} Vergleichszellen neu berechnet."
+        ))
@@ -0,0 +1,397 @@
+"""
+Betriebskennzahlen im Textformat von Prometheus.
+
+Das Modul enthält eine kleine Registry mit Zählern (``Counter``) und Histogrammen
+(``Histogram``) sowie die Kennzahlen der Curriculum-App. Die Werte werden je Prozess im
+Speicher gesammelt; ``/metrics`` (siehe ``curriculum.views.MetricsView``) gibt sie im
+Textformat von Prometheus aus.
+
+Mehrere Worker-Prozesse (gunicorn, uvicorn --workers) zählen getrennt. Ist
+``CURRICULUM_METRICS_DIR`` gesetzt, schreibt jeder Prozess spätestens
+``CURRICULUM_METRICS_FLUSH_INTERVAL`` Sekunden nach einer Änderung eine Momentaufnahme
+seiner Werte als JSON-Datei in dieses Verzeichnis (atomar per ``os.replace``). Beim Abruf
+werden die Dateien aller Prozesse mit den aktuellen Werten des eigenen Prozesses summiert.
+Dateien beendeter Prozesse bleiben erhalten, damit Zähler nicht zurückspringen; das
+Verzeichnis sollte daher beim Start des Deployments geleert werden. Ohne Verzeichnis
+liefert ``/metrics`` nur die Werte des antwortenden Prozesses.
+
+Verwendungsbeispiel:
+    from curriculum import metrics
+
+    metrics.CACHE_REQUESTS.inc(cache='tree', result='hit')
+    metrics.REQUEST_DURATION.observe(0.042, view='curriculum')
+    print(metrics.registry.generate_text())
+"""
+
+import atexit
+import bisect
+import copy
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+# Standardgrenzen für Dauern in Sekunden
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# Grenzen für Antwort- und Dateigrößen in Bytes
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Grenzen für die Anzahl der SQL-Abfragen je Anfrage
+QUERY_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def record_admin_operation(operation, outcome, started):
+    """
+    Erfasst Ergebnis und Dauer eines Exports oder Imports über die Admin-Site.
+
+    Args:
+        operation (str): 'export' oder 'import'
+        outcome (str): z. B. 'success', 'partial' oder 'error'
+        started (float): Beginn der Operation laut time.perf_counter()
+    """
+    ADMIN_OPERATIONS.inc(operation=operation, outcome=outcome)
+    ADMIN_OPERATION_DURATION.observe(time.perf_counter() - started, operation=operation)
+
+
+def record_import(resource, result, started):
+    """
+    Erfasst die Zeilen eines Imports je Ergebnis und seine Dauer.
+
+    Die Zeilen pro Sekunde ergeben sich aus curriculum_import_rows_total geteilt durch
+    curriculum_import_duration_seconds_sum bzw. als rate() des Zählers.
+
+    Args:
+        resource: Die importierende ModelResource
+        result: Das Ergebnis von import_data() mit den Zeilen je Ergebnis in totals
+        started (float): Beginn des Imports laut time.perf_counter()
+    """
+    name = resource._meta.model.__name__
+    for import_type, count in result.totals.items():
+        if count:
+            IMPORT_ROWS.inc(count, resource=name, result=import_type)
+    IMPORT_DURATION.observe(time.perf_counter() - started, resource=name)
+
+
+def escape_label_value(value):
+    """Maskiert einen Labelwert für das Textformat."""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value):
+    """Formatiert einen Messwert für das Textformat."""
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Basisklasse der Kennzahlen.
+
+    Die Werte liegen im Dictionary ``registry.values[name]`` mit dem Tupel der Labelwerte
+    als Schlüssel.
+    """
+
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def make_key(self, labels):
+        """
+        Bildet den Schlüssel aus den Labelwerten.
+
+        Raises:
+            ValueError: Wenn die Labels nicht den deklarierten Namen entsprechen
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} erwartet die Labels {', '.join(self.labelnames) or '(keine)'}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def format_labels(self, key, extra=()):
+        """Formatiert Labelwerte als {name="wert",...}."""
+        pairs = [*zip(self.labelnames, key), *extra]
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{escape_label_value(value)}"' for name, value in pairs) + '}'
+
+    def merge(self, total, value):
+        """Addiert einen Wert eines anderen Prozesses zum Gesamtwert und liefert diesen."""
+        raise NotImplementedError
+
+    def expose(self, samples):
+        """Liefert die Zeilen des Textformats für die summierten Werte."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monoton steigender Zähler."""
+
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Erhöht den Zähler für die Labelwerte um amount."""
+        key = self.make_key(labels)
+        with self.registry.lock:
+            values = self.registry.get_values(self.name)
+            values[key] = values.get(key, 0) + amount
+        self.registry.mark_dirty()
+
+    def merge(self, total, value):
+        return (total or 0) + value
+
+    def expose(self, samples):
+        return [f"{self.name}{self.format_labels(key)} {format_value(value)}" for key, value in samples]
+
+
+class Histogram(Metric):
+    """
+    Histogramm mit festen Obergrenzen.
+
+    Je Labelwerte werden die Anzahl je Intervall (nicht kumuliert), die Summe und die
+    Anzahl der Beobachtungen gespeichert; die Ausgabe kumuliert die Intervalle.
+    """
+
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Erfasst eine Beobachtung für die Labelwerte."""
+        key = self.make_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.registry.lock:
+            values = self.registry.get_values(self.name)
+            entry = values.get(key)
+            if entry is None:
+                entry = values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+        self.registry.mark_dirty()
+
+    def merge(self, total, value):
+        if total is None:
+            return [list(value[0]), value[1], value[2]]
+        total[0] = [a + b for a, b in zip(total[0], value[0])]
+        total[1] += value[1]
+        total[2] += value[2]
+        return total
+
+    def expose(self, samples):
+        lines = []
+        for key, (counts, total, count) in samples:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                labels = self.format_labels(key, [('le', format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self.format_labels(key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{self.format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registry der Kennzahlen eines Prozesses mit optionaler Ablage für mehrere Prozesse.
+
+    Nach einem fork() (z. B. gunicorn mit --preload) beginnt der Kindprozess mit leeren
+    Werten und eigener Datei, damit die Werte des Elternprozesses nicht doppelt zählen.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Verwirft alle Werte des Prozesses, etwa in Tests oder nach einem fork()."""
+        self.values = {}
+        self.pid = os.getpid()
+        self.filename = f"metrics-{self.pid}-{uuid.uuid4().hex[:8]}.json"
+        self.flush_timer = None
+        self.atexit_registered = False
+
+    def register(self, metric):
+        """
+        Registriert eine Kennzahl.
+
+        Raises:
+            ValueError: Wenn bereits eine Kennzahl gleichen Namens registriert ist
+        """
+        if metric.name in self.metrics:
+            raise ValueError(f"Kennzahl {metric.name} ist bereits registriert")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Legt einen Zähler an und registriert ihn."""
+        return self.register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        """Legt ein Histogramm an und registriert es."""
+        return self.register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def get_values(self, name):
+        """Liefert die Werte einer Kennzahl im aktuellen Prozess; nur mit gehaltenem Lock aufrufen."""
+        if self.pid != os.getpid():
+            self.reset()
+        return self.values.setdefault(name, {})
+
+    def get_directory(self):
+        """Liefert das Verzeichnis für die Ablage über Prozesse hinweg oder None."""
+        return getattr(settings, 'CURRICULUM_METRICS_DIR', None)
+
+    def mark_dirty(self):
+        """Plant das Schreiben der Momentaufnahme, sofern ein Verzeichnis gesetzt ist."""
+        if self.flush_timer is not None or not self.get_directory():
+            return
+        with self.lock:
+            if self.flush_timer is not None:
+                return
+            self.flush_timer = threading.Timer(getattr(settings, 'CURRICULUM_METRICS_FLUSH_INTERVAL', 1.0), self.flush)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+            if not self.atexit_registered:
+                atexit.register(self.flush)
+                self.atexit_registered = True
+
+    def snapshot(self):
+        """Liefert eine Kopie der Werte des Prozesses: Name -> Liste von [Labelwerte, Wert]."""
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()
+            return {
+                name: [[list(key), copy.deepcopy(value)] for key, value in values.items()]
+                for name, values in self.values.items()
+            }
+
+    def flush(self):
+        """Schreibt die Werte des Prozesses atomar in das Verzeichnis."""
+        directory = self.get_directory()
+        with self.lock:
+            self.flush_timer = None
+        if not directory:
+            return
+        data = self.snapshot()
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, os.path.join(directory, self.filename))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def read_snapshots(self):
+        """Liest die Momentaufnahmen der anderen Prozesse aus dem Verzeichnis."""
+        directory = self.get_directory()
+        if not directory or not os.path.isdir(directory):
+            return []
+        snapshots = []
+        for filename in sorted(os.listdir(directory)):
+            if not (filename.startswith('metrics-') and filename.endswith('.json')) or filename == self.filename:
+                continue
+            try:
+                with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                # Die Datei wurde zwischen listdir() und open() ersetzt oder gelöscht
+                continue
+        return snapshots
+
+    def collect(self):
+        """
+        Summiert die Werte aller Prozesse.
+
+        Returns:
+            dict: Name -> Dictionary Labelwerte -> summierter Wert, nur für registrierte Kennzahlen
+        """
+        totals = {name: {} for name in self.metrics}
+        for snapshot in [self.snapshot(), *self.read_snapshots()]:
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                for key, value in samples:
+                    key = tuple(key)
+                    totals[name][key] = metric.merge(totals[name].get(key), value)
+        return totals
+
+    def generate_text(self):
+        """
+        Erzeugt die Ausgabe im Textformat von Prometheus (Version 0.0.4).
+
+        Returns:
+            str: Die Kennzahlen mit HELP- und TYPE-Zeilen, Labelwerte sortiert
+        """
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(metric.expose(sorted(values.items())))
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    'curriculum_http_requests_total', "Anzahl der HTTP-Anfragen je View, Methode und Status.",
+    ['view', 'method', 'status']
+)
+REQUEST_DURATION = registry.histogram(
+    'curriculum_http_request_duration_seconds', "Dauer der HTTP-Anfragen bis zur Antwort je View.",
+    ['view']
+)
+RESPONSE_SIZE = registry.histogram(
+    'curriculum_http_response_size_bytes', "Größe der nicht gestreamten Antworten je View.",
+    ['view'], buckets=SIZE_BUCKETS
+)
+REQUEST_QUERIES = registry.histogram(
+    'curriculum_http_request_queries', "SQL-Abfragen je HTTP-Anfrage und View.",
+    ['view'], buckets=QUERY_BUCKETS
+)
+SERIALIZE_DURATION = registry.histogram(
+    'curriculum_serialize_duration_seconds', "Zeit für den Aufbau der Lehrplanbäume ohne SQL je View.",
+    ['view']
+)
+CACHE_REQUESTS = registry.counter(
+    'curriculum_cache_requests_total', "Zugriffe auf den Lehrplan-Cache je Eintragsart (tree) und Ergebnis (hit, miss).",
+    ['cache', 'result']
+)
+ADMIN_OPERATIONS = registry.counter(
+    'curriculum_admin_operations_total', "Export und Import aller Daten über die Admin-Site je Ergebnis.",
+    ['operation', 'outcome']
+)
+ADMIN_OPERATION_DURATION = registry.histogram(
+    'curriculum_admin_operation_duration_seconds', "Dauer von Export und Import aller Daten über die Admin-Site.",
+    ['operation']
+)
+EXPORT_SIZE = registry.histogram(
+    'curriculum_export_size_bytes', "Größe des ZIP-Archivs beim Export aller Daten.",
+    buckets=SIZE_BUCKETS
+)
+IMPORT_ROWS = registry.counter(
+    'curriculum_import_rows_total', "Importierte CSV-Zeilen je Resource und Ergebnis (new, update, skip, error, invalid).",
+    ['resource', 'result']
+)
+IMPORT_DURATION = registry.histogram(
+    'curriculum_import_duration_seconds', "Dauer des Imports einer CSV-Datei je Resource ohne Dry-Run.",
+    ['resource']
+)
@@ -0,0 +1,364 @@
+"""
+Middleware der Curriculum-App.
+
+``QueryInstrumentationMiddleware`` misst jede Anfrage (siehe ``curriculum.instrumentation``),
+schreibt die Messwerte in die Kennzahlen unter ``/metrics`` (siehe ``curriculum.metrics``)
+und sollte möglichst weit vorne in ``MIDDLEWARE`` stehen, damit auch die Abfragen anderer
+Middleware (Sitzung, Benutzer) gezählt werden. ``ProfilingMiddleware`` profiliert einzelne
+Anfragen von Staff-Benutzern auf Wunsch mit cProfile und muss hinter der
+``AuthenticationMiddleware`` stehen.
+
+Einstellungen:
+    CURRICULUM_QUERY_BUDGET_RAISE: Löst bei überschrittenem Budget QueryBudgetExceeded aus,
+        statt nur eine Warnung zu protokollieren (Standard: False, in Tests mit QueryBudgetTestMixin True)
+    CURRICULUM_SERVER_TIMING: Server-Timing-Header für alle Anfragen statt nur für Staff
+        (Standard: False)
+    CURRICULUM_SLOW_QUERY_COUNT: Anzahl der langsamsten Abfragen im Header (Standard: 3)
+    CURRICULUM_PROFILE_DIR: Verzeichnis für mit ?_profile=store gespeicherte Profile
+        (Standard: None, Speichern nicht möglich)
+    CURRICULUM_PROFILE_LIMIT: Anzahl der Funktionen im Textbericht des Profils (Standard: 40)
+"""
+
+import cProfile
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import re
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from . import metrics as curriculum_metrics
+from .instrumentation import QueryBudgetExceeded, RequestMetrics, current_metrics, get_query_budget
+
+logger = logging.getLogger(__name__)
+
+
+def format_description(text, limit=100):
+    """Kürzt einen Text für den desc-Parameter im Server-Timing-Header und maskiert ihn."""
+    text = ' '.join(text.split())
+    if len(text) > limit:
+        text = text[:limit - 3] + '...'
+    return text.encode('ascii', 'replace').decode('ascii').replace('\\', '/').replace('"', "'")
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Zählt die SQL-Abfragen jeder Anfrage, misst ihre Dauer und prüft das Abfragebudget der View.
+
+    Für Staff-Benutzer werden die Messwerte als ``Server-Timing`` ausgegeben, z. B.:
+
+        Server-Timing: db;dur=4.2;desc="7 Abfragen", serialize;dur=1.3, app;dur=2.0,
+                       total;dur=7.5, size;desc="18342 Bytes", sql1;dur=1.9;desc="SELECT ..."
+
+    ``db`` ist die SQL-Zeit, ``serialize`` die Zeit für den Aufbau der Lehrplanbäume ohne
+    SQL, ``app`` die übrige Zeit und ``sql1`` bis ``sqlN`` die langsamsten Abfragen. Bei
+    gestreamten Antworten werden nur die Abfragen bis zum Beginn des Streams erfasst.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics, token = self.start(request)
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        self.check_budget(request, metrics)
+        self.record_metrics(request, response, metrics)
+        if self.wants_server_timing(request.user if hasattr(request, 'user') else None):
+            self.add_server_timing(response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics, token = self.start(request)
+        # Verbindungen gehören zu einem Thread; das ORM führt asynchrone Abfragen im
+        # Thread-Executor der Anfrage aus, daher werden die Wrapper dort eingehängt
+        stack = ExitStack()
+        await sync_to_async(self.wrap_connections)(stack, metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            current_metrics.reset(token)
+        self.check_budget(request, metrics)
+        self.record_metrics(request, response, metrics)
+        if self.wants_server_timing(await request.auser() if hasattr(request, 'auser') else None):
+            self.add_server_timing(response, metrics)
+        return response
+
+    def start(self, request):
+        """Legt die Messung der Anfrage an."""
+        metrics = RequestMetrics(getattr(settings, 'CURRICULUM_SLOW_QUERY_COUNT', 3))
+        request.curriculum_metrics = metrics
+        return metrics, current_metrics.set(metrics)
+
+    def wrap_connections(self, stack, metrics):
+        """Legt die Messung um alle Abfragen der Datenbankverbindungen des aktuellen Threads."""
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Merkt sich das Abfragebudget der aufgelösten View."""
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        request.curriculum_query_budget = get_query_budget(view_func, url_name)
+        return None
+
+    def check_budget(self, request, metrics):
+        """
+        Prüft die Anzahl der Abfragen gegen das Budget der View.
+
+        Raises:
+            QueryBudgetExceeded: Bei Überschreitung, wenn CURRICULUM_QUERY_BUDGET_RAISE gesetzt ist
+        """
+        budget = getattr(request, 'curriculum_query_budget', None)
+        # Für ein angefordertes Profil lädt ProfilingMiddleware zusätzlich Sitzung und Benutzer
+        if getattr(request, 'curriculum_profile', None):
+            return
+        if budget is None or metrics.query_count <= budget:
+            return
+        message = f"{request.method} {request.get_full_path()}: {metrics.query_count} Abfragen, Budget {budget}"
+        if getattr(settings, 'CURRICULUM_QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    def record_metrics(self, request, response, metrics):
+        """Erfasst Anzahl, Dauer, Antwortgröße, Abfragen und Serialisierungszeit der Anfrage je View."""
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        curriculum_metrics.REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        curriculum_metrics.REQUEST_DURATION.observe(metrics.get_total_time(), view=view)
+        curriculum_metrics.REQUEST_QUERIES.observe(metrics.query_count, view=view)
+        if not response.streaming:
+            curriculum_metrics.RESPONSE_SIZE.observe(len(response.content), view=view)
+        if 'serialize' in metrics.timings:
+            curriculum_metrics.SERIALIZE_DURATION.observe(metrics.timings['serialize'], view=view)
+
+    def wants_server_timing(self, user):
+        """Prüft, ob die Messwerte im Header ausgegeben werden (Staff oder CURRICULUM_SERVER_TIMING)."""
+        if getattr(settings, 'CURRICULUM_SERVER_TIMING', False):
+            return True
+        return user is not None and user.is_active and user.is_staff
+
+    def add_server_timing(self, response, metrics):
+        """Setzt den Server-Timing-Header aus den Messwerten."""
+        total = metrics.get_total_time()
+        serialize = metrics.timings.get('serialize', 0.0)
+        entries = [
+            f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.query_count} Abfragen"',
+            f'serialize;dur={serialize * 1000:.1f}',
+            f'app;dur={max(total - metrics.sql_time - serialize, 0) * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ]
+        if not response.streaming:
+            entries.append(f'size;desc="{len(response.content)} Bytes"')
+        for index, (duration, sql) in enumerate(metrics.get_slowest_queries(), 1):
+            entries.append(f'sql{index};dur={duration * 1000:.1f};desc="{format_description(sql)}"')
+        response.headers['Server-Timing'] = ', '.join(entries)
+
+
+# Admin-Views, die zusätzlich zu den Views der Curriculum-App profiliert werden können
+PROFILED_ADMIN_VIEWS = {('curriculum_admin', 'export-all'), ('curriculum_admin', 'import-all')}
+
+PROFILE_MODES = {'1': 'text', 'text': 'text', 'pstats': 'pstats', 'store': 'store'}
+
+
+class ProfilingMiddleware:
+    """
+    Profiliert einzelne Anfragen von Staff-Benutzern mit cProfile.
+
+    Das Profil wird mit dem Parameter ``_profile`` oder dem Header ``X-Curriculum-Profile``
+    angefordert und ist auf die Views der Curriculum-App sowie Export und Import der
+    Admin-Site beschränkt. Für andere Benutzer und Views wird der Parameter ignoriert.
+    Ohne Parameter und Header wird nur geprüft, ob einer von beiden vorhanden ist.
+
+    Modi:
+        text (oder 1)  Ersetzt die Antwort durch einen Textbericht: Gesamtzeit, SQL-Zeit
+                       und Abfragen, Zeit im CurriculumSerializer und in der JSON-Kodierung,
+                       danach die Funktionen mit der höchsten kumulierten Zeit
+        pstats         Liefert das Profil im Format von pstats zum Download, z. B. für snakeviz
+        store          Speichert das Profil in CURRICULUM_PROFILE_DIR und liefert die
+                       eigentliche Antwort mit dem Dateinamen im Header X-Curriculum-Profile
+
+    Verwendungsbeispiel:
+        GET /curriculum/curriculum/1/?_profile=1
+        GET /curriculum/curricula/all/?stream=1&_profile=pstats
+        POST /admin-curriculum/import-all/ mit Header "X-Curriculum-Profile: store"
+
+    SQL und Serialisierung stammen aus der Messung von QueryInstrumentationMiddleware, die
+    JSON-Kodierung aus der kumulierten Zeit von json.dumps im Profil. Alle Zeiten enthalten
+    den Mehraufwand des Profilers. Gestreamte Antworten werden in den Modi text und pstats
+    vollständig innerhalb des Profils gelesen, im Modus store nur bis zum Beginn des Streams.
+    Bei asynchronen Views erfasst der Profiler nur den Thread der Ereignisschleife und
+    sollte nicht für mehrere gleichzeitige Anfragen verwendet werden.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        mode = self.get_mode(request)
+        if mode is None or not self.is_profiled(request, request.user):
+            return self.get_response(request)
+        request.curriculum_profile = mode
+        if error := self.check_mode(mode):
+            return error
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+            content = None
+            if mode != 'store':
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+        finally:
+            profiler.disable()
+        return self.finish(request, response, content, profiler, time.perf_counter() - start, mode)
+
+    async def __acall__(self, request):
+        mode = self.get_mode(request)
+        if mode is None or not self.is_profiled(request, await request.auser()):
+            return await self.get_response(request)
+        request.curriculum_profile = mode
+        if error := self.check_mode(mode):
+            return error
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+            content = None
+            if mode != 'store':
+                if response.streaming:
+                    content = b''.join([chunk async for chunk in response.streaming_content])
+                else:
+                    content = response.content
+        finally:
+            profiler.disable()
+        return self.finish(request, response, content, profiler, time.perf_counter() - start, mode)
+
+    def get_mode(self, request):
+        """
+        Liefert den angeforderten Modus oder None, wenn kein Profil angefordert wurde.
+
+        Erst wenn is_profiled() die Anfrage zulässt, wird der Modus als
+        ``request.curriculum_profile`` vermerkt; QueryInstrumentationMiddleware prüft nur
+        solche Anfragen nicht gegen das Abfragebudget. Eine Anfrage ohne Staff-Rechte kann
+        das Budget also nicht über ``?_profile`` abschalten.
+        """
+        value = request.GET.get('_profile') or request.META.get('HTTP_X_CURRICULUM_PROFILE')
+        return PROFILE_MODES.get(value.lower()) if value else None
+
+    def is_profiled(self, request, user):
+        """Prüft, ob der Benutzer Staff ist und die View profiliert werden darf."""
+        if user is None or not user.is_active or not user.is_staff:
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        view_class = getattr(match.func, 'view_class', None)
+        if view_class is not None:
+            return view_class.__module__.startswith('curriculum.')
+        return (match.namespace, match.url_name) in PROFILED_ADMIN_VIEWS
+
+    def check_mode(self, mode):
+        """Liefert eine Fehlerantwort, wenn der Modus nicht verfügbar ist, sonst None."""
+        if mode == 'store' and not getattr(settings, 'CURRICULUM_PROFILE_DIR', None):
+            return HttpResponseBadRequest("CURRICULUM_PROFILE_DIR ist nicht gesetzt.", content_type='text/plain; charset=utf-8')
+        return None
+
+    def finish(self, request, response, content, profiler, total, mode):
+        """
+        Erzeugt die Antwort des jeweiligen Modus aus dem Profil.
+
+        Args:
+            request (HttpRequest): Die profilierte Anfrage
+            response (HttpResponse): Die Antwort der View
+            content (bytes): Der gelesene Inhalt der Antwort (nicht im Modus store)
+            profiler (cProfile.Profile): Der angehaltene Profiler
+            total (float): Die Dauer der Anfrage in Sekunden
+            mode (str): 'text', 'pstats' oder 'store'
+
+        Returns:
+            HttpResponse: Der Bericht, das Profil oder die ursprüngliche Antwort
+        """
+        stats = pstats.Stats(profiler)
+        if mode == 'store':
+            filename = self.get_filename(request)
+            stats.dump_stats(os.path.join(settings.CURRICULUM_PROFILE_DIR, filename))
+            response.headers['X-Curriculum-Profile'] = filename
+            return response
+        if mode == 'pstats':
+            profile = HttpResponse(marshal.dumps(stats.stats), content_type='application/octet-stream')
+            profile.headers['Content-Disposition'] = f'attachment; filename="{self.get_filename(request)}"'
+            return profile
+        return HttpResponse(
+            self.format_report(request, response, content, stats, total),
+            content_type='text/plain; charset=utf-8'
+        )
+
+    def get_filename(self, request):
+        """Bildet einen Dateinamen aus Zeitpunkt, Methode und Pfad der Anfrage."""
+        path = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        return f"{timezone.now():%Y%m%d-%H%M%S-%f}-{request.method}-{path}.pstats"
+
+    def format_report(self, request, response, content, stats, total):
+        """
+        Erstellt den Textbericht eines Profils.
+
+        Returns:
+            str: Die Zeitaufteilung der Anfrage gefolgt von der Ausgabe von pstats
+        """
+        metrics = getattr(request, 'curriculum_metrics', None)
+        sql_time = metrics.sql_time if metrics else 0.0
+        serialize = metrics.timings.get('serialize', 0.0) if metrics else 0.0
+        # json.dumps ruft sich nicht rekursiv auf; die kumulierte Zeit ist die gesamte Kodierung
+        code = json.dumps.__code__
+        entry = stats.stats.get((code.co_filename, code.co_firstlineno, code.co_name))
+        encoding = entry[3] if entry else 0.0
+        rest = max(total - sql_time - serialize - encoding, 0.0)
+
+        output = io.StringIO()
+        output.write(
+            f"Profil für {request.method} {request.get_full_path()}: Status {response.status_code}, "
+            f"{len(content)} Bytes\n\n"
+            f"Gesamt          {total * 1000:10.1f} ms\n"
+            f"SQL             {sql_time * 1000:10.1f} ms  ({metrics.query_count if metrics else 0} Abfragen)\n"
+            f"Serialisierung  {serialize * 1000:10.1f} ms\n"
+            f"JSON-Kodierung  {encoding * 1000:10.1f} ms\n"
+            f"Übrige          {rest * 1000:10.1f} ms\n\n"
+        )
+        stats.stream = output
+        stats.sort_stats('cumulative').print_stats(getattr(settings, 'CURRICULUM_PROFILE_LIMIT', 40))
+        return output.getvalue()
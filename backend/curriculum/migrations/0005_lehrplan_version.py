@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-17 21:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0004_alter_lehrplan_options_alter_lernbereich_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lehrplan',
+            name='geaendert_am',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='Zeitpunkt der letzten Änderung des Lehrplans oder eines untergeordneten Knotens'),
+        ),
+        migrations.AddField(
+            model_name='lehrplan',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Wird bei jeder Änderung des Lehrplans oder eines untergeordneten Knotens erhöht'),
+        ),
+    ]
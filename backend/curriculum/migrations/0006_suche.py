@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Ein Dokument pro Lernziel/Teilziel/Lerninhalt; rowid = knoten_id * 3 + typ (siehe curriculum.search)
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE curriculum_suche USING fts5(
+    name,
+    beschreibungen,
+    knotentyp UNINDEXED,
+    knoten_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+POPULATE = """
+INSERT INTO curriculum_suche (rowid, name, beschreibungen, knotentyp, knoten_id)
+SELECT k.id * 3 + {typ}, k.name,
+       coalesce((SELECT group_concat(b.text, char(10)) FROM (
+           SELECT text FROM curriculum_{model}beschreibung WHERE {model}_id = k.id ORDER BY id
+       ) AS b), ''),
+       '{name}', k.id
+FROM curriculum_{model} AS k
+"""
+
+
+def create_search_table(apps, schema_editor):
+    """Legt die FTS5-Tabelle an und befüllt sie (nur SQLite mit FTS5)."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(CREATE_TABLE)
+    except OperationalError:
+        # SQLite ohne FTS5: Die Suche bleibt deaktiviert
+        return
+    for typ, name in enumerate(['Lernziel', 'Teilziel', 'Lerninhalt']):
+        schema_editor.execute(POPULATE.format(typ=typ, name=name, model=name.lower()))
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS curriculum_suche")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0005_lehrplan_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.7 on 2026-10-17 21:55
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Stand von curriculum.klassenstufen bei Erstellung der Migration; bewusst kopiert, damit
+# spätere Änderungen am Parser die Migration nicht verändern
+STUFE_PATTERN = re.compile(r'^(\d{1,2})\s*([a-zA-Z]{0,20})$')
+BEREICH_PATTERN = re.compile(r'^(\d{1,2})\s*(?:-|–|bis)\s*(\d{1,2})$')
+
+
+def parse_klassenstufen(value):
+    """Zerlegt den Text eines Lehrplans in sortierte, eindeutige Tupel (stufe, zusatz)."""
+    stufen = set()
+    for token in re.split(r'[,;/]', value or ''):
+        token = token.strip()
+        bereich = BEREICH_PATTERN.match(token)
+        if bereich:
+            start, end = sorted((int(bereich.group(1)), int(bereich.group(2))))
+            stufen.update((stufe, '') for stufe in range(start, end + 1))
+            continue
+        stufe = STUFE_PATTERN.match(token)
+        if stufe:
+            stufen.add((int(stufe.group(1)), stufe.group(2).lower()))
+    return sorted(stufen)
+
+
+def fill_klassenstufen(apps, schema_editor):
+    """Leitet die normalisierten Klassenstufen aller bestehenden Lehrpläne ab."""
+    Lehrplan = apps.get_model('curriculum', 'Lehrplan')
+    LehrplanKlassenstufe = apps.get_model('curriculum', 'LehrplanKlassenstufe')
+    LehrplanKlassenstufe.objects.bulk_create([
+        LehrplanKlassenstufe(lehrplan_id=lehrplan_id, stufe=stufe, zusatz=zusatz)
+        for lehrplan_id, klassenstufen in Lehrplan.objects.values_list('id', 'klassenstufen')
+        for stufe, zusatz in parse_klassenstufen(klassenstufen)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0006_suche'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LehrplanKlassenstufe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stufe', models.PositiveSmallIntegerField()),
+                ('zusatz', models.CharField(blank=True, help_text="Zusatz hinter der Stufe, z. B. 'a' bei '5a'", max_length=20)),
+                ('lehrplan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stufen', to='curriculum.lehrplan')),
+            ],
+            options={
+                'verbose_name': 'Klassenstufe',
+                'verbose_name_plural': 'Klassenstufen',
+                'ordering': ['lehrplan_id', 'stufe', 'zusatz'],
+                'indexes': [models.Index(fields=['stufe', 'lehrplan'], name='curriculum_stufe_lehrplan_idx')],
+                'unique_together': {('lehrplan', 'stufe', 'zusatz')},
+            },
+        ),
+        migrations.RunPython(fill_klassenstufen, migrations.RunPython.noop),
+    ]
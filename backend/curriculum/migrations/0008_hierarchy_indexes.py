@@ -0,0 +1,109 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0007_lehrplanklassenstufe'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='lernbereich',
+            options={'ordering': ['lehrplan_id', 'nummer'], 'verbose_name': 'Lernbereich', 'verbose_name_plural': 'Lernbereiche'},
+        ),
+        migrations.AlterModelOptions(
+            name='lerninhalt',
+            options={'ordering': ['teilziel_id', 'id'], 'verbose_name': 'Lerninhalt', 'verbose_name_plural': 'Lerninhalte'},
+        ),
+        migrations.AlterModelOptions(
+            name='lerninhaltbeschreibung',
+            options={'ordering': ['lerninhalt_id', 'id'], 'verbose_name': 'Lerninhaltbeschreibung', 'verbose_name_plural': 'Lerninhaltbeschreibungen'},
+        ),
+        migrations.AlterModelOptions(
+            name='lernziel',
+            options={'ordering': ['lernbereich_id', 'id'], 'verbose_name': 'Lernziel', 'verbose_name_plural': 'Lernziele'},
+        ),
+        migrations.AlterModelOptions(
+            name='lernzielbeschreibung',
+            options={'ordering': ['lernziel_id', 'id'], 'verbose_name': 'Lernzielbeschreibung', 'verbose_name_plural': 'Lernzielbeschreibungen'},
+        ),
+        migrations.AlterModelOptions(
+            name='teilziel',
+            options={'ordering': ['lernziel_id', 'id'], 'verbose_name': 'Teilziel', 'verbose_name_plural': 'Teilziele'},
+        ),
+        migrations.AlterModelOptions(
+            name='teilzielbeschreibung',
+            options={'ordering': ['teilziel_id', 'id'], 'verbose_name': 'Teilzielbeschreibung', 'verbose_name_plural': 'Teilzielbeschreibungen'},
+        ),
+        migrations.AlterField(
+            model_name='lernbereich',
+            name='lehrplan',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lernbereiche', to='curriculum.lehrplan'),
+        ),
+        migrations.AlterField(
+            model_name='lerninhalt',
+            name='teilziel',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lerninhalte', to='curriculum.teilziel'),
+        ),
+        migrations.AlterField(
+            model_name='lerninhaltbeschreibung',
+            name='lerninhalt',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='beschreibungen', to='curriculum.lerninhalt'),
+        ),
+        migrations.AlterField(
+            model_name='lernziel',
+            name='lernbereich',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lernziele', to='curriculum.lernbereich'),
+        ),
+        migrations.AlterField(
+            model_name='lernzielbeschreibung',
+            name='lernziel',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='beschreibungen', to='curriculum.lernziel'),
+        ),
+        migrations.AlterField(
+            model_name='teilziel',
+            name='lernziel',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='teilziele', to='curriculum.lernziel'),
+        ),
+        migrations.AlterField(
+            model_name='teilzielbeschreibung',
+            name='teilziel',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='beschreibungen', to='curriculum.teilziel'),
+        ),
+        migrations.AddIndex(
+            model_name='lehrplan',
+            index=models.Index(fields=['bundesland', 'fach', 'klassenstufen', 'id'], name='curriculum_lehrplan_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lehrplan',
+            index=models.Index(fields=['fach', 'bundesland', 'klassenstufen', 'id'], name='curriculum_lehrplan_fach_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lerninhalt',
+            index=models.Index(fields=['teilziel', 'id'], name='curriculum_lerninhalt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lerninhaltbeschreibung',
+            index=models.Index(fields=['lerninhalt', 'id'], name='curriculum_libeschreibung_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lernziel',
+            index=models.Index(fields=['lernbereich', 'id'], name='curriculum_lernziel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lernzielbeschreibung',
+            index=models.Index(fields=['lernziel', 'id'], name='curriculum_lzbeschreibung_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teilziel',
+            index=models.Index(fields=['lernziel', 'id'], name='curriculum_teilziel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teilzielbeschreibung',
+            index=models.Index(fields=['teilziel', 'id'], name='curriculum_tzbeschreibung_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:02
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_facetten(apps, schema_editor):
+    """Zählt die Lehrpläne aller bestehenden Kombinationen aus Bundesland, Fach und Klassenstufen."""
+    Lehrplan = apps.get_model('curriculum', 'Lehrplan')
+    LehrplanFacette = apps.get_model('curriculum', 'LehrplanFacette')
+    LehrplanFacette.objects.bulk_create([
+        LehrplanFacette(bundesland=bundesland, fach=fach, klassenstufen=klassenstufen, anzahl=anzahl)
+        for bundesland, fach, klassenstufen, anzahl in (
+            Lehrplan.objects.order_by()
+            .values_list('bundesland', 'fach', 'klassenstufen')
+            .annotate(anzahl=Count('id'))
+        )
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0008_hierarchy_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LehrplanFacette',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bundesland', models.CharField(max_length=100)),
+                ('fach', models.CharField(max_length=100)),
+                ('klassenstufen', models.CharField(max_length=100)),
+                ('anzahl', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Facette',
+                'verbose_name_plural': 'Facetten',
+                'ordering': ['bundesland', 'fach', 'klassenstufen'],
+                'unique_together': {('bundesland', 'fach', 'klassenstufen')},
+            },
+        ),
+        migrations.RunPython(fill_facetten, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_statistiken(apps, schema_editor):
+    """Zählt die Kennzahlen aller bestehenden Lehrpläne."""
+    Lehrplan = apps.get_model('curriculum', 'Lehrplan')
+    LehrplanStatistik = apps.get_model('curriculum', 'LehrplanStatistik')
+    werte = {lehrplan_id: {} for lehrplan_id in Lehrplan.objects.values_list('id', flat=True)}
+    aggregates = [
+        ('Lernbereich', 'lehrplan_id', 'lernbereiche', Count('id')),
+        ('Lernbereich', 'lehrplan_id', 'unterrichtsstunden', Sum('unterrichtsstunden')),
+        ('Lernziel', 'lernbereich__lehrplan_id', 'lernziele', Count('id')),
+        ('Teilziel', 'lernziel__lernbereich__lehrplan_id', 'teilziele', Count('id')),
+        ('Lerninhalt', 'teilziel__lernziel__lernbereich__lehrplan_id', 'lerninhalte', Count('id')),
+    ]
+    for model_name, lookup, field, aggregate in aggregates:
+        model = apps.get_model('curriculum', model_name)
+        for lehrplan_id, wert in model.objects.order_by().values_list(lookup).annotate(wert=aggregate):
+            werte[lehrplan_id][field] = wert or 0
+    LehrplanStatistik.objects.bulk_create([
+        LehrplanStatistik(lehrplan_id=lehrplan_id, **felder) for lehrplan_id, felder in werte.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0009_lehrplanfacette'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LehrplanStatistik',
+            fields=[
+                ('lehrplan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistik', serialize=False, to='curriculum.lehrplan')),
+                ('lernbereiche', models.IntegerField(default=0)),
+                ('lernziele', models.IntegerField(default=0)),
+                ('teilziele', models.IntegerField(default=0)),
+                ('lerninhalte', models.IntegerField(default=0)),
+                ('unterrichtsstunden', models.IntegerField(default=0, help_text='Summe der Unterrichtsstunden aller Lernbereiche')),
+            ],
+            options={
+                'verbose_name': 'Lehrplanstatistik',
+                'verbose_name_plural': 'Lehrplanstatistiken',
+            },
+        ),
+        migrations.RunPython(fill_statistiken, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:06
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_kennzahlen(apps, schema_editor):
+    """Berechnet den Vergleichswürfel aus den Kennzahlen aller bestehenden Lehrpläne."""
+    Lehrplan = apps.get_model('curriculum', 'Lehrplan')
+    LehrplanKlassenstufe = apps.get_model('curriculum', 'LehrplanKlassenstufe')
+    VergleichsKennzahl = apps.get_model('curriculum', 'VergleichsKennzahl')
+    fields = ('lernbereiche', 'lernziele', 'teilziele', 'lerninhalte', 'unterrichtsstunden')
+
+    stufen = defaultdict(set)
+    for lehrplan_id, stufe in LehrplanKlassenstufe.objects.order_by().values_list('lehrplan_id', 'stufe'):
+        stufen[lehrplan_id].add(stufe)
+
+    cells = defaultdict(lambda: dict.fromkeys(('lehrplaene',) + fields, 0))
+    rows = Lehrplan.objects.order_by().values_list(
+        'id', 'bundesland', 'fach', *(f'statistik__{field}' for field in fields)
+    )
+    for lehrplan_id, bundesland, fach, *werte in rows:
+        for stufe in [None, *stufen[lehrplan_id]]:
+            cell = cells[(bundesland, fach, stufe)]
+            cell['lehrplaene'] += 1
+            for field, wert in zip(fields, werte):
+                cell[field] += wert or 0
+    VergleichsKennzahl.objects.bulk_create([
+        VergleichsKennzahl(bundesland=bundesland, fach=fach, stufe=stufe, **werte)
+        for (bundesland, fach, stufe), werte in cells.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0010_lehrplanstatistik'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VergleichsKennzahl',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bundesland', models.CharField(max_length=100)),
+                ('fach', models.CharField(max_length=100)),
+                ('stufe', models.PositiveSmallIntegerField(blank=True, help_text='Leer für alle Klassenstufen', null=True)),
+                ('lehrplaene', models.IntegerField(default=0)),
+                ('lernbereiche', models.IntegerField(default=0)),
+                ('lernziele', models.IntegerField(default=0)),
+                ('teilziele', models.IntegerField(default=0)),
+                ('lerninhalte', models.IntegerField(default=0)),
+                ('unterrichtsstunden', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Vergleichskennzahl',
+                'verbose_name_plural': 'Vergleichskennzahlen',
+                'ordering': ['bundesland', 'fach', 'stufe'],
+                'indexes': [models.Index(fields=['fach', 'stufe'], name='curriculum_vergleich_fach_idx')],
+                'constraints': [models.UniqueConstraint(fields=('bundesland', 'fach', 'stufe'), name='curriculum_vergleich_zelle_uniq'), models.UniqueConstraint(condition=models.Q(('stufe__isnull', True)), fields=('bundesland', 'fach'), name='curriculum_vergleich_summe_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_kennzahlen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+def fill_pfade(apps, schema_editor):
+    """Legt die Einträge der Closure-Tabelle für alle bestehenden Knoten an."""
+    HierarchiePfad = apps.get_model('curriculum', 'HierarchiePfad')
+    # Modell -> Lookups zu den Vorfahren, vom Lehrplan abwärts
+    ebenen = [
+        ('Lehrplan', []),
+        ('Lernbereich', ['lehrplan_id']),
+        ('Lernziel', ['lernbereich__lehrplan_id', 'lernbereich_id']),
+        ('Teilziel', ['lernziel__lernbereich__lehrplan_id', 'lernziel__lernbereich_id', 'lernziel_id']),
+        ('Lerninhalt', [
+            'teilziel__lernziel__lernbereich__lehrplan_id', 'teilziel__lernziel__lernbereich_id',
+            'teilziel__lernziel_id', 'teilziel_id'
+        ]),
+    ]
+    pfade = []
+    for ebene, (model_name, lookups) in enumerate(ebenen):
+        model = apps.get_model('curriculum', model_name)
+        for knoten_id, *vorfahr_ids in model.objects.order_by().values_list('id', *lookups):
+            for vorfahr_ebene, vorfahr_id in enumerate([*vorfahr_ids, knoten_id]):
+                pfade.append(HierarchiePfad(
+                    vorfahr_ebene=vorfahr_ebene, vorfahr_id=vorfahr_id, nachfahr_ebene=ebene, nachfahr_id=knoten_id
+                ))
+    HierarchiePfad.objects.bulk_create(pfade, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0011_vergleichskennzahl'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HierarchiePfad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vorfahr_ebene', models.PositiveSmallIntegerField()),
+                ('vorfahr_id', models.BigIntegerField()),
+                ('nachfahr_ebene', models.PositiveSmallIntegerField()),
+                ('nachfahr_id', models.BigIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Hierarchiepfad',
+                'verbose_name_plural': 'Hierarchiepfade',
+                'indexes': [models.Index(fields=['vorfahr_ebene', 'vorfahr_id', 'nachfahr_ebene', 'nachfahr_id'], name='curriculum_pfad_teilbaum_idx')],
+                'constraints': [models.UniqueConstraint(fields=('nachfahr_ebene', 'nachfahr_id', 'vorfahr_ebene'), name='curriculum_pfad_vorfahr_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_pfade, migrations.RunPython.noop),
+    ]
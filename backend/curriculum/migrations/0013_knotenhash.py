@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0012_hierarchiepfad'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KnotenHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ebene', models.PositiveSmallIntegerField()),
+                ('knoten_id', models.BigIntegerField()),
+                ('eigen', models.CharField(help_text='Hash über die eigenen Felder und Beschreibungen', max_length=32)),
+                ('baum', models.CharField(help_text='Hash über den eigenen Hash und die Baum-Hashes der Kinder', max_length=32)),
+            ],
+            options={
+                'verbose_name': 'Knotenhash',
+                'verbose_name_plural': 'Knotenhashes',
+                'constraints': [models.UniqueConstraint(fields=('ebene', 'knoten_id'), name='curriculum_knotenhash_uniq')],
+            },
+        ),
+    ]
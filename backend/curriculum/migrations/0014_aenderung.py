@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-17 22:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0013_knotenhash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Aenderung',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modell', models.CharField(help_text="Name des Curriculum-Modells, z. B. 'Lernziel'", max_length=50)),
+                ('knoten_id', models.BigIntegerField()),
+                ('art', models.CharField(choices=[('angelegt', 'Angelegt'), ('geaendert', 'Geändert'), ('geloescht', 'Gelöscht')], max_length=10)),
+                ('zeitpunkt', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Änderung',
+                'verbose_name_plural': 'Änderungen',
+                'ordering': ['id'],
+            },
+        ),
+    ]
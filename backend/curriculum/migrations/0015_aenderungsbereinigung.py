@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-17 23:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0014_aenderung'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AenderungsBereinigung',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bis', models.BigIntegerField(help_text='Höchste gelöschte ID des Änderungsprotokolls')),
+                ('anzahl', models.PositiveIntegerField(default=0, help_text='Anzahl der gelöschten Einträge')),
+                ('zeitpunkt', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Bereinigung des Änderungsprotokolls',
+                'verbose_name_plural': 'Bereinigungen des Änderungsprotokolls',
+                'ordering': ['id'],
+            },
+        ),
+    ]
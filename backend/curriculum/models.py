@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class BaseModel(models.Model):
     """
@@ -37,6 +38,8 @@ class TextualDescriptionModel(BaseModel):
 class Lehrplan(BaseModel):
     """
     Repräsentiert einen Lehrplan mit Klassenstufen, Bundesland und Fach.
+    Version und Änderungszeitpunkt werden über die Signal-Handler in curriculum.signals
+    gepflegt und dienen als Validatoren (ETag/Last-Modified) für die API.
     """
     klassenstufen = models.CharField(
         max_length=100,
@@ -44,22 +47,144 @@ class Lehrplan(BaseModel):
     )
     bundesland = models.CharField(max_length=100)
     fach = models.CharField(max_length=100)
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Wird bei jeder Änderung des Lehrplans oder eines untergeordneten Knotens erhöht"
+    )
+    geaendert_am = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        help_text="Zeitpunkt der letzten Änderung des Lehrplans oder eines untergeordneten Knotens"
+    )
     
     class Meta:
         verbose_name = "Lehrplan"
         verbose_name_plural = "Lehrpläne"
         ordering = ['bundesland', 'fach', 'klassenstufen']
+        indexes = [
+            models.Index(fields=['bundesland', 'fach', 'klassenstufen', 'id'], name='curriculum_lehrplan_sort_idx'),
+            models.Index(fields=['fach', 'bundesland', 'klassenstufen', 'id'], name='curriculum_lehrplan_fach_idx'),
+        ]
 
     def __str__(self):
         return f"{self.fach} (Klasse {self.klassenstufen}, {self.bundesland})"
 
 
+class LehrplanKlassenstufe(BaseModel):
+    """
+    Normalisierte Darstellung einer Klassenstufe eines Lehrplans.
+    Wird aus Lehrplan.klassenstufen abgeleitet (siehe curriculum.klassenstufen) und
+    ermöglicht das Filtern nach Klassenstufen über einen Index.
+    """
+    lehrplan = models.ForeignKey(Lehrplan, related_name="stufen", on_delete=models.CASCADE)
+    stufe = models.PositiveSmallIntegerField()
+    zusatz = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="Zusatz hinter der Stufe, z. B. 'a' bei '5a'"
+    )
+    
+    class Meta:
+        verbose_name = "Klassenstufe"
+        verbose_name_plural = "Klassenstufen"
+        ordering = ['lehrplan_id', 'stufe', 'zusatz']
+        unique_together = ['lehrplan', 'stufe', 'zusatz']
+        indexes = [
+            models.Index(fields=['stufe', 'lehrplan'], name='curriculum_stufe_lehrplan_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.stufe}{self.zusatz}"
+
+
+class LehrplanFacette(BaseModel):
+    """
+    Materialisierte Anzahl der Lehrpläne je Kombination aus Bundesland, Fach und Klassenstufen.
+    Wird bei jedem Speichern und Löschen eines Lehrplans nachgeführt (siehe curriculum.facets)
+    und liefert die Zählungen für die Filterleiste mit einer einzigen kleinen Abfrage.
+    """
+    bundesland = models.CharField(max_length=100)
+    fach = models.CharField(max_length=100)
+    klassenstufen = models.CharField(max_length=100)
+    anzahl = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Facette"
+        verbose_name_plural = "Facetten"
+        ordering = ['bundesland', 'fach', 'klassenstufen']
+        unique_together = ['bundesland', 'fach', 'klassenstufen']
+
+    def __str__(self):
+        return f"{self.bundesland} / {self.fach} / {self.klassenstufen}: {self.anzahl}"
+
+
+class LehrplanStatistik(BaseModel):
+    """
+    Denormalisierte Kennzahlen eines Lehrplans für Übersichtskarten.
+    Wird bei Änderungen an Lernbereichen, Lernzielen, Teilzielen und Lerninhalten
+    inkrementell fortgeschrieben (siehe curriculum.statistik). Die Zähler sind bewusst
+    vorzeichenbehaftet, damit eine Abweichung (z. B. nach bulk_create) das Löschen von
+    Knoten nicht verhindert; das Kommando rebuild_statistik stellt den Stand wieder her.
+    """
+    lehrplan = models.OneToOneField(Lehrplan, related_name="statistik", on_delete=models.CASCADE, primary_key=True)
+    lernbereiche = models.IntegerField(default=0)
+    lernziele = models.IntegerField(default=0)
+    teilziele = models.IntegerField(default=0)
+    lerninhalte = models.IntegerField(default=0)
+    unterrichtsstunden = models.IntegerField(default=0, help_text="Summe der Unterrichtsstunden aller Lernbereiche")
+    
+    class Meta:
+        verbose_name = "Lehrplanstatistik"
+        verbose_name_plural = "Lehrplanstatistiken"
+
+    def __str__(self):
+        return f"Statistik für Lehrplan {self.lehrplan_id}"
+
+
+class VergleichsKennzahl(BaseModel):
+    """
+    Zelle des Vergleichswürfels über Bundesland, Fach und Klassenstufe.
+    Summiert die Kennzahlen aus LehrplanStatistik über alle Lehrpläne der Zelle; eine Zelle
+    ohne Stufe enthält alle Lehrpläne von Bundesland und Fach (siehe curriculum.vergleich).
+    """
+    bundesland = models.CharField(max_length=100)
+    fach = models.CharField(max_length=100)
+    stufe = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Leer für alle Klassenstufen")
+    lehrplaene = models.IntegerField(default=0)
+    lernbereiche = models.IntegerField(default=0)
+    lernziele = models.IntegerField(default=0)
+    teilziele = models.IntegerField(default=0)
+    lerninhalte = models.IntegerField(default=0)
+    unterrichtsstunden = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Vergleichskennzahl"
+        verbose_name_plural = "Vergleichskennzahlen"
+        ordering = ['bundesland', 'fach', 'stufe']
+        constraints = [
+            models.UniqueConstraint(fields=['bundesland', 'fach', 'stufe'], name='curriculum_vergleich_zelle_uniq'),
+            models.UniqueConstraint(
+                fields=['bundesland', 'fach'],
+                condition=models.Q(stufe__isnull=True),
+                name='curriculum_vergleich_summe_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['fach', 'stufe'], name='curriculum_vergleich_fach_idx'),
+        ]
+
+    def __str__(self):
+        stufe = self.stufe if self.stufe is not None else 'alle'
+        return f"{self.bundesland} / {self.fach} / Klasse {stufe}"
+
+
 class Lernbereich(BaseModel):
     """
     Repräsentiert einen Lernbereich innerhalb eines Lehrplans.
     Enthält Nummer, Name und Unterrichtsstunden.
     """
-    lehrplan = models.ForeignKey(Lehrplan, related_name="lernbereiche", on_delete=models.CASCADE)
+    lehrplan = models.ForeignKey(Lehrplan, related_name="lernbereiche", on_delete=models.CASCADE, db_index=False)
     nummer = models.PositiveIntegerField()
     name = models.CharField(max_length=255)
     unterrichtsstunden = models.PositiveIntegerField()
@@ -67,7 +192,7 @@ class Lernbereich(BaseModel):
     class Meta:
         verbose_name = "Lernbereich"
         verbose_name_plural = "Lernbereiche"
-        ordering = ['lehrplan', 'nummer']
+        ordering = ['lehrplan_id', 'nummer']
         unique_together = ['lehrplan', 'nummer']
 
     def __str__(self):
@@ -78,66 +203,192 @@ class Lernziel(NamedModel):
     """
     Repräsentiert ein Lernziel innerhalb eines Lernbereichs.
     """
-    lernbereich = models.ForeignKey(Lernbereich, related_name="lernziele", on_delete=models.CASCADE)
+    lernbereich = models.ForeignKey(Lernbereich, related_name="lernziele", on_delete=models.CASCADE, db_index=False)
     
     class Meta:
         verbose_name = "Lernziel"
         verbose_name_plural = "Lernziele"
-        ordering = ['lernbereich', 'id']
+        ordering = ['lernbereich_id', 'id']
+        indexes = [
+            models.Index(fields=['lernbereich', 'id'], name='curriculum_lernziel_idx'),
+        ]
 
 
 class LernzielBeschreibung(TextualDescriptionModel):
     """
     Repräsentiert eine detaillierte Beschreibung eines Lernziels.
     """
-    lernziel = models.ForeignKey(Lernziel, related_name="beschreibungen", on_delete=models.CASCADE)
+    lernziel = models.ForeignKey(Lernziel, related_name="beschreibungen", on_delete=models.CASCADE, db_index=False)
     
     class Meta:
         verbose_name = "Lernzielbeschreibung"
         verbose_name_plural = "Lernzielbeschreibungen"
+        ordering = ['lernziel_id', 'id']
+        indexes = [
+            models.Index(fields=['lernziel', 'id'], name='curriculum_lzbeschreibung_idx'),
+        ]
 
 
 class Teilziel(NamedModel):
     """
     Repräsentiert ein Teilziel innerhalb eines Lernziels.
     """
-    lernziel = models.ForeignKey(Lernziel, related_name="teilziele", on_delete=models.CASCADE)
+    lernziel = models.ForeignKey(Lernziel, related_name="teilziele", on_delete=models.CASCADE, db_index=False)
     
     class Meta:
         verbose_name = "Teilziel"
         verbose_name_plural = "Teilziele"
-        ordering = ['lernziel', 'id']
+        ordering = ['lernziel_id', 'id']
+        indexes = [
+            models.Index(fields=['lernziel', 'id'], name='curriculum_teilziel_idx'),
+        ]
 
 
 class TeilzielBeschreibung(TextualDescriptionModel):
     """
     Repräsentiert eine detaillierte Beschreibung eines Teilziels.
     """
-    teilziel = models.ForeignKey(Teilziel, related_name="beschreibungen", on_delete=models.CASCADE)
+    teilziel = models.ForeignKey(Teilziel, related_name="beschreibungen", on_delete=models.CASCADE, db_index=False)
     
     class Meta:
         verbose_name = "Teilzielbeschreibung"
         verbose_name_plural = "Teilzielbeschreibungen"
+        ordering = ['teilziel_id', 'id']
+        indexes = [
+            models.Index(fields=['teilziel', 'id'], name='curriculum_tzbeschreibung_idx'),
+        ]
 
 
 class Lerninhalt(NamedModel):
     """
     Repräsentiert einen Lerninhalt, der einem Teilziel zugeordnet ist.
     """
-    teilziel = models.ForeignKey(Teilziel, related_name="lerninhalte", on_delete=models.CASCADE)
+    teilziel = models.ForeignKey(Teilziel, related_name="lerninhalte", on_delete=models.CASCADE, db_index=False)
     
     class Meta:
         verbose_name = "Lerninhalt"
         verbose_name_plural = "Lerninhalte"
-        ordering = ['teilziel', 'id']
+        ordering = ['teilziel_id', 'id']
+        indexes = [
+            models.Index(fields=['teilziel', 'id'], name='curriculum_lerninhalt_idx'),
+        ]
 
 
 class LerninhaltBeschreibung(TextualDescriptionModel):
     """
     Repräsentiert eine detaillierte Beschreibung eines Lerninhalts.
     """
-    lerninhalt = models.ForeignKey(Lerninhalt, related_name="beschreibungen", on_delete=models.CASCADE)
+    lerninhalt = models.ForeignKey(Lerninhalt, related_name="beschreibungen", on_delete=models.CASCADE, db_index=False)
     
     class Meta:
         verbose_name = "Lerninhaltbeschreibung"
         verbose_name_plural = "Lerninhaltbeschreibungen"
+        ordering = ['lerninhalt_id', 'id']
+        indexes = [
+            models.Index(fields=['lerninhalt', 'id'], name='curriculum_libeschreibung_idx'),
+        ]
+
+
+class HierarchiePfad(BaseModel):
+    """
+    Eintrag der Closure-Tabelle über die fünf Ebenen Lehrplan, Lernbereich, Lernziel,
+    Teilziel und Lerninhalt.
+    Für jeden Knoten gibt es einen Eintrag je Vorfahre und einen Eintrag für sich selbst
+    (gleiche Ebene). Die Ebene bestimmt das Modell, 0 = Lehrplan bis 4 = Lerninhalt
+    (siehe curriculum.hierarchy und curriculum.pfade).
+    """
+    vorfahr_ebene = models.PositiveSmallIntegerField()
+    vorfahr_id = models.BigIntegerField()
+    nachfahr_ebene = models.PositiveSmallIntegerField()
+    nachfahr_id = models.BigIntegerField()
+    
+    class Meta:
+        verbose_name = "Hierarchiepfad"
+        verbose_name_plural = "Hierarchiepfade"
+        constraints = [
+            # Vorfahren eines Knotens; höchstens einer je Ebene
+            models.UniqueConstraint(
+                fields=['nachfahr_ebene', 'nachfahr_id', 'vorfahr_ebene'], name='curriculum_pfad_vorfahr_uniq'
+            ),
+        ]
+        indexes = [
+            # Teilbaum eines Knotens
+            models.Index(
+                fields=['vorfahr_ebene', 'vorfahr_id', 'nachfahr_ebene', 'nachfahr_id'],
+                name='curriculum_pfad_teilbaum_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.vorfahr_ebene}:{self.vorfahr_id} -> {self.nachfahr_ebene}:{self.nachfahr_id}"
+
+
+class KnotenHash(BaseModel):
+    """
+    Inhaltshashes eines Knotens im Merkle-Baum über die Lehrplan-Hierarchie.
+    Ebene und Knoten-ID entsprechen HierarchiePfad (0 = Lehrplan bis 4 = Lerninhalt).
+    Fehlende Einträge werden bei Bedarf berechnet (siehe curriculum.hashes).
+    """
+    ebene = models.PositiveSmallIntegerField()
+    knoten_id = models.BigIntegerField()
+    eigen = models.CharField(max_length=32, help_text="Hash über die eigenen Felder und Beschreibungen")
+    baum = models.CharField(max_length=32, help_text="Hash über den eigenen Hash und die Baum-Hashes der Kinder")
+    
+    class Meta:
+        verbose_name = "Knotenhash"
+        verbose_name_plural = "Knotenhashes"
+        constraints = [
+            models.UniqueConstraint(fields=['ebene', 'knoten_id'], name='curriculum_knotenhash_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.ebene}:{self.knoten_id} {self.baum}"
+
+
+class Aenderung(BaseModel):
+    """
+    Eintrag im Änderungsprotokoll der acht Curriculum-Modelle.
+    Die fortlaufende ID dient als Token für den inkrementellen Abgleich (siehe
+    curriculum.aenderungen); Einträge werden nur angehängt, nie geändert.
+    """
+    ART_ANGELEGT = 'angelegt'
+    ART_GEAENDERT = 'geaendert'
+    ART_GELOESCHT = 'geloescht'
+    ARTEN = [
+        (ART_ANGELEGT, 'Angelegt'),
+        (ART_GEAENDERT, 'Geändert'),
+        (ART_GELOESCHT, 'Gelöscht'),
+    ]
+
+    modell = models.CharField(max_length=50, help_text="Name des Curriculum-Modells, z. B. 'Lernziel'")
+    knoten_id = models.BigIntegerField()
+    art = models.CharField(max_length=10, choices=ARTEN)
+    zeitpunkt = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = "Änderung"
+        verbose_name_plural = "Änderungen"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.id}: {self.modell} {self.knoten_id} {self.art}"
+
+
+class AenderungsBereinigung(BaseModel):
+    """
+    Vermerk über einen Lauf von ``prune_aenderungen``.
+    Hält die höchste gelöschte ID des Änderungsprotokolls fest; ältere Tokens werden
+    danach abgelehnt, da die gelöschten Einträge nicht mehr geliefert werden können
+    (siehe curriculum.aenderungen).
+    """
+    bis = models.BigIntegerField(help_text="Höchste gelöschte ID des Änderungsprotokolls")
+    anzahl = models.PositiveIntegerField(default=0, help_text="Anzahl der gelöschten Einträge")
+    zeitpunkt = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = "Bereinigung des Änderungsprotokolls"
+        verbose_name_plural = "Bereinigungen des Änderungsprotokolls"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"bis {self.bis}: {self.anzahl} Einträge"
@@ -0,0 +1,162 @@
+"""
+Pflege der Closure-Tabelle ``HierarchiePfad``.
+
+Für jeden Knoten (Lehrplan, Lernbereich, Lernziel, Teilziel, Lerninhalt) enthält die Tabelle
+einen Eintrag für sich selbst und einen je Vorfahre. Die Signal-Handler in
+``curriculum.signals`` halten sie aktuell:
+
+- Anlegen eines Knotens: die Einträge des Elternknotens werden übernommen und um den
+  eigenen Eintrag ergänzt
+- Verschieben eines Knotens: die Einträge zwischen dem Teilbaum und seinen bisherigen
+  Vorfahren werden gelöscht und für die neuen Vorfahren angelegt
+- Löschen eines Knotens: die Einträge seines Teilbaums werden mit einer Abfrage gelöscht;
+  beim kaskadierenden Löschen übernimmt das der oberste gelöschte Knoten für alle Nachfahren
+
+``compute_pfade()`` berechnet die Tabelle aus den Fremdschlüsseln; das Kommando
+``rebuild_pfade`` vergleicht bzw. überschreibt den gespeicherten Stand damit.
+"""
+
+from django.db.models import Exists, OuterRef
+
+from .hierarchy import EBENEN, PARENT_FIELDS, get_parent_model
+from .models import HierarchiePfad
+
+
+def get_ancestor_keys(model, pk):
+    """
+    Liefert einen Knoten und seine gespeicherten Vorfahren.
+
+    Args:
+        model: Eine Knotenmodellklasse aus EBENEN
+        pk: Die ID des Knotens
+
+    Returns:
+        list: Tupel (Ebene, ID) vom Knoten bis zum Lehrplan; leer, wenn der Knoten keine Einträge hat
+    """
+    return list(
+        HierarchiePfad.objects
+        .filter(nachfahr_ebene=EBENEN[model], nachfahr_id=pk)
+        .values_list('vorfahr_ebene', 'vorfahr_id')
+    )
+
+
+def insert_pfade(instance):
+    """
+    Legt die Einträge eines neuen Knotens an.
+
+    Args:
+        instance: Eine neu gespeicherte Instanz eines Knotenmodells
+
+    Returns:
+        list: Tupel (Ebene, ID) vom Knoten bis zum Lehrplan
+    """
+    ebene = EBENEN[type(instance)]
+    vorfahren = []
+    parent_field = PARENT_FIELDS.get(type(instance))
+    if parent_field is not None:
+        vorfahren = get_ancestor_keys(get_parent_model(type(instance)), getattr(instance, f"{parent_field}_id"))
+    vorfahren.append((ebene, instance.pk))
+    HierarchiePfad.objects.bulk_create([
+        HierarchiePfad(vorfahr_ebene=vorfahr_ebene, vorfahr_id=vorfahr_id, nachfahr_ebene=ebene, nachfahr_id=instance.pk)
+        for vorfahr_ebene, vorfahr_id in vorfahren
+    ])
+    return vorfahren
+
+
+def move_pfade(instance):
+    """
+    Hängt den Teilbaum eines Knotens unter seinen neuen Elternknoten.
+
+    Args:
+        instance: Eine gespeicherte Instanz eines Knotenmodells mit geändertem Elternknoten
+
+    Returns:
+        list: Tupel (Ebene, ID) vom Knoten bis zum neuen Lehrplan
+    """
+    ebene = EBENEN[type(instance)]
+    teilbaum = HierarchiePfad.objects.filter(vorfahr_ebene=ebene, vorfahr_id=instance.pk)
+    HierarchiePfad.objects.filter(
+        Exists(teilbaum.filter(nachfahr_ebene=OuterRef('nachfahr_ebene'), nachfahr_id=OuterRef('nachfahr_id'))),
+        vorfahr_ebene__lt=ebene
+    ).delete()
+
+    parent_model = get_parent_model(type(instance))
+    vorfahren = get_ancestor_keys(parent_model, getattr(instance, f"{PARENT_FIELDS[type(instance)]}_id"))
+    HierarchiePfad.objects.bulk_create([
+        HierarchiePfad(
+            vorfahr_ebene=vorfahr_ebene, vorfahr_id=vorfahr_id,
+            nachfahr_ebene=nachfahr_ebene, nachfahr_id=nachfahr_id
+        )
+        for nachfahr_ebene, nachfahr_id in teilbaum.values_list('nachfahr_ebene', 'nachfahr_id')
+        for vorfahr_ebene, vorfahr_id in vorfahren
+    ], batch_size=500)
+    return [*vorfahren, (ebene, instance.pk)]
+
+
+def delete_pfade(instance):
+    """
+    Löscht die Einträge eines gelöschten Knotens und seiner Nachfahren mit einer Abfrage.
+
+    Args:
+        instance: Eine gelöschte Instanz eines Knotenmodells
+    """
+    teilbaum = HierarchiePfad.objects.filter(vorfahr_ebene=EBENEN[type(instance)], vorfahr_id=instance.pk)
+    HierarchiePfad.objects.filter(
+        Exists(teilbaum.filter(nachfahr_ebene=OuterRef('nachfahr_ebene'), nachfahr_id=OuterRef('nachfahr_id')))
+    ).delete()
+
+
+def compute_pfade():
+    """
+    Berechnet alle Einträge aus den Fremdschlüsseln der Knoten.
+
+    Es wird eine Abfrage je Ebene ausgeführt.
+
+    Returns:
+        set: Tupel (vorfahr_ebene, vorfahr_id, nachfahr_ebene, nachfahr_id)
+    """
+    pfade = set()
+    for model, ebene in EBENEN.items():
+        # Lookup-Pfade vom Knoten zu seinen Vorfahren, z. B. 'lernziel__lernbereich_id'
+        lookups, parts, parent = [], [], model
+        while parent in PARENT_FIELDS:
+            parts.append(PARENT_FIELDS[parent])
+            parent = get_parent_model(parent)
+            lookups.append((EBENEN[parent], '__'.join(parts) + '_id'))
+        rows = model.objects.order_by().values_list('id', *(lookup for _, lookup in lookups))
+        for knoten_id, *vorfahr_ids in rows:
+            pfade.add((ebene, knoten_id, ebene, knoten_id))
+            for (vorfahr_ebene, _), vorfahr_id in zip(lookups, vorfahr_ids):
+                pfade.add((vorfahr_ebene, vorfahr_id, ebene, knoten_id))
+    return pfade
+
+
+def find_pfad_abweichungen():
+    """
+    Vergleicht die gespeicherten Einträge mit einer Neuberechnung.
+
+    Returns:
+        tuple: (fehlende Einträge, überzählige Einträge) als Mengen von Tupeln
+               (vorfahr_ebene, vorfahr_id, nachfahr_ebene, nachfahr_id)
+    """
+    stored = set(
+        HierarchiePfad.objects.values_list('vorfahr_ebene', 'vorfahr_id', 'nachfahr_ebene', 'nachfahr_id')
+    )
+    computed = compute_pfade()
+    return computed - stored, stored - computed
+
+
+def rebuild_pfade():
+    """
+    Schreibt die gesamte Closure-Tabelle neu.
+
+    Returns:
+        int: Die Anzahl der Einträge
+    """
+    pfade = compute_pfade()
+    HierarchiePfad.objects.all().delete()
+    HierarchiePfad.objects.bulk_create([
+        HierarchiePfad(vorfahr_ebene=vorfahr_ebene, vorfahr_id=vorfahr_id, nachfahr_ebene=nachfahr_ebene, nachfahr_id=nachfahr_id)
+        for vorfahr_ebene, vorfahr_id, nachfahr_ebene, nachfahr_id in pfade
+    ], batch_size=500)
+    return len(pfade)
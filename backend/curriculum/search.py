@@ -0,0 +1,270 @@
+"""
+Volltextsuche über Lernziele, Teilziele und Lerninhalte.
+
+Die Suche verwendet eine SQLite-FTS5-Tabelle (``curriculum_suche``) mit einem Dokument pro
+Knoten: dem Namen und den zusammengefügten Texten seiner Beschreibungen. Die Tabelle wird
+per Migration angelegt und befüllt und über die Signal-Handler in ``curriculum.signals``
+aktuell gehalten, sobald sich ein Knoten oder eine seiner Beschreibungen ändert.
+
+Die rowid eines Dokuments wird aus Knotentyp und Knoten-ID berechnet
+(``knoten_id * 3 + typ``), damit ein einzelnes Dokument ohne Suche über die
+nicht indizierten Spalten ersetzt oder entfernt werden kann.
+
+Auf anderen Datenbanken als SQLite ist die Suche nicht verfügbar.
+"""
+
+import html
+from collections import defaultdict
+
+from django.db import connection
+
+from .models import Lernziel, Teilziel, Lerninhalt
+
+TABLE = 'curriculum_suche'
+
+# Markierungen der Treffer im Ausschnitt, die snippet() einfügt; format_snippet ersetzt
+# sie nach dem HTML-Maskieren durch <mark>-Tags (Steuerzeichen, die nicht maskiert werden)
+MARK_START, MARK_END = '\x02', '\x03'
+
+# Zeichen mit Bedeutung in der FTS5-Abfragesyntax
+SYNTAX_CHARS = frozenset('"*():^')
+
+# Modell -> Typkennung in der rowid
+KNOTENTYPEN = {
+    Lernziel: 0,
+    Teilziel: 1,
+    Lerninhalt: 2,
+}
+
+
+class CurriculumSearchIndex:
+    """
+    Hilfsklasse für Pflege und Abfrage des Volltextindex.
+
+    Wie der CurriculumCache wird diese Klasse ohne Instanziierung verwendet.
+    """
+
+    # Gewichtung der Spalten (name, beschreibungen) für bm25
+    WEIGHTS = (5.0, 1.0)
+
+    # Datenbankname -> ob die FTS-Tabelle existiert
+    _available = {}
+
+    @classmethod
+    def is_available(cls):
+        """
+        Prüft, ob die Datenbank die Volltextsuche unterstützt.
+
+        Das Ergebnis wird pro Datenbank zwischengespeichert, damit die Signal-Handler
+        keine zusätzliche Abfrage pro Speichervorgang ausführen.
+
+        Returns:
+            bool: True für SQLite, wenn die FTS-Tabelle existiert
+        """
+        if connection.vendor != 'sqlite':
+            return False
+        name = connection.settings_dict['NAME']
+        if name not in cls._available:
+            cls._available[name] = TABLE in connection.introspection.table_names()
+        return cls._available[name]
+
+    @staticmethod
+    def make_rowid(model, knoten_id):
+        """
+        Berechnet die rowid des Dokuments eines Knotens.
+
+        Args:
+            model: Lernziel, Teilziel oder Lerninhalt
+            knoten_id: Die ID des Knotens
+
+        Returns:
+            int: Die rowid in der FTS-Tabelle
+        """
+        return int(knoten_id) * len(KNOTENTYPEN) + KNOTENTYPEN[model]
+
+    @staticmethod
+    def split_rowid(rowid):
+        """
+        Zerlegt eine rowid in Modell und Knoten-ID.
+
+        Returns:
+            tuple: (Modellklasse, Knoten-ID)
+        """
+        knoten_id, typ = divmod(rowid, len(KNOTENTYPEN))
+        model = next(model for model, value in KNOTENTYPEN.items() if value == typ)
+        return model, knoten_id
+
+    @classmethod
+    def get_documents(cls, model, knoten_ids=None):
+        """
+        Liest die Dokumente (Name und Beschreibungstexte) von Knoten aus der Datenbank.
+
+        Args:
+            model: Lernziel, Teilziel oder Lerninhalt
+            knoten_ids: Iterierbare Menge von Knoten-IDs oder None für alle Knoten des Modells
+
+        Returns:
+            list: Tupel (rowid, name, beschreibungen, knotentyp, knoten_id)
+        """
+        beschreibung_model = model.beschreibungen.rel.related_model
+        parent_column = model.beschreibungen.rel.field.attname
+
+        nodes = model.objects.order_by()
+        texts = beschreibung_model.objects.order_by(parent_column, 'id')
+        if knoten_ids is not None:
+            nodes = nodes.filter(pk__in=knoten_ids)
+            texts = texts.filter(**{f"{parent_column}__in": knoten_ids})
+
+        grouped = defaultdict(list)
+        for parent_id, text in texts.values_list(parent_column, 'text'):
+            grouped[parent_id].append(text)
+
+        return [
+            (cls.make_rowid(model, knoten_id), name, '\n'.join(grouped.get(knoten_id, [])),
+             model.__name__, knoten_id)
+            for knoten_id, name in nodes.values_list('id', 'name')
+        ]
+
+    @classmethod
+    def index_nodes(cls, model, knoten_ids):
+        """
+        Aktualisiert die Dokumente der angegebenen Knoten.
+
+        Nicht (mehr) existierende Knoten werden aus dem Index entfernt.
+
+        Args:
+            model: Lernziel, Teilziel oder Lerninhalt
+            knoten_ids: Iterierbare Menge von Knoten-IDs
+        """
+        knoten_ids = {knoten_id for knoten_id in knoten_ids if knoten_id is not None}
+        if not knoten_ids or not cls.is_available():
+            return
+        documents = cls.get_documents(model, knoten_ids)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {TABLE} WHERE rowid = %s",
+                [(cls.make_rowid(model, knoten_id),) for knoten_id in knoten_ids]
+            )
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (rowid, name, beschreibungen, knotentyp, knoten_id) "
+                f"VALUES (%s, %s, %s, %s, %s)",
+                documents
+            )
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Baut den Index vollständig neu auf.
+
+        Returns:
+            int: Die Anzahl der indizierten Dokumente
+        """
+        count = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE}")
+            for model in KNOTENTYPEN:
+                documents = cls.get_documents(model)
+                cursor.executemany(
+                    f"INSERT INTO {TABLE} (rowid, name, beschreibungen, knotentyp, knoten_id) "
+                    f"VALUES (%s, %s, %s, %s, %s)",
+                    documents
+                )
+                count += len(documents)
+            cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+        return count
+
+    @staticmethod
+    def build_match_query(text):
+        """
+        Wandelt eine Benutzereingabe in einen FTS5-MATCH-Ausdruck um.
+
+        Jedes Wort wird als Phrase maskiert und als Präfix gesucht; alle Wörter müssen
+        vorkommen. Eingaben mit FTS5-Syntaxzeichen (Phrasen, Präfixe, Spalten, NEAR(...))
+        werden abgelehnt statt stillschweigend anders ausgewertet.
+
+        Args:
+            text (str): Die Suchanfrage
+
+        Returns:
+            str: Der MATCH-Ausdruck oder '' für eine leere Anfrage
+
+        Raises:
+            ValueError: Wenn die Eingabe FTS5-Syntaxzeichen enthält
+        """
+        syntax = sorted(set(text) & SYNTAX_CHARS)
+        if syntax:
+            raise ValueError(f"Die Suche unterstützt keine Sonderzeichen: {' '.join(syntax)}")
+        return ' '.join(f'"{term}"*' for term in text.split())
+
+    @classmethod
+    def count(cls, match, knotentypen=None):
+        """
+        Zählt die Treffer eines MATCH-Ausdrucks.
+
+        Args:
+            match (str): Der MATCH-Ausdruck (siehe build_match_query)
+            knotentypen (list): Einschränkung auf Modellnamen oder None für alle
+
+        Returns:
+            int: Die Anzahl der Treffer
+        """
+        where, params = cls._where(match, knotentypen)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {TABLE} WHERE {where}", params)
+            return cursor.fetchone()[0]
+
+    @classmethod
+    def search(cls, match, offset=0, limit=20, knotentypen=None):
+        """
+        Sucht Knoten und sortiert sie nach Relevanz (bm25, Treffer im Namen zählen stärker).
+
+        Der Textausschnitt ist HTML-maskiert; nur die Treffer sind in <mark>-Tags gesetzt
+        (siehe format_snippet).
+
+        Args:
+            match (str): Der MATCH-Ausdruck (siehe build_match_query)
+            offset (int): Anzahl zu überspringender Treffer
+            limit (int): Maximale Anzahl an Treffern
+            knotentypen (list): Einschränkung auf Modellnamen oder None für alle
+
+        Returns:
+            list: Tupel (Modellklasse, Knoten-ID, Relevanz, Textausschnitt) in Rangfolge
+        """
+        where, params = cls._where(match, knotentypen)
+        weights = ', '.join(str(weight) for weight in cls.WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, bm25({TABLE}, {weights}) AS rang, "
+                f"snippet({TABLE}, -1, %s, %s, '…', 12) "
+                f"FROM {TABLE} WHERE {where} ORDER BY rang, rowid LIMIT %s OFFSET %s",
+                [MARK_START, MARK_END] + params + [limit, offset]
+            )
+            rows = cursor.fetchall()
+        return [(*cls.split_rowid(rowid), -rang, cls.format_snippet(snippet)) for rowid, rang, snippet in rows]
+
+    @staticmethod
+    def format_snippet(snippet):
+        """
+        Maskiert einen Ausschnitt für HTML und setzt die Treffer in <mark>-Tags.
+
+        Namen und Beschreibungen werden von Redakteuren gepflegt und können Markup enthalten;
+        ein Client darf den Ausschnitt daher nur nach dem Maskieren als HTML ausgeben.
+
+        Args:
+            snippet (str): Der Ausschnitt mit MARK_START/MARK_END um die Treffer
+
+        Returns:
+            str: Der maskierte Ausschnitt, z. B. "&lt;b&gt; <mark>Bruch</mark>rechnung"
+        """
+        text = html.escape(snippet)
+        return text.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+    @staticmethod
+    def _where(match, knotentypen):
+        """Baut die WHERE-Bedingung für MATCH und die optionale Typeinschränkung."""
+        where = f"{TABLE} MATCH %s"
+        params = [match]
+        if knotentypen:
+            where += f" AND knotentyp IN ({', '.join(['%s'] * len(knotentypen))})"
+            params.extend(knotentypen)
+        return where, params
@@ -0,0 +1,508 @@
+"""
+Signal-Handler der Curriculum-App.
+
+Die Handler reagieren auf Änderungen an allen acht Curriculum-Modellen, ermitteln den
+besitzenden Lehrplan und schreiben dessen Versionsstempel fort. Da die Schlüssel des
+CurriculumCache die Version enthalten, fragen alle Prozesse danach den neuen Baum ab (siehe
+``curriculum.cache``). Wird ein Knoten in einen anderen Lehrplan verschoben, sind der alte
+und der neue Lehrplan betroffen. Zusätzlich wird das Dokument des Knotens im Volltextindex
+(``curriculum.search``) erneuert und bei Lehrplänen die normalisierte Klassenstufen-Tabelle
+(``curriculum.klassenstufen``) sowie die Facettenzählung (``curriculum.facets``) nachgeführt.
+Die Closure-Tabelle der Hierarchie (``curriculum.pfade``) wird vor allen anderen Handlern
+aktualisiert. Die Inhaltshashes (``curriculum.hashes``) des Knotens und seiner Vorfahren
+werden verworfen und nach dem Commit neu berechnet.
+Die Kennzahlen je Lehrplan (``curriculum.statistik``) und die Zellen des Vergleichswürfels
+(``curriculum.vergleich``) werden inkrementell fortgeschrieben. Jede Änderung wird im
+Änderungsprotokoll (``curriculum.aenderungen``) festgehalten.
+
+Beim kaskadierenden Löschen erhält jedes Objekt sein eigenes post_delete-Signal. Objekte,
+deren Elternknoten im selben Löschvorgang gelöscht wird, passen die abgeleiteten Daten
+nicht einzeln an; das übernimmt der oberste gelöschte Knoten für seinen ganzen Teilbaum
+(siehe ``is_deleted_with_parent``). Arbeit nach dem Commit (Volltextindex, Inhaltshashes)
+wird je Transaktion gesammelt (siehe ``defer_on_commit``).
+
+Hinweis: ``QuerySet.update()`` und ``bulk_create()`` lösen keine Signale aus. Wer diese
+Methoden auf Curriculum-Modellen verwendet, muss ``bump_versions()`` selbst aufrufen und
+betroffene Knoten mit ``CurriculumSearchIndex.index_nodes()`` neu indizieren bzw. bei Lehrplänen
+``sync_klassenstufen()`` und ``refresh_facetten()`` aufrufen. Die Kennzahlen lassen sich mit
+``rebuild_statistiken()`` und ``refresh_kennzahlen()`` bzw. dem Kommando
+``rebuild_statistik`` neu berechnen, die Closure-Tabelle mit ``rebuild_pfade()`` bzw. dem
+Kommando ``rebuild_pfade``. Veraltete Inhaltshashes lassen sich mit dem Kommando
+``rebuild_hashes`` neu berechnen. Änderungen für den Abgleich sind mit
+``record_aenderungen()`` zu protokollieren.
+"""
+
+from django.db import transaction
+from django.db.models.signals import pre_delete, pre_save, post_save, post_delete
+from django.utils import timezone
+
+from .aenderungen import record_aenderungen
+from .facets import refresh_facetten
+from .hierarchy import (
+    CURRICULUM_MODELS, EBENEN, EBENEN_MODELLE, PARENT_FIELDS,
+    get_lehrplan_id, get_lehrplan_lookup, get_parent_model, get_stored_ancestor_ids
+)
+from .hashes import invalidate_hashes, invalidate_subtree_hashes, refresh_hashes
+from .klassenstufen import sync_klassenstufen
+from .models import Aenderung, Lehrplan, LehrplanStatistik, Lernbereich
+from .pfade import delete_pfade, get_ancestor_keys, insert_pfade, move_pfade
+from .search import KNOTENTYPEN, CurriculumSearchIndex
+from .statistik import COUNTER_FIELDS, apply_deltas, get_node_deltas, get_subtree_deltas
+from .vergleich import apply_kennzahl_deltas, refresh_kennzahlen
+from .versioning import bump_versions
+
+
+class DeferredCall:
+    """Aufruf einer Funktion nach dem Commit mit allen bis dahin gesammelten Schlüsseln."""
+
+    def __init__(self, function, args):
+        self.function = function
+        self.args = args
+        self.keys = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        self.function(*self.args, self.keys)
+
+
+def defer_on_commit(function, *args, keys):
+    """
+    Ruft ``function(*args, keys)`` nach dem Commit der laufenden Transaktion auf.
+
+    Innerhalb einer Transaktion werden die Schlüssel aller Aufrufe mit derselben Funktion und
+    denselben Argumenten gesammelt, sodass z. B. ein kaskadierendes Löschen den Volltextindex
+    einmal je Modell statt einmal je Knoten aktualisiert. Gesammelt wird je Savepoint-Ebene,
+    da Django die Callbacks eines zurückgerollten Savepoints verwirft; ein bereits
+    ausgeführter Aufruf (etwa in Tests mit captureOnCommitCallbacks) wird nicht erweitert.
+    Tests, die die Callbacks eines Blocks prüfen, sollten vorher auf derselben Ebene
+    registrierte Callbacks daher ebenfalls ausführen. Außerhalb einer Transaktion erfolgt der
+    Aufruf sofort.
+
+    Args:
+        function: Eine Funktion, deren letztes Argument eine Menge von Schlüsseln ist
+        *args: Die übrigen Argumente
+        keys: Iterierbare Menge von Schlüsseln
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    connection = transaction.get_connection()
+    savepoint_ids = set(connection.savepoint_ids)
+    for sids, callback, _ in connection.run_on_commit:
+        if (
+            isinstance(callback, DeferredCall) and not callback.done and sids == savepoint_ids
+            and callback.function == function and callback.args == args
+        ):
+            callback.keys.update(keys)
+            return
+    callback = DeferredCall(function, args)
+    callback.keys = keys
+    transaction.on_commit(callback)
+
+
+def get_vorfahren(sender, instance):
+    """
+    Liefert einen Knoten und seine aktuellen Vorfahren, bei einer Beschreibung die ihres Knotens.
+
+    Beim Anlegen, Verschieben und Ändern eines Knotens sind sie aus der Pflege der
+    Closure-Tabelle bzw. aus remember_previous_lehrplan bekannt; sonst werden sie mit einer
+    Abfrage geladen. Das Ergebnis wird an der Instanz gemerkt, sodass Lehrplan-ID und
+    Inhaltshashes ohne weitere Abfragen auskommen.
+
+    Returns:
+        list: Tupel (Ebene, ID) bis zum Lehrplan
+    """
+    vorfahren = getattr(instance, '_curriculum_vorfahren', None)
+    if vorfahren is None:
+        if sender is Lehrplan:
+            vorfahren = [(EBENEN[Lehrplan], instance.pk)]
+        elif sender in EBENEN:
+            vorfahren = get_ancestor_keys(sender, instance.pk)
+        else:
+            vorfahren = get_ancestor_keys(get_parent_model(sender), getattr(instance, f"{PARENT_FIELDS[sender]}_id"))
+        instance._curriculum_vorfahren = vorfahren
+    return vorfahren
+
+
+def get_known_lehrplan_id(sender, instance):
+    """Ermittelt die Lehrplan-ID aus get_vorfahren bzw. über die Fremdschlüssel, falls die Einträge fehlen."""
+    lehrplan_id = dict(get_vorfahren(sender, instance)).get(EBENEN[Lehrplan])
+    return lehrplan_id if lehrplan_id is not None else get_lehrplan_id(instance)
+
+
+def remember_deleted_node(sender, instance, origin=None, **kwargs):
+    """
+    Merkt sich vor dem Löschen den Knoten am Ursprung des Löschvorgangs.
+
+    Django sendet pre_delete für alle kaskadierend gelöschten Objekte, bevor das erste
+    gelöscht wird, und übergibt allen Signalen eines Löschvorgangs dasselbe ``origin``
+    (die Instanz bzw. das QuerySet, auf dem delete() aufgerufen wurde).
+    """
+    instance._curriculum_vorfahren = None
+    if origin is None:
+        return
+    loeschvorgang = getattr(origin, '_curriculum_loeschvorgang', None)
+    if loeschvorgang is None or loeschvorgang['begonnen']:
+        loeschvorgang = origin._curriculum_loeschvorgang = {'knoten': set(), 'aenderungen': [], 'begonnen': False}
+    if sender in EBENEN:
+        loeschvorgang['knoten'].add((EBENEN[sender], instance.pk))
+
+
+def is_deleted_with_parent(sender, instance, origin=None):
+    """
+    Prüft nach dem Löschen, ob der Elternknoten im selben Löschvorgang gelöscht wird.
+
+    Die abgeleiteten Daten solcher Objekte schreibt der oberste gelöschte Knoten für seinen
+    ganzen Teilbaum fort. Da Django Kinder vor ihren Eltern löscht, bestehen deren
+    Einträge in der Closure-Tabelle bis dahin noch.
+    """
+    loeschvorgang = getattr(origin, '_curriculum_loeschvorgang', None)
+    if loeschvorgang is None:
+        return False
+    loeschvorgang['begonnen'] = True
+    parent_field = PARENT_FIELDS.get(sender)
+    if parent_field is None:
+        return False
+    parent_key = (EBENEN[get_parent_model(sender)], getattr(instance, f"{parent_field}_id"))
+    return parent_key in loeschvorgang['knoten']
+
+
+def remember_previous_lehrplan(sender, instance, raw=False, **kwargs):
+    """
+    Merkt sich vor dem Speichern den bisherigen Lehrplan des Knotens.
+
+    Für einen Lehrplan selbst wird stattdessen der Versionsstempel auf Basis des
+    gespeicherten Standes fortgeschrieben, damit eine veraltete Instanz im Speicher
+    keine bereits vergebene Version erneut schreibt. Außerdem werden die bisherigen
+    Klassenstufen und Facettenwerte gemerkt, um unnötige Neuberechnungen zu vermeiden.
+    Bei einem Lernbereich werden zusätzlich die gespeicherten Unterrichtsstunden gemerkt,
+    bei allen Knoten der bisherige Elternknoten, um Verschiebungen zu erkennen, sowie die
+    gespeicherten Vorfahren (siehe get_vorfahren).
+    """
+    instance._curriculum_vorfahren = instance._curriculum_previous_vorfahren = None
+    if sender is Lehrplan:
+        if instance.pk is not None and not raw:
+            stored = (
+                Lehrplan.objects.filter(pk=instance.pk)
+                .values_list('version', 'bundesland', 'fach', 'klassenstufen')
+                .first()
+            )
+            if stored is not None:
+                instance.version = stored[0] + 1
+                instance.geaendert_am = timezone.now()
+                instance._curriculum_previous_facette = stored[1:]
+                instance._curriculum_previous_klassenstufen = stored[3]
+        return
+    if sender is Lernbereich:
+        stored = None
+        if instance.pk is not None:
+            stored = Lernbereich.objects.filter(pk=instance.pk).values_list('lehrplan_id', 'unterrichtsstunden').first()
+        instance._curriculum_previous_lehrplan_id, instance._curriculum_previous_unterrichtsstunden = stored or (None, 0)
+        instance._curriculum_previous_parent_id = instance._curriculum_previous_lehrplan_id
+        if stored is not None:
+            instance._curriculum_previous_vorfahren = [(EBENEN[Lehrplan], stored[0]), (EBENEN[Lernbereich], instance.pk)]
+        return
+    if sender in EBENEN:
+        vorfahren = get_stored_ancestor_ids(instance)
+        if vorfahren:
+            instance._curriculum_previous_lehrplan_id = vorfahren.get(0)
+            instance._curriculum_previous_parent_id = vorfahren.get(EBENEN[sender] - 1)
+            instance._curriculum_previous_vorfahren = [*vorfahren.items(), (EBENEN[sender], instance.pk)]
+            return
+    stored = None
+    if instance.pk is not None:
+        stored = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list(f"{PARENT_FIELDS[sender]}_id", get_lehrplan_lookup(sender))
+            .first()
+        )
+    instance._curriculum_previous_parent_id, instance._curriculum_previous_lehrplan_id = stored or (None, None)
+
+
+def is_moved(sender, instance):
+    """Prüft nach dem Speichern, ob das Objekt einen anderen Elternknoten erhalten hat."""
+    parent_field = PARENT_FIELDS.get(sender)
+    previous_parent_id = getattr(instance, '_curriculum_previous_parent_id', None)
+    return parent_field is not None and previous_parent_id not in (None, getattr(instance, f"{parent_field}_id"))
+
+
+def update_saved_pfade(sender, instance, created=False, **kwargs):
+    """
+    Legt nach dem Speichern die Einträge eines neuen Knotens an bzw. hängt einen verschobenen Teilbaum um.
+
+    Die dabei bekannten Vorfahren werden für get_vorfahren gemerkt.
+    """
+    if created:
+        instance._curriculum_vorfahren = insert_pfade(instance)
+        return
+    if is_moved(sender, instance):
+        instance._curriculum_vorfahren = move_pfade(instance)
+    else:
+        instance._curriculum_vorfahren = getattr(instance, '_curriculum_previous_vorfahren', None)
+
+
+def update_deleted_pfade(sender, instance, **kwargs):
+    """Löscht nach dem Löschen eines Knotens die Einträge seines Teilbaums in der Closure-Tabelle."""
+    if not getattr(instance, '_curriculum_mit_eltern_geloescht', False):
+        delete_pfade(instance)
+
+
+def invalidate_saved_node(sender, instance, raw=False, **kwargs):
+    """Aktualisiert nach dem Speichern den alten und den neuen Lehrplan des Knotens."""
+    previous_lehrplan_id = getattr(instance, '_curriculum_previous_lehrplan_id', None)
+    instance._curriculum_lehrplan_id = get_known_lehrplan_id(sender, instance)
+    if sender is not Lehrplan:
+        bump_versions([previous_lehrplan_id, instance._curriculum_lehrplan_id])
+
+
+def invalidate_deleted_node(sender, instance, origin=None, **kwargs):
+    """
+    Aktualisiert nach dem Löschen den Lehrplan des Knotens.
+
+    Wird der Elternknoten mit gelöscht, entfällt das für dieses Objekt ebenso wie in den
+    folgenden Handlern.
+    """
+    instance._curriculum_mit_eltern_geloescht = is_deleted_with_parent(sender, instance, origin)
+    if instance._curriculum_mit_eltern_geloescht:
+        return
+    instance._curriculum_lehrplan_id = get_known_lehrplan_id(sender, instance)
+    if sender is not Lehrplan:
+        bump_versions([instance._curriculum_lehrplan_id])
+
+
+def record_saved_aenderung(sender, instance, created=False, **kwargs):
+    """
+    Protokolliert nach dem Speichern das Anlegen bzw. Ändern des Objekts.
+
+    Bei untergeordneten Knoten werden auch die betroffenen Lehrpläne als geändert
+    protokolliert, da bump_versions() ihre Versionsstempel per update() ohne Signal erhöht.
+    """
+    aenderungen = [(sender, instance.pk, Aenderung.ART_ANGELEGT if created else Aenderung.ART_GEAENDERT)]
+    if sender is not Lehrplan:
+        lehrplan_ids = {
+            getattr(instance, '_curriculum_previous_lehrplan_id', None),
+            getattr(instance, '_curriculum_lehrplan_id', None),
+        } - {None}
+        aenderungen += [(Lehrplan, lehrplan_id, Aenderung.ART_GEAENDERT) for lehrplan_id in sorted(lehrplan_ids)]
+    record_aenderungen(aenderungen)
+
+
+def record_deleted_aenderung(sender, instance, origin=None, **kwargs):
+    """
+    Protokolliert nach dem Löschen das Löschen des Objekts und die Änderung seines Lehrplans.
+
+    Die Einträge von Objekten, deren Elternknoten mit gelöscht wird, werden gesammelt und
+    zusammen mit dem obersten gelöschten Knoten geschrieben.
+    """
+    aenderungen = [(sender, instance.pk, Aenderung.ART_GELOESCHT)]
+    if getattr(instance, '_curriculum_mit_eltern_geloescht', False):
+        origin._curriculum_loeschvorgang['aenderungen'] += aenderungen
+        return
+    lehrplan_id = getattr(instance, '_curriculum_lehrplan_id', None)
+    if sender is not Lehrplan and lehrplan_id is not None:
+        aenderungen.append((Lehrplan, lehrplan_id, Aenderung.ART_GEAENDERT))
+    loeschvorgang = getattr(origin, '_curriculum_loeschvorgang', None)
+    if loeschvorgang is not None:
+        aenderungen[:0], loeschvorgang['aenderungen'] = loeschvorgang['aenderungen'], []
+    record_aenderungen(aenderungen)
+
+
+def get_hash_keys(sender, instance):
+    """
+    Liefert die Knoten, deren Inhaltshash sich mit der Instanz ändert, ohne ihre Vorfahren.
+
+    Das ist der Knoten selbst bzw. bei einer Beschreibung ihr Knoten, bei einer Verschiebung
+    zusätzlich der bisherige Elternknoten.
+    """
+    keys = set()
+    if sender in EBENEN:
+        keys.add((EBENEN[sender], instance.pk))
+    parent_field = PARENT_FIELDS.get(sender)
+    if parent_field is not None:
+        parent_ebene = EBENEN[get_parent_model(sender)]
+        for parent_id in (getattr(instance, f"{parent_field}_id"), getattr(instance, '_curriculum_previous_parent_id', None)):
+            if parent_id is not None:
+                keys.add((parent_ebene, parent_id))
+    return keys
+
+
+def invalidate_saved_hashes(sender, instance, **kwargs):
+    """
+    Verwirft nach dem Speichern die Inhaltshashes der betroffenen Knoten und berechnet sie nach dem Commit neu.
+
+    Die Vorfahren sind aus get_vorfahren bekannt, bei einem verschobenen Knoten zusätzlich
+    die bisherigen aus remember_previous_lehrplan. Nur bei einer verschobenen Beschreibung
+    werden sie erneut geladen.
+    """
+    vorfahren = get_vorfahren(sender, instance)
+    if is_moved(sender, instance):
+        previous = getattr(instance, '_curriculum_previous_vorfahren', None)
+        vorfahren = None if previous is None else [*vorfahren, *previous]
+    defer_on_commit(refresh_hashes, keys=invalidate_hashes(get_hash_keys(sender, instance), vorfahren))
+
+
+def invalidate_deleted_hashes(sender, instance, **kwargs):
+    """Verwirft nach dem Löschen die Inhaltshashes des Teilbaums bzw. Knotens und seiner Vorfahren."""
+    if getattr(instance, '_curriculum_mit_eltern_geloescht', False):
+        return
+    if sender in EBENEN:
+        vorfahren = get_vorfahren(sender, instance)
+        invalidate_subtree_hashes(EBENEN[sender], instance.pk, vorfahren)
+        keys = set(vorfahren) - {(EBENEN[sender], instance.pk)}
+    else:
+        keys = invalidate_hashes(get_hash_keys(sender, instance), get_vorfahren(sender, instance))
+    defer_on_commit(refresh_hashes, keys=keys)
+
+
+def sync_saved_klassenstufen(sender, instance, created=False, **kwargs):
+    """Aktualisiert nach dem Speichern eines Lehrplans seine normalisierten Klassenstufen, falls nötig."""
+    previous = getattr(instance, '_curriculum_previous_klassenstufen', None)
+    if created or previous != instance.klassenstufen:
+        sync_klassenstufen([instance])
+
+
+def refresh_saved_facetten(sender, instance, **kwargs):
+    """Zählt nach dem Speichern eines Lehrplans die bisherige und die neue Facettenkombination neu, falls nötig."""
+    previous = getattr(instance, '_curriculum_previous_facette', None)
+    current = (instance.bundesland, instance.fach, instance.klassenstufen)
+    if previous != current:
+        refresh_facetten([kombination for kombination in (previous, current) if kombination is not None])
+
+
+def refresh_deleted_facetten(sender, instance, **kwargs):
+    """Zählt nach dem Löschen eines Lehrplans seine Facettenkombination neu."""
+    refresh_facetten([(instance.bundesland, instance.fach, instance.klassenstufen)])
+
+
+def apply_statistik_deltas(lehrplan_id, deltas):
+    """Schreibt Differenzen in die Kennzahlen des Lehrplans und in seine Zellen im Vergleichswürfel fort."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if lehrplan_id is None or not deltas:
+        return
+    apply_deltas(lehrplan_id, deltas)
+    apply_kennzahl_deltas(lehrplan_id, deltas)
+
+
+def update_saved_statistik(sender, instance, created=False, **kwargs):
+    """
+    Schreibt nach dem Speichern die Kennzahlen der betroffenen Lehrpläne fort.
+
+    Verwendet die von invalidate_saved_node ermittelte Lehrplan-ID, sodass keine weitere
+    Abfrage zur Auflösung nötig ist.
+    """
+    if sender is Lehrplan:
+        if created:
+            LehrplanStatistik.objects.get_or_create(lehrplan_id=instance.pk)
+        return
+
+    lehrplan_id = getattr(instance, '_curriculum_lehrplan_id', None) or get_lehrplan_id(instance)
+    if created:
+        apply_statistik_deltas(lehrplan_id, get_node_deltas(instance))
+        return
+
+    previous_lehrplan_id = getattr(instance, '_curriculum_previous_lehrplan_id', None)
+    previous_stunden = getattr(instance, '_curriculum_previous_unterrichtsstunden', 0)
+    if previous_lehrplan_id != lehrplan_id:
+        deltas = get_subtree_deltas(instance)
+        apply_statistik_deltas(lehrplan_id, deltas)
+        removed = {field: -delta for field, delta in deltas.items()}
+        if sender is Lernbereich:
+            removed['unterrichtsstunden'] = -previous_stunden
+        apply_statistik_deltas(previous_lehrplan_id, removed)
+    elif sender is Lernbereich:
+        apply_statistik_deltas(lehrplan_id, {'unterrichtsstunden': instance.unterrichtsstunden - previous_stunden})
+
+
+def update_deleted_statistik(sender, instance, **kwargs):
+    """Zieht nach dem Löschen eines Knotens seinen Teilbaum von den Kennzahlen seines Lehrplans ab."""
+    if getattr(instance, '_curriculum_mit_eltern_geloescht', False):
+        return
+    lehrplan_id = getattr(instance, '_curriculum_lehrplan_id', None) or get_lehrplan_id(instance)
+    if EBENEN[sender] == max(EBENEN_MODELLE):
+        deltas = get_node_deltas(instance, -1)
+    else:
+        deltas = get_subtree_deltas(instance, -1)
+    apply_statistik_deltas(lehrplan_id, deltas)
+
+
+def refresh_saved_vergleich(sender, instance, created=False, **kwargs):
+    """Berechnet nach dem Speichern eines Lehrplans die betroffenen Zellen des Vergleichswürfels neu, falls nötig."""
+    previous = getattr(instance, '_curriculum_previous_facette', None)
+    current = (instance.bundesland, instance.fach, instance.klassenstufen)
+    if created or previous != current:
+        refresh_kennzahlen([
+            kombination[:2] for kombination in (previous, current) if kombination is not None
+        ])
+
+
+def refresh_deleted_vergleich(sender, instance, **kwargs):
+    """Berechnet nach dem Löschen eines Lehrplans die Zellen seines Bundeslands und Fachs neu."""
+    refresh_kennzahlen([(instance.bundesland, instance.fach)])
+
+
+def update_search_index(sender, instance, **kwargs):
+    """
+    Erneuert nach dem Speichern oder Löschen das Dokument des betroffenen Knotens im Volltextindex.
+
+    Bei einer Beschreibung ist das der Knoten, zu dem sie gehört. Die Knoten werden je
+    Transaktion und Modell gesammelt und nach dem Commit gemeinsam indiziert.
+    """
+    if sender in KNOTENTYPEN:
+        model, knoten_id = sender, instance.pk
+    else:
+        model = get_parent_model(sender)
+        knoten_id = getattr(instance, f"{PARENT_FIELDS[sender]}_id")
+    defer_on_commit(CurriculumSearchIndex.index_nodes, model, keys=[knoten_id])
+
+
+def connect_signals():
+    """Verbindet die Handler mit allen acht Curriculum-Modellen."""
+    # Closure-Tabelle zuerst, damit die folgenden Handler den neuen Stand sehen
+    for model in EBENEN:
+        post_save.connect(update_saved_pfade, sender=model, dispatch_uid=f'curriculum_pfade_save_{model.__name__}')
+
+    for model in CURRICULUM_MODELS:
+        name = model.__name__
+        pre_save.connect(remember_previous_lehrplan, sender=model, dispatch_uid=f'curriculum_pre_save_{name}')
+        pre_delete.connect(remember_deleted_node, sender=model, dispatch_uid=f'curriculum_pre_delete_{name}')
+        post_save.connect(invalidate_saved_node, sender=model, dispatch_uid=f'curriculum_post_save_{name}')
+        post_delete.connect(invalidate_deleted_node, sender=model, dispatch_uid=f'curriculum_post_delete_{name}')
+
+    # Änderungsprotokoll
+    for model in CURRICULUM_MODELS:
+        name = model.__name__
+        post_save.connect(record_saved_aenderung, sender=model, dispatch_uid=f'curriculum_aenderung_save_{name}')
+        post_delete.connect(record_deleted_aenderung, sender=model, dispatch_uid=f'curriculum_aenderung_delete_{name}')
+
+    # Inhaltshashes; nach der Closure-Tabelle und der Ermittlung der Lehrplan-ID
+    for model in CURRICULUM_MODELS:
+        name = model.__name__
+        post_save.connect(invalidate_saved_hashes, sender=model, dispatch_uid=f'curriculum_hashes_save_{name}')
+        post_delete.connect(invalidate_deleted_hashes, sender=model, dispatch_uid=f'curriculum_hashes_delete_{name}')
+
+    post_save.connect(sync_saved_klassenstufen, sender=Lehrplan, dispatch_uid='curriculum_klassenstufen_Lehrplan')
+    post_save.connect(refresh_saved_facetten, sender=Lehrplan, dispatch_uid='curriculum_facetten_save_Lehrplan')
+    post_delete.connect(refresh_deleted_facetten, sender=Lehrplan, dispatch_uid='curriculum_facetten_delete_Lehrplan')
+
+    # Kennzahlen je Lehrplan; nach den Handlern oben, die die Lehrplan-ID ermitteln
+    for model in (Lehrplan,) + tuple(COUNTER_FIELDS):
+        name = model.__name__
+        post_save.connect(update_saved_statistik, sender=model, dispatch_uid=f'curriculum_statistik_save_{name}')
+        if model is not Lehrplan:
+            post_delete.connect(update_deleted_statistik, sender=model, dispatch_uid=f'curriculum_statistik_delete_{name}')
+
+    # Vergleichswürfel; nach Klassenstufen und Statistik, aus denen die Zellen berechnet werden
+    post_save.connect(refresh_saved_vergleich, sender=Lehrplan, dispatch_uid='curriculum_vergleich_save_Lehrplan')
+    post_delete.connect(refresh_deleted_vergleich, sender=Lehrplan, dispatch_uid='curriculum_vergleich_delete_Lehrplan')
+
+    # Knoten mit Volltextdokument und ihre Beschreibungen
+    for model in CURRICULUM_MODELS:
+        if model in KNOTENTYPEN or get_parent_model(model) in KNOTENTYPEN:
+            name = model.__name__
+            post_save.connect(update_search_index, sender=model, dispatch_uid=f'curriculum_search_save_{name}')
+            post_delete.connect(update_search_index, sender=model, dispatch_uid=f'curriculum_search_delete_{name}')
+
+    # Einträge gelöschter Knoten zuletzt, nachdem die übrigen Handler den Lehrplan ermittelt haben
+    for model in EBENEN:
+        post_delete.connect(update_deleted_pfade, sender=model, dispatch_uid=f'curriculum_pfade_delete_{model.__name__}')
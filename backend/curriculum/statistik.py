@@ -0,0 +1,166 @@
+"""
+Denormalisierte Kennzahlen je Lehrplan.
+
+Die Tabelle ``LehrplanStatistik`` enthält für jeden Lehrplan die Anzahl seiner Lernbereiche,
+Lernziele, Teilziele und Lerninhalte sowie die Summe der Unterrichtsstunden seiner
+Lernbereiche. Die Werte werden über die Signal-Handler in ``curriculum.signals`` inkrementell
+fortgeschrieben (``UPDATE ... SET zaehler = zaehler + n``), ohne die Kindtabellen erneut zu
+zählen:
+
+- Anlegen eines Knotens: +1 auf der Ebene des Knotens
+- Löschen eines Knotens: der Teilbaum wird einmal gezählt und abgezogen; beim
+  kaskadierenden Löschen übernimmt das der oberste gelöschte Knoten für alle Nachfahren
+- Verschieben eines Knotens in einen anderen Lehrplan: der Teilbaum wird einmal gezählt,
+  beim alten Lehrplan abgezogen und beim neuen addiert
+- Ändern der Unterrichtsstunden eines Lernbereichs: Differenz zum gespeicherten Wert
+
+``compute_statistiken()`` zählt die Werte aus den Kindtabellen neu; das Kommando
+``rebuild_statistik`` vergleicht bzw. überschreibt den gespeicherten Stand damit.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, F, Sum
+
+from .hierarchy import EBENEN, EBENEN_MODELLE, get_lehrplan_lookup
+from .models import HierarchiePfad, Lehrplan, LehrplanStatistik, Lernbereich, Lernziel, Teilziel, Lerninhalt
+
+# Modell -> Zählerfeld in LehrplanStatistik
+COUNTER_FIELDS = {
+    Lernbereich: 'lernbereiche',
+    Lernziel: 'lernziele',
+    Teilziel: 'teilziele',
+    Lerninhalt: 'lerninhalte',
+}
+
+FIELDS = tuple(COUNTER_FIELDS.values()) + ('unterrichtsstunden',)
+
+
+def apply_deltas(lehrplan_id, deltas):
+    """
+    Addiert Differenzen auf die Kennzahlen eines Lehrplans.
+
+    Args:
+        lehrplan_id: Die ID des Lehrplans (None wird ignoriert)
+        deltas (dict): Feldname -> Differenz; Nullwerte werden ausgelassen
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if lehrplan_id is None or not deltas:
+        return
+    LehrplanStatistik.objects.filter(lehrplan_id=lehrplan_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def get_node_deltas(instance, sign=1):
+    """
+    Liefert die Differenzen für das Anlegen (sign=1) oder Löschen (sign=-1) eines einzelnen Knotens.
+
+    Args:
+        instance: Ein Lernbereich, Lernziel, Teilziel oder Lerninhalt
+        sign (int): 1 zum Addieren, -1 zum Abziehen
+
+    Returns:
+        dict: Feldname -> Differenz
+    """
+    deltas = {COUNTER_FIELDS[type(instance)]: sign}
+    if isinstance(instance, Lernbereich):
+        deltas['unterrichtsstunden'] = sign * (instance.unterrichtsstunden or 0)
+    return deltas
+
+
+def get_subtree_deltas(instance, sign=1):
+    """
+    Zählt einen Knoten mit allen Nachfahren, z. B. für das Verschieben in einen anderen Lehrplan oder das Löschen.
+
+    Die Nachfahren werden mit einer Abfrage auf die Closure-Tabelle je Ebene gezählt.
+
+    Args:
+        instance: Ein Lernbereich, Lernziel, Teilziel oder Lerninhalt
+        sign (int): 1 zum Addieren, -1 zum Abziehen
+
+    Returns:
+        dict: Feldname -> Differenz
+    """
+    deltas = get_node_deltas(instance, sign)
+    ebene = EBENEN[type(instance)]
+    counts = (
+        HierarchiePfad.objects
+        .filter(vorfahr_ebene=ebene, vorfahr_id=instance.pk, nachfahr_ebene__gt=ebene)
+        .order_by()
+        .values_list('nachfahr_ebene')
+        .annotate(anzahl=Count('id'))
+    )
+    for nachfahr_ebene, anzahl in counts:
+        deltas[COUNTER_FIELDS[EBENEN_MODELLE[nachfahr_ebene]]] = sign * anzahl
+    return deltas
+
+
+def compute_statistiken(lehrplan_ids=None):
+    """
+    Zählt die Kennzahlen aus den Kindtabellen neu.
+
+    Args:
+        lehrplan_ids: Iterierbare Menge von Lehrplan-IDs oder None für alle Lehrpläne
+
+    Returns:
+        dict: Lehrplan-ID -> {Feldname: Wert}
+    """
+    lehrplaene = Lehrplan.objects.order_by()
+    if lehrplan_ids is not None:
+        lehrplaene = lehrplaene.filter(id__in=lehrplan_ids)
+    result = {lehrplan_id: dict.fromkeys(FIELDS, 0) for lehrplan_id in lehrplaene.values_list('id', flat=True)}
+
+    aggregates = [
+        (model, field, Count('id')) for model, field in COUNTER_FIELDS.items()
+    ] + [(Lernbereich, 'unterrichtsstunden', Sum('unterrichtsstunden'))]
+    for model, field, aggregate in aggregates:
+        lookup = get_lehrplan_lookup(model)
+        queryset = model.objects.order_by().values_list(lookup).annotate(wert=aggregate)
+        if lehrplan_ids is not None:
+            queryset = queryset.filter(**{f"{lookup}__in": list(result)})
+        for lehrplan_id, wert in queryset:
+            if lehrplan_id in result:
+                result[lehrplan_id][field] = wert or 0
+    return result
+
+
+def find_abweichungen():
+    """
+    Vergleicht die gespeicherten Kennzahlen mit einer vollständigen Neuzählung.
+
+    Returns:
+        dict: Lehrplan-ID -> {Feldname: (gespeichert, neu gezählt)}; fehlende Zeilen gelten als None
+    """
+    stored = {
+        row['lehrplan_id']: row
+        for row in LehrplanStatistik.objects.values('lehrplan_id', *FIELDS)
+    }
+    abweichungen = defaultdict(dict)
+    for lehrplan_id, werte in compute_statistiken().items():
+        row = stored.get(lehrplan_id, {})
+        for field, wert in werte.items():
+            if row.get(field) != wert:
+                abweichungen[lehrplan_id][field] = (row.get(field), wert)
+    return dict(abweichungen)
+
+
+def rebuild_statistiken(lehrplan_ids=None):
+    """
+    Schreibt die Kennzahlen neu aus den Kindtabellen.
+
+    Args:
+        lehrplan_ids: Iterierbare Menge von Lehrplan-IDs oder None für alle Lehrpläne
+
+    Returns:
+        int: Die Anzahl der geschriebenen Zeilen
+    """
+    werte = compute_statistiken(lehrplan_ids)
+    if lehrplan_ids is None:
+        LehrplanStatistik.objects.all().delete()
+    else:
+        LehrplanStatistik.objects.filter(lehrplan_id__in=list(werte)).delete()
+    LehrplanStatistik.objects.bulk_create([
+        LehrplanStatistik(lehrplan_id=lehrplan_id, **felder) for lehrplan_id, felder in werte.items()
+    ], batch_size=500)
+    return len(werte)
@@ -0,0 +1,193 @@
+"""
+Deterministischer Generator für synthetische Lehrpläne.
+
+Für Benchmarks und Lasttests werden Lehrpläne mit einstellbarer Verzweigung je Ebene und
+einstellbarer Länge der Beschreibungen erzeugt. Namen, Texte, Bundesländer, Fächer und
+Klassenstufen stammen aus einem ``random.Random`` mit festem Seed; bei gleichen Parametern
+entsteht derselbe Datenbestand (bis auf die IDs).
+
+Die Objekte werden ebenenweise per ``bulk_create()`` angelegt. Da dabei keine Signale
+ausgelöst werden, schreibt ``generate_curricula()`` die abgeleiteten Daten der neuen
+Lehrpläne anschließend selbst: normalisierte Klassenstufen, Closure-Tabelle, Kennzahlen,
+Vergleichswürfel, Facetten, Suchindex und Änderungsprotokoll. Inhaltshashes werden wie
+sonst auch beim ersten Zugriff berechnet.
+"""
+
+import random
+
+from django.db import transaction
+
+from .aenderungen import record_aenderungen
+from .facets import refresh_facetten
+from .hierarchy import CURRICULUM_MODELS, EBENEN
+from .klassenstufen import sync_klassenstufen
+from .models import (
+    Aenderung, HierarchiePfad, Lehrplan, Lernbereich, Lernziel, LernzielBeschreibung,
+    Teilziel, TeilzielBeschreibung, Lerninhalt, LerninhaltBeschreibung
+)
+from .search import CurriculumSearchIndex
+from .statistik import rebuild_statistiken
+from .vergleich import refresh_kennzahlen
+
+BUNDESLAENDER = (
+    'Baden-Württemberg', 'Bayern', 'Berlin', 'Brandenburg', 'Bremen', 'Hamburg', 'Hessen',
+    'Mecklenburg-Vorpommern', 'Niedersachsen', 'Nordrhein-Westfalen', 'Rheinland-Pfalz',
+    'Saarland', 'Sachsen', 'Sachsen-Anhalt', 'Schleswig-Holstein', 'Thüringen',
+)
+
+FAECHER = (
+    'Mathematik', 'Deutsch', 'Englisch', 'Biologie', 'Chemie', 'Physik', 'Geschichte',
+    'Geographie', 'Kunst', 'Musik', 'Informatik', 'Ethik', 'Sport', 'Französisch',
+)
+
+KLASSENSTUFEN = ('1-4', '5', '6', '5, 6', '7', '7-9', '8', '9, 10', '10', '11-12', '5a, 6a')
+
+WOERTER = (
+    'Schülerinnen', 'Schüler', 'erkennen', 'beschreiben', 'vergleichen', 'untersuchen',
+    'Zusammenhänge', 'Grundlagen', 'Modelle', 'Verfahren', 'anwenden', 'beurteilen',
+    'Begriffe', 'Darstellungen', 'Strukturen', 'Prozesse', 'entwickeln', 'begründen',
+    'Beispiele', 'Eigenschaften', 'Methoden', 'Quellen', 'gestalten', 'reflektieren',
+    'Zahlen', 'Texte', 'Experimente', 'Lebewesen', 'Energie', 'Gesellschaft', 'Sprache',
+)
+
+# Anzahl der Ebenen unterhalb des Lehrplans
+TIEFE = 4
+
+
+def parse_fanout(value):
+    """
+    Liest die Verzweigung je Ebene.
+
+    Beispiel:
+        parse_fanout(3) == (3, 3, 3, 3)
+        parse_fanout('6,4,3,2') == (6, 4, 3, 2)
+
+    Args:
+        value: Eine Zahl für alle Ebenen oder vier Zahlen (Lernbereiche je Lehrplan, Lernziele
+               je Lernbereich, Teilziele je Lernziel, Lerninhalte je Teilziel) als Folge oder
+               kommaseparierte Zeichenkette
+
+    Returns:
+        tuple: Vier nicht negative Zahlen
+
+    Raises:
+        ValueError: Bei einer ungültigen Angabe
+    """
+    if isinstance(value, str):
+        value = [int(part) for part in value.split(',')]
+    elif isinstance(value, int):
+        value = [value]
+    fanout = tuple(value) * TIEFE if len(value) == 1 else tuple(value)
+    if len(fanout) != TIEFE or any(anzahl < 0 for anzahl in fanout):
+        raise ValueError("fanout erwartet eine Zahl oder vier nicht negative Zahlen")
+    return fanout
+
+
+def make_text(rng, length):
+    """
+    Erzeugt einen Satz aus zufälligen Wörtern mit ungefähr der angegebenen Länge.
+
+    Args:
+        rng (random.Random): Der Zufallsgenerator
+        length (int): Die Mindestlänge in Zeichen
+
+    Returns:
+        str: Der Text, mit Punkt abgeschlossen
+    """
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WOERTER)
+        words.append(word)
+        size += len(word) + 1
+    text = ' '.join(words)
+    return text[0].upper() + text[1:] + '.'
+
+
+def generate_curricula(anzahl, fanout=3, beschreibungen=2, text_length=120, seed=0):
+    """
+    Legt synthetische Lehrpläne mit vollständiger Hierarchie an.
+
+    Bei einer Verzweigung von (6, 4, 3, 2) und zwei Beschreibungen je Knoten entstehen je
+    Lehrplan 6 Lernbereiche, 24 Lernziele, 72 Teilziele, 144 Lerninhalte und 480 Beschreibungen.
+
+    Args:
+        anzahl (int): Die Anzahl der Lehrpläne
+        fanout: Die Verzweigung je Ebene (siehe parse_fanout)
+        beschreibungen (int): Beschreibungen je Lernziel, Teilziel und Lerninhalt
+        text_length (int): Die ungefähre Länge einer Beschreibung in Zeichen
+        seed (int): Der Seed des Zufallsgenerators
+
+    Returns:
+        dict: Modellklasse -> Liste der IDs der angelegten Objekte, in der Reihenfolge
+              von CURRICULUM_MODELS
+    """
+    fanout = parse_fanout(fanout)
+    rng = random.Random(seed)
+    created = {model: [] for model in CURRICULUM_MODELS}
+
+    with transaction.atomic():
+        lehrplaene = Lehrplan.objects.bulk_create([
+            Lehrplan(
+                bundesland=rng.choice(BUNDESLAENDER),
+                fach=rng.choice(FAECHER),
+                klassenstufen=rng.choice(KLASSENSTUFEN),
+            )
+            for _ in range(anzahl)
+        ], batch_size=500)
+        # Knoten-ID -> Schlüssel (Ebene, ID) des Knotens und seiner Vorfahren für die Closure-Tabelle
+        pfade = {lehrplan.id: [(EBENEN[Lehrplan], lehrplan.id)] for lehrplan in lehrplaene}
+        created[Lehrplan] = list(pfade)
+        HierarchiePfad.objects.bulk_create([
+            HierarchiePfad(vorfahr_ebene=ebene, vorfahr_id=lehrplan_id, nachfahr_ebene=ebene, nachfahr_id=lehrplan_id)
+            for [(ebene, lehrplan_id)] in pfade.values()
+        ], batch_size=500)
+
+        levels = (
+            (Lernbereich, 'lehrplan', None),
+            (Lernziel, 'lernbereich', LernzielBeschreibung),
+            (Teilziel, 'lernziel', TeilzielBeschreibung),
+            (Lerninhalt, 'teilziel', LerninhaltBeschreibung),
+        )
+        for (model, parent_field, beschreibung_model), kinder in zip(levels, fanout):
+            nodes = []
+            for parent_id in pfade:
+                for nummer in range(1, kinder + 1):
+                    values = {f"{parent_field}_id": parent_id, 'name': make_text(rng, 20)[:-1]}
+                    if model is Lernbereich:
+                        values.update(nummer=nummer, unterrichtsstunden=rng.randint(4, 40))
+                    nodes.append(model(**values))
+            nodes = model.objects.bulk_create(nodes, batch_size=500)
+            ebene = EBENEN[model]
+            pfade = {
+                node.id: [*pfade[getattr(node, f"{parent_field}_id")], (ebene, node.id)]
+                for node in nodes
+            }
+            created[model] = list(pfade)
+            HierarchiePfad.objects.bulk_create([
+                HierarchiePfad(vorfahr_ebene=vorfahr_ebene, vorfahr_id=vorfahr_id, nachfahr_ebene=ebene, nachfahr_id=knoten_id)
+                for knoten_id, vorfahren in pfade.items()
+                for vorfahr_ebene, vorfahr_id in vorfahren
+            ], batch_size=500)
+
+            if beschreibung_model is not None:
+                texte = beschreibung_model.objects.bulk_create([
+                    beschreibung_model(**{f"{model.__name__.lower()}_id": knoten_id}, text=make_text(rng, text_length))
+                    for knoten_id in pfade
+                    for _ in range(beschreibungen)
+                ], batch_size=500)
+                created[beschreibung_model] = [text.id for text in texte]
+                CurriculumSearchIndex.index_nodes(model, pfade)
+
+        # Die Closure-Tabelle wurde ebenenweise geschrieben; die übrigen Daten hängen nur vom Lehrplan ab
+        sync_klassenstufen(lehrplaene)
+        rebuild_statistiken(created[Lehrplan])
+        refresh_kennzahlen((lehrplan.bundesland, lehrplan.fach) for lehrplan in lehrplaene)
+        refresh_facetten((lehrplan.bundesland, lehrplan.fach, lehrplan.klassenstufen) for lehrplan in lehrplaene)
+        record_aenderungen(
+            (model, knoten_id, Aenderung.ART_ANGELEGT)
+            for model, ids in created.items()
+            for knoten_id in ids
+        )
+
+    return created
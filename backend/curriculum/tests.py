@@ -1,3 +1,1903 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import math
+import os
+import pstats
+import re
+import tempfile
+import unittest
+import zipfile
+from collections import Counter
+from contextlib import redirect_stdout
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.exceptions import BadRequest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from . import metrics
+from .bulk_import import BulkImportNotSupported
+from .benachrichtigungen import aget_token, broadcaster
+from .assembly import CurriculumTreeAssembler
+from .cache import CurriculumCache
+from .facets import count_facets
+from .hashes import diff_knoten, find_hash_abweichungen, get_hashes
+from .hierarchy import CURRICULUM_MODELS, PARENT_FIELDS, get_lehrplan_id, get_lehrplan_lookup, get_parent_model
+from .klassenstufen import parse_klassenstufen
+from .instrumentation import QueryBudgetExceeded, QueryBudgetTestMixin
+from .models import (
+    Aenderung, AenderungsBereinigung, KnotenHash, Lehrplan, LehrplanStatistik, Lernbereich, Lernziel,
+    LernzielBeschreibung, Teilziel, TeilzielBeschreibung, Lerninhalt, LerninhaltBeschreibung, VergleichsKennzahl
+)
+from .pfade import find_pfad_abweichungen
+from .search import CurriculumSearchIndex
+from .statistik import FIELDS as STATISTIK_FIELDS, find_abweichungen, get_subtree_deltas
+from .synthetic import generate_curricula
+from .vergleich import find_kennzahl_abweichungen
+from .views.async_views import AsyncLehrplanEventsView
+from .views.get_curriculum_view import LehrplanAllView, LehrplanListView
+from .views.serializers import CurriculumSerializer
+
+
+def create_lehrplan(bundesland, fach, klassenstufen, lernbereiche=2):
+    """Legt einen Lehrplan mit vollständiger Hierarchie und je einer Beschreibung an."""
+    lehrplan = Lehrplan.objects.create(bundesland=bundesland, fach=fach, klassenstufen=klassenstufen)
+    for nummer in range(1, lernbereiche + 1):
+        lernbereich = Lernbereich.objects.create(
+            lehrplan=lehrplan, nummer=nummer, name=f"Lernbereich {nummer}", unterrichtsstunden=10
+        )
+        lernziel = Lernziel.objects.create(lernbereich=lernbereich, name="Lernziel")
+        LernzielBeschreibung.objects.create(lernziel=lernziel, text="Beschreibung")
+        teilziel = Teilziel.objects.create(lernziel=lernziel, name="Teilziel")
+        TeilzielBeschreibung.objects.create(teilziel=teilziel, text="Beschreibung")
+        lerninhalt = Lerninhalt.objects.create(teilziel=teilziel, name="Lerninhalt")
+        LerninhaltBeschreibung.objects.create(lerninhalt=lerninhalt, text="Beschreibung")
+    return lehrplan
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN wird nur für SQLite geprüft")
+class QueryPlanTests(TestCase):
+    """
+    Stellt sicher, dass die häufigsten Abfragen über Indizes beantwortet werden.
+
+    Jede Abfrage wird mit EXPLAIN QUERY PLAN untersucht. Ein Test schlägt fehl, wenn eine
+    Abfrage das Ergebnis nachträglich sortiert (USE TEMP B-TREE) oder eine Tabelle ohne
+    Index durchläuft. Aggregatabfragen (Gesamtzahl, Versionsstempel) lesen die gesamte
+    gefilterte Menge und dürfen die Tabelle durchlaufen, aber ebenfalls nicht sortieren.
+    """
+
+    # Planzeile eines Tabellendurchlaufs ohne Index, z. B. "SCAN curriculum_lehrplan"
+    FULL_SCAN = re.compile(r'^SCAN \w+$')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplaene = [
+            create_lehrplan('Sachsen', 'Mathematik', '5'),
+            create_lehrplan('Sachsen', 'Deutsch', '5,6'),
+            create_lehrplan('Bayern', 'Mathematik', '7-9'),
+        ]
+
+    def setUp(self):
+        CurriculumCache.get_backend().clear()
+
+    def assertIndexedQueries(self, queries):
+        """Prüft die Ausführungspläne aller SELECT-Abfragen."""
+        checked = 0
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = [row[3] for row in cursor.fetchall()]
+                message = f"{sql}\n{plan}"
+                self.assertFalse([step for step in plan if 'USE TEMP B-TREE' in step], message)
+                if 'COUNT(' not in sql:
+                    self.assertFalse([step for step in plan if self.FULL_SCAN.match(step)], message)
+                checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_serializer_prefetch_queries(self):
+        lehrplan_id = self.lehrplaene[0].id
+        with CaptureQueriesContext(connection) as context:
+            lehrplan = (
+                Lehrplan.objects
+                .prefetch_related(*CurriculumSerializer.get_prefetch_related_fields())
+                .get(pk=lehrplan_id)
+            )
+            CurriculumSerializer.serialize_curriculum(lehrplan)
+        self.assertIndexedQueries(context.captured_queries)
+
+    def test_serializer_flat_queries(self):
+        ids = [lehrplan.id for lehrplan in self.lehrplaene]
+        with CaptureQueriesContext(connection) as context:
+            CurriculumSerializer.serialize_curricula()
+            CurriculumSerializer.serialize_curricula(ids)
+            CurriculumSerializer.serialize_curricula(ids[:1], depth=2, beschreibungen=False)
+        self.assertIndexedQueries(context.captured_queries)
+
+    def test_flat_queries_keep_standard_ordering(self):
+        ids = [lehrplan.id for lehrplan in self.lehrplaene]
+        trees = CurriculumSerializer.serialize_curricula(ids)
+        self.assertEqual([tree["Fach"] for tree in trees], ['Mathematik', 'Deutsch', 'Mathematik'])
+        self.assertEqual([tree["Bundesland"] for tree in trees], ['Bayern', 'Sachsen', 'Sachsen'])
+
+    def test_list_view_queries(self):
+        urls = [
+            '/curriculum/curricula/list/',
+            '/curriculum/curricula/list/?bundesland=Sachsen',
+            '/curriculum/curricula/list/?fach=Mathematik',
+            '/curriculum/curricula/list/?bundesland=Sachsen&fach=Mathematik',
+            '/curriculum/curricula/list/?klassenstufe=5',
+            '/curriculum/curricula/list/?pagination=cursor&bundesland=Sachsen',
+            '/curriculum/curricula/summary/?bundesland=Sachsen',
+            '/curriculum/changes/?since=0&page_size=20',
+        ]
+        with CaptureQueriesContext(connection) as context:
+            for url in urls:
+                self.assertEqual(self.client.get(url).status_code, 200, url)
+        self.assertIndexedQueries(context.captured_queries)
+
+    def test_detail_and_subtree_queries(self):
+        lehrplan = self.lehrplaene[0]
+        lernbereich = lehrplan.lernbereiche.first()
+        lernziel = lernbereich.lernziele.first()
+        teilziel = lernziel.teilziele.first()
+        urls = [
+            f'/curriculum/curriculum/{lehrplan.id}/',
+            f'/curriculum/curricula/batch/?ids={lehrplan.id},{self.lehrplaene[1].id}',
+            f'/curriculum/lernbereich/{lernbereich.id}/',
+            f'/curriculum/lernziel/{lernziel.id}/',
+            f'/curriculum/teilziel/{teilziel.id}/',
+            f'/curriculum/curriculum/{lehrplan.id}/hashes/?depth=4',
+            f'/curriculum/curricula/diff/?a={lehrplan.id}&b={self.lehrplaene[1].id}',
+        ]
+        with CaptureQueriesContext(connection) as context:
+            for url in urls:
+                self.assertEqual(self.client.get(url).status_code, 200, url)
+        self.assertIndexedQueries(context.captured_queries)
+
+    def test_hierarchy_path_queries(self):
+        lernbereich = self.lehrplaene[0].lernbereiche.first()
+        lerninhalt = Lerninhalt.objects.filter(teilziel__lernziel__lernbereich=lernbereich).first()
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(get_lehrplan_id(lerninhalt), self.lehrplaene[0].id)
+            paths = CurriculumSerializer.serialize_paths([(4, lerninhalt.id), (1, lernbereich.id)])
+            deltas = get_subtree_deltas(lernbereich)
+        self.assertEqual(len(context.captured_queries), 3)
+        self.assertEqual([len(paths[(4, lerninhalt.id)]), len(paths[(1, lernbereich.id)])], [5, 2])
+        self.assertEqual((deltas['lernziele'], deltas['teilziele'], deltas['lerninhalte']), (1, 1, 1))
+        self.assertIndexedQueries(context.captured_queries)
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """
+    Prüft die Abfragebudgets der Endpunkte (siehe curriculum.instrumentation).
+
+    In Tests löst die Middleware bei überschrittenem Budget QueryBudgetExceeded aus, sodass
+    jeder Aufruf eines Endpunkts mit Budget dieses auch prüft. Die Bäume sind größer als in
+    QueryPlanTests, damit eine Abfrage je Knoten auffällt.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplaene = [
+            create_lehrplan('Sachsen', 'Mathematik', '5', lernbereiche=6),
+            create_lehrplan('Sachsen', 'Deutsch', '5,6', lernbereiche=4),
+        ]
+        cls.staff = User.objects.create_user('redaktion', password='geheim', is_staff=True)
+
+    def setUp(self):
+        CurriculumCache.get_backend().clear()
+
+    def test_detail_cold_cache(self):
+        lehrplan_id = self.lehrplaene[0].id
+        with self.assertMaxQueries(9):
+            response = self.client.get(f'/curriculum/curriculum/{lehrplan_id}/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertMaxQueries(1):
+            response = self.client.get(f'/curriculum/curriculum/{lehrplan_id}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_detail(self):
+        lehrplan = self.lehrplaene[0]
+        url = f'/curriculum/curriculum/{lehrplan.id}/'
+        etag = self.client.get(url)['ETag']
+        with self.assertMaxQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Ohne captureOnCommitCallbacks läuft keine Invalidierung, wie in einem anderen Worker-Prozess
+        lerninhalt = Lerninhalt.objects.filter(teilziel__lernziel__lernbereich__lehrplan=lehrplan).first()
+        lerninhalt.name = "Geändert"
+        lerninhalt.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_endpoints_within_budget(self):
+        lehrplan, other = self.lehrplaene
+        lernbereich = lehrplan.lernbereiche.first()
+        lernziel = lernbereich.lernziele.first()
+        urls = [
+            f'/curriculum/curricula/batch/?ids={lehrplan.id},{other.id}',
+            f'/curriculum/lernbereich/{lernbereich.id}/',
+            f'/curriculum/lernziel/{lernziel.id}/',
+            f'/curriculum/teilziel/{lernziel.teilziele.first().id}/',
+            f'/curriculum/curriculum/{lehrplan.id}/hashes/?depth=4',
+            f'/curriculum/curricula/diff/?a={lehrplan.id}&b={other.id}',
+            '/curriculum/curricula/list/?bundesland=Sachsen',
+            '/curriculum/curricula/summary/',
+            '/curriculum/changes/?since=0',
+        ]
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+    def test_admin_changelists_within_budget(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='geheim'))
+        for model in ('lehrplan', 'lernbereich', 'lernziel', 'teilzielbeschreibung', 'lerninhalt'):
+            url = f'/admin/curriculum/{model}/'
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+    def test_budget_exceeded(self):
+        with mock.patch.object(LehrplanListView, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/curriculum/curricula/list/')
+
+    def test_profile_request_keeps_budget(self):
+        # Ohne Staff-Rechte schaltet ein angefordertes Profil das Budget nicht ab
+        with mock.patch.object(LehrplanListView, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/curriculum/curricula/list/?_profile=1')
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/curriculum/curricula/list/', HTTP_X_CURRICULUM_PROFILE='text')
+            self.client.force_login(self.staff)
+            response = self.client.get('/curriculum/curricula/list/?_profile=1')
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+    def test_server_timing_for_staff_only(self):
+        url = f'/curriculum/curriculum/{self.lehrplaene[0].id}/'
+        self.assertNotIn('Server-Timing', self.client.get(url).headers)
+        self.client.force_login(self.staff)
+        CurriculumCache.get_backend().clear()
+        header = self.client.get(url).headers['Server-Timing']
+        self.assertRegex(header, r'^db;dur=[\d.]+;desc="\d+ Abfragen", serialize;dur=[\d.]+')
+        self.assertIn('sql1;dur=', header)
+
+    def test_profile_for_staff_only(self):
+        url = f'/curriculum/curriculum/{self.lehrplaene[0].id}/?_profile=1'
+        with mock.patch('cProfile.Profile') as profile:
+            response = self.client.get(url)
+        profile.assert_not_called()
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.client.force_login(self.staff)
+        CurriculumCache.get_backend().clear()
+        response = self.client.get(url)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        report = response.content.decode()
+        self.assertRegex(report, r'SQL +[\d.]+ ms  \([1-9]\d* Abfragen\)')
+        for section in ('Serialisierung', 'JSON-Kodierung', 'curriculum/assembly.py'):
+            self.assertIn(section, report)
+
+    def test_profile_pstats_and_store(self):
+        self.client.force_login(self.staff)
+        url = f'/curriculum/curriculum/{self.lehrplaene[0].id}/'
+        response = self.client.get(url, HTTP_X_CURRICULUM_PROFILE='pstats')
+        self.assertIn('attachment', response['Content-Disposition'])
+        with tempfile.NamedTemporaryFile(suffix='.pstats', delete=False) as f:
+            f.write(response.content)
+        self.addCleanup(os.remove, f.name)
+        self.assertTrue(pstats.Stats(f.name).total_calls)
+
+        url += '?_profile=store'
+        self.assertEqual(self.client.get(url).status_code, 400)
+        with tempfile.TemporaryDirectory() as directory, self.settings(CURRICULUM_PROFILE_DIR=directory):
+            response = self.client.get(url)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertEqual(os.listdir(directory), [response['X-Curriculum-Profile']])
+
+
+class CurriculumCacheTests(TestCase):
+    """
+    Prüft, dass gecachte Lehrplanbäume nach jeder Änderung an einer der acht Ebenen veralten.
+
+    Die Tests führen keine on_commit-Callbacks aus, wie in einem Worker-Prozess, der die
+    Änderung nicht selbst geschrieben hat; maßgeblich ist allein die Version im Cache-Schlüssel.
+    """
+
+    def setUp(self):
+        CurriculumCache.get_backend().clear()
+        # Je ein Zweig für jede Ebene, da ein verschobener Knoten seinen Teilbaum mitnimmt
+        self.lehrplan = create_lehrplan('Sachsen', 'Mathematik', '5', lernbereiche=len(CURRICULUM_MODELS))
+        self.other = create_lehrplan('Bayern', 'Deutsch', '6')
+
+    def get_tree(self, lehrplan_id):
+        response = self.client.get(f'/curriculum/curriculum/{lehrplan_id}/')
+        return response.json() if response.status_code == 200 else None
+
+    def assertTreesCurrent(self):
+        for lehrplan_id in (self.lehrplan.id, self.other.id):
+            fresh = CurriculumSerializer.serialize_curricula([lehrplan_id])
+            self.assertEqual(self.get_tree(lehrplan_id), fresh[0] if fresh else None, lehrplan_id)
+
+    def get_node(self, model, lehrplan):
+        return model.objects.filter(**{get_lehrplan_lookup(model): lehrplan.id}).order_by('id').first()
+
+    def warm(self):
+        self.assertIsNotNone(self.get_tree(self.lehrplan.id))
+        self.assertIsNotNone(self.get_tree(self.other.id))
+
+    def test_save(self):
+        for model in CURRICULUM_MODELS:
+            with self.subTest(model=model.__name__):
+                self.warm()
+                node = self.get_node(model, self.lehrplan)
+                field = 'fach' if model is Lehrplan else 'text' if model.__name__.endswith('Beschreibung') else 'name'
+                setattr(node, field, f"Geändert {model.__name__}")
+                node.save()
+                self.assertTreesCurrent()
+
+    def test_move(self):
+        for model in PARENT_FIELDS:
+            with self.subTest(model=model.__name__):
+                self.warm()
+                node = self.get_node(model, self.lehrplan)
+                parent_model = get_parent_model(model)
+                setattr(node, PARENT_FIELDS[model], self.get_node(parent_model, self.other))
+                if model is Lernbereich:
+                    node.nummer = 99
+                node.save()
+                self.assertTreesCurrent()
+
+    def test_delete(self):
+        for model in reversed(CURRICULUM_MODELS):
+            with self.subTest(model=model.__name__):
+                self.warm()
+                self.get_node(model, self.lehrplan).delete()
+                self.assertTreesCurrent()
+        self.assertIsNone(self.get_tree(self.lehrplan.id))
+
+    def test_stale_reader_after_write(self):
+        stale_tree = self.get_tree(self.lehrplan.id)
+        stale_version = Lehrplan.objects.get(pk=self.lehrplan.id).version
+        lerninhalt = self.get_node(Lerninhalt, self.lehrplan)
+        lerninhalt.name = "Geändert"
+        lerninhalt.save()
+        # Ein Leser, der den alten Stand vor dem Commit geladen hat, schreibt ihn erst danach
+        CurriculumCache.set_many({self.lehrplan.id: stale_tree}, {self.lehrplan.id: stale_version})
+        self.assertTreesCurrent()
+
+
+
+
+class TreeOptionsTests(TestCase):
+    """Prüft depth, fields und exclude (siehe CurriculumSerializer.parse_tree_options und prune)."""
+
+    BESCHREIBUNG_TABLES = ('curriculum_lernzielbeschreibung', 'curriculum_teilzielbeschreibung',
+                           'curriculum_lerninhaltbeschreibung')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplan = create_lehrplan('Sachsen', 'Mathematik', '5')
+        cls.url = f'/curriculum/curriculum/{cls.lehrplan.id}/'
+
+    def setUp(self):
+        CurriculumCache.get_backend().clear()
+
+    def get_tree(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def collect_keys(self, tree, level=0, keys=None):
+        """Sammelt die Schlüssel aller Knoten je Ebene."""
+        keys = keys if keys is not None else {}
+        keys.setdefault(level, set()).update(tree)
+        if level < CurriculumSerializer.MAX_DEPTH:
+            for child in tree.get(CurriculumSerializer.CHILD_KEYS[level], []):
+                self.collect_keys(child, level + 1, keys)
+        return keys
+
+    def test_parse(self):
+        parse = CurriculumSerializer.parse_tree_options
+        self.assertIsNone(parse(QueryDict('')))
+        self.assertIsNone(parse(QueryDict('fields=&exclude=')))
+        options = parse(QueryDict('depth=1&fields=id,name,Lernbereich_Nummer'))
+        self.assertEqual(options['depth'], 1)
+        self.assertEqual(options['keys'][0], {'Lehrplan_id'})
+        self.assertEqual(options['keys'][1], {'Lernbereich_id', 'Lernbereich_name', 'Lernbereich_Nummer'})
+        options = parse(QueryDict('exclude=beschreibungen,Fach'))
+        self.assertEqual(options['depth'], CurriculumSerializer.MAX_DEPTH)
+        self.assertEqual(options['keys'][0], {'Lehrplan_id', 'Klassenstufen', 'Bundesland'})
+        self.assertEqual(options['keys'][2], {'Lernziel_id', 'Lernziel_name'})
+        self.assertFalse(CurriculumSerializer.needs_beschreibungen(options))
+        self.assertFalse(CurriculumSerializer.needs_beschreibungen(parse(QueryDict('depth=1'))))
+        self.assertTrue(CurriculumSerializer.needs_beschreibungen(parse(QueryDict('depth=2'))))
+
+    def test_invalid_values(self):
+        for query in ('depth=x', 'depth=-1', f'depth={CurriculumSerializer.MAX_DEPTH + 1}', 'depth=',
+                      'fields=id,unbekannt', 'exclude=Lernziel_Name'):
+            with self.subTest(query=query):
+                with self.assertRaises(BadRequest):
+                    CurriculumSerializer.parse_tree_options(QueryDict(query))
+                self.assertEqual(self.client.get(f'{self.url}?{query}').status_code, 400)
+
+    def test_depth_fields_exclude(self):
+        self.assertEqual(self.get_tree(depth=0), {
+            'Lehrplan_id': self.lehrplan.id, 'Klassenstufen': '5', 'Bundesland': 'Sachsen', 'Fach': 'Mathematik'
+        })
+        tree = self.get_tree(depth=1, fields='id,name,nummer')
+        self.assertEqual(set(tree), {'Lehrplan_id', 'Lernbereiche'})
+        self.assertEqual([set(child) for child in tree['Lernbereiche']], [
+            {'Lernbereich_id', 'Lernbereich_name', 'Lernbereich_Nummer'}
+        ] * 2)
+        keys = self.collect_keys(self.get_tree(exclude='beschreibungen'))
+        self.assertEqual(sorted(keys), [0, 1, 2, 3, 4])
+        self.assertEqual(keys[4], {'Lerninhalt_id', 'Lerninhalt_name'})
+        keys = self.collect_keys(self.get_tree(depth=3, fields='Teilziel_beschreibungen'))
+        self.assertEqual(keys, {0: {'Lernbereiche'}, 1: {'Lernziele'}, 2: {'Teilziele'}, 3: {'Teilziel_beschreibungen'}})
+
+    def test_cached_and_uncached_trees_agree(self):
+        queries = ({'depth': '2'}, {'fields': 'id,beschreibungen'}, {'exclude': 'name,Fach'},
+                   {'depth': '4', 'fields': 'Lerninhalt_name', 'exclude': 'id'})
+        # Kalter Cache: eingeschränkt geladen und nicht gecacht
+        versions = dict(Lehrplan.objects.values_list('id', 'version'))
+        uncached = [self.get_tree(**params) for params in queries]
+        self.assertEqual(CurriculumCache.get_many(versions), {})
+
+        # Warmer Cache: aus dem vollständigen Baum reduziert, der dabei unverändert bleibt
+        full = self.get_tree()
+        self.assertEqual(len(CurriculumCache.get_many(versions)), 1)
+        with self.assertNumQueries(1):
+            cached = [self.get_tree(**params) for params in queries[:1]]
+        cached += [self.get_tree(**params) for params in queries[1:]]
+        self.assertEqual(cached, uncached)
+        self.assertEqual(self.get_tree(), full)
+        for params, tree in zip(queries, uncached):
+            options = CurriculumSerializer.parse_tree_options(QueryDict(urlencode(params)))
+            self.assertEqual(CurriculumSerializer.prune(full, options), tree, params)
+
+    def test_beschreibungen_loaded_only_when_requested(self):
+        def tables(**params):
+            with CaptureQueriesContext(connection) as context:
+                self.get_tree(**params)
+            return {table for table in self.BESCHREIBUNG_TABLES
+                    if any(f'FROM "{table}"' in query['sql'] for query in context.captured_queries)}
+
+        self.assertEqual(tables(exclude='beschreibungen'), set())
+        self.assertEqual(tables(depth=1), set())
+        self.assertEqual(tables(depth=2, fields='id'), set())
+        self.assertEqual(tables(depth=2), {'curriculum_lernzielbeschreibung'})
+        self.assertEqual(tables(fields='Teilziel_beschreibungen'), set(self.BESCHREIBUNG_TABLES))
+        self.assertEqual(tables(), set(self.BESCHREIBUNG_TABLES))
+
+
+class BatchViewTests(TestCase):
+    """Prüft /curricula/batch/ (siehe LehrplanBatchView)."""
+
+    url = '/curriculum/curricula/batch/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplaene = [
+            create_lehrplan('Sachsen', 'Mathematik', '5'),
+            create_lehrplan('Bayern', 'Deutsch', '6', lernbereiche=1),
+            Lehrplan.objects.create(bundesland='Hessen', fach='Leer', klassenstufen='7'),
+        ]
+
+    def setUp(self):
+        CurriculumCache.get_backend().clear()
+
+    def get_batch(self, ids, status=200, **params):
+        response = self.client.get(self.url, {'ids': ids, **params})
+        self.assertEqual(response.status_code, status, response.content)
+        return response
+
+    def test_mixed_cached_and_missing(self):
+        a, b, c = (lehrplan.id for lehrplan in self.lehrplaene)
+        missing = c + 1000
+        self.client.get(f'/curriculum/curriculum/{a}/')
+
+        serialize_curricula = CurriculumSerializer.serialize_curricula
+        with mock.patch.object(CurriculumSerializer, 'serialize_curricula', wraps=serialize_curricula) as serialize:
+            data = self.get_batch(f'{c},{missing},{a},{b},{a}').json()
+        self.assertEqual([call.args[0] for call in serialize.call_args_list], [[c, b]])
+        self.assertEqual(list(data['results']), [str(c), str(a), str(b)])
+        self.assertEqual(data['not_found'], [missing])
+        for lehrplan_id in (a, b, c):
+            self.assertEqual(data['results'][str(lehrplan_id)], CurriculumSerializer.serialize_curricula([lehrplan_id])[0])
+
+        # Jetzt liegen alle Bäume im Cache
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_batch(f'{c},{missing},{a},{b}').json(), data)
+        self.assertEqual(self.get_batch(f'{a},{b}', depth=0).json()['results'][str(b)], {
+            'Lehrplan_id': b, 'Klassenstufen': '6', 'Bundesland': 'Bayern', 'Fach': 'Deutsch'
+        })
+
+    def test_only_missing_ids(self):
+        data = self.get_batch('999998,999999').json()
+        self.assertEqual(data, {'results': {}, 'not_found': [999998, 999999]})
+
+    def test_max_size(self):
+        ids = [str(lehrplan.id) for lehrplan in self.lehrplaene]
+        with override_settings(CURRICULUM_BATCH_MAX_SIZE=3):
+            self.get_batch(','.join(ids))
+            self.get_batch(','.join(ids + ids))
+            self.get_batch(','.join(ids + ['999999']), status=400)
+        with override_settings(CURRICULUM_BATCH_MAX_SIZE=50):
+            self.get_batch(','.join(str(value) for value in range(1, 51)))
+            self.get_batch(','.join(str(value) for value in range(1, 52)), status=400)
+
+    def test_malformed_ids(self):
+        for ids in ('', ' , ', 'x', '1,x', '1.5', '-1', '+1', '1_0', '\u0663', '1e3', '9' * 19):
+            with self.subTest(ids=ids):
+                self.get_batch(ids, status=400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        lehrplan_id = self.lehrplaene[0].id
+        data = self.get_batch(f' {lehrplan_id} ,,0{lehrplan_id}').json()
+        self.assertEqual(list(data['results']), [str(lehrplan_id)])
+
+    def test_not_modified(self):
+        a, b, _ = self.lehrplaene
+        response = self.get_batch(f'{a.id},{b.id}')
+        not_modified = self.client.get(self.url, {'ids': f'{a.id},{b.id}'}, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        Lernbereich.objects.filter(lehrplan=b).get().save()
+        changed = self.client.get(self.url, {'ids': f'{a.id},{b.id}'}, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+
+class SubtreeViewTests(TestCase):
+    """Prüft die Teilbaum-Endpunkte (siehe views.get_subtree_view) und serialize_ancestors."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplan = create_lehrplan('Sachsen', 'Mathematik', '5')
+        create_lehrplan('Bayern', 'Deutsch', '6')
+        lernbereich = cls.lehrplan.lernbereiche.order_by('nummer').last()
+        lernziel = Lernziel.objects.create(lernbereich=lernbereich, name="Zweites Lernziel")
+        Teilziel.objects.create(lernziel=lernziel, name="Teilziel ohne Inhalte")
+        cls.lernziel = lernziel
+
+    def setUp(self):
+        CurriculumCache.get_backend().clear()
+
+    def get_expected_nodes(self):
+        """Liefert (URL, erwartete Antwort) für alle Knoten der Ebenen 1 bis 3 aus dem vollständigen Baum."""
+        tree = CurriculumSerializer.serialize_curricula([self.lehrplan.id])[0]
+        expected = []
+
+        def visit(node, level, pfad):
+            if level > 0:
+                name = CurriculumSerializer.LEVELS[level]
+                expected.append((f'/curriculum/{name.lower()}/{node[f"{name}_id"]}/', {"Pfad": pfad, **node}))
+            if level < 3:
+                keys = CurriculumSerializer.FIELD_KEYS[level]
+                eintrag = {keys[field]: node[keys[field]] for field in CurriculumSerializer.ANCESTOR_FIELDS[level]}
+                for child in node[CurriculumSerializer.CHILD_KEYS[level]]:
+                    visit(child, level + 1, pfad + [eintrag])
+
+        visit(tree, 0, [])
+        return expected
+
+    def test_response_shape(self):
+        expected = self.get_expected_nodes()
+        self.assertEqual(Counter(url.split('/')[2] for url, _ in expected), {'lernbereich': 2, 'lernziel': 3, 'teilziel': 3})
+        for url, data in expected:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), data)
+                self.assertEqual(list(response.json())[0], "Pfad")
+
+    def test_serialize_ancestors(self):
+        teilziel = Teilziel.objects.select_related('lernziel__lernbereich__lehrplan').get(lernziel=self.lernziel)
+        with self.assertNumQueries(0):
+            pfad = CurriculumSerializer.serialize_ancestors(teilziel)
+        lernbereich = self.lernziel.lernbereich
+        self.assertEqual(pfad, [
+            {"Lehrplan_id": self.lehrplan.id, "Klassenstufen": "5", "Bundesland": "Sachsen", "Fach": "Mathematik"},
+            {"Lernbereich_id": lernbereich.id, "Lernbereich_Nummer": lernbereich.nummer,
+             "Lernbereich_name": lernbereich.name},
+            {"Lernziel_id": self.lernziel.id, "Lernziel_name": "Zweites Lernziel"},
+        ])
+        self.assertEqual(CurriculumSerializer.serialize_ancestors(lernbereich), pfad[:1])
+        self.assertEqual(CurriculumSerializer.serialize_ancestors(self.lehrplan), [])
+        # Gleiche Form wie die Pfade aus der Closure-Tabelle ohne den Knoten selbst
+        self.assertEqual(CurriculumSerializer.serialize_paths([(3, teilziel.id)])[(3, teilziel.id)][:-1], pfad)
+
+    def test_not_found(self):
+        for name, model in (('lernbereich', Lernbereich), ('lernziel', Lernziel), ('teilziel', Teilziel)):
+            with self.subTest(name=name):
+                missing = (model.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+                self.assertEqual(self.client.get(f'/curriculum/{name}/{missing}/').status_code, 404)
+
+        teilziel = Teilziel.objects.get(lernziel=self.lernziel)
+        urls = [f'/curriculum/teilziel/{teilziel.id}/', f'/curriculum/lernziel/{self.lernziel.id}/']
+        self.assertEqual([self.client.get(url).status_code for url in urls], [200, 200])
+        Lernziel.objects.filter(id=self.lernziel.id).delete()
+        self.assertEqual([self.client.get(url).status_code for url in urls], [404, 404])
+
+    def test_not_modified(self):
+        url = f'/curriculum/lernziel/{self.lernziel.id}/'
+        response = self.client.get(url)
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': response['ETag']}).status_code, 304)
+
+        # Jede Änderung am Lehrplan erneuert die Validatoren aller seiner Teilbäume
+        Lerninhalt.objects.filter(teilziel__lernziel__lernbereich__lehrplan=self.lehrplan).first().save()
+        changed = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json(), response.json())
+
+
+class SearchViewTests(TestCase):
+    """Prüft Rangfolge, Pfade und Indexpflege der Volltextsuche (siehe curriculum.search)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        lehrplan = create_lehrplan('Sachsen', 'Mathematik', '6', lernbereiche=1)
+        lernbereich = lehrplan.lernbereiche.get()
+        cls.lernziel = Lernziel.objects.create(lernbereich=lernbereich, name="Bruchrechnung")
+        cls.teilziel = Teilziel.objects.create(lernziel=cls.lernziel, name="Anteile")
+        TeilzielBeschreibung.objects.create(teilziel=cls.teilziel, text="Anteile als Bruchrechnung darstellen")
+        cls.lerninhalt = Lerninhalt.objects.create(teilziel=cls.teilziel, name="Kürzen von Anteilen")
+        if CurriculumSearchIndex.is_available():
+            CurriculumSearchIndex.rebuild()
+
+    def setUp(self):
+        if not CurriculumSearchIndex.is_available():
+            self.skipTest("Die Volltextsuche benötigt SQLite mit FTS5")
+
+    def search(self, q, status=200, **params):
+        response = self.client.get('/curriculum/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, status)
+        return response.json() if status == 200 else None
+
+    def test_ranking(self):
+        data = self.search('Bruch')
+        # Präfixsuche; der Treffer im Namen steht vor dem Treffer in der Beschreibung
+        self.assertEqual(
+            [(hit['Typ'], hit[f"{hit['Typ']}_id"]) for hit in data['results']],
+            [('Lernziel', self.lernziel.id), ('Teilziel', self.teilziel.id)]
+        )
+        self.assertGreater(data['results'][0]['Rang'], data['results'][1]['Rang'])
+        self.assertEqual(data['results'][0]['Ausschnitt'], "<mark>Bruchrechnung</mark>")
+        self.assertEqual(data['pagination']['total_items'], 2)
+
+        self.assertEqual([hit['Typ'] for hit in self.search('Bruch', typ='teilziel')['results']], ['Teilziel'])
+        self.assertEqual(self.search('Bruch Anteile')['pagination']['total_items'], 1)
+        # remove_diacritics: "Kurzen" findet "Kürzen"
+        self.assertEqual(self.search('kurzen')['results'][0]['Lerninhalt_id'], self.lerninhalt.id)
+
+    def test_breadcrumbs(self):
+        hits = self.search('Anteile Kürzen')['results'] + self.search('Bruch')['results']
+        self.assertEqual(len(hits), 3)
+        for hit in hits:
+            with self.subTest(typ=hit['Typ']):
+                model = {'Lernziel': Lernziel, 'Teilziel': Teilziel, 'Lerninhalt': Lerninhalt}[hit['Typ']]
+                node = model.objects.get(id=hit[f"{hit['Typ']}_id"])
+                self.assertEqual(hit['Pfad'], CurriculumSerializer.serialize_ancestors(node))
+                self.assertEqual(hit[f"{hit['Typ']}_name"], node.name)
+
+    def test_reindex_on_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lerninhalt.name = "Erweitern von Anteilen"
+            self.lerninhalt.save()
+        self.assertEqual(self.search('Kürzen')['results'], [])
+        self.assertEqual(self.search('Erweitern')['results'][0]['Lerninhalt_id'], self.lerninhalt.id)
+
+        # Neue Beschreibungen erneuern das Dokument ihres Knotens
+        with self.captureOnCommitCallbacks(execute=True):
+            LerninhaltBeschreibung.objects.create(lerninhalt=self.lerninhalt, text="Hauptnenner bestimmen")
+        self.assertEqual(self.search('Hauptnenner')['results'][0]['Lerninhalt_id'], self.lerninhalt.id)
+
+    def test_reindex_on_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Teilziel.objects.filter(id=self.teilziel.id).delete()
+        # Mit dem Teilziel wird auch sein Lerninhalt aus dem Index entfernt
+        self.assertEqual([hit['Typ'] for hit in self.search('Bruch')['results']], ['Lernziel'])
+        self.assertEqual(self.search('Kürzen')['results'], [])
+
+    def test_snippet_escaped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            LerninhaltBeschreibung.objects.create(
+                lerninhalt=self.lerninhalt, text='<img src=x onerror="alert(1)"> Hauptnenner & Co'
+            )
+        ausschnitt = self.search('Hauptnenner')['results'][0]['Ausschnitt']
+        self.assertEqual(ausschnitt, '&lt;img src=x onerror=&quot;alert(1)&quot;&gt; <mark>Hauptnenner</mark> &amp; Co')
+        self.assertEqual(CurriculumSearchIndex.format_snippet('<b>\x02Bruch\x03'), '&lt;b&gt;<mark>Bruch</mark>')
+
+    def test_fts_syntax_rejected(self):
+        for q in ['"', '*', 'NEAR(', 'NEAR(Bruch Anteile)', 'Bruch*', '"Bruchrechnung"', 'name:Bruch', '^Bruch', '']:
+            with self.subTest(q=q):
+                self.search(q, status=400)
+        with self.assertRaises(ValueError):
+            CurriculumSearchIndex.build_match_query('NEAR(')
+        self.assertEqual(CurriculumSearchIndex.build_match_query(' Bruch  NEAR '), '"Bruch"* "NEAR"*')
+
+class StreamingTests(TestCase):
+    """Prüft /curricula/all/?stream=1 gegen die nicht gestreamte Antwort."""
+
+    url = '/curriculum/curricula/all/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplaene = [
+            create_lehrplan('Sachsen', 'Mathematik', '5'),
+            Lehrplan.objects.create(bundesland='Bayern', fach='Leer', klassenstufen='6'),
+            create_lehrplan('Bayern', 'Deutsch', '7', lernbereiche=3),
+            create_lehrplan('Hessen', 'Ethik', 'Ä, Ö', lernbereiche=1),
+            Lehrplan.objects.create(bundesland='Berlin', fach='Sport', klassenstufen='5-7'),
+        ]
+
+    def setUp(self):
+        CurriculumCache.get_backend().clear()
+
+    def get_both(self, **params):
+        streamed = self.client.get(self.url, {**params, 'stream': '1'})
+        self.assertTrue(streamed.streaming)
+        streamed_content = b''.join(streamed.streaming_content)
+        plain = self.client.get(self.url, {**params, 'stream': '0'})
+        self.assertFalse(plain.streaming)
+        return streamed_content, plain.content
+
+    def get_cached_ids(self):
+        versions = dict(Lehrplan.objects.values_list('id', 'version'))
+        return set(CurriculumCache.get_many(versions))
+
+    def test_byte_equivalent(self):
+        with override_settings(CURRICULUM_STREAM_CHUNK_SIZE=2):
+            for params in ({}, {'depth': '1'}, {'fields': 'Lehrplan_id,Fach'}, {'exclude': 'beschreibungen'}):
+                with self.subTest(params=params):
+                    CurriculumCache.get_backend().clear()
+                    streamed, plain = self.get_both(**params)
+                    self.assertEqual(streamed, plain)
+                    # Mit warmem Cache ebenso
+                    self.assertEqual(self.get_both(**params), (plain, plain))
+        self.assertEqual(len(json.loads(plain)), len(self.lehrplaene))
+
+    def test_chunk_size_setting(self):
+        for chunk_size in (1, 2):
+            with self.subTest(chunk_size=chunk_size), override_settings(CURRICULUM_STREAM_CHUNK_SIZE=chunk_size):
+                load_trees = mock.patch.object(
+                    LehrplanAllView, 'load_trees', autospec=True, side_effect=LehrplanAllView.load_trees
+                )
+                with load_trees as load_trees:
+                    b''.join(self.client.get(self.url, {'stream': '1'}).streaming_content)
+                self.assertEqual(load_trees.call_count, math.ceil(len(self.lehrplaene) / chunk_size))
+
+    def test_empty(self):
+        Lehrplan.objects.all().delete()
+        streamed, plain = self.get_both()
+        self.assertEqual(streamed, plain)
+        self.assertEqual(json.loads(streamed), [])
+
+    def test_stream_does_not_populate_cache(self):
+        b''.join(self.client.get(self.url, {'stream': '1'}).streaming_content)
+        self.assertEqual(self.get_cached_ids(), set())
+
+        # Gecachte Bäume werden beim Streamen weiter gelesen
+        self.client.get(f'/curriculum/curriculum/{self.lehrplaene[0].id}/')
+        self.assertEqual(self.get_cached_ids(), {self.lehrplaene[0].id})
+        serialize_curricula = CurriculumSerializer.serialize_curricula
+        with mock.patch.object(CurriculumSerializer, 'serialize_curricula', wraps=serialize_curricula) as serialize:
+            b''.join(self.client.get(self.url, {'stream': '1'}).streaming_content)
+        built = {lehrplan_id for call in serialize.call_args_list for lehrplan_id in call.args[0]}
+        self.assertEqual(built, {lehrplan.id for lehrplan in self.lehrplaene[1:]})
+        self.assertEqual(self.get_cached_ids(), {self.lehrplaene[0].id})
+
+        with override_settings(CURRICULUM_STREAM_POPULATE_CACHE=True):
+            b''.join(self.client.get(self.url, {'stream': '1'}).streaming_content)
+        self.assertEqual(self.get_cached_ids(), {lehrplan.id for lehrplan in self.lehrplaene})
+
+        # Die nicht gestreamte Antwort cacht wie bisher
+        CurriculumCache.get_backend().clear()
+        self.client.get(self.url)
+        self.assertEqual(self.get_cached_ids(), {lehrplan.id for lehrplan in self.lehrplaene})
+
+
+class TreeAssemblerTests(TestCase):
+    """Vergleicht die flache Assemblierung (curriculum.assembly) mit der Serialisierung über Modellinstanzen."""
+
+    @classmethod
+    def setUpTestData(cls):
+        lehrplan = create_lehrplan('Sachsen', 'Mathematik', '5')
+        # Leere Ebenen: Lernbereich ohne Lernziele, Lernziel ohne Teilziele, Teilziel ohne Lerninhalte
+        Lernbereich.objects.create(lehrplan=lehrplan, nummer=0, name="Ohne Lernziele", unterrichtsstunden=4)
+        lernbereich = lehrplan.lernbereiche.get(nummer=2)
+        Lernziel.objects.create(lernbereich=lernbereich, name="Ohne Teilziele")
+        lernziel = Lernziel.objects.create(lernbereich=lernbereich, name="Mehrere Beschreibungen")
+        for text in ("Zweitens", "Erstens", "Drittens"):
+            LernzielBeschreibung.objects.create(lernziel=lernziel, text=text)
+        teilziel = Teilziel.objects.create(lernziel=lernziel, name="Ohne Lerninhalte")
+        TeilzielBeschreibung.objects.create(teilziel=teilziel, text="B")
+        TeilzielBeschreibung.objects.create(teilziel=teilziel, text="A")
+        erstes_teilziel = Teilziel.objects.filter(lernziel__lernbereich=lernbereich).order_by('id').first()
+        lerninhalt = Lerninhalt.objects.create(teilziel=erstes_teilziel, name="Zweiter Lerninhalt")
+        for text in ("Y", "X"):
+            LerninhaltBeschreibung.objects.create(lerninhalt=lerninhalt, text=text)
+
+        # Lehrplan ohne Lernbereiche und ein weiterer mit gleicher Facette
+        Lehrplan.objects.create(bundesland='Sachsen', fach='Mathematik', klassenstufen='5')
+        Lehrplan.objects.create(bundesland='Bayern', fach='Deutsch', klassenstufen='6')
+        create_lehrplan('Bayern', 'Deutsch', '5', lernbereiche=1)
+
+    def serialize_models(self, depth, beschreibungen):
+        lehrplaene = Lehrplan.objects.order_by(*Lehrplan._meta.ordering, 'id')
+        return [CurriculumSerializer.serialize_curriculum(lehrplan, depth, beschreibungen) for lehrplan in lehrplaene]
+
+    def test_equals_serialize_curriculum(self):
+        lehrplan_ids = list(Lehrplan.objects.values_list('id', flat=True))
+        for depth in range(CurriculumTreeAssembler.MAX_DEPTH + 1):
+            for beschreibungen in (True, False):
+                with self.subTest(depth=depth, beschreibungen=beschreibungen):
+                    expected = self.serialize_models(depth, beschreibungen)
+                    self.assertEqual(CurriculumTreeAssembler.assemble(depth=depth, beschreibungen=beschreibungen), expected)
+                    self.assertEqual(
+                        CurriculumTreeAssembler.assemble(reversed(lehrplan_ids), depth=depth, beschreibungen=beschreibungen),
+                        expected
+                    )
+
+    def test_empty_levels_and_beschreibungen(self):
+        tree = next(
+            data for data in CurriculumTreeAssembler.assemble()
+            if data['Bundesland'] == 'Sachsen' and data['Lernbereiche']
+        )
+        self.assertEqual([lb['Lernbereich_Nummer'] for lb in tree['Lernbereiche']], [0, 1, 2])
+        self.assertEqual(tree['Lernbereiche'][0]['Lernziele'], [])
+        lernziele = tree['Lernbereiche'][2]['Lernziele']
+        self.assertEqual([lz['Lernziel_name'] for lz in lernziele], ["Lernziel", "Ohne Teilziele", "Mehrere Beschreibungen"])
+        self.assertEqual(lernziele[1]['Teilziele'], [])
+        # Beschreibungen in der Reihenfolge ihrer Anlage, nicht alphabetisch
+        self.assertEqual(lernziele[2]['Lernziel_Beschreibungen'], ["Zweitens", "Erstens", "Drittens"])
+        self.assertEqual(lernziele[2]['Teilziele'][0]['Teilziel_beschreibungen'], ["B", "A"])
+        self.assertEqual(lernziele[2]['Teilziele'][0]['Lerninhalte'], [])
+        self.assertEqual(
+            [li['Lerninhalt_beschreibungen'] for li in lernziele[0]['Teilziele'][0]['Lerninhalte']],
+            [["Beschreibung"], ["Y", "X"]]
+        )
+
+        self.assertEqual(CurriculumTreeAssembler.assemble([]), [])
+        self.assertEqual(CurriculumTreeAssembler.assemble([0]), [])
+
+class DerivedDataTests(TestCase):
+    """
+    Prüft die von den Signal-Handlern gepflegten Tabellen (siehe curriculum.signals).
+
+    Nach jedem Schritt müssen Closure-Tabelle, Kennzahlen, Vergleichswürfel und Inhaltshashes
+    einer vollständigen Neuberechnung entsprechen.
+    """
+
+    def setUp(self):
+        # Ausgeführte Callbacks werden von defer_on_commit nicht mehr erweitert
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lehrplan = create_lehrplan('Sachsen', 'Mathematik', '5, 6')
+            self.other = create_lehrplan('Bayern', 'Deutsch', '6')
+
+    def assertConsistent(self):
+        self.assertEqual(find_pfad_abweichungen(), (set(), set()))
+        self.assertEqual(find_abweichungen(), {})
+        self.assertEqual(find_kennzahl_abweichungen(), {})
+        self.assertEqual(find_hash_abweichungen(), {})
+
+    def get_node(self, model, lehrplan):
+        return model.objects.filter(**{get_lehrplan_lookup(model): lehrplan.id}).order_by('id').first()
+
+    def get_aenderungen(self, since):
+        return Counter(Aenderung.objects.filter(id__gt=since).values_list('modell', 'art'))
+
+    def test_create_move_delete(self):
+        teilziel = self.get_node(Teilziel, self.lehrplan)
+        lernbereich = self.get_node(Lernbereich, self.lehrplan)
+        lernbereich.nummer = 99
+
+        def move(node, parent):
+            setattr(node, PARENT_FIELDS[type(node)], parent)
+            node.save()
+
+        steps = [
+            ('Lerninhalt anlegen', lambda: Lerninhalt.objects.create(teilziel=teilziel, name="Sonderinhalt")),
+            ('Beschreibung anlegen', lambda: TeilzielBeschreibung.objects.create(teilziel=teilziel, text="Zweite")),
+            ('Teilziel verschieben', lambda: move(teilziel, self.get_node(Lernziel, self.other))),
+            ('Lernbereich verschieben', lambda: move(lernbereich, self.other)),
+            ('Beschreibung löschen', lambda: self.get_node(TeilzielBeschreibung, self.other).delete()),
+            ('Lernziel löschen', lambda: self.get_node(Lernziel, self.other).delete()),
+            ('Lernbereiche löschen', lambda: Lernbereich.objects.filter(lehrplan=self.other).delete()),
+            ('Lehrplan löschen', lambda: self.lehrplan.delete()),
+        ]
+        for name, step in steps:
+            with self.subTest(step=name):
+                with self.captureOnCommitCallbacks(execute=True):
+                    step()
+                self.assertConsistent()
+        if CurriculumSearchIndex.is_available():
+            self.assertEqual(CurriculumSearchIndex.count(CurriculumSearchIndex.build_match_query('Sonderinhalt')), 0)
+
+    def test_cascading_delete(self):
+        since = Aenderung.objects.order_by('-id').values_list('id', flat=True).first()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            # Mit Anpassung je gelöschtem Objekt waren es 137 Abfragen
+            with self.assertNumQueries(25):
+                self.lehrplan.delete()
+        # Ein Aufruf von index_nodes je Modell mit Volltextdokument
+        self.assertEqual(len(callbacks), 3)
+        self.assertConsistent()
+        self.assertEqual(self.get_aenderungen(since), Counter({
+            (model.__name__, Aenderung.ART_GELOESCHT): 1 if model is Lehrplan else 2 for model in CURRICULUM_MODELS
+        }))
+
+    def test_subtree_delete(self):
+        version = Lehrplan.objects.get(pk=self.lehrplan.pk).version
+        since = Aenderung.objects.order_by('-id').values_list('id', flat=True).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.get_node(Lernbereich, self.lehrplan).delete()
+        self.assertConsistent()
+        self.assertEqual(Lehrplan.objects.get(pk=self.lehrplan.pk).version, version + 1)
+        expected = Counter({(model.__name__, Aenderung.ART_GELOESCHT): 1 for model in PARENT_FIELDS})
+        expected[('Lehrplan', Aenderung.ART_GEAENDERT)] = 1
+        self.assertEqual(self.get_aenderungen(since), expected)
+
+    def test_create_queries(self):
+        teilziel = self.get_node(Teilziel, self.lehrplan)
+        # Einfügen, Vorfahren, Closure-Tabelle, Version, Protokoll, Hashes, Statistik, Würfel
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertNumQueries(8):
+                lerninhalt = Lerninhalt.objects.create(teilziel=teilziel, name="Neu")
+            LerninhaltBeschreibung.objects.create(lerninhalt=lerninhalt, text="Neu")
+        # Hashes und Volltextindex je einmal für beide Objekte
+        self.assertEqual(len(callbacks), 2)
+
+
+class VergleichTests(TestCase):
+    """Prüft den Vergleichswürfel (siehe curriculum.vergleich) und den Endpunkt /curriculum/vergleich/."""
+
+    def setUp(self):
+        self.sachsen = create_lehrplan('Sachsen', 'Mathematik', '5, 6')
+        self.sachsen_6 = create_lehrplan('Sachsen', 'Mathematik', '6', lernbereiche=1)
+        self.bayern = create_lehrplan('Bayern', 'Mathematik', '5')
+
+    def get_results(self, query):
+        response = self.client.get(f'/curriculum/vergleich/?{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def get_counts(self, query, dimension, measure='lehrplaene'):
+        return {row[dimension]: row[measure] for row in self.get_results(query)}
+
+    def test_rollup_without_klassenstufe(self):
+        self.assertEqual(self.get_counts('group_by=bundesland', 'bundesland'), {'Bayern': 1, 'Sachsen': 2})
+        self.assertEqual(self.get_counts('group_by=bundesland', 'bundesland', 'lernbereiche'), {'Bayern': 2, 'Sachsen': 3})
+        total = self.get_results('group_by=')
+        self.assertEqual(len(total), 1)
+        self.assertEqual((total[0]['lehrplaene'], total[0]['unterrichtsstunden']), (3, 50))
+
+    def test_rollup_by_klassenstufe(self):
+        # Der Lehrplan für 5 und 6 zählt in beiden Stufen, in der Summe aber nur einmal
+        self.assertEqual(self.get_counts('group_by=klassenstufe&bundesland=Sachsen', 'klassenstufe'), {5: 1, 6: 2})
+        self.assertEqual(
+            self.get_counts('group_by=klassenstufe&bundesland=Sachsen', 'klassenstufe', 'lerninhalte'), {5: 2, 6: 3}
+        )
+        self.assertEqual(self.get_counts('group_by=bundesland&bundesland=Sachsen', 'bundesland'), {'Sachsen': 2})
+        self.assertEqual(self.get_counts('group_by=bundesland&klassenstufe=6', 'bundesland'), {'Sachsen': 2})
+        self.assertEqual(
+            self.get_counts('group_by=bundesland,klassenstufe&klassenstufe=5-6', 'klassenstufe'), {5: 1, 6: 2}
+        )
+        self.assertEqual(self.client.get('/curriculum/vergleich/?group_by=bundesland&klassenstufe=5-6').status_code, 400)
+        self.assertEqual(self.client.get('/curriculum/vergleich/?group_by=schulart').status_code, 400)
+
+    def test_rekeying(self):
+        changes = [
+            ('bundesland', 'Bayern', {'Bayern': 2, 'Sachsen': 1}),
+            ('fach', 'Deutsch', {'Bayern': 1, 'Sachsen': 1}),
+            ('klassenstufen', '7', {'Bayern': 1, 'Sachsen': 1}),
+        ]
+        for field, value, expected in changes:
+            with self.subTest(field=field):
+                setattr(self.sachsen, field, value)
+                self.sachsen.save()
+                self.assertEqual(find_kennzahl_abweichungen(), {})
+                self.assertEqual(self.get_counts('group_by=bundesland&fach=Mathematik', 'bundesland'), expected)
+        self.assertEqual(self.get_counts('group_by=klassenstufe&fach=Deutsch', 'klassenstufe'), {7: 1})
+        self.assertEqual(self.get_counts('group_by=klassenstufe&fach=Mathematik', 'klassenstufe'), {5: 1, 6: 1})
+
+    def test_moves(self):
+        lernbereich = self.sachsen.lernbereiche.order_by('nummer').last()
+        lernbereich.lehrplan = self.bayern
+        lernbereich.nummer = 3
+        lernbereich.save()
+        self.assertEqual(find_kennzahl_abweichungen(), {})
+        self.assertEqual(self.get_counts('group_by=bundesland', 'bundesland', 'lernbereiche'), {'Bayern': 3, 'Sachsen': 2})
+
+        teilziel = Teilziel.objects.filter(lernziel__lernbereich__lehrplan=self.bayern).first()
+        teilziel.lernziel = Lernziel.objects.filter(lernbereich__lehrplan=self.sachsen_6).first()
+        teilziel.save()
+        self.assertEqual(find_kennzahl_abweichungen(), {})
+        self.assertEqual(self.get_counts('group_by=klassenstufe', 'klassenstufe', 'teilziele'), {5: 3, 6: 3})
+
+        self.sachsen_6.lernbereiche.get().delete()
+        self.assertEqual(find_kennzahl_abweichungen(), {})
+        self.assertEqual(self.get_counts('group_by=klassenstufe', 'klassenstufe', 'teilziele'), {5: 3, 6: 1})
+
+    def test_node_write_queries(self):
+        teilziel = Teilziel.objects.filter(lernziel__lernbereich__lehrplan=self.sachsen).first()
+        with CaptureQueriesContext(connection) as queries:
+            Lerninhalt.objects.create(teilziel=teilziel, name="Neu")
+        # Die Zellen werden in der UPDATE-Abfrage über die Lehrplan-ID aufgelöst
+        cube = [query['sql'] for query in queries.captured_queries if 'curriculum_vergleichskennzahl' in query['sql']]
+        self.assertEqual(len(cube), 1)
+        self.assertTrue(cube[0].startswith('UPDATE'))
+        self.assertEqual(find_kennzahl_abweichungen(), {})
+
+
+class HashTests(TestCase):
+    """Prüft die Inhaltshashes und den Vergleich zweier Lehrpläne (siehe curriculum.hashes)."""
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.a = create_lehrplan('Sachsen', 'Mathematik', '5')
+            self.b = create_lehrplan('Sachsen', 'Mathematik', '5')
+
+    def get_node(self, model, lehrplan, **filters):
+        return model.objects.filter(**{get_lehrplan_lookup(model): lehrplan.id}, **filters).order_by('id').first()
+
+    def summarize(self, changes):
+        return sorted((change['art'], change['ebene'], change['a'], change['b'], tuple(change['pfad'])) for change in changes)
+
+    def test_refresh_overwrites_stale_rows(self):
+        stale = {(ebene, knoten_id): (eigen, baum) for ebene, knoten_id, eigen, baum in KnotenHash.objects.values_list(
+            'ebene', 'knoten_id', 'eigen', 'baum'
+        )}
+        lerninhalt = self.get_node(Lerninhalt, self.a)
+        with self.captureOnCommitCallbacks(execute=True):
+            lerninhalt.name = "Geändert"
+            lerninhalt.save()
+            # Ein Leser mit dem Stand vor dem Commit speichert seine Hashes nach dem Verwerfen
+            KnotenHash.objects.bulk_create([
+                KnotenHash(ebene=ebene, knoten_id=knoten_id, eigen=eigen, baum=baum)
+                for (ebene, knoten_id), (eigen, baum) in stale.items()
+            ], ignore_conflicts=True)
+            self.assertEqual(get_hashes([(0, self.a.id)]), {(0, self.a.id): stale[(0, self.a.id)]})
+        self.assertEqual(find_hash_abweichungen(), {})
+        self.assertNotEqual(get_hashes([(0, self.a.id)])[(0, self.a.id)], stale[(0, self.a.id)])
+
+    def test_equal_curricula(self):
+        self.assertEqual(diff_knoten(0, self.a.id, self.b.id), [])
+        self.assertEqual(get_hashes([(0, self.a.id)])[(0, self.a.id)], get_hashes([(0, self.b.id)])[(0, self.b.id)])
+        self.assertIsNone(diff_knoten(0, self.a.id, 999999))
+
+    def test_pairing_and_subtrees(self):
+        lernbereich_a, lernbereich_b = (self.get_node(Lernbereich, lehrplan, nummer=1) for lehrplan in (self.a, self.b))
+        lernziel_a, lernziel_b = (Lernziel.objects.get(lernbereich=lernbereich) for lernbereich in (lernbereich_a, lernbereich_b))
+        teilziel_a, teilziel_b = (Teilziel.objects.get(lernziel=lernziel) for lernziel in (lernziel_a, lernziel_b))
+        other_a, other_b = (self.get_node(Lernbereich, lehrplan, nummer=2) for lehrplan in (self.a, self.b))
+        lerninhalt_a = Lerninhalt.objects.get(teilziel__lernziel__lernbereich=other_a)
+        lerninhalt_b = Lerninhalt.objects.get(teilziel__lernziel__lernbereich=other_b)
+
+        # Lernbereiche werden über die Nummer zugeordnet, auch wenn sich der Name ändert
+        lernbereich_b.name = "Umbenannt"
+        lernbereich_b.save()
+        # Ein zusätzliches Lernziel gleichen Namens wird als zweites Vorkommen zugeordnet
+        zusatz = Lernziel.objects.create(lernbereich=lernbereich_b, name="Lernziel")
+        Teilziel.objects.create(lernziel=zusatz, name="Teilziel")
+        # Ein entfernter Teilbaum erscheint einmal an seiner Wurzel
+        teilziel_b.delete()
+        # Lerninhalte werden über den Namen zugeordnet: geänderte Beschreibung bzw. Umbenennung
+        beschreibung = LerninhaltBeschreibung.objects.get(lerninhalt=lerninhalt_b)
+        beschreibung.text = "Geändert"
+        beschreibung.save()
+        neu = Lerninhalt.objects.create(teilziel=lerninhalt_b.teilziel, name="Neu")
+        alt = Lerninhalt.objects.create(teilziel=lerninhalt_a.teilziel, name="Alt")
+
+        changes = diff_knoten(0, self.a.id, self.b.id)
+        lernbereich_pfad = ((0, self.a.id, self.b.id), (1, lernbereich_a.id, lernbereich_b.id))
+        lerninhalt_pfad = (
+            (0, self.a.id, self.b.id), (1, other_a.id, other_b.id),
+            (2, lerninhalt_a.teilziel.lernziel_id, lerninhalt_b.teilziel.lernziel_id),
+            (3, lerninhalt_a.teilziel_id, lerninhalt_b.teilziel_id),
+        )
+        self.assertEqual(self.summarize(changes), sorted([
+            ('geaendert', 1, lernbereich_a.id, lernbereich_b.id, lernbereich_pfad[:1]),
+            ('hinzugefuegt', 2, None, zusatz.id, lernbereich_pfad),
+            ('entfernt', 3, teilziel_a.id, None, lernbereich_pfad + ((2, lernziel_a.id, lernziel_b.id),)),
+            ('geaendert', 4, lerninhalt_a.id, lerninhalt_b.id, lerninhalt_pfad),
+            ('entfernt', 4, alt.id, None, lerninhalt_pfad),
+            ('hinzugefuegt', 4, None, neu.id, lerninhalt_pfad),
+        ]))
+        werte = {(change['art'], change['ebene']): change['werte'] for change in changes}
+        self.assertEqual(werte[('geaendert', 1)][0]['name'], "Lernbereich 1")
+        self.assertEqual(werte[('geaendert', 1)][1]['name'], "Umbenannt")
+        self.assertEqual(werte[('geaendert', 4)], (
+            {'name': "Lerninhalt", 'beschreibungen': ["Beschreibung"]},
+            {'name': "Lerninhalt", 'beschreibungen': ["Geändert"]},
+        ))
+        self.assertEqual(werte[('entfernt', 4)], ({'name': "Alt", 'beschreibungen': []}, None))
+        self.assertEqual(werte[('entfernt', 3)][1], None)
+
+    def test_diff_view(self):
+        beschreibung = self.get_node(LerninhaltBeschreibung, self.b)
+        beschreibung.text = "Geändert"
+        beschreibung.save()
+        response = self.client.get(f'/curriculum/curricula/diff/?a={self.a.id}&b={self.b.id}')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data['gleich'])
+        [change] = data['aenderungen']
+        self.assertEqual(change['Art'], 'geaendert')
+        self.assertEqual([schritt['Typ'] for schritt in change['Pfad']], list(CurriculumSerializer.LEVELS[:4]))
+        self.assertEqual(change['Pfad'][0], {'Typ': CurriculumSerializer.LEVELS[0], 'a': self.a.id, 'b': self.b.id})
+        self.assertEqual(list(change['Felder'].values()), [{'a': ["Beschreibung"], 'b': ["Geändert"]}])
+        self.assertEqual(self.client.get(f'/curriculum/curricula/diff/?a={self.a.id}&b=999999').status_code, 404)
+        self.assertEqual(self.client.get(f'/curriculum/curricula/diff/?a={self.a.id}&b=x').status_code, 400)
+
+
+class KlassenstufenTests(TestCase):
+    """Prüft die normalisierten Klassenstufen (siehe curriculum.klassenstufen) und den Filter der Liste."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplaene = {
+            klassenstufen: Lehrplan.objects.create(bundesland='Sachsen', fach='Mathematik', klassenstufen=klassenstufen).id
+            for klassenstufen in ('5', '5a, 5b', '7-9', '3, 4, 5A', '10 bis 11', '6; 8', 'Sekundarstufe')
+        }
+
+    def get_filtered(self, klassenstufe):
+        response = self.client.get('/curriculum/curricula/list/', {'klassenstufe': klassenstufe})
+        self.assertEqual(response.status_code, 200, response.content)
+        ids = {eintrag['id'] for eintrag in response.json()['results']}
+        return {klassenstufen for klassenstufen, lehrplan_id in self.lehrplaene.items() if lehrplan_id in ids}
+
+    def test_parse_klassenstufen(self):
+        self.assertEqual(parse_klassenstufen('3, 4, 5a'), [(3, ''), (4, ''), (5, 'a')])
+        self.assertEqual(parse_klassenstufen('9-7'), [(7, ''), (8, ''), (9, '')])
+        self.assertEqual(parse_klassenstufen('10 bis 11'), [(10, ''), (11, '')])
+        self.assertEqual(parse_klassenstufen('5 – 6'), [(5, ''), (6, '')])
+        self.assertEqual(parse_klassenstufen('5A; 5b / 5a'), [(5, 'a'), (5, 'b')])
+        self.assertEqual(parse_klassenstufen('Sekundarstufe, 7'), [(7, '')])
+        self.assertEqual(parse_klassenstufen(None), [])
+
+    def test_single_and_suffix(self):
+        # Ohne Zusatz passt jede Stufe 5, mit Zusatz nur genau dieser
+        self.assertEqual(self.get_filtered('5'), {'5', '5a, 5b', '3, 4, 5A'})
+        self.assertEqual(self.get_filtered('5a'), {'5a, 5b', '3, 4, 5A'})
+        self.assertEqual(self.get_filtered('5B'), {'5a, 5b'})
+        self.assertEqual(self.get_filtered('12'), set())
+
+    def test_ranges_and_lists(self):
+        self.assertEqual(self.get_filtered('8'), {'7-9', '6; 8'})
+        self.assertEqual(self.get_filtered('8-10'), {'7-9', '6; 8', '10 bis 11'})
+        self.assertEqual(self.get_filtered('11 bis 10'), {'10 bis 11'})
+        self.assertEqual(self.get_filtered('4,11'), {'3, 4, 5A', '10 bis 11'})
+
+    def test_invalid_filter(self):
+        for klassenstufe in ('x', '5-', '5,,6', 'Sekundarstufe'):
+            with self.subTest(klassenstufe=klassenstufe):
+                response = self.client.get('/curriculum/curricula/list/', {'klassenstufe': klassenstufe})
+                self.assertEqual(response.status_code, 400)
+
+    def test_update_on_save(self):
+        lehrplan = Lehrplan.objects.get(pk=self.lehrplaene['7-9'])
+        lehrplan.klassenstufen = '12a'
+        lehrplan.save()
+        self.assertEqual(list(lehrplan.stufen.values_list('stufe', 'zusatz')), [(12, 'a')])
+        self.assertEqual(self.get_filtered('8'), {'6; 8'})
+        self.assertEqual(self.get_filtered('12a'), {'7-9'})
+
+
+
+class FacetTests(TestCase):
+    """Prüft die Facettenzählungen (siehe curriculum.facets) und ihre Nachführung."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for bundesland, fach, klassenstufen in [
+            ('Sachsen', 'Mathematik', '5'),
+            ('Sachsen', 'Mathematik', '5a, 5b'),
+            ('Sachsen', 'Deutsch', '5-7'),
+            ('Bayern', 'Mathematik', '7'),
+            ('Bayern', 'Deutsch', 'Sekundarstufe'),
+        ]:
+            Lehrplan.objects.create(bundesland=bundesland, fach=fach, klassenstufen=klassenstufen)
+
+    def get_facets(self, **params):
+        response = self.client.get('/curriculum/curricula/facets/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_without_filters(self):
+        with self.assertNumQueries(2):
+            result = count_facets()
+        self.assertEqual(result, {
+            'total': 5,
+            'facets': {
+                'bundesland': {'Bayern': 2, 'Sachsen': 3},
+                'fach': {'Deutsch': 2, 'Mathematik': 3},
+                'klassenstufe': {5: 3, 6: 1, 7: 2},
+            },
+        })
+
+    def test_filters_apply_to_other_dimensions(self):
+        result = self.get_facets(bundesland='Sachsen')
+        self.assertEqual(result['total'], 3)
+        self.assertEqual(result['facets']['bundesland'], {'Bayern': 2, 'Sachsen': 3})
+        self.assertEqual(result['facets']['fach'], {'Deutsch': 1, 'Mathematik': 2})
+        self.assertEqual(result['facets']['klassenstufe'], {'5': 3, '6': 1, '7': 1})
+
+        result = self.get_facets(fach='Mathematik', klassenstufe='7')
+        self.assertEqual(result['total'], 1)
+        self.assertEqual(result['facets']['bundesland'], {'Bayern': 1})
+        self.assertEqual(result['facets']['fach'], {'Deutsch': 1, 'Mathematik': 1})
+        self.assertEqual(result['facets']['klassenstufe'], {'5': 2, '7': 1})
+
+        result = self.get_facets(bundesland='Sachsen', fach='Mathematik', klassenstufe='5b')
+        self.assertEqual(result['total'], 1)
+        self.assertEqual(result['facets']['bundesland'], {'Sachsen': 1})
+        self.assertEqual(result['facets']['fach'], {'Mathematik': 1})
+        self.assertEqual(result['facets']['klassenstufe'], {'5': 2})
+
+        # Die Gesamtzahl entspricht der Liste mit denselben Filtern
+        for params in ({'bundesland': 'Bayern'}, {'klassenstufe': '6-7'}, {'fach': 'Deutsch', 'klassenstufe': '5'}):
+            with self.subTest(params=params):
+                listed = self.client.get('/curriculum/curricula/list/', params).json()
+                self.assertEqual(self.get_facets(**params)['total'], listed['pagination']['total_items'])
+
+    def test_invalid_filter(self):
+        response = self.client.get('/curriculum/curricula/facets/', {'klassenstufe': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_refresh_on_create_rename_delete(self):
+        lehrplan = Lehrplan.objects.create(bundesland='Hessen', fach='Mathematik', klassenstufen='6')
+        result = self.get_facets()
+        self.assertEqual(result['total'], 6)
+        self.assertEqual(result['facets']['bundesland']['Hessen'], 1)
+        self.assertEqual(result['facets']['fach']['Mathematik'], 4)
+        self.assertEqual(result['facets']['klassenstufe']['6'], 2)
+
+        lehrplan.bundesland = 'Sachsen'
+        lehrplan.fach = 'Physik'
+        lehrplan.klassenstufen = '8'
+        lehrplan.save()
+        result = self.get_facets()
+        self.assertEqual(result['total'], 6)
+        self.assertNotIn('Hessen', result['facets']['bundesland'])
+        self.assertEqual(result['facets']['bundesland']['Sachsen'], 4)
+        self.assertEqual(result['facets']['fach'], {'Deutsch': 2, 'Mathematik': 3, 'Physik': 1})
+        self.assertEqual(result['facets']['klassenstufe'], {'5': 3, '6': 1, '7': 2, '8': 1})
+        self.assertEqual(self.get_facets(klassenstufe='8')['facets']['fach'], {'Physik': 1})
+
+        lehrplan.delete()
+        self.assertEqual(self.get_facets(), {
+            'total': 5,
+            'facets': {
+                'bundesland': {'Bayern': 2, 'Sachsen': 3},
+                'fach': {'Deutsch': 2, 'Mathematik': 3},
+                'klassenstufe': {'5': 3, '6': 1, '7': 2},
+            },
+        })
+
+
+class AenderungenTests(TestCase):
+    """Prüft den Abgleich über das Änderungsprotokoll (siehe curriculum.aenderungen)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplan = create_lehrplan('Sachsen', 'Mathematik', '5', lernbereiche=1)
+
+    def get_changes(self, **params):
+        response = self.client.get('/curriculum/changes/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def get_token(self):
+        return int(self.get_changes()['next'])
+
+    def test_token_without_since(self):
+        data = self.get_changes()
+        self.assertEqual(data, {'since': None, 'next': str(Aenderung.objects.last().id), 'has_more': False, 'aenderungen': []})
+
+    def test_since_and_page_size(self):
+        token = self.get_token()
+        lernbereiche = [
+            Lernbereich.objects.create(lehrplan=self.lehrplan, nummer=nummer, name=f"Lernbereich {nummer}", unterrichtsstunden=10)
+            for nummer in range(2, 7)
+        ]
+        seen, since, pages = [], token, 0
+        while True:
+            data = self.get_changes(since=since, page_size=2)
+            self.assertEqual(data['since'], str(since))
+            self.assertLessEqual(len(data['aenderungen']), 2)
+            self.assertEqual(set(data['aenderungen'][0]), {'modell', 'id', 'art', 'daten'})
+            seen += [(aenderung['modell'], aenderung['id'], aenderung['art']) for aenderung in data['aenderungen']]
+            since, pages = int(data['next']), pages + 1
+            if not data['has_more']:
+                break
+        self.assertEqual(pages, 5)
+        # Jeder Lernbereich protokolliert zusätzlich seinen Lehrplan als geändert
+        self.assertEqual(
+            [eintrag for eintrag in seen if eintrag[0] == 'Lernbereich'],
+            [('Lernbereich', lernbereich.id, 'angelegt') for lernbereich in lernbereiche]
+        )
+        self.assertIn(('Lehrplan', self.lehrplan.id, 'geaendert'), seen)
+        self.assertEqual(self.get_changes(since=since)['aenderungen'], [])
+        self.assertEqual(self.get_changes(since=since)['next'], str(since))
+
+        # Seitengrößen werden auf 1 bis 1000 begrenzt
+        self.assertEqual(len(self.get_changes(since=token, page_size=0)['aenderungen']), 1)
+        data = self.get_changes(since=0, page_size=5000)
+        self.assertFalse(data['has_more'])
+        self.assertEqual(len(data['aenderungen']), len(set(Aenderung.objects.values_list('modell', 'knoten_id'))))
+        for params in ({'since': 'x'}, {'since': -1}, {'since': 0, 'page_size': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/curriculum/changes/', params).status_code, 400)
+
+    def test_repeated_changes_are_collapsed(self):
+        token = self.get_token()
+        lernbereich = self.lehrplan.lernbereiche.get()
+        for name in ("Erste Änderung", "Zweite Änderung"):
+            lernbereich.name = name
+            lernbereich.save()
+        neu = Lernbereich.objects.create(lehrplan=self.lehrplan, nummer=2, name="Neu", unterrichtsstunden=10)
+        neu.name = "Neu, geändert"
+        neu.save()
+        lernziel = Lernziel.objects.create(lernbereich=neu, name="Lernziel")
+
+        aenderungen = self.get_changes(since=token)['aenderungen']
+        self.assertEqual(
+            [(aenderung['modell'], aenderung['id'], aenderung['art']) for aenderung in aenderungen],
+            [
+                ('Lernbereich', lernbereich.id, 'geaendert'),
+                ('Lehrplan', self.lehrplan.id, 'geaendert'),
+                ('Lernbereich', neu.id, 'angelegt'),
+                ('Lernziel', lernziel.id, 'angelegt'),
+            ]
+        )
+        self.assertEqual(aenderungen[0]['daten']['name'], "Zweite Änderung")
+        self.assertEqual(aenderungen[2]['daten']['name'], "Neu, geändert")
+        self.assertEqual(aenderungen[3]['daten']['lernbereich_id'], neu.id)
+
+    def test_deleted_objects(self):
+        token = self.get_token()
+        lernbereich = self.lehrplan.lernbereiche.get()
+        lernziel = lernbereich.lernziele.get()
+        kurzlebig = Lernziel.objects.create(lernbereich=lernbereich, name="Kurzlebig")
+        kurzlebig_id, lernziel_id = kurzlebig.id, lernziel.id
+        kurzlebig.delete()
+        lernziel.delete()
+
+        aenderungen = {
+            (aenderung['modell'], aenderung['id']): aenderung
+            for aenderung in self.get_changes(since=token)['aenderungen']
+        }
+        self.assertEqual(aenderungen[('Lernziel', kurzlebig_id)]['art'], 'geloescht')
+        self.assertIsNone(aenderungen[('Lernziel', kurzlebig_id)]['daten'])
+        self.assertEqual(aenderungen[('Lernziel', lernziel_id)]['art'], 'geloescht')
+        self.assertEqual(
+            Counter(modell for (modell, _), aenderung in aenderungen.items() if aenderung['art'] == 'geloescht'),
+            Counter({'Lernziel': 2, 'LernzielBeschreibung': 1, 'Teilziel': 1, 'TeilzielBeschreibung': 1,
+                     'Lerninhalt': 1, 'LerninhaltBeschreibung': 1})
+        )
+        self.assertEqual(aenderungen[('Lehrplan', self.lehrplan.id)]['art'], 'geaendert')
+
+    def test_unknown_tokens(self):
+        token = self.get_token()
+        response = self.client.get('/curriculum/changes/', {'since': token + 1})
+        self.assertEqual(response.status_code, 410)
+
+        # Nach der Bereinigung sind nur Tokens ab dem Horizont gültig
+        Lernbereich.objects.create(lehrplan=self.lehrplan, nummer=2, name="Neu", unterrichtsstunden=10)
+        Aenderung.objects.filter(id__lte=token).update(zeitpunkt=timezone.now() - timedelta(days=60))
+        output = io.StringIO()
+        call_command('prune_aenderungen', stdout=output)
+        self.assertIn(f"Tokens ab {token} bleiben gültig", output.getvalue())
+        self.assertFalse(Aenderung.objects.filter(id__lte=token).exists())
+        self.assertEqual(AenderungsBereinigung.objects.get().bis, token)
+
+        for since in (0, token - 1):
+            with self.subTest(since=since):
+                self.assertEqual(self.client.get('/curriculum/changes/', {'since': since}).status_code, 410)
+        self.assertEqual(len(self.get_changes(since=token)['aenderungen']), 2)
+
+    def test_prune_keeps_newest_entry(self):
+        Aenderung.objects.update(zeitpunkt=timezone.now() - timedelta(days=60))
+        token = self.get_token()
+        call_command('prune_aenderungen', days=7, stdout=io.StringIO())
+        self.assertEqual(list(Aenderung.objects.values_list('id', flat=True)), [token])
+        self.assertEqual(self.get_token(), token)
+        self.assertEqual(self.get_changes(since=token)['aenderungen'], [])
+        self.assertEqual(self.client.get('/curriculum/changes/', {'since': token - 1}).status_code, 200)
+
+        # Ein weiterer Lauf ohne alte Einträge löscht nichts
+        output = io.StringIO()
+        call_command('prune_aenderungen', stdout=output)
+        self.assertIn("0 Einträge", output.getvalue())
+        self.assertEqual(AenderungsBereinigung.objects.count(), 1)
+
+
+@override_settings(CURRICULUM_EVENTS_POLL_INTERVAL=0.01)
+class LehrplanEventsTests(TestCase):
+    """
+    Prüft die Server-Sent Events (siehe curriculum.benachrichtigungen).
+
+    Ein Strom endet erst nach CURRICULUM_EVENTS_MAX_DURATION Sekunden; die Tests schließen
+    deshalb die erzeugten Generatoren selbst, damit sich die Clients beim Broadcaster abmelden
+    und dessen Abfrageaufgabe endet.
+    """
+
+    url = '/curriculum/async/curricula/events/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplaene = [
+            Lehrplan.objects.create(bundesland='Sachsen', fach='Mathematik', klassenstufen='5'),
+            Lehrplan.objects.create(bundesland='Bayern', fach='Deutsch', klassenstufen='6'),
+        ]
+
+    def setUp(self):
+        self.streams = []
+
+    async def open_stream(self, params=None, **headers):
+        """Öffnet einen Ereignisstrom und liefert ihn mit dem Token aus seinem ersten Block."""
+        original = AsyncLehrplanEventsView.aiter_events
+
+        def capture(view, since, lehrplan_ids):
+            generator = original(view, since, lehrplan_ids)
+            self.streams.append(generator)
+            return generator
+
+        with mock.patch.object(AsyncLehrplanEventsView, 'aiter_events', autospec=True, side_effect=capture):
+            response = await self.async_client.get(self.url, params or {}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.streams.insert(0, stream)
+        first = await self.read(stream)
+        self.assertEqual(first['retry'], '2000')
+        return stream, int(first['id'])
+
+    async def close_streams(self):
+        for stream in self.streams:
+            await stream.aclose()
+        if broadcaster.task is not None:
+            await asyncio.wait_for(broadcaster.task, timeout=5)
+
+    async def read(self, stream):
+        """Liest den nächsten Block eines Stroms als Dictionary seiner Felder."""
+        chunk = await asyncio.wait_for(anext(stream), timeout=5)
+        fields = {}
+        for line in chunk.decode('utf-8').splitlines():
+            if line and not line.startswith(':'):
+                name, _, value = line.partition(': ')
+                fields[name] = json.loads(value) if name == 'data' else value
+        return fields
+
+    async def read_events(self, stream, count):
+        """Liest die nächsten count Ereignisse eines Stroms als Tupel (Token, Daten)."""
+        events = []
+        while len(events) < count:
+            fields = await self.read(stream)
+            if fields.get('event') == 'lehrplan':
+                events.append((int(fields['id']), fields['data']))
+        return events
+
+    async def change(self, lehrplan):
+        """Speichert einen Lehrplan und liefert das erwartete Ereignis als Tupel (Token, Daten)."""
+        lehrplan.fach += " (geändert)"
+        await lehrplan.asave()
+        token = await Aenderung.objects.order_by('-id').values_list('id', flat=True).afirst()
+        version = await Lehrplan.objects.values_list('version', flat=True).aget(pk=lehrplan.pk)
+        return token, {'lehrplan_id': lehrplan.pk, 'version': version, 'geloescht': False}
+
+    def test_format_event(self):
+        event = AsyncLehrplanEventsView().format_event({'token': 12, 'lehrplan_id': 3, 'version': None})
+        self.assertEqual(
+            event, 'id: 12\nevent: lehrplan\ndata: {"lehrplan_id": 3, "version": null, "geloescht": true}\n\n'
+        )
+
+    async def test_broadcaster(self):
+        lehrplan, other = self.lehrplaene
+        since = await aget_token()
+        queue, token = broadcaster.subscribe(since)
+        try:
+            self.assertEqual(token, since)
+            expected_token, expected = await self.change(lehrplan)
+            events, batch_token = await asyncio.wait_for(queue.get(), timeout=5)
+            self.assertEqual(batch_token, expected_token)
+            self.assertEqual(
+                [(event['token'], event['lehrplan_id'], event['version']) for event in events],
+                [(expected_token, lehrplan.pk, expected['version'])]
+            )
+
+            # Spätere Clients beginnen beim Stand des Broadcasters und laden ältere Ereignisse selbst
+            late_queue, late_token = broadcaster.subscribe(since)
+            self.assertEqual(late_token, batch_token)
+            other_id = other.pk
+            await other.adelete()
+            for client_queue in (queue, late_queue):
+                events, _ = await asyncio.wait_for(client_queue.get(), timeout=5)
+                self.assertEqual([(event['lehrplan_id'], event['version']) for event in events], [(other_id, None)])
+            broadcaster.unsubscribe(late_queue)
+        finally:
+            broadcaster.unsubscribe(queue)
+        await asyncio.wait_for(broadcaster.task, timeout=5)
+
+    async def test_lehrplan_filter(self):
+        lehrplan, other = self.lehrplaene
+        try:
+            stream, since = await self.open_stream({'lehrplan': f'{lehrplan.pk}'})
+            self.assertEqual(since, await aget_token())
+            await self.change(other)
+            expected = await self.change(lehrplan)
+            self.assertEqual(await self.read_events(stream, 1), [expected])
+        finally:
+            await self.close_streams()
+
+        for params, headers in (({'lehrplan': 'x'}, {}), ({}, {'Last-Event-ID': 'x'}), ({'since': '-1'}, {})):
+            with self.subTest(params=params, headers=headers):
+                response = await self.async_client.get(self.url, params, headers=headers)
+                self.assertEqual(response.status_code, 400)
+
+    async def test_last_event_id_replay(self):
+        lehrplan, other = self.lehrplaene
+        try:
+            stream, since = await self.open_stream()
+            changes = [await self.change(lehrplan), await self.change(other)]
+            self.assertEqual(await self.read_events(stream, 2), changes)
+
+            # Der Broadcaster ist schon weiter; der neue Client lädt die Ereignisse nach since nach.
+            # Last-Event-ID hat Vorrang vor since.
+            replay, replay_since = await self.open_stream({'since': changes[-1][0]}, **{'Last-Event-ID': str(since)})
+            self.assertEqual(replay_since, since)
+            self.assertEqual(await self.read_events(replay, 2), changes)
+
+            # Danach erhalten beide Clients neue Ereignisse genau einmal
+            latest = await self.change(lehrplan)
+            self.assertEqual(await self.read_events(stream, 1), [latest])
+            self.assertEqual(await self.read_events(replay, 1), [latest])
+        finally:
+            await self.close_streams()
+
+    @override_settings(CURRICULUM_EVENTS_HEARTBEAT=0.05, CURRICULUM_EVENTS_MAX_DURATION=0.3)
+    async def test_heartbeat_and_max_duration(self):
+        try:
+            stream, since = await self.open_stream()
+            chunk = await asyncio.wait_for(anext(stream), timeout=5)
+            self.assertTrue(chunk.decode('utf-8').startswith(': ping'))
+            chunks = [chunk async for chunk in stream]
+            self.assertTrue(all(chunk.decode('utf-8').startswith(': ping') for chunk in chunks))
+        finally:
+            await self.close_streams()
+
+
+
+class AsyncViewTests(TestCase):
+    """Prüft die freischaltbaren asynchronen Lehrplan-Views (siehe views.async_views) gegen die synchronen."""
+
+    PATHS = [
+        ('/curriculum/curriculum/{id}/', '/curriculum/async/curriculum/{id}/'),
+        ('/curriculum/curriculum/{id}/?depth=1&exclude=beschreibungen', '/curriculum/async/curriculum/{id}/?depth=1&exclude=beschreibungen'),
+        ('/curriculum/curricula/list/?page_size=1&page=2', '/curriculum/async/curricula/list/?page_size=1&page=2'),
+        ('/curriculum/curricula/list/?pagination=cursor&page_size=1', '/curriculum/async/curricula/list/?pagination=cursor&page_size=1'),
+        ('/curriculum/curricula/all/', '/curriculum/async/curricula/all/'),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplan = create_lehrplan('Sachsen', 'Mathematik', '5')
+        create_lehrplan('Bayern', 'Deutsch', '6')
+
+    def setUp(self):
+        CurriculumCache.get_backend().clear()
+
+    async def test_disabled_by_default(self):
+        for _, path in self.PATHS:
+            with self.subTest(path=path):
+                response = await self.async_client.get(path.format(id=self.lehrplan.id))
+                self.assertEqual(response.status_code, 404)
+
+    @override_settings(CURRICULUM_ASYNC_VIEWS=True)
+    async def test_same_responses(self):
+        for sync_path, async_path in self.PATHS:
+            with self.subTest(path=async_path):
+                expected = await self.async_client.get(sync_path.format(id=self.lehrplan.id))
+                # Einmal mit leerem und einmal mit gefülltem Cache
+                for _ in range(2):
+                    response = await self.async_client.get(async_path.format(id=self.lehrplan.id))
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.content, expected.content)
+                    self.assertEqual(response.get('ETag'), expected.get('ETag'))
+                not_modified = await self.async_client.get(
+                    async_path.format(id=self.lehrplan.id), headers={'If-None-Match': expected['ETag']}
+                )
+                self.assertEqual(not_modified.status_code, 304)
+
+        missing = await self.async_client.get('/curriculum/async/curriculum/0/')
+        self.assertEqual(missing.status_code, 404)
+
+    @override_settings(CURRICULUM_ASYNC_VIEWS=True)
+    async def test_stream(self):
+        expected = await self.async_client.get('/curriculum/curricula/all/')
+        response = await self.async_client.get('/curriculum/async/curricula/all/?stream=1')
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), expected.content)
+
+class CursorPaginationTests(TestCase):
+    """Prüft die Cursor-Paginierung der Liste (siehe BaseGetView.cursor_paginate_queryset) und ihre Validatoren."""
+
+    url = '/curriculum/curricula/list/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids = [
+            Lehrplan.objects.create(bundesland='Sachsen', fach=f"Fach {nummer}", klassenstufen='5').id
+            for nummer in range(1, 8)
+        ]
+
+    def get_page(self, status=200, headers=None, **params):
+        response = self.client.get(self.url, {'pagination': 'cursor', **params}, headers=headers)
+        self.assertEqual(response.status_code, status, response.content)
+        return response
+
+    def test_forward_and_backward(self):
+        pages, cursor = [], None
+        while True:
+            data = self.get_page(page_size=3, **({'cursor': cursor} if cursor else {})).json()
+            pages.append([eintrag['id'] for eintrag in data['results']])
+            self.assertEqual(data['pagination']['has_previous'], len(pages) > 1)
+            cursor = data['pagination']['next']
+            if not data['pagination']['has_next']:
+                self.assertIsNone(cursor)
+                break
+        self.assertEqual(pages, [self.ids[0:3], self.ids[3:6], self.ids[6:]])
+
+        backward, cursor = [], data['pagination']['previous']
+        while cursor:
+            data = self.get_page(page_size=3, cursor=cursor).json()
+            backward.append([eintrag['id'] for eintrag in data['results']])
+            self.assertTrue(data['pagination']['has_next'])
+            cursor = data['pagination']['previous']
+        self.assertEqual(backward, [self.ids[3:6], self.ids[0:3]])
+        self.assertFalse(data['pagination']['has_previous'])
+
+    def test_page_size_bounds(self):
+        for page_size, expected in (('0', 1), ('-5', 1), ('3', 3), ('x', 7), ('1000', 7)):
+            with self.subTest(page_size=page_size):
+                data = self.get_page(page_size=page_size).json()
+                self.assertEqual(len(data['results']), expected)
+        self.assertEqual(self.get_page(page_size='1000').json()['pagination']['page_size'], LehrplanListView.max_page_size)
+        self.assertEqual(self.get_page(page_size='x').json()['pagination']['page_size'], LehrplanListView.page_size)
+
+    def test_bad_cursors(self):
+        wrong_length = LehrplanListView.encode_cursor(['Sachsen', self.ids[0]])
+        for cursor in ('x', '!!!', 'eyJrIjpbXX0', wrong_length, LehrplanListView.encode_cursor('abcd')):
+            with self.subTest(cursor=cursor):
+                self.get_page(status=400, cursor=cursor)
+
+    def test_not_modified(self):
+        first = self.get_page(page_size=3)
+        self.assertNotIn('Last-Modified', first)
+        self.get_page(status=304, headers={'If-None-Match': first['ETag']}, page_size=3)
+        counted = self.get_page(page_size=3, include_total=1)
+        self.get_page(status=304, headers={'If-None-Match': counted['ETag']}, page_size=3, include_total=1)
+
+        # Letzte Seite: genau ein Lehrplan, danach keiner mehr
+        cursor = LehrplanListView.encode_cursor(['Sachsen', 'Fach 6', '5', self.ids[5]])
+        last = self.get_page(page_size=1, cursor=cursor)
+        self.assertEqual([eintrag['id'] for eintrag in last.json()['results']], self.ids[6:])
+        self.assertFalse(last.json()['pagination']['has_next'])
+
+        # Ein neuer Lehrplan hinter der Seite ändert keinen Lehrplan der Seite, aber has_next
+        # bzw. die Gesamtanzahl; die ETags müssen sich trotzdem ändern
+        Lehrplan.objects.create(bundesland='Thüringen', fach='Fach 1', klassenstufen='5')
+        response = self.get_page(headers={'If-None-Match': last['ETag']}, page_size=1, cursor=cursor)
+        self.assertTrue(response.json()['pagination']['has_next'])
+        self.assertIsNotNone(response.json()['pagination']['next'])
+        response = self.get_page(headers={'If-None-Match': counted['ETag']}, page_size=3, include_total=1)
+        self.assertEqual(response.json()['pagination']['total_items'], 8)
+        self.get_page(status=304, headers={'If-None-Match': first['ETag']}, page_size=3)
+
+        # Ohne Last-Modified beantwortet If-Modified-Since allein keine Seite mit 304
+        self.get_page(headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'}, page_size=1, cursor=cursor)
+
+class MetricsTests(TestCase):
+    """Prüft die Kennzahlen unter /metrics (siehe curriculum.metrics)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lehrplan = create_lehrplan('Sachsen', 'Mathematik', '5')
+
+    def setUp(self):
+        CurriculumCache.get_backend().clear()
+        metrics.registry.reset()
+
+    def test_requests_and_cache(self):
+        url = f'/curriculum/curriculum/{self.lehrplan.id}/'
+        self.client.get(url)
+        self.client.get(url)
+        text = self.client.get('/metrics').content.decode()
+        self.assertIn('curriculum_http_requests_total{view="curriculum",method="GET",status="200"} 2', text)
+        self.assertIn('curriculum_http_request_duration_seconds_count{view="curriculum"} 2', text)
+        self.assertIn('curriculum_serialize_duration_seconds_count{view="curriculum"} 1', text)
+        self.assertIn('curriculum_cache_requests_total{cache="tree",result="hit"} 1', text)
+        self.assertIn('curriculum_cache_requests_total{cache="tree",result="miss"} 1', text)
+        self.assertRegex(text, r'curriculum_http_response_size_bytes_bucket\{view="curriculum",le="\+Inf"\} 2\n')
+
+    def test_processes_are_summed(self):
+        with tempfile.TemporaryDirectory() as directory, self.settings(CURRICULUM_METRICS_DIR=directory):
+            metrics.CACHE_REQUESTS.inc(3, cache='tree', result='hit')
+            metrics.REQUEST_DURATION.observe(0.2, view='curriculum')
+            metrics.registry.flush()
+            # Neue Datei wie nach einem Neustart; die Werte des vorigen Prozesses bleiben erhalten
+            metrics.registry.reset()
+            metrics.CACHE_REQUESTS.inc(cache='tree', result='hit')
+            metrics.REQUEST_DURATION.observe(20, view='curriculum')
+            totals = metrics.registry.collect()
+        self.assertEqual(totals['curriculum_cache_requests_total'][('tree', 'hit')], 4)
+        counts, total, count = totals['curriculum_http_request_duration_seconds'][('curriculum',)]
+        self.assertEqual((total, count, sum(counts)), (20.2, 2, 2))
+
+    def test_admin_import_and_export(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='geheim'))
+        archive = self.client.get('/admin-curriculum/export-all/').content
+        Lehrplan.objects.all().delete()
+        self.client.post('/admin-curriculum/import-all/', {
+            'zip_file': SimpleUploadedFile('export.zip', archive, content_type='application/zip'),
+        })
+        totals = metrics.registry.collect()
+        self.assertEqual(totals['curriculum_import_rows_total'][('Lehrplan', 'new')], 1)
+        self.assertEqual(totals['curriculum_import_rows_total'][('Lerninhalt', 'new')], 2)
+        self.assertEqual(totals['curriculum_import_duration_seconds'][('Lerninhalt',)][2], 1)
+        self.assertEqual(totals['curriculum_admin_operations_total'], {('export', 'success'): 1, ('import', 'success'): 1})
+        self.assertEqual(totals['curriculum_export_size_bytes'][()][2], 1)
+
+    def test_token(self):
+        with self.settings(CURRICULUM_METRICS_TOKEN='geheim'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer geheim')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+
+class BulkImportTests(TestCase):
+    """Vergleicht den Bulk-Import (curriculum.bulk_import) mit dem zeilenweisen Import über import-all."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', password='geheim')
+        create_lehrplan('Sachsen', 'Mathematik', '5, 6')
+        lehrplan = create_lehrplan('Bayern', 'Deutsch', '7')
+        # Doppelte Zeile in derselben Datei, wird beim Import übersprungen
+        LernzielBeschreibung.objects.create(lernziel=Lernziel.objects.filter(lernbereich__lehrplan=lehrplan).first(), text="Beschreibung")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.archive = self.client.get('/admin-curriculum/export-all/').content
+
+    def delete_all(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Lehrplan.objects.all().delete()
+
+    def import_archive(self, archive):
+        since = Aenderung.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        with redirect_stdout(io.StringIO()) as stdout, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/admin-curriculum/import-all/', {
+                'zip_file': SimpleUploadedFile('export.zip', archive, content_type='application/zip'),
+            })
+        # Zeilenweiser und Bulk-Import protokollieren nur über logging
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertEqual(find_pfad_abweichungen(), (set(), set()))
+        self.assertEqual(find_abweichungen(), {})
+        self.assertEqual(find_kennzahl_abweichungen(), {})
+        ids = list(Lehrplan.objects.order_by('id').values_list('id', flat=True))
+        return {
+            'message': str(list(get_messages(response.wsgi_request))[-1]),
+            'baum': re.sub(r'"(\w+_)?id": \d+', '"id": 0', json.dumps(CurriculumSerializer.serialize_curricula(ids))),
+            'versionen': list(Lehrplan.objects.order_by('id').values_list('version', flat=True)),
+            'statistik': list(LehrplanStatistik.objects.order_by('lehrplan_id').values_list(*STATISTIK_FIELDS)),
+            'kennzahlen': list(VergleichsKennzahl.objects.order_by('bundesland', 'fach', 'stufe').values_list('stufe', *STATISTIK_FIELDS)),
+            'hashes': sorted(KnotenHash.objects.values_list('ebene', 'eigen', 'baum')),
+            'aenderungen': Counter(Aenderung.objects.filter(id__gt=since).values_list('modell', 'art')),
+            'suche': CurriculumSearchIndex.count('Beschreibung') if CurriculumSearchIndex.is_available() else None,
+        }
+
+    def run_imports(self, bulk):
+        """Importiert den Export zweimal und anschließend einen Export mit fehlender Verknüpfung."""
+        with zipfile.ZipFile(io.BytesIO(self.archive)) as z:
+            files = {name: z.read(name) for name in z.namelist()}
+        files['03_lernziel.csv'] += '999999,Ohne Lernbereich,999999\r\n'.encode('utf-8')
+        broken = io.BytesIO()
+        with zipfile.ZipFile(broken, 'w') as z:
+            for name, content in files.items():
+                z.writestr(name, content)
+
+        results = []
+        with self.settings(CURRICULUM_BULK_IMPORT=bulk):
+            for archive in (self.archive, self.archive, broken.getvalue()):
+                if archive is not self.archive:
+                    self.delete_all()
+                results.append(self.import_archive(archive))
+            self.delete_all()
+        return results
+
+    def test_bulk_matches_row_import(self):
+        self.delete_all()
+        row_results, bulk_results = self.run_imports(False), self.run_imports(True)
+        for row_result, bulk_result in zip(row_results, bulk_results):
+            self.assertEqual(row_result, bulk_result)
+        first, second, broken = bulk_results
+        self.assertIn('04_lernziel_beschreibung.csv:</strong> 4 neue Einträge, 1 übersprungene Duplikate', first['message'])
+        # Version 1 plus eins je neuem Knoten und jeder neuen Beschreibung
+        self.assertEqual(first['versionen'], [15, 15])
+        self.assertIn('01_lehrplan.csv:</strong> 2 übersprungene Duplikate', second['message'])
+        # Eine Zeile ohne Lernbereich verwirft die ganze Datei
+        self.assertIn('03_lernziel.csv:</strong> 4 neue Einträge, 1 übersprungene Einträge (fehlende Verknüpfungen)', broken['message'])
+        self.assertEqual(broken['statistik'], [(2, 0, 0, 0, 20)] * 2)
+
+    def test_fallback_logs_debug(self):
+        self.delete_all()
+        with mock.patch('curriculum.admin.bulk_import', side_effect=BulkImportNotSupported("Testgrund")):
+            with self.assertLogs('curriculum.admin', 'DEBUG') as logs:
+                result = self.import_archive(self.archive)
+        self.assertEqual(Lehrplan.objects.count(), 2)
+        self.assertIn("Import abgeschlossen!", result['message'])
+        messages = [record.getMessage() for record in logs.records]
+        self.assertIn("Bulk-Import nicht möglich, importiere zeilenweise: Testgrund", messages)
+        self.assertTrue(any(message.startswith("Validiere Zeile: ") for message in messages))
+        self.assertEqual({record.levelname for record in logs.records}, {'DEBUG'})
+
+    def test_bulk_queries(self):
+        self.delete_all()
+        counts = {}
+        for bulk in (False, True):
+            with self.settings(CURRICULUM_BULK_IMPORT=bulk), CaptureQueriesContext(connection) as queries:
+                self.import_archive(self.archive)
+            counts[bulk] = len(queries)
+            self.delete_all()
+        self.assertLess(counts[True] * 3, counts[False])
+
+
+class SyntheticDataTests(TestCase):
+    """Prüft den Datengenerator und die Benchmark-Suite auf kleinen Datenbeständen."""
+
+    def test_generate_is_deterministic(self):
+        created = generate_curricula(2, '2,1,2,1', beschreibungen=1, text_length=40, seed=3)
+        self.assertEqual([len(created[model]) for model in (Lehrplan, Lernbereich, Lernziel, Teilziel, Lerninhalt)], [2, 4, 4, 8, 8])
+        self.assertEqual(len(created[LerninhaltBeschreibung]), 8)
+        again = generate_curricula(2, '2,1,2,1', beschreibungen=1, text_length=40, seed=3)
+        # Gleicher Inhalt bis auf die IDs
+        first, second = (
+            re.sub(r'"\w+_id": \d+', '"id": 0', json.dumps(CurriculumSerializer.serialize_curricula(ids[Lehrplan])))
+            for ids in (created, again)
+        )
+        self.assertEqual(first, second)
+
+    def test_generate_writes_derived_data(self):
+        created = generate_curricula(3, 2, seed=1)
+        self.assertEqual(find_pfad_abweichungen(), (set(), set()))
+        self.assertEqual(find_abweichungen(), {})
+        self.assertEqual(find_kennzahl_abweichungen(), {})
+        self.assertEqual(Aenderung.objects.count(), sum(len(ids) for ids in created.values()))
+
+    def test_benchmark_writes_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'benchmark.json')
+            call_command(
+                'benchmark_curricula', lehrplaene=2, fanout='1', repeat=2, io_repeat=1,
+                output=path, stdout=io.StringIO()
+            )
+            with open(path, encoding='utf-8') as f:
+                results = json.load(f)
+        self.assertEqual(set(results['scenarios']), {'detail', 'detail_cached', 'list', 'all', 'export', 'import'})
+        # Der Versionsstempel wird je Anfrage gelesen, der Baum kommt aus dem Cache
+        self.assertEqual(results['scenarios']['detail_cached']['queries_max'], 1)
+        self.assertGreater(results['scenarios']['import']['queries_max'], 0)
+        self.assertFalse(Lehrplan.objects.exists())
@@ -4,6 +4,24 @@ from . import views
 urlpatterns = [
 
     path('curriculum/<int:pk>/', views.LehrplanDetailView.as_view(), name='curriculum'),
+    path('curriculum/<int:pk>/hashes/', views.LehrplanHashView.as_view(), name='curriculum_hashes'), # USEAGE: http://127.0.0.1:8000/curriculum/curriculum/1/hashes/?depth=1
+    path('curricula/diff/', views.LehrplanDiffView.as_view(), name='curricula_diff'), # USEAGE: http://127.0.0.1:8000/curriculum/curricula/diff/?a=1&b=2
     path('curricula/all/', views.LehrplanAllView.as_view(), name='curricula_all'),
+    path('curricula/batch/', views.LehrplanBatchView.as_view(), name='curricula_batch'), # USEAGE: http://127.0.0.1:8000/curriculum/curricula/batch/?ids=1,2,3
+    path('lernbereich/<int:pk>/', views.LernbereichDetailView.as_view(), name='lernbereich'),
+    path('lernziel/<int:pk>/', views.LernzielDetailView.as_view(), name='lernziel'),
+    path('teilziel/<int:pk>/', views.TeilzielDetailView.as_view(), name='teilziel'),
     path('curricula/list/', views.LehrplanListView.as_view(), name='curricula'), # USEAGE: http://127.0.0.1:8000/curriculum/curricula/list/?page=1
+    path('curricula/summary/', views.LehrplanSummaryView.as_view(), name='curricula_summary'), # USEAGE: http://127.0.0.1:8000/curriculum/curricula/summary/?bundesland=Sachsen
+    path('curricula/facets/', views.LehrplanFacetView.as_view(), name='curricula_facets'), # USEAGE: http://127.0.0.1:8000/curriculum/curricula/facets/?bundesland=Sachsen
+    path('search/', views.CurriculumSearchView.as_view(), name='search'), # USEAGE: http://127.0.0.1:8000/curriculum/search/?q=Bruchrechnung
+    path('changes/', views.AenderungenView.as_view(), name='changes'), # USEAGE: http://127.0.0.1:8000/curriculum/changes/?since=0
+    path('vergleich/', views.VergleichView.as_view(), name='vergleich'), # USEAGE: http://127.0.0.1:8000/curriculum/vergleich/?group_by=bundesland,klassenstufe&fach=Mathematik
+
+    # Nur unter ASGI (z. B. uvicorn backend.asgi:application), siehe views/async_views.py
+    # Die asynchronen Lehrplan-Views antworten nur mit CURRICULUM_ASYNC_VIEWS = True (siehe benchmark_asgi)
+    path('async/curriculum/<int:pk>/', views.AsyncLehrplanDetailView.as_view(), name='async_curriculum'),
+    path('async/curricula/all/', views.AsyncLehrplanAllView.as_view(), name='async_curricula_all'),
+    path('async/curricula/list/', views.AsyncLehrplanListView.as_view(), name='async_curricula'),
+    path('async/curricula/events/', views.AsyncLehrplanEventsView.as_view(), name='async_curricula_events'), # USEAGE: http://127.0.0.1:8000/curriculum/async/curricula/events/?lehrplan=1
 ]
\ No newline at end of file
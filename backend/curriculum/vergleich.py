@@ -0,0 +1,211 @@
+"""
+Vergleichswürfel über Bundesland, Fach und Klassenstufe.
+
+Die Tabelle ``VergleichsKennzahl`` fasst die Kennzahlen aus ``LehrplanStatistik`` (Anzahl der
+Lernbereiche, Lernziele, Teilziele, Lerninhalte, Unterrichtsstunden) sowie die Anzahl der
+Lehrpläne je Zelle zusammen. Es gibt zwei Arten von Zellen:
+
+- ``(bundesland, fach, stufe)``: alle Lehrpläne, die die Klassenstufe abdecken. Ein Lehrplan
+  für die Stufen 5 und 6 zählt in beiden Zellen.
+- ``(bundesland, fach, None)``: alle Lehrpläne unabhängig von der Klassenstufe; jeder Lehrplan
+  zählt genau einmal. Diese Zellen dienen für Auswertungen ohne Klassenstufe.
+
+Änderungen an Knoten werden dieselben Differenzen wie in ``LehrplanStatistik`` auf die
+Zellen des Lehrplans übertragen. Ändern sich Bundesland, Fach oder Klassenstufen eines
+Lehrplans oder wird er angelegt bzw. gelöscht, werden die Zellen der betroffenen
+Kombinationen aus Bundesland und Fach neu berechnet (siehe ``curriculum.signals``).
+"""
+
+from collections import defaultdict
+
+from django.core.exceptions import BadRequest
+from django.db.models import Exists, F, OuterRef, Q, Sum
+
+from .klassenstufen import parse_klassenstufe_filter
+from .models import Lehrplan, LehrplanKlassenstufe, VergleichsKennzahl
+from .statistik import FIELDS as STATISTIK_FIELDS
+
+MEASURES = ('lehrplaene',) + STATISTIK_FIELDS
+
+# Dimension im API-Parameter -> Feld in VergleichsKennzahl
+DIMENSIONS = {
+    'bundesland': 'bundesland',
+    'fach': 'fach',
+    'klassenstufe': 'stufe',
+}
+
+
+def apply_kennzahl_deltas(lehrplan_id, deltas):
+    """
+    Überträgt Differenzen der Kennzahlen eines Lehrplans auf seine Zellen im Würfel.
+
+    Bundesland, Fach und Klassenstufen des Lehrplans werden nicht vorab gelesen, sondern
+    über Unterabfragen auf die ID in derselben UPDATE-Abfrage aufgelöst.
+
+    Args:
+        lehrplan_id: Die ID des Lehrplans
+        deltas (dict): Feldname aus LehrplanStatistik -> Differenz (ohne Nullwerte)
+    """
+    lehrplan = Lehrplan.objects.filter(pk=lehrplan_id, bundesland=OuterRef('bundesland'), fach=OuterRef('fach'))
+    stufen = LehrplanKlassenstufe.objects.filter(lehrplan_id=lehrplan_id).values('stufe')
+    VergleichsKennzahl.objects.filter(
+        Q(stufe__isnull=True) | Q(stufe__in=stufen),
+        Exists(lehrplan)
+    ).update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def compute_kennzahlen(kombinationen=None):
+    """
+    Berechnet die Zellen des Würfels aus den Kennzahlen der Lehrpläne.
+
+    Die Kindtabellen werden nicht gelesen, nur Lehrplan, LehrplanStatistik und
+    LehrplanKlassenstufe.
+
+    Args:
+        kombinationen: Iterierbare Menge von Tupeln (bundesland, fach) oder None für alle
+
+    Returns:
+        dict: (bundesland, fach, stufe oder None) -> {Kennzahl: Wert}
+    """
+    lehrplaene = Lehrplan.objects.order_by()
+    if kombinationen is not None:
+        condition = Q(pk__in=[])
+        for bundesland, fach in set(kombinationen):
+            condition |= Q(bundesland=bundesland, fach=fach)
+        lehrplaene = lehrplaene.filter(condition)
+
+    stufen = defaultdict(set)
+    for lehrplan_id, stufe in (
+        LehrplanKlassenstufe.objects.order_by()
+        .filter(lehrplan__in=lehrplaene.values('id'))
+        .values_list('lehrplan_id', 'stufe')
+    ):
+        stufen[lehrplan_id].add(stufe)
+
+    cells = defaultdict(lambda: dict.fromkeys(MEASURES, 0))
+    rows = lehrplaene.values_list(
+        'id', 'bundesland', 'fach', *(f'statistik__{field}' for field in STATISTIK_FIELDS)
+    )
+    for lehrplan_id, bundesland, fach, *werte in rows:
+        for stufe in [None, *sorted(stufen[lehrplan_id])]:
+            cell = cells[(bundesland, fach, stufe)]
+            cell['lehrplaene'] += 1
+            for field, wert in zip(STATISTIK_FIELDS, werte):
+                cell[field] += wert or 0
+    return dict(cells)
+
+
+def refresh_kennzahlen(kombinationen=None):
+    """
+    Berechnet die Zellen der angegebenen Kombinationen (oder des ganzen Würfels) neu.
+
+    Args:
+        kombinationen: Iterierbare Menge von Tupeln (bundesland, fach) oder None für alle
+
+    Returns:
+        int: Die Anzahl der geschriebenen Zellen
+    """
+    if kombinationen is not None:
+        kombinationen = set(kombinationen)
+        if not kombinationen:
+            return 0
+    cells = compute_kennzahlen(kombinationen)
+
+    existing = VergleichsKennzahl.objects.all()
+    if kombinationen is not None:
+        condition = Q()
+        for bundesland, fach in kombinationen:
+            condition |= Q(bundesland=bundesland, fach=fach)
+        existing = existing.filter(condition)
+    existing.delete()
+
+    VergleichsKennzahl.objects.bulk_create([
+        VergleichsKennzahl(bundesland=bundesland, fach=fach, stufe=stufe, **werte)
+        for (bundesland, fach, stufe), werte in cells.items()
+    ], batch_size=500)
+    return len(cells)
+
+
+def find_kennzahl_abweichungen():
+    """
+    Vergleicht den gespeicherten Würfel mit einer Neuberechnung aus LehrplanStatistik.
+
+    Returns:
+        dict: (bundesland, fach, stufe) -> (gespeicherte Werte oder None, berechnete Werte oder None)
+    """
+    stored = {
+        (row.pop('bundesland'), row.pop('fach'), row.pop('stufe')): row
+        for row in VergleichsKennzahl.objects.values('bundesland', 'fach', 'stufe', *MEASURES)
+    }
+    computed = compute_kennzahlen()
+    return {
+        key: (stored.get(key), computed.get(key))
+        for key in stored.keys() | computed.keys()
+        if stored.get(key) != computed.get(key)
+    }
+
+
+def query_kennzahlen(group_by, bundeslaender=None, faecher=None, klassenstufe=None):
+    """
+    Liefert einen Ausschnitt des Würfels, aggregiert über die nicht gruppierten Dimensionen.
+
+    Ohne Gruppierung nach Klassenstufe werden die Zellen ohne Stufe summiert, sodass jeder
+    Lehrplan genau einmal zählt. Ein Klassenstufen-Filter ist in diesem Fall nur für eine
+    einzelne Stufe möglich, da sich Lehrpläne mehrerer Stufen nicht aus den Stufenzellen
+    herausrechnen lassen.
+
+    Args:
+        group_by (list): Dimensionen aus DIMENSIONS, nach denen gruppiert wird (leer = Gesamtsumme)
+        bundeslaender (list): Einschränkung auf Bundesländer oder None
+        faecher (list): Einschränkung auf Fächer oder None
+        klassenstufe (str): Filter wie beim Parameter klassenstufe der Liste (Zusätze werden
+                            nicht unterschieden) oder None
+
+    Returns:
+        list: Dictionaries mit den Werten der gruppierten Dimensionen und allen Kennzahlen
+
+    Raises:
+        BadRequest: Bei unbekannten Dimensionen oder einem nicht auswertbaren Klassenstufen-Filter
+    """
+    unknown = [dimension for dimension in group_by if dimension not in DIMENSIONS]
+    if unknown:
+        raise BadRequest(f"Unbekannte Dimensionen: {', '.join(unknown)} (erlaubt: {', '.join(DIMENSIONS)})")
+
+    queryset = VergleichsKennzahl.objects.all()
+    if bundeslaender:
+        queryset = queryset.filter(bundesland__in=bundeslaender)
+    if faecher:
+        queryset = queryset.filter(fach__in=faecher)
+
+    stufen = None
+    if klassenstufe:
+        stufen = Q()
+        for start, end, _ in parse_klassenstufe_filter(klassenstufe):
+            stufen |= Q(stufe__range=(start, end))
+
+    if 'klassenstufe' in group_by:
+        queryset = queryset.filter(stufe__isnull=False)
+        if stufen is not None:
+            queryset = queryset.filter(stufen)
+    elif stufen is not None:
+        conditions = parse_klassenstufe_filter(klassenstufe)
+        if len({(start, end) for start, end, _ in conditions}) != 1 or conditions[0][0] != conditions[0][1]:
+            raise BadRequest(
+                "Ein Filter über mehrere Klassenstufen ist nur zusammen mit group_by=klassenstufe möglich"
+            )
+        queryset = queryset.filter(stufen)
+    else:
+        queryset = queryset.filter(stufe__isnull=True)
+
+    fields = [DIMENSIONS[dimension] for dimension in group_by]
+    sums = {f'summe_{measure}': Sum(measure) for measure in MEASURES}
+    if fields:
+        rows = queryset.order_by(*fields).values(*fields).annotate(**sums)
+    else:
+        rows = [queryset.aggregate(**sums)]
+    results = []
+    for row in rows:
+        result = {dimension: row[DIMENSIONS[dimension]] for dimension in group_by}
+        result.update({measure: row[f'summe_{measure}'] or 0 for measure in MEASURES})
+        results.append(result)
+    return results
@@ -0,0 +1,109 @@
+"""
+Versionsstempel für Lehrpläne.
+
+Jeder Lehrplan trägt eine Versionsnummer und einen Änderungszeitpunkt, die bei jeder
+Änderung des Lehrplans oder eines seiner untergeordneten Knoten fortgeschrieben werden.
+Die API verwendet diese Stempel als ETag/Last-Modified-Validatoren, um bedingte
+GET-Anfragen mit 304 zu beantworten, bevor der Baum geladen oder serialisiert wird.
+"""
+
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+
+from .models import Lehrplan
+
+
+def bump_versions(lehrplan_ids):
+    """
+    Erhöht Version und Änderungszeitpunkt der angegebenen Lehrpläne.
+
+    Args:
+        lehrplan_ids: Iterierbare Menge von Lehrplan-IDs (None-Werte werden ignoriert)
+    """
+    lehrplan_ids = {lehrplan_id for lehrplan_id in lehrplan_ids if lehrplan_id is not None}
+    if lehrplan_ids:
+        Lehrplan.objects.filter(pk__in=lehrplan_ids).update(
+            version=F('version') + 1,
+            geaendert_am=timezone.now()
+        )
+
+
+def to_timestamp(value):
+    """Wandelt einen Zeitpunkt in Sekunden seit der Epoche um (für Last-Modified)."""
+    if value is None:
+        return None
+    return timegm(value.utctimetuple())
+
+
+def get_lehrplan_stamp(lehrplan_id):
+    """
+    Liefert den Versionsstempel eines Lehrplans.
+
+    Der Stempel wird bei jedem Aufruf mit einer Abfrage über den Primärschlüssel gelesen
+    und bewusst nicht gecacht: Die Invalidierung nach einem Commit erreicht nur den Cache
+    des schreibenden Prozesses, sodass andere Worker-Prozesse mit einem gecachten Stempel
+    weiter 304 auf einen veralteten Stand antworten würden.
+
+    Args:
+        lehrplan_id: Die ID des Lehrplans
+
+    Returns:
+        tuple: (version, Last-Modified als Zeitstempel) oder None, wenn der Lehrplan nicht existiert
+    """
+    row = Lehrplan.objects.filter(pk=lehrplan_id).values_list('version', 'geaendert_am').first()
+    if row is None:
+        return None
+    return row[0], to_timestamp(row[1])
+
+
+async def aget_lehrplan_stamp(lehrplan_id):
+    """
+    Asynchrone Variante von get_lehrplan_stamp() für ASGI-Views.
+    """
+    row = await Lehrplan.objects.filter(pk=lehrplan_id).values_list('version', 'geaendert_am').afirst()
+    if row is None:
+        return None
+    return row[0], to_timestamp(row[1])
+
+
+def get_collection_stamp(queryset):
+    """
+    Berechnet einen Stempel für eine Menge von Lehrplänen mit einer Aggregatabfrage.
+
+    Der Stempel ändert sich, sobald ein Lehrplan der Menge hinzugefügt, entfernt oder
+    (einschließlich seiner Unterknoten) geändert wird.
+
+    Args:
+        queryset: Das (gefilterte) Lehrplan-QuerySet
+
+    Returns:
+        tuple: (Stempel-Zeichenkette, Last-Modified als Zeitstempel oder None)
+    """
+    return _make_collection_stamp(queryset.order_by().aggregate(**_collection_aggregates()))
+
+
+async def aget_collection_stamp(queryset):
+    """
+    Asynchrone Variante von get_collection_stamp() für ASGI-Views.
+    """
+    return _make_collection_stamp(await queryset.order_by().aaggregate(**_collection_aggregates()))
+
+
+def _collection_aggregates():
+    """Liefert die Aggregate, aus denen der Stempel einer Lehrplanmenge berechnet wird."""
+    return {
+        'anzahl': Count('id'),
+        'max_id': Max('id'),
+        'versionen': Sum('version'),
+        'zuletzt': Max('geaendert_am'),
+    }
+
+
+def _make_collection_stamp(aggregate):
+    """Berechnet (Stempel, Last-Modified) aus dem Ergebnis der Aggregatabfrage."""
+    zuletzt = aggregate['zuletzt']
+    raw = f"{aggregate['anzahl']}:{aggregate['max_id']}:{aggregate['versionen']}:{zuletzt.isoformat() if zuletzt else ''}"
+    return hashlib.md5(raw.encode('utf-8')).hexdigest(), to_timestamp(zuletzt)
@@ -7,18 +7,67 @@ Exportierte Klassen:
     - LehrplanDetailView: API-Endpunkt für detaillierte Informationen zu einem einzelnen Lehrplan
     - LehrplanListView: API-Endpunkt für eine paginierte Liste von Lehrplänen mit Filteroptionen
     - LehrplanAllView: API-Endpunkt für alle Lehrpläne ohne Paginierung (mit Vorsicht zu verwenden)
+    - LehrplanSummaryView: API-Endpunkt für eine paginierte Liste von Lehrplänen mit ihren Kennzahlen
+    - LehrplanBatchView: API-Endpunkt für mehrere Lehrpläne in einer Anfrage
+    - LehrplanFacetView: API-Endpunkt für die Anzahl der Lehrpläne je Bundesland, Fach und Klassenstufe
+    - LernbereichDetailView, LernzielDetailView, TeilzielDetailView: API-Endpunkte für
+      Teilbäume unterhalb des Lehrplans mit Pfad zu den Vorfahren
+    - AsyncLehrplanDetailView, AsyncLehrplanListView, AsyncLehrplanAllView: asynchrone
+      Varianten der Lehrplan-Views für Messungen unter ASGI (nur mit CURRICULUM_ASYNC_VIEWS)
+    - AsyncLehrplanEventsView: Server-Sent Events über geänderte Lehrpläne (nur ASGI)
+    - CurriculumSearchView: API-Endpunkt für die Volltextsuche über Lernziele, Teilziele und Lerninhalte
+    - LehrplanHashView: API-Endpunkt für die Inhaltshashes eines Lehrplans und seiner Knoten
+    - LehrplanDiffView: API-Endpunkt für die Unterschiede zwischen zwei Lehrplänen
+    - VergleichView: API-Endpunkt für Kennzahlen je Bundesland, Fach und Klassenstufe aus dem Vergleichswürfel
+    - AenderungenView: API-Endpunkt für den inkrementellen Abgleich über das Änderungsprotokoll
+    - MetricsView: Betriebskennzahlen im Textformat von Prometheus unter /metrics
 """
 
 from .get_curriculum_view import (
     LehrplanDetailView,
     LehrplanListView,
-    LehrplanAllView
+    LehrplanSummaryView,
+    LehrplanAllView,
+    LehrplanBatchView,
+    LehrplanFacetView
 )
+from .get_subtree_view import (
+    LernbereichDetailView,
+    LernzielDetailView,
+    TeilzielDetailView
+)
+from .async_views import (
+    AsyncLehrplanDetailView,
+    AsyncLehrplanListView,
+    AsyncLehrplanAllView,
+    AsyncLehrplanEventsView
+)
+from .search_view import CurriculumSearchView
+from .vergleich_view import VergleichView
+from .diff_view import LehrplanHashView, LehrplanDiffView
+from .aenderungen_view import AenderungenView
+from .metrics_view import MetricsView
 
 __all__ = [
     'LehrplanDetailView',
     'LehrplanListView',
+    'LehrplanSummaryView',
     'LehrplanAllView',
+    'LehrplanBatchView',
+    'LehrplanFacetView',
+    'LernbereichDetailView',
+    'LernzielDetailView',
+    'TeilzielDetailView',
+    'AsyncLehrplanDetailView',
+    'AsyncLehrplanListView',
+    'AsyncLehrplanAllView',
+    'AsyncLehrplanEventsView',
+    'CurriculumSearchView',
+    'VergleichView',
+    'LehrplanHashView',
+    'LehrplanDiffView',
+    'AenderungenView',
+    'MetricsView',
 ]
 
 
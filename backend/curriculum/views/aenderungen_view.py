@@ -0,0 +1,117 @@
+from django.core.exceptions import BadRequest
+from django.http import JsonResponse
+from django.views import View
+from curriculum.aenderungen import get_horizont, get_token, load_aenderungen
+
+
+class AenderungenView(View):
+    """
+    API-Endpunkt für den inkrementellen Abgleich über das Änderungsprotokoll.
+    
+    Clients, die den Datenbestand spiegeln, laden ihn einmal vollständig und holen danach
+    nur noch die seitdem angelegten, geänderten und gelöschten Objekte ab. Die Kosten einer
+    Abfrage hängen von der Anzahl der Änderungen ab, nicht von der Größe des Bestands.
+    
+    Verwendung:
+        GET /curriculum/changes/
+        GET /curriculum/changes/?since=1234
+        GET /curriculum/changes/?since=1234&page_size=100
+    
+        Ohne since wird nur das Token des aktuellen Stands geliefert. Ein Client ruft das
+        Token vor dem vollständigen Laden (z. B. über /curricula/all/) ab und fragt danach
+        mit since ab; Änderungen, die während des Ladens eintreffen, werden dann erneut
+        geliefert.
+    
+        Optionale Abfrageparameter:
+        - since: Token aus der vorherigen Antwort (Feld "next")
+        - page_size: Höchstzahl der gelesenen Protokolleinträge (Standard: 500, maximal 1000)
+    
+        Antwort:
+        {
+            "since": "1234",
+            "next": "1240",
+            "has_more": false,
+            "aenderungen": [
+                {
+                    "modell": "Lernziel",
+                    "id": 7,
+                    "art": "geaendert",
+                    "daten": {"id": 7, "name": "...", "lernbereich_id": 3}
+                },
+                {"modell": "LernzielBeschreibung", "id": 19, "art": "geloescht", "daten": null},
+                ...
+            ]
+        }
+    
+        "art" ist "angelegt", "geaendert" oder "geloescht"; angelegte und geänderte
+        Objekte enthalten unter "daten" ihre aktuellen Werte. Ist "has_more" true, liegen
+        weitere Änderungen vor, die sofort mit since=<next> abgefragt werden können.
+        Ein Token, das neuer als der Stand des Servers ist (z. B. nach dem Zurücksetzen der
+        Datenbank) oder älter als der aufbewahrte Teil des Protokolls (siehe Befehl
+        prune_aenderungen), wird mit Status 410 abgelehnt; der Client muss dann neu laden.
+    """
+
+    page_size = 500
+    max_page_size = 1000
+    query_budget = 10
+
+    def parse_int(self, request, name, default):
+        """
+        Liest einen nicht negativen ganzzahligen Abfrageparameter.
+        
+        Args:
+            request: Die HTTP-Anfrage
+            name (str): Der Name des Parameters
+            default (int): Der Wert, wenn der Parameter fehlt
+        
+        Returns:
+            int: Der Wert des Parameters
+        
+        Raises:
+            BadRequest: Wenn der Parameter keine nicht negative Zahl ist
+        """
+        try:
+            value = int(request.GET.get(name, default))
+        except ValueError:
+            raise BadRequest(f"{name} muss eine Zahl sein")
+        if value < 0:
+            raise BadRequest(f"{name} darf nicht negativ sein")
+        return value
+
+    def get(self, request):
+        """
+        Verarbeitet GET-Anfragen für den Abgleich.
+        
+        Args:
+            request: Die HTTP-Anfrage mit den optionalen Parametern since und page_size
+        
+        Returns:
+            JsonResponse: Die geänderten Objekte und das neue Token bzw. Status 410 bei
+                          einem unbekannten Token
+        
+        Raises:
+            BadRequest: Bei einem ungültigen Token oder einer ungültigen Seitengröße
+        """
+        json_params = {'indent': 2, 'ensure_ascii': False}
+        if 'since' not in request.GET:
+            token = get_token()
+            return JsonResponse(
+                {'since': None, 'next': str(token), 'has_more': False, 'aenderungen': []},
+                json_dumps_params=json_params
+            )
+
+        since = self.parse_int(request, 'since', 0)
+        page_size = max(1, min(self.parse_int(request, 'page_size', self.page_size), self.max_page_size))
+        result = load_aenderungen(since, page_size)
+        if since < get_horizont() or (not result['aenderungen'] and since > get_token()):
+            return JsonResponse(
+                {'error': "Unbekanntes Token, der Datenbestand muss neu geladen werden"},
+                status=410, json_dumps_params=json_params
+            )
+
+        return JsonResponse({
+            'since': str(since),
+            'next': str(result['token']),
+            'has_more': result['has_more'],
+            'aenderungen': result['aenderungen'],
+        }, json_dumps_params=json_params)
@@ -0,0 +1,522 @@
+"""
+Asynchrone (ASGI-native) Views der Curriculum-App.
+
+Benachrichtigungen über geänderte Lehrpläne werden als Server-Sent Events gesendet
+(``AsyncLehrplanEventsView``). Eine Verbindung bleibt minutenlang offen und wartet die
+meiste Zeit; als ``async def`` belegt sie unter ASGI keinen Thread.
+
+Die asynchronen Varianten der Detail-, Listen- und /all/-Views
+(``AsyncLehrplanDetailView``, ``AsyncLehrplanListView``, ``AsyncLehrplanAllView``)
+lesen Versionsstempel, Seiten und gecachte Bäume über die asynchrone Schnittstelle von
+ORM und Cache-Backend; nur der Aufbau fehlender Bäume läuft über ``sync_to_async``, weil
+er eine Transaktion benötigt. Antworten und Validatoren sind identisch mit denen der
+synchronen Views. Die Routen unter /curriculum/async/ antworten nur mit
+``CURRICULUM_ASYNC_VIEWS = True`` und sonst mit 404.
+
+Standardmäßig bleiben sie abgeschaltet, weil sie sich nicht lohnen: Mit SQLite und
+LocMemCache führt Django 5.1 jeden ``aget``/``acount``/``async for``- und jeden
+Cache-Zugriff über ``sync_to_async`` im selben thread-sensitiven Executor aus, in dem
+unter ASGI auch die synchronen Views laufen. Anfragen, die nur kurz rechnen und dann
+antworten, werden dadurch nicht paralleler, sondern zahlen zusätzlich für den Wechsel
+zwischen Event-Loop und Thread je Abfrage. Mit
+``python manage.py benchmark_asgi --endpoint detail|list|all --requests 500`` (50
+gleichzeitige Anfragen) lag der Durchsatz der asynchronen Views bei etwa dem 1,1-, 0,9-
+und 0,8-fachen der synchronen. Die Messung sollte nach einem Wechsel zu einem Datenbank-
+oder Cache-Backend mit echten asynchronen Treibern wiederholt werden.
+"""
+
+import asyncio
+import json
+import math
+import textwrap
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views import View
+from curriculum.benachrichtigungen import aget_token, aload_lehrplan_events, broadcaster
+from curriculum.cache import CurriculumCache
+from curriculum.models import Lehrplan
+from curriculum.versioning import aget_collection_stamp, aget_lehrplan_stamp
+from .base_view import BaseGetView, get_not_modified_response, make_etag, set_validators
+from .get_curriculum_view import LehrplanAllView, LehrplanDetailView, LehrplanListView, build_curriculum_trees
+from .serializers import CurriculumSerializer
+
+
+def async_views_enabled():
+    """
+    Prüft, ob die asynchronen Lehrplan-Views freigeschaltet sind (CURRICULUM_ASYNC_VIEWS).
+    
+    Returns:
+        bool: True, wenn die Routen unter /curriculum/async/ antworten
+    """
+    return getattr(settings, 'CURRICULUM_ASYNC_VIEWS', False)
+
+
+async def aload_curriculum_trees(lehrplan_ids, options=None, versions=None, populate_cache=True):
+    """
+    Asynchrone Variante von load_curriculum_trees.
+    
+    Args:
+        lehrplan_ids (list): Die IDs der zu ladenden Lehrpläne
+        options (dict): Das Ergebnis von CurriculumSerializer.parse_tree_options oder None
+        versions (dict): Lehrplan-ID -> aktuelle Version oder None
+        populate_cache (bool): False, um neu aufgebaute Bäume nicht zu cachen
+    
+    Returns:
+        dict: Lehrplan-ID -> serialisierter Baum; nicht existierende IDs fehlen
+    """
+    if versions is None:
+        versions = {
+            lehrplan_id: version async for lehrplan_id, version in
+            Lehrplan.objects.filter(pk__in=lehrplan_ids).order_by().values_list('id', 'version')
+        }
+    trees = {
+        lehrplan_id: CurriculumSerializer.prune(tree, options)
+        for lehrplan_id, tree in (await CurriculumCache.aget_many(
+            {lehrplan_id: versions[lehrplan_id] for lehrplan_id in lehrplan_ids if lehrplan_id in versions}
+        )).items()
+    }
+
+    missing_ids = [lehrplan_id for lehrplan_id in lehrplan_ids if lehrplan_id in versions and lehrplan_id not in trees]
+    if missing_ids:
+        trees.update(await sync_to_async(build_curriculum_trees)(missing_ids, options, populate_cache))
+
+    return trees
+
+
+class AsyncOptInMixin:
+    """
+    Beantwortet Anfragen nur, wenn CURRICULUM_ASYNC_VIEWS gesetzt ist, sonst mit 404.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        """Prüft die Freischaltung je Anfrage, damit override_settings und Änderungen der Einstellung wirken."""
+        if not async_views_enabled():
+            raise Http404("Die asynchronen Views sind nicht freigeschaltet (CURRICULUM_ASYNC_VIEWS)")
+        return super().dispatch(request, *args, **kwargs)
+
+
+class AsyncBaseGetView(AsyncOptInMixin, BaseGetView):
+    """
+    Asynchrone Variante von BaseGetView.
+    
+    Unterklassen implementieren ``async def get`` und rufen aget_list_response bzw.
+    aget_detail_response auf. Die synchronen Hilfsmethoden für Filter, Seitengröße,
+    Cursor, Validatoren einer Cursor-Seite und Serialisierung werden unverändert weiterverwendet.
+    """
+
+    async def apaginate_queryset(self, queryset, request):
+        """
+        Asynchrone Variante von paginate_queryset mit identischem Ergebnis.
+        """
+        try:
+            page = int(request.GET.get('page', 1))
+        except ValueError:
+            page = 1
+
+        page_size = self.get_page_size(request)
+        count = await queryset.acount()
+        num_pages = max(1, math.ceil(count / page_size))
+        page = min(max(page, 1), num_pages)
+
+        offset = (page - 1) * page_size
+        items = [obj async for obj in queryset[offset:offset + page_size]]
+        return {
+            'items': items,
+            'total_pages': num_pages,
+            'current_page': page,
+            'total_items': count,
+            'has_next': page < num_pages,
+            'has_previous': page > 1
+        }
+
+    async def acursor_paginate_queryset(self, queryset, request):
+        """
+        Asynchrone Variante von cursor_paginate_queryset.
+        """
+        page = self.get_cursor_page(queryset, request)
+        items = self.finish_cursor_page([obj async for obj in page['queryset']], page)
+        if self.wants_total(request):
+            page['pagination']['total_items'] = await queryset.acount()
+        return {'items': items, 'pagination': page['pagination']}
+
+    async def aget_detail_validators(self, request, pk):
+        """
+        Asynchrone Variante von get_detail_validators.
+        """
+        return None, None
+
+    async def aget_list_validators(self, request, queryset):
+        """
+        Asynchrone Variante von get_list_validators.
+        """
+        return None, None
+
+    async def aget_serialized_detail(self, pk):
+        """
+        Asynchrone Variante von get_serialized_detail.
+        """
+        try:
+            return self.serialize_object(await self.get_queryset().aget(pk=pk))
+        except self.model.DoesNotExist:
+            raise Http404(f"{self.model.__name__} nicht gefunden")
+
+    async def aget_list_response(self, request):
+        """
+        Asynchrone Variante von get_list_response.
+        """
+        queryset = self.get_queryset()
+        queryset = self.apply_filters(queryset, request)
+
+        if self.uses_cursor_pagination(request):
+            return await self.aget_cursor_list_response(request, queryset)
+
+        etag, last_modified = await self.aget_list_validators(request, queryset)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        paginated_data = await self.apaginate_queryset(queryset, request)
+
+        response = JsonResponse({
+            'results': [self.serialize_object(obj) for obj in paginated_data['items']],
+            'pagination': {
+                'total_pages': paginated_data['total_pages'],
+                'current_page': paginated_data['current_page'],
+                'total_items': paginated_data['total_items'],
+                'has_next': paginated_data['has_next'],
+                'has_previous': paginated_data['has_previous']
+            }
+        }, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
+        return set_validators(response, etag, last_modified)
+
+    async def aget_cursor_list_response(self, request, queryset):
+        """
+        Asynchrone Variante von get_cursor_list_response.
+        """
+        paginated_data = await self.acursor_paginate_queryset(queryset, request)
+
+        etag, last_modified = self.get_page_validators(request, paginated_data['items'], paginated_data['pagination'])
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = JsonResponse({
+            'results': [self.serialize_object(obj) for obj in paginated_data['items']],
+            'pagination': paginated_data['pagination']
+        }, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
+        return set_validators(response, etag, last_modified)
+
+    async def aget_detail_response(self, request, pk):
+        """
+        Asynchrone Variante von get_detail_response.
+        """
+        etag, last_modified = await self.aget_detail_validators(request, pk)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = JsonResponse(await self.aget_serialized_detail(pk), safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
+        return set_validators(response, etag, last_modified)
+
+
+class AsyncLehrplanDetailView(AsyncBaseGetView, LehrplanDetailView):
+    """
+    Asynchrone Variante von LehrplanDetailView.
+    
+    Verwendung (nur mit CURRICULUM_ASYNC_VIEWS = True):
+        GET /curriculum/async/curriculum/<id>/
+    """
+
+    async def aget_detail_validators(self, request, pk):
+        """
+        Liefert ETag und Last-Modified auf Basis des Versionsstempels des Lehrplans.
+        
+        Raises:
+            Http404: Wenn der Lehrplan nicht existiert
+        """
+        stamp = await aget_lehrplan_stamp(pk)
+        if stamp is None:
+            raise Http404(f"{self.model.__name__} nicht gefunden")
+        version, last_modified = stamp
+        self.versions = {pk: version}
+        return make_etag(request, 'lehrplan', pk, version), last_modified
+
+    async def aget_serialized_detail(self, pk):
+        """
+        Liefert den serialisierten Lehrplanbaum aus dem Cache oder baut ihn bei Bedarf auf.
+        
+        Raises:
+            Http404: Wenn der Lehrplan nicht existiert
+        """
+        options = CurriculumSerializer.parse_tree_options(self.request.GET)
+        tree = (await aload_curriculum_trees([pk], options, getattr(self, 'versions', None))).get(pk)
+        if tree is None:
+            raise Http404(f"{self.model.__name__} nicht gefunden")
+        return tree
+
+    async def get(self, request, pk):
+        """
+        Verarbeitet GET-Anfragen für einen spezifischen Lehrplan.
+        """
+        return await self.aget_detail_response(request, pk)
+
+
+class AsyncLehrplanListView(AsyncBaseGetView, LehrplanListView):
+    """
+    Asynchrone Variante von LehrplanListView.
+    
+    Verwendung (nur mit CURRICULUM_ASYNC_VIEWS = True):
+        GET /curriculum/async/curricula/list/?page=1
+    """
+
+    async def aget_list_validators(self, request, queryset):
+        """
+        Liefert ETag und Last-Modified für die gefilterte Liste über eine Aggregatabfrage.
+        """
+        stamp, last_modified = await aget_collection_stamp(queryset)
+        return make_etag(request, 'lehrplaene', stamp), last_modified
+
+    async def get(self, request):
+        """
+        Verarbeitet GET-Anfragen für die paginierte Liste von Lehrplänen.
+        """
+        return await self.aget_list_response(request)
+
+
+class AsyncLehrplanAllView(AsyncOptInMixin, LehrplanAllView):
+    """
+    Asynchrone Variante von LehrplanAllView.
+    
+    Mit ``?stream=1`` wird die Antwort über einen asynchronen Generator erzeugt, den der
+    ASGI-Handler direkt konsumiert.
+    
+    Verwendung (nur mit CURRICULUM_ASYNC_VIEWS = True):
+        GET /curriculum/async/curricula/all/
+        GET /curriculum/async/curricula/all/?stream=1
+    """
+
+    async def aload_trees(self, lehrplan_ids, options=None, versions=None, populate_cache=True):
+        """
+        Asynchrone Variante von load_trees.
+        """
+        trees = await aload_curriculum_trees(lehrplan_ids, options, versions, populate_cache)
+        return [trees[lehrplan_id] for lehrplan_id in lehrplan_ids if lehrplan_id in trees]
+
+    async def aiter_json_chunks(self, lehrplan_ids, options=None, versions=None):
+        """
+        Asynchrone Variante von iter_json_chunks mit byte-identischer Ausgabe.
+        """
+        chunk_size, populate_cache = self.get_stream_chunk_size(), self.get_stream_populate_cache()
+        first = True
+        for start in range(0, len(lehrplan_ids), chunk_size):
+            chunk_ids = lehrplan_ids[start:start + chunk_size]
+            for tree in await self.aload_trees(chunk_ids, options, versions, populate_cache=populate_cache):
+                encoded = json.dumps(tree, indent=2, ensure_ascii=False, cls=DjangoJSONEncoder)
+                yield ('[\n' if first else ',\n') + textwrap.indent(encoded, '  ')
+                first = False
+        yield '[]' if first else '\n]'
+
+    async def get(self, request):
+        """
+        Verarbeitet GET-Anfragen für alle Lehrpläne ohne Paginierung.
+        """
+        stamp, last_modified = await aget_collection_stamp(Lehrplan.objects.all())
+        etag = make_etag(request, 'alle', stamp)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        options = CurriculumSerializer.parse_tree_options(request.GET)
+        versions = {lehrplan_id: version async for lehrplan_id, version in Lehrplan.objects.values_list('id', 'version')}
+        lehrplan_ids = list(versions)
+
+        if request.GET.get('stream', '').lower() in ('1', 'true'):
+            response = StreamingHttpResponse(
+                self.aiter_json_chunks(lehrplan_ids, options, versions),
+                content_type='application/json'
+            )
+        else:
+            result = await self.aload_trees(lehrplan_ids, options, versions)
+            response = JsonResponse(result, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
+        return set_validators(response, etag, last_modified)
+
+
+class AsyncLehrplanEventsView(View):
+    """
+    Server-Sent Events für geänderte Lehrpläne.
+    
+    Statt den Lehrplan regelmäßig abzufragen, hält ein Client (z. B. die Live-Vorschau im
+    Admin) eine Verbindung offen und erhält nach jedem Commit, der einen Lehrplan oder einen
+    seiner Knoten ändert, dessen ID und neue Version. Er lädt den Lehrplan nur dann neu, wenn
+    sich die Version von der geladenen unterscheidet. Änderungen aus anderen Worker-Prozessen
+    kommen über das Änderungsprotokoll an (siehe curriculum.benachrichtigungen).
+    
+    Nur für den Betrieb unter ASGI gedacht; unter WSGI belegt jede Verbindung einen Worker.
+    
+    Verwendung:
+        GET /curriculum/async/curricula/events/
+        GET /curriculum/async/curricula/events/?lehrplan=1,2
+    
+        Optionale Abfrageparameter:
+        - lehrplan: Kommaseparierte IDs der Lehrpläne, über die benachrichtigt wird (Standard: alle)
+        - since: Token, ab dem Änderungen gesendet werden (z. B. "next" aus /changes/);
+                 der Header Last-Event-ID hat Vorrang
+    
+        Ereignisse:
+            id: 1240
+            event: lehrplan
+            data: {"lehrplan_id": 1, "version": 12, "geloescht": false}
+    
+        Die id ist ein Token des Änderungsprotokolls; ein EventSource sendet sie beim
+        Wiederverbinden als Last-Event-ID, sodass keine Änderungen verloren gehen. Der Server
+        sendet regelmäßig Kommentare als Lebenszeichen und beendet die Verbindung nach
+        CURRICULUM_EVENTS_MAX_DURATION Sekunden; der Client verbindet sich dann neu.
+    """
+
+    retry = 2000
+
+    def get_heartbeat_interval(self):
+        """Gibt den Abstand der Lebenszeichen in Sekunden zurück (CURRICULUM_EVENTS_HEARTBEAT)."""
+        return getattr(settings, 'CURRICULUM_EVENTS_HEARTBEAT', 15)
+
+    def get_max_duration(self):
+        """Gibt die Höchstdauer einer Verbindung in Sekunden zurück (CURRICULUM_EVENTS_MAX_DURATION)."""
+        return getattr(settings, 'CURRICULUM_EVENTS_MAX_DURATION', 300)
+
+    def parse_lehrplan_ids(self, request):
+        """
+        Liest die IDs der beobachteten Lehrpläne.
+        
+        Args:
+            request: Die HTTP-Anfrage
+        
+        Returns:
+            set: Die IDs oder None für alle Lehrpläne
+        
+        Raises:
+            BadRequest: Wenn eine ID keine Zahl ist
+        """
+        value = request.GET.get('lehrplan', '')
+        if not value.strip():
+            return None
+        try:
+            return {int(part) for part in value.split(',') if part.strip()}
+        except ValueError:
+            raise BadRequest("lehrplan muss eine kommaseparierte Liste von IDs sein")
+
+    async def aget_since(self, request):
+        """
+        Ermittelt das Token, ab dem Änderungen gesendet werden.
+        
+        Args:
+            request: Die HTTP-Anfrage
+        
+        Returns:
+            int: Last-Event-ID, der Parameter since oder das Token des aktuellen Stands
+        
+        Raises:
+            BadRequest: Wenn das Token keine nicht negative Zahl ist
+        """
+        value = request.headers.get('Last-Event-ID') or request.GET.get('since')
+        if value is None:
+            return await aget_token()
+        try:
+            since = int(value)
+        except ValueError:
+            raise BadRequest("Ungültiges Token")
+        if since < 0:
+            raise BadRequest("Ungültiges Token")
+        return since
+
+    def format_event(self, event):
+        """
+        Kodiert ein Ereignis im Format von Server-Sent Events.
+        
+        Args:
+            event (dict): Ein Ereignis aus aload_lehrplan_events
+        
+        Returns:
+            str: Das kodierte Ereignis
+        """
+        data = json.dumps({
+            'lehrplan_id': event['lehrplan_id'],
+            'version': event['version'],
+            'geloescht': event['version'] is None,
+        })
+        return f"id: {event['token']}\nevent: lehrplan\ndata: {data}\n\n"
+
+    async def aiter_events(self, since, lehrplan_ids):
+        """
+        Erzeugt den Ereignisstrom einer Verbindung.
+        
+        Zuerst werden Änderungen zwischen since und dem Stand des Broadcasters nachgeladen,
+        danach die vom Broadcaster verteilten Ereignisse gesendet. Ereignisse, die der Client
+        bereits erhalten hat, werden übersprungen.
+        
+        Args:
+            since (int): Das Token, ab dem Änderungen gesendet werden
+            lehrplan_ids (set): Die beobachteten Lehrpläne oder None für alle
+        
+        Yields:
+            str: Kodierte Ereignisse, Kommentare und Token-Aktualisierungen
+        """
+        def wanted(event):
+            return lehrplan_ids is None or event['lehrplan_id'] in lehrplan_ids
+
+        yield f"retry: {self.retry}\nid: {since}\n\n"
+        queue, token = broadcaster.subscribe(since)
+        try:
+            position = sent = since
+            while position < token:
+                events, position, has_more = await aload_lehrplan_events(position)
+                for event in events:
+                    if event['token'] <= token and wanted(event):
+                        yield self.format_event(event)
+                        sent = event['token']
+                if not has_more:
+                    break
+            position = max(since, token)
+
+            loop = asyncio.get_running_loop()
+            heartbeat_interval = self.get_heartbeat_interval()
+            deadline = loop.time() + self.get_max_duration()
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    events, batch_token = await asyncio.wait_for(
+                        queue.get(), timeout=min(heartbeat_interval, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    # Lebenszeichen; "id" ohne Daten aktualisiert nur die Last-Event-ID des Clients
+                    yield f": ping\nid: {position}\n\n" if position != sent else ": ping\n\n"
+                    sent = position
+                    continue
+                for event in events:
+                    if event['token'] > position and wanted(event):
+                        yield self.format_event(event)
+                        sent = event['token']
+                position = max(position, batch_token)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    async def get(self, request):
+        """
+        Verarbeitet GET-Anfragen und öffnet den Ereignisstrom.
+        
+        Args:
+            request: Die HTTP-Anfrage mit den optionalen Parametern lehrplan und since
+        
+        Returns:
+            StreamingHttpResponse: Der Ereignisstrom (text/event-stream)
+        
+        Raises:
+            BadRequest: Bei ungültigen IDs oder einem ungültigen Token
+        """
+        lehrplan_ids = self.parse_lehrplan_ids(request)
+        since = await self.aget_since(request)
+        response = StreamingHttpResponse(self.aiter_events(since, lehrplan_ids), content_type='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
@@ -1,30 +1,116 @@
+import base64
+import binascii
+import hashlib
+import json
 from django.views import View
 from django.http import JsonResponse, Http404
+from django.core.exceptions import BadRequest
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db.models import Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(request, *parts):
+    """
+    Baut einen ETag aus den übergebenen Bestandteilen und den Abfrageparametern.
+    
+    Die Abfrageparameter fließen mit ein, da sie die Darstellung (z. B. die Seite) bestimmen.
+    
+    Args:
+        request (HttpRequest): Das HTTP-Anfrageobjekt
+        *parts: Werte, die den Stand der Ressource beschreiben (z. B. ID und Version)
+    
+    Returns:
+        str: Der ungequotete ETag-Wert
+    """
+    etag = '-'.join(str(part) for part in parts)
+    query = '&'.join(sorted(request.GET.urlencode().split('&'))) if request.GET else ''
+    if query:
+        etag += '-' + hashlib.md5(query.encode('utf-8')).hexdigest()[:12]
+    return etag
+
+
+def get_not_modified_response(request, etag=None, last_modified=None):
+    """
+    Prüft die bedingten Header (If-None-Match, If-Modified-Since, ...) einer Anfrage.
+    
+    Args:
+        request (HttpRequest): Das HTTP-Anfrageobjekt
+        etag (str): Der ungequotete ETag der aktuellen Darstellung oder None
+        last_modified (int): Zeitstempel der letzten Änderung oder None
+    
+    Returns:
+        HttpResponse: Eine 304- bzw. 412-Antwort mit gesetzten Validatoren oder None,
+                      wenn die Anfrage normal beantwortet werden muss
+    """
+    if etag is None and last_modified is None:
+        return None
+    response = get_conditional_response(
+        request,
+        etag=quote_etag(etag) if etag else None,
+        last_modified=last_modified
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """
+    Setzt ETag, Last-Modified und Cache-Control auf einer Antwort.
+    
+    ``Cache-Control: no-cache`` erlaubt Clients und Zwischen-Caches das Speichern, verlangt
+    aber vor jeder Wiederverwendung eine Revalidierung per bedingter Anfrage.
+    
+    Args:
+        response (HttpResponse): Die Antwort
+        etag (str): Der ungequotete ETag oder None
+        last_modified (int): Zeitstempel der letzten Änderung oder None
+    
+    Returns:
+        HttpResponse: Die Antwort mit gesetzten Headern
+    """
+    if etag is not None:
+        response.headers['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    if etag is not None or last_modified is not None:
+        patch_cache_control(response, no_cache=True)
+    return response
+
 
 class BaseGetView(View):
     """
     Eine Basisklasse für die Verarbeitung von GET-Anfragen mit standardisierten Antwortformaten, Paginierung und Filterung.
     
     Diese Klasse bietet eine Grundlage für die Erstellung von REST-API-Views mit gemeinsamen Funktionalitäten wie:
-    - Paginierung
+    - Paginierung (seitenbasiert oder optional per Cursor/Keyset)
     - Objekt-Serialisierung
     - Query-Filterung
     - Detaillierte und Listen-Antworten
+    - Bedingte GET-Anfragen (ETag/Last-Modified), sofern Unterklassen Validatoren liefern
     
     Attribute:
         model (Model): Die Django-Modellklasse, die für Abfragen verwendet werden soll
         serializer_fields (list): Liste der Modellfelder, die in die Serialisierung einbezogen werden sollen
         prefetch_related_fields (list): Liste der verwandten Felder, die für die Optimierung vorgeladen werden sollen
+        select_related_fields (list): Liste der ForeignKey-Pfade, die per JOIN mitgeladen werden sollen
         page_size (int): Anzahl der Elemente pro Seite für paginierte Antworten
-        
+        max_page_size (int): Obergrenze für den vom Client gewählten Parameter page_size
+        cursor_pagination (bool): Aktiviert die Cursor-Paginierung (?pagination=cursor bzw. ?cursor=...)
+        cursor_ordering (list): Eindeutige Sortierung für die Cursor-Paginierung
+                                (Standard: Meta-ordering des Modells plus 'id')
+        query_budget (int): Höchstzahl der SQL-Abfragen je Anfrage, unabhängig von der Datenmenge
+                            (siehe curriculum.instrumentation; None = keine Prüfung)
+    
     Verwendungsbeispiel:
         class MyModelView(BaseGetView):
             model = MyModel
             serializer_fields = ['id', 'name', 'description']
             prefetch_related_fields = ['related_items']
             page_size = 20
-            
+    
             def apply_filters(self, queryset, request):
                 category = request.GET.get('category')
                 if category:
@@ -35,7 +121,12 @@ class BaseGetView(View):
     model = None  
     serializer_fields = []  
     prefetch_related_fields = []  
+    select_related_fields = []
     page_size = 10  
+    max_page_size = 100
+    cursor_pagination = False
+    query_budget = None
+    cursor_ordering = None
     
     def get_queryset(self):
         """
@@ -43,14 +134,16 @@ class BaseGetView(View):
         
         Returns:
             QuerySet: Das QuerySet des Modells mit vorgeladenen verwandten Feldern
-            
+        
         Raises:
             NotImplementedError: Wenn das model-Attribut nicht definiert ist
         """
         if not self.model:
             raise NotImplementedError("model muss in der erbenden Klasse definiert werden")
         
-        queryset = self.model.objects
+        queryset = self.model.objects.all()
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
         if self.prefetch_related_fields:
             queryset = queryset.prefetch_related(*self.prefetch_related_fields)
         return queryset
@@ -63,7 +156,7 @@ class BaseGetView(View):
         Args:
             queryset (QuerySet): Das initiale QuerySet, das gefiltert werden soll
             request (HttpRequest): Das HTTP-Anfrageobjekt mit Filterparametern
-            
+        
         Returns:
             QuerySet: Das gefilterte QuerySet
         """
@@ -76,7 +169,7 @@ class BaseGetView(View):
         Args:
             queryset (QuerySet): Das zu paginierende QuerySet
             request (HttpRequest): Das HTTP-Anfrageobjekt mit dem Seitenparameter
-            
+        
         Returns:
             dict: Ein Dictionary mit den paginierten Elementen und Paginierungsinformationen
         """
@@ -86,7 +179,7 @@ class BaseGetView(View):
         except ValueError:
             page = 1
         
-        paginator = Paginator(queryset, self.page_size)
+        paginator = Paginator(queryset, self.get_page_size(request))
         try:
             page_obj = paginator.page(page)
         except PageNotAnInteger:
@@ -103,6 +196,184 @@ class BaseGetView(View):
             'has_previous': page_obj.has_previous()
         }
 
+    def get_page_size(self, request):
+        """
+        Ermittelt die Seitengröße aus dem Parameter page_size, begrenzt auf max_page_size.
+        
+        Args:
+            request (HttpRequest): Das HTTP-Anfrageobjekt
+        
+        Returns:
+            int: Die zu verwendende Seitengröße
+        """
+        try:
+            page_size = int(request.GET.get('page_size', self.page_size))
+        except ValueError:
+            page_size = self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def uses_cursor_pagination(self, request):
+        """
+        Prüft, ob die Anfrage die Cursor-Paginierung verwenden soll.
+        
+        Args:
+            request (HttpRequest): Das HTTP-Anfrageobjekt
+        
+        Returns:
+            bool: True, wenn die View sie unterstützt und die Anfrage sie anfordert
+        """
+        return self.cursor_pagination and (
+            'cursor' in request.GET or request.GET.get('pagination') == 'cursor'
+        )
+
+    def get_cursor_ordering(self):
+        """
+        Liefert die eindeutige Sortierung für die Cursor-Paginierung.
+        
+        Returns:
+            list: Feldnamen in Sortierreihenfolge, mit 'id' als letztem Feld
+        """
+        ordering = list(self.cursor_ordering or self.model._meta.ordering)
+        if 'id' not in ordering:
+            ordering.append('id')
+        return ordering
+    
+    @staticmethod
+    def encode_cursor(values, reverse=False):
+        """
+        Kodiert die Sortierschlüssel eines Elements als undurchsichtigen Cursor.
+        
+        Args:
+            values (list): Die Werte der Sortierfelder
+            reverse (bool): True für einen Cursor, der rückwärts blättert
+        
+        Returns:
+            str: Der URL-sichere Cursor
+        """
+        raw = json.dumps({'k': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor, length):
+        """
+        Dekodiert einen Cursor.
+        
+        Args:
+            cursor (str): Der vom Client übergebene Cursor
+            length (int): Die erwartete Anzahl an Sortierwerten
+        
+        Returns:
+            tuple: (Liste der Sortierwerte, reverse)
+        
+        Raises:
+            BadRequest: Wenn der Cursor ungültig ist
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            values, reverse = data['k'], bool(data['r'])
+        except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+            raise BadRequest("Ungültiger Cursor")
+        if not isinstance(values, list) or len(values) != length:
+            raise BadRequest("Ungültiger Cursor")
+        return values, reverse
+
+    def cursor_paginate_queryset(self, queryset, request):
+        """
+        Paginiert das QuerySet per Keyset über die Cursor-Sortierung.
+        
+        Anders als bei der seitenbasierten Paginierung wird weder ein COUNT(*) noch ein
+        OFFSET benötigt: Jede Seite ist eine Bereichsabfrage ab dem Cursor mit LIMIT
+        page_size + 1, sodass die Kosten unabhängig von der Position konstant bleiben.
+        Die Gesamtanzahl wird nur mit ?include_total=1 ermittelt.
+        
+        Args:
+            queryset (QuerySet): Das zu paginierende QuerySet
+            request (HttpRequest): Das HTTP-Anfrageobjekt mit den Parametern cursor,
+                                   page_size und include_total
+        
+        Returns:
+            dict: Ein Dictionary mit den Elementen ('items') und Paginierungsinformationen ('pagination')
+        """
+        page = self.get_cursor_page(queryset, request)
+        items = self.finish_cursor_page(list(page['queryset']), page)
+        if self.wants_total(request):
+            page['pagination']['total_items'] = queryset.count()
+        return {'items': items, 'pagination': page['pagination']}
+
+    def wants_total(self, request):
+        """
+        Prüft, ob im Cursor-Modus zusätzlich die Gesamtanzahl ermittelt werden soll (?include_total=1).
+        """
+        return request.GET.get('include_total', '').lower() in ('1', 'true')
+
+    def get_cursor_page(self, queryset, request):
+        """
+        Baut die Bereichsabfrage für eine Cursor-Seite, ohne sie auszuführen.
+        
+        Args:
+            queryset (QuerySet): Das zu paginierende QuerySet
+            request (HttpRequest): Das HTTP-Anfrageobjekt
+        
+        Returns:
+            dict: Die Abfrage ('queryset') und der Zustand für finish_cursor_page
+        """
+        ordering = self.get_cursor_ordering()
+        page_size = self.get_page_size(request)
+        cursor = request.GET.get('cursor')
+
+        reverse = False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor, len(ordering))
+            # (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ... bzw. < beim Rückwärtsblättern
+            lookup = 'lt' if reverse else 'gt'
+            condition = Q()
+            for index, field in enumerate(ordering):
+                equal = {ordering[i]: values[i] for i in range(index)}
+                condition |= Q(**equal, **{f"{field}__{lookup}": values[index]})
+            queryset = queryset.filter(condition)
+
+        order_by = [f"-{field}" for field in ordering] if reverse else ordering
+        return {
+            'queryset': queryset.order_by(*order_by)[:page_size + 1],
+            'ordering': ordering,
+            'page_size': page_size,
+            'cursor': cursor,
+            'reverse': reverse,
+        }
+
+    def finish_cursor_page(self, items, page):
+        """
+        Wertet die geladenen Zeilen einer Cursor-Seite aus und setzt page['pagination'].
+        
+        Args:
+            items (list): Die Ergebnisse der Abfrage aus get_cursor_page (höchstens page_size + 1)
+            page (dict): Der Zustand aus get_cursor_page
+        
+        Returns:
+            list: Die Elemente der Seite in Vorwärtsreihenfolge
+        """
+        ordering, page_size, cursor, reverse = page['ordering'], page['page_size'], page['cursor'], page['reverse']
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if reverse:
+            items.reverse()
+
+        has_next = has_more if not reverse else bool(cursor)
+        has_previous = has_more if reverse else bool(cursor)
+
+        def key(obj):
+            return [getattr(obj, field) for field in ordering]
+
+        page['pagination'] = {
+            'page_size': page_size,
+            'has_next': has_next and bool(items),
+            'has_previous': has_previous and bool(items),
+            'next': self.encode_cursor(key(items[-1])) if has_next and items else None,
+            'previous': self.encode_cursor(key(items[0]), reverse=True) if has_previous and items else None,
+        }
+        return items
+
     def serialize_object(self, obj):
         """
         Serialisiert ein Modellobjekt in ein Dictionary für die JSON-Antwort.
@@ -110,10 +381,10 @@ class BaseGetView(View):
         
         Args:
             obj: Das zu serialisierende Modellobjekt
-            
+        
         Returns:
             dict: Eine Dictionary-Darstellung des Objekts
-            
+        
         Raises:
             NotImplementedError: Wenn serializer_fields nicht definiert ist
         """
@@ -128,10 +399,10 @@ class BaseGetView(View):
         
         Args:
             pk: Der Primärschlüssel des abzurufenden Objekts
-            
+        
         Returns:
             Model: Das angeforderte Objekt
-            
+        
         Raises:
             Http404: Wenn das Objekt nicht existiert
         """
@@ -140,21 +411,95 @@ class BaseGetView(View):
         except self.model.DoesNotExist:
             raise Http404(f"{self.model.__name__} nicht gefunden")
 
+    def get_detail_validators(self, request, pk):
+        """
+        Liefert die Validatoren für die Detailansicht eines Objekts.
+        Unterklassen überschreiben diese Methode, um bedingte GET-Anfragen zu unterstützen.
+        Sie wird vor dem Laden und Serialisieren des Objekts aufgerufen.
+        
+        Args:
+            request (HttpRequest): Das HTTP-Anfrageobjekt
+            pk: Der Primärschlüssel des Objekts
+        
+        Returns:
+            tuple: (ETag, Last-Modified-Zeitstempel), jeweils None, wenn nicht verfügbar
+        """
+        return None, None
+
+    def get_list_validators(self, request, queryset):
+        """
+        Liefert die Validatoren für eine Listenansicht.
+        Unterklassen überschreiben diese Methode, um bedingte GET-Anfragen zu unterstützen.
+        Sie wird vor der Paginierung und Serialisierung aufgerufen.
+        
+        Args:
+            request (HttpRequest): Das HTTP-Anfrageobjekt
+            queryset (QuerySet): Das gefilterte QuerySet
+        
+        Returns:
+            tuple: (ETag, Last-Modified-Zeitstempel), jeweils None, wenn nicht verfügbar
+        """
+        return None, None
+
+    def get_page_validators(self, request, items, pagination):
+        """
+        Liefert die Validatoren für eine per Cursor paginierte Seite.
+        Unterklassen überschreiben diese Methode, um bedingte GET-Anfragen zu unterstützen.
+        Die Validatoren müssen auch die Paginierungsangaben abdecken, da sich has_next,
+        die Cursor oder die Gesamtanzahl ändern können, ohne dass sich ein Element der
+        Seite ändert.
+        
+        Args:
+            request (HttpRequest): Das HTTP-Anfrageobjekt
+            items (list): Die Objekte der Seite
+            pagination (dict): Die Paginierungsangaben der Seite (siehe finish_cursor_page)
+        
+        Returns:
+            tuple: (ETag, Last-Modified-Zeitstempel), jeweils None, wenn nicht verfügbar
+        """
+        return None, None
+
+    def get_serialized_detail(self, pk):
+        """
+        Liefert die serialisierte Darstellung eines einzelnen Objekts.
+        Unterklassen können diese Methode überschreiben, um z. B. einen Cache vorzuschalten.
+        
+        Args:
+            pk: Der Primärschlüssel des abzurufenden Objekts
+        
+        Returns:
+            dict: Die serialisierte Darstellung des Objekts
+        
+        Raises:
+            Http404: Wenn das Objekt nicht existiert
+        """
+        return self.serialize_object(self.get_single_object(pk))
+
     def get_list_response(self, request):
         """
         Generiert eine standardisierte JSON-Antwort für eine Listenansicht.
         
         Args:
             request (HttpRequest): Das HTTP-Anfrageobjekt
-            
+        
         Returns:
             JsonResponse: Eine JSON-Antwort mit den serialisierten Objekten und Paginierungsinformationen
+                          oder eine 304-Antwort, wenn sich die Liste nicht geändert hat
         """
         queryset = self.get_queryset()
         queryset = self.apply_filters(queryset, request)
+        
+        if self.uses_cursor_pagination(request):
+            return self.get_cursor_list_response(request, queryset)
+        
+        etag, last_modified = self.get_list_validators(request, queryset)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
         paginated_data = self.paginate_queryset(queryset, request)
         
-        return JsonResponse({
+        response = JsonResponse({
             'results': [self.serialize_object(obj) for obj in paginated_data['items']],
             'pagination': {
                 'total_pages': paginated_data['total_pages'],
@@ -164,6 +509,35 @@ class BaseGetView(View):
                 'has_previous': paginated_data['has_previous']
             }
         }, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
+        return set_validators(response, etag, last_modified)
+
+    def get_cursor_list_response(self, request, queryset):
+        """
+        Generiert eine JSON-Antwort für eine Listenansicht mit Cursor-Paginierung.
+        
+        Die Validatoren werden aus den Elementen und den Paginierungsangaben der Seite
+        berechnet, damit auch bedingte Anfragen nur die konstanten Kosten einer Seite verursachen.
+        
+        Args:
+            request (HttpRequest): Das HTTP-Anfrageobjekt
+            queryset (QuerySet): Das gefilterte QuerySet
+        
+        Returns:
+            JsonResponse: Eine JSON-Antwort mit den serialisierten Objekten und den Cursorn
+                          oder eine 304-Antwort, wenn sich die Seite nicht geändert hat
+        """
+        paginated_data = self.cursor_paginate_queryset(queryset, request)
+        
+        etag, last_modified = self.get_page_validators(request, paginated_data['items'], paginated_data['pagination'])
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        response = JsonResponse({
+            'results': [self.serialize_object(obj) for obj in paginated_data['items']],
+            'pagination': paginated_data['pagination']
+        }, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
+        return set_validators(response, etag, last_modified)
 
     def get_detail_response(self, request, pk):
         """
@@ -172,9 +546,15 @@ class BaseGetView(View):
         Args:
             request (HttpRequest): Das HTTP-Anfrageobjekt
             pk: Der Primärschlüssel des abzurufenden Objekts
-            
+        
         Returns:
             JsonResponse: Eine JSON-Antwort mit dem serialisierten Objekt
+                          oder eine 304-Antwort, wenn sich das Objekt nicht geändert hat
         """
-        obj = self.get_single_object(pk)
-        return JsonResponse(self.serialize_object(obj), safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False}) 
\ No newline at end of file
+        etag, last_modified = self.get_detail_validators(request, pk)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        response = JsonResponse(self.get_serialized_detail(pk), safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
+        return set_validators(response, etag, last_modified) 
\ No newline at end of file
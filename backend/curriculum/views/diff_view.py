@@ -0,0 +1,274 @@
+from django.core.exceptions import BadRequest
+from django.http import Http404, JsonResponse
+from django.views import View
+from curriculum.hashes import diff_knoten, get_hashes, load_children
+from curriculum.hierarchy import EBENEN_MODELLE
+from curriculum.models import Lehrplan
+from .base_view import BaseGetView, make_etag
+from .serializers import CurriculumSerializer
+
+
+class LehrplanHashView(BaseGetView):
+    """
+    API-Endpunkt für die Inhaltshashes eines Lehrplans und seiner Knoten.
+    
+    Jeder Knoten hat einen Hash über seine eigenen Felder und Beschreibungen
+    ("Inhalt_hash") und einen Hash über seinen gesamten Teilbaum ("Hash"), siehe
+    curriculum.hashes. Ein Client, der den Lehrplan bereits kennt, vergleicht zunächst
+    den Hash des Lehrplans und fragt nur bei einer Abweichung tiefere Ebenen ab.
+    Der Hash des Lehrplans dient zugleich als starker ETag.
+    
+    Verwendung:
+        GET /curriculum/curriculum/<id>/hashes/
+        GET /curriculum/curriculum/<id>/hashes/?depth=2
+    
+        Optionale Abfrageparameter:
+        - depth: Anzahl der Ebenen unterhalb des Lehrplans (Standard: 0 = nur Lehrplan)
+    
+        Beispielantwort (depth=1):
+        {
+            "Lehrplan_id": 1,
+            "Hash": "0f3c...",
+            "Inhalt_hash": "9a41...",
+            "Lernbereiche": [
+                {"Lernbereich_id": 3, "Hash": "77be...", "Inhalt_hash": "1c09..."},
+                ...
+            ]
+        }
+    """
+
+    model = Lehrplan
+    query_budget = 30
+
+    def parse_depth(self, request):
+        """
+        Liest den Parameter depth.
+        
+        Args:
+            request: Die HTTP-Anfrage
+        
+        Returns:
+            int: Die Anzahl der Ebenen unterhalb des Lehrplans
+        
+        Raises:
+            BadRequest: Bei einer ungültigen Tiefe
+        """
+        try:
+            depth = int(request.GET.get('depth', 0))
+        except ValueError:
+            raise BadRequest("depth muss eine Zahl sein")
+        if not 0 <= depth <= CurriculumSerializer.MAX_DEPTH:
+            raise BadRequest(f"depth muss zwischen 0 und {CurriculumSerializer.MAX_DEPTH} liegen")
+        return depth
+
+    def get_detail_validators(self, request, pk):
+        """
+        Liefert einen starken ETag aus dem Baum-Hash des Lehrplans.
+        
+        Args:
+            request: Die HTTP-Anfrage
+            pk: Die ID des Lehrplans
+        
+        Returns:
+            tuple: (ETag, None)
+        
+        Raises:
+            Http404: Wenn der Lehrplan nicht existiert
+        """
+        hashes = get_hashes([(0, pk)]).get((0, pk))
+        if hashes is None:
+            raise Http404(f"{self.model.__name__} nicht gefunden")
+        return make_etag(request, 'hashes', pk, hashes[1]), None
+
+    def get_serialized_detail(self, pk):
+        """
+        Baut den Baum der Hashes bis zur angeforderten Tiefe auf, mit zwei Abfragen je Ebene.
+        
+        Args:
+            pk: Die ID des Lehrplans
+        
+        Returns:
+            dict: Die Hashes des Lehrplans und seiner Knoten in der Struktur des Lehrplanbaums
+        
+        Raises:
+            Http404: Wenn der Lehrplan nicht existiert
+        """
+        depth = self.parse_depth(self.request)
+        hashes = get_hashes([(0, pk)]).get((0, pk))
+        if hashes is None:
+            raise Http404(f"{self.model.__name__} nicht gefunden")
+        root = {"Lehrplan_id": pk, "Hash": hashes[1], "Inhalt_hash": hashes[0]}
+
+        nodes = {pk: root}
+        for ebene in range(depth):
+            children = load_children(ebene, nodes)
+            known = get_hashes((ebene + 1, child_id) for kinder in children.values() for child_id, in kinder)
+            name = EBENEN_MODELLE[ebene + 1].__name__
+            child_nodes = {}
+            for parent_id, node in nodes.items():
+                node[CurriculumSerializer.CHILD_KEYS[ebene]] = []
+                for child_id, in children.get(parent_id, []):
+                    eigen, baum = known[(ebene + 1, child_id)]
+                    child = {f"{name}_id": child_id, "Hash": baum, "Inhalt_hash": eigen}
+                    node[CurriculumSerializer.CHILD_KEYS[ebene]].append(child)
+                    child_nodes[child_id] = child
+            nodes = child_nodes
+        return root
+
+    def get(self, request, pk):
+        """
+        Verarbeitet GET-Anfragen für die Hashes eines Lehrplans.
+        
+        Args:
+            request: Die HTTP-Anfrage
+            pk: Die ID des Lehrplans
+        
+        Returns:
+            JsonResponse: Die Hashes oder eine 304-Antwort, wenn der ETag übereinstimmt
+        """
+        return self.get_detail_response(request, pk)
+
+
+class LehrplanDiffView(View):
+    """
+    API-Endpunkt für die Unterschiede zwischen zwei Lehrplänen.
+    
+    Der Vergleich nutzt die Inhaltshashes (siehe curriculum.hashes) und steigt nur in
+    Teilbäume ab, deren Hashes sich unterscheiden; gleiche Teilbäume werden nicht geladen.
+    Kinder werden einander über die Nummer (Lernbereiche) bzw. den Namen zugeordnet.
+    
+    Verwendung:
+        GET /curriculum/curricula/diff/?a=1&b=2
+    
+        Antwort:
+        {
+            "a": {"Lehrplan_id": 1, "Hash": "0f3c..."},
+            "b": {"Lehrplan_id": 2, "Hash": "5d20..."},
+            "gleich": false,
+            "aenderungen": [
+                {
+                    "Art": "geaendert",
+                    "Typ": "Lernziel",
+                    "Pfad": [
+                        {"Typ": "Lehrplan", "a": 1, "b": 2},
+                        {"Typ": "Lernbereich", "a": 3, "b": 11}
+                    ],
+                    "a": {"Lernziel_id": 7},
+                    "b": {"Lernziel_id": 19},
+                    "Felder": {
+                        "Lernziel_Beschreibungen": {"a": ["..."], "b": ["...", "..."]}
+                    }
+                },
+                {
+                    "Art": "hinzugefuegt",
+                    "Typ": "Teilziel",
+                    "Pfad": [...],
+                    "a": null,
+                    "b": {"Teilziel_id": 40, "Teilziel_name": "...", "Teilziel_beschreibungen": [...]}
+                },
+                ...
+            ]
+        }
+    
+        "Art" ist "geaendert" (eigene Felder oder Beschreibungen unterscheiden sich),
+        "hinzugefuegt" (nur in b) oder "entfernt" (nur in a). Unterhalb hinzugefügter oder
+        entfernter Knoten werden keine weiteren Einträge ausgegeben.
+    """
+
+    query_budget = 30
+
+    def parse_id(self, request, name):
+        """
+        Liest eine Lehrplan-ID aus den Abfrageparametern.
+        
+        Args:
+            request: Die HTTP-Anfrage
+            name (str): Der Name des Parameters
+        
+        Returns:
+            int: Die ID
+        
+        Raises:
+            BadRequest: Wenn der Parameter fehlt oder keine Zahl ist
+        """
+        try:
+            return int(request.GET[name])
+        except (KeyError, ValueError):
+            raise BadRequest(f"Parameter {name} muss die ID eines Lehrplans sein, z. B. ?a=1&b=2")
+
+    def serialize_values(self, ebene, knoten_id, values):
+        """
+        Gibt einen Knoten mit seinen Werten in der Schlüsselform des Lehrplanbaums aus.
+        
+        Args:
+            ebene (int): Die Ebene des Knotens
+            knoten_id: Die ID des Knotens
+            values (dict): Feldname -> Wert oder None
+        
+        Returns:
+            dict: Die Ausgabeschlüssel mit ihren Werten
+        """
+        keys = CurriculumSerializer.FIELD_KEYS[ebene]
+        data = {keys['id']: knoten_id}
+        data.update({keys[field]: value for field, value in (values or {}).items()})
+        return data
+
+    def serialize_change(self, change):
+        """
+        Gibt einen Eintrag von diff_knoten in der Form der API aus.
+        
+        Args:
+            change (dict): Ein Eintrag aus curriculum.hashes.diff_knoten
+        
+        Returns:
+            dict: Der Eintrag der Antwort
+        """
+        ebene = change['ebene']
+        keys = CurriculumSerializer.FIELD_KEYS[ebene]
+        result = {
+            "Art": change['art'],
+            "Typ": CurriculumSerializer.LEVELS[ebene],
+            "Pfad": [
+                {"Typ": CurriculumSerializer.LEVELS[pfad_ebene], "a": a, "b": b}
+                for pfad_ebene, a, b in change['pfad']
+            ],
+        }
+        werte_a, werte_b = change['werte']
+        if change['art'] == 'geaendert':
+            result["a"] = {keys['id']: change['a']}
+            result["b"] = {keys['id']: change['b']}
+            result["Felder"] = {
+                keys[field]: {"a": werte_a.get(field), "b": werte_b.get(field)}
+                for field in werte_a
+                if werte_a.get(field) != werte_b.get(field)
+            }
+        else:
+            result["a"] = self.serialize_values(ebene, change['a'], werte_a) if change['a'] is not None else None
+            result["b"] = self.serialize_values(ebene, change['b'], werte_b) if change['b'] is not None else None
+        return result
+
+    def get(self, request):
+        """
+        Verarbeitet GET-Anfragen für den Vergleich zweier Lehrpläne.
+        
+        Args:
+            request: Die HTTP-Anfrage mit den Parametern a und b
+        
+        Returns:
+            JsonResponse: Die Hashes beider Lehrpläne und die Liste der Unterschiede
+        
+        Raises:
+            BadRequest: Wenn a oder b fehlen oder ungültig sind
+            Http404: Wenn einer der Lehrpläne nicht existiert
+        """
+        a_id, b_id = self.parse_id(request, 'a'), self.parse_id(request, 'b')
+        changes = diff_knoten(0, a_id, b_id)
+        if changes is None:
+            raise Http404("Lehrplan nicht gefunden")
+        hashes = get_hashes([(0, a_id), (0, b_id)])
+        return JsonResponse({
+            'a': {"Lehrplan_id": a_id, "Hash": hashes[(0, a_id)][1]},
+            'b': {"Lehrplan_id": b_id, "Hash": hashes[(0, b_id)][1]},
+            'gleich': hashes[(0, a_id)][1] == hashes[(0, b_id)][1],
+            'aenderungen': [self.serialize_change(change) for change in changes],
+        }, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
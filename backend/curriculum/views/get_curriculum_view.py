@@ -1,9 +1,110 @@
-from django.http import JsonResponse
-from curriculum.models import Lehrplan
-from .base_view import BaseGetView
+import hashlib
+import json
+import re
+import textwrap
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from curriculum.cache import CurriculumCache
+from curriculum.facets import count_facets
+from curriculum.klassenstufen import build_klassenstufe_filter
+from curriculum.models import Lehrplan, LehrplanKlassenstufe
+from curriculum.statistik import FIELDS as STATISTIK_FIELDS
+from curriculum.versioning import get_collection_stamp, get_lehrplan_stamp, to_timestamp
+from .base_view import BaseGetView, get_not_modified_response, make_etag, set_validators
 from django.views import View
 from .serializers import CurriculumSerializer
 
+def get_versions(lehrplan_ids):
+    """
+    Liest die aktuellen Versionen mehrerer Lehrpläne mit einer Abfrage.
+    
+    Args:
+        lehrplan_ids (list): Die IDs der Lehrpläne
+    
+    Returns:
+        dict: Lehrplan-ID -> Version; nicht existierende IDs fehlen
+    """
+    return dict(Lehrplan.objects.filter(pk__in=lehrplan_ids).order_by().values_list('id', 'version'))
+
+
+def load_curriculum_trees(lehrplan_ids, options=None, versions=None, populate_cache=True):
+    """
+    Lädt die serialisierten Bäume mehrerer Lehrpläne, bevorzugt aus dem CurriculumCache.
+    
+    Bereits gecachte Bäume der aktuellen Versionen werden mit einem Cache-Zugriff gelesen
+    und bei Bedarf auf die angeforderte Tiefe und Felder reduziert. Fehlende vollständige
+    Bäume werden über die flachen Abfragen des CurriculumTreeAssembler in einer Transaktion
+    aufgebaut und unter der Version gecacht, die dabei mitgelesen wurde, sodass ein Baum nie
+    unter einer neueren Version als seinem Inhalt abgelegt wird. Eingeschränkte
+    Darstellungen fragen nur die benötigten Ebenen ab und werden nicht gecacht.
+    
+    Args:
+        lehrplan_ids (list): Die IDs der zu ladenden Lehrpläne
+        options (dict): Das Ergebnis von CurriculumSerializer.parse_tree_options oder None
+        versions (dict): Lehrplan-ID -> aktuelle Version, falls bereits gelesen;
+                         sonst werden die Versionen mit einer Abfrage ermittelt
+        populate_cache (bool): False, um neu aufgebaute Bäume nicht zu cachen (z. B. beim
+                               Streamen aller Lehrpläne, das sonst den Cache verdrängt)
+    
+    Returns:
+        dict: Lehrplan-ID -> serialisierter Baum; nicht existierende IDs fehlen
+    """
+    if versions is None:
+        versions = get_versions(lehrplan_ids)
+    trees = {
+        lehrplan_id: CurriculumSerializer.prune(tree, options)
+        for lehrplan_id, tree in CurriculumCache.get_many(
+            {lehrplan_id: versions[lehrplan_id] for lehrplan_id in lehrplan_ids if lehrplan_id in versions}
+        ).items()
+    }
+
+    missing_ids = [lehrplan_id for lehrplan_id in lehrplan_ids if lehrplan_id in versions and lehrplan_id not in trees]
+    if missing_ids:
+        trees.update(build_curriculum_trees(missing_ids, options, populate_cache))
+
+    return trees
+
+
+def build_curriculum_trees(lehrplan_ids, options=None, populate_cache=True):
+    """
+    Baut die Bäume von Lehrplänen ohne Cache-Eintrag über den CurriculumTreeAssembler auf.
+    
+    Vollständige Bäume werden in einer Transaktion zusammen mit ihren Versionen gelesen und
+    unter diesen gecacht (siehe load_curriculum_trees).
+    
+    Args:
+        lehrplan_ids (list): Die IDs der aufzubauenden Lehrpläne
+        options (dict): Das Ergebnis von CurriculumSerializer.parse_tree_options oder None
+        populate_cache (bool): False, um die Bäume nicht zu cachen
+    
+    Returns:
+        dict: Lehrplan-ID -> serialisierter Baum; nicht existierende IDs fehlen
+    """
+    if options is not None:
+        return {
+            tree["Lehrplan_id"]: CurriculumSerializer.prune(tree, options)
+            for tree in CurriculumSerializer.serialize_curricula(
+                lehrplan_ids,
+                depth=options['depth'],
+                beschreibungen=CurriculumSerializer.needs_beschreibungen(options)
+            )
+        }
+
+    stamps = {}
+    with transaction.atomic(savepoint=False):
+        loaded = {
+            tree["Lehrplan_id"]: tree
+            for tree in CurriculumSerializer.serialize_curricula(lehrplan_ids, stamps=stamps)
+        }
+    if populate_cache:
+        CurriculumCache.set_many(loaded, {lehrplan_id: stamp[0] for lehrplan_id, stamp in stamps.items()})
+    return loaded
+
+
 class LehrplanDetailView(BaseGetView):
     """
     API-Endpunkt für den Abruf detaillierter Informationen zu einem bestimmten Lehrplan.
@@ -15,7 +116,7 @@ class LehrplanDetailView(BaseGetView):
         model: Das Lehrplan-Modell
         serializer_fields: Grundlegende Felder, die in die Serialisierung einbezogen werden sollen
         prefetch_related_fields: Verwandte Felder, die für die Abfrageoptimierung vorgeladen werden sollen
-        
+    
     Returns:
         JsonResponse: Eine detaillierte JSON-Struktur mit:
             - Grundlegenden Lehrplaninformationen (ID, Klassenstufen, Bundesland, Fach)
@@ -23,10 +124,20 @@ class LehrplanDetailView(BaseGetView):
             - Lernzielen mit ihren Beschreibungen
             - Teilzielen mit ihren Beschreibungen
             - Lerninhalten mit ihren Beschreibungen
-            
+    
     Verwendung:
         GET /curriculum/curriculum/<id>/
-        
+    
+        Optionale Abfrageparameter:
+        - depth: Anzahl der Ebenen unterhalb des Lehrplans (0 = nur Lehrplan,
+          1 = + Lernbereiche, 2 = + Lernziele, 3 = + Teilziele, 4 = + Lerninhalte)
+        - fields: Kommaseparierte Liste der auszugebenden Felder, z. B. fields=id,name
+        - exclude: Kommaseparierte Liste auszulassender Felder, z. B. exclude=beschreibungen
+    
+        Nicht benötigte Ebenen und Beschreibungstabellen werden nicht abgefragt.
+        Beispiel für ein Navigationsmenü:
+        GET /curriculum/curriculum/<id>/?depth=1&fields=id,name,nummer
+    
         Beispielantwort:
         {
             "Lehrplan_id": 1,
@@ -47,6 +158,8 @@ class LehrplanDetailView(BaseGetView):
     model = Lehrplan
     serializer_fields = ['id', 'klassenstufen', 'bundesland', 'fach']
     prefetch_related_fields = CurriculumSerializer.get_prefetch_related_fields()
+    # Versionsstempel und acht Ebenen bei leerem Cache; bei einem Cache-Treffer nur der Stempel
+    query_budget = 9
 
     def serialize_object(self, lehrplan):
         """
@@ -54,12 +167,56 @@ class LehrplanDetailView(BaseGetView):
         
         Args:
             lehrplan: Das zu serialisierende Lehrplanobjekt
-            
+        
         Returns:
             dict: Die serialisierte hierarchische Struktur des Lehrplans mit allen zugehörigen Daten
         """
         return CurriculumSerializer.serialize_curriculum(lehrplan)
 
+    def get_detail_validators(self, request, pk):
+        """
+        Liefert ETag und Last-Modified auf Basis des Versionsstempels des Lehrplans.
+        
+        Args:
+            request: Die HTTP-Anfrage
+            pk: Die ID des Lehrplans
+        
+        Returns:
+            tuple: (ETag, Last-Modified-Zeitstempel)
+        
+        Raises:
+            Http404: Wenn der Lehrplan nicht existiert
+        """
+        stamp = get_lehrplan_stamp(pk)
+        if stamp is None:
+            raise Http404(f"{self.model.__name__} nicht gefunden")
+        version, last_modified = stamp
+        self.versions = {pk: version}
+        return make_etag(request, 'lehrplan', pk, version), last_modified
+
+    def get_serialized_detail(self, pk):
+        """
+        Liefert den serialisierten Lehrplanbaum aus dem Cache oder baut ihn bei Bedarf auf.
+        
+        Bei einem Cache-Treffer wird keine Datenbankabfrage ausgeführt. Andernfalls wird der
+        Baum über die flachen Abfragen des CurriculumTreeAssembler aufgebaut und im Cache abgelegt.
+        Die Parameter depth, fields und exclude schränken Ausgabe und Abfragen ein.
+        
+        Args:
+            pk: Die ID des Lehrplans
+        
+        Returns:
+            dict: Die serialisierte hierarchische Struktur des Lehrplans
+        
+        Raises:
+            Http404: Wenn der Lehrplan nicht existiert
+        """
+        options = CurriculumSerializer.parse_tree_options(self.request.GET)
+        tree = load_curriculum_trees([pk], options, getattr(self, 'versions', None)).get(pk)
+        if tree is None:
+            raise Http404(f"{self.model.__name__} nicht gefunden")
+        return tree
+
     def get(self, request, pk):
         """
         Verarbeitet GET-Anfragen für einen spezifischen Lehrplan.
@@ -70,7 +227,7 @@ class LehrplanDetailView(BaseGetView):
         Args:
             request: Die HTTP-Anfrage
             pk: Die ID des anzuzeigenden Lehrplans
-            
+        
         Returns:
             JsonResponse: Die serialisierte Darstellung des Lehrplans mit allen zugehörigen Daten
         """
@@ -82,29 +239,35 @@ class LehrplanListView(BaseGetView):
     API-Endpunkt für den Abruf einer paginierten Liste von Lehrplänen mit Filteroptionen.
     
     Diese Ansicht bietet eine paginierte Liste von Lehrplänen mit grundlegenden Informationen und
-    unterstützt die Filterung nach Bundesland und Fach.
+    unterstützt die Filterung nach Bundesland, Fach und Klassenstufe.
     
     Attribute:
         model: Das Lehrplan-Modell
         serializer_fields: Felder, die in die Antwort einbezogen werden sollen
         page_size: Anzahl der Elemente pro Seite
-        
+    
     Returns:
         JsonResponse: Eine paginierte Liste mit:
             - results: Liste der Lehrpläne mit grundlegenden Informationen
             - pagination: Informationen über aktuelle Seite, Gesamtseitenzahl und Gesamtanzahl der Elemente
-            
+    
     Verwendung:
         GET /curriculum/curricula/
-        
+    
         Optionale Abfrageparameter:
         - page: Seitennummer (Standard: 1)
+        - page_size: Elemente pro Seite (Standard: 20, höchstens 100)
         - bundesland: Filter nach Bundesland
         - fach: Filter nach Fach
-        
+        - klassenstufe: Filter nach Klassenstufe, z. B. 5, 5a, 5-7 oder 5,7
+        - pagination=cursor bzw. cursor=<Cursor>: Cursor-Paginierung über
+          (bundesland, fach, klassenstufen, id) ohne COUNT(*) und OFFSET
+        - include_total=1: Gesamtanzahl auch im Cursor-Modus ermitteln
+    
         Beispiel:
         GET /curriculum/curricula/?page=1&bundesland=Bayern&fach=Mathematik
-        
+        GET /curriculum/curricula/list/?bundesland=Sachsen&klassenstufe=5
+    
         Antwort:
         {
             "results": [
@@ -122,11 +285,30 @@ class LehrplanListView(BaseGetView):
                 "total_items": 100
             }
         }
+    
+        Beispiel (Cursor-Modus):
+        GET /curriculum/curricula/list/?pagination=cursor&page_size=50
+    
+        Antwort:
+        {
+            "results": [...],
+            "pagination": {
+                "page_size": 50,
+                "has_next": true,
+                "has_previous": false,
+                "next": "eyJrIjpb...",
+                "previous": null
+            }
+        }
     """
     
     model = Lehrplan
     serializer_fields = ['id', 'klassenstufen', 'bundesland', 'fach']
     page_size = 20
+    max_page_size = 100
+    cursor_pagination = True
+    cursor_ordering = ['bundesland', 'fach', 'klassenstufen', 'id']
+    query_budget = 4
 
     def apply_filters(self, queryset, request):
         """
@@ -135,37 +317,130 @@ class LehrplanListView(BaseGetView):
         Args:
             queryset: Das initiale QuerySet, das gefiltert werden soll
             request: Das HTTP-Anfrageobjekt mit Filterparametern
-            
+        
         Returns:
             QuerySet: Das gefilterte QuerySet
         """
         bundesland = request.GET.get('bundesland')
         fach = request.GET.get('fach')
+        klassenstufe = request.GET.get('klassenstufe')
         
         if bundesland:
             queryset = queryset.filter(bundesland=bundesland)
         if fach:
             queryset = queryset.filter(fach=fach)
+        if klassenstufe:
+            # Korrelierte Unterabfrage über den Index (lehrplan_id, stufe, zusatz), damit die
+            # Liste weiter in der Reihenfolge des Sortierindex gelesen wird
+            queryset = queryset.filter(Exists(LehrplanKlassenstufe.objects.filter(
+                build_klassenstufe_filter(klassenstufe), lehrplan=OuterRef('pk')
+            )))
             
         return queryset
 
+    def get_list_validators(self, request, queryset):
+        """
+        Liefert ETag und Last-Modified für die gefilterte Liste über eine Aggregatabfrage.
+        
+        Args:
+            request: Die HTTP-Anfrage
+            queryset: Das gefilterte QuerySet
+        
+        Returns:
+            tuple: (ETag, Last-Modified-Zeitstempel)
+        """
+        stamp, last_modified = get_collection_stamp(queryset)
+        return make_etag(request, 'lehrplaene', stamp), last_modified
+
+    def get_page_validators(self, request, items, pagination):
+        """
+        Liefert einen ETag für eine Cursor-Seite aus den Versionsstempeln ihrer Lehrpläne und
+        ihren Paginierungsangaben (has_next/has_previous, Cursor, ggf. Gesamtanzahl).
+        
+        Last-Modified wird nicht gesetzt: Kommt hinter der Seite ein Lehrplan hinzu oder wird
+        einer gelöscht, ändern sich has_next oder die Gesamtanzahl, nicht aber der jüngste
+        Änderungszeitpunkt der Lehrpläne auf der Seite.
+        
+        Args:
+            request: Die HTTP-Anfrage
+            items: Die Lehrpläne der Seite
+            pagination (dict): Die Paginierungsangaben der Seite
+        
+        Returns:
+            tuple: (ETag, None)
+        """
+        raw = ','.join(f"{lehrplan.id}:{lehrplan.version}" for lehrplan in items)
+        raw += '|' + json.dumps(pagination, sort_keys=True)
+        return make_etag(request, 'seite', hashlib.md5(raw.encode('utf-8')).hexdigest()), None
+
     def get(self, request):
         """
         Verarbeitet GET-Anfragen für die paginierte Liste von Lehrplänen.
         
         Ruft eine gefilterte und paginierte Liste von Lehrplänen ab und 
         gibt sie in einem standardisierten JSON-Format zurück. Die Ergebnisse
-        können nach Bundesland und Fach gefiltert werden.
+        können nach Bundesland, Fach und Klassenstufe gefiltert werden.
         
         Args:
             request: Die HTTP-Anfrage mit optionalen Abfrageparametern für Filterung und Paginierung
-            
+        
         Returns:
             JsonResponse: Die paginierte Liste von Lehrplänen mit Paginierungsinformationen
         """
         return self.get_list_response(request)
 
 
+class LehrplanSummaryView(LehrplanListView):
+    """
+    API-Endpunkt für eine paginierte Liste von Lehrplänen mit ihren Kennzahlen.
+    
+    Die Kennzahlen stammen aus der denormalisierten Tabelle LehrplanStatistik (siehe
+    curriculum.statistik) und werden per JOIN mit den Lehrplänen geladen; die Tabellen der
+    Lernbereiche, Lernziele, Teilziele und Lerninhalte werden nicht abgefragt. Filter,
+    Paginierung (auch per Cursor) und Validatoren entsprechen LehrplanListView.
+    
+    Verwendung:
+        GET /curriculum/curricula/summary/?bundesland=Sachsen
+    
+        Antwort:
+        {
+            "results": [
+                {
+                    "id": 1,
+                    "klassenstufen": "5",
+                    "bundesland": "Sachsen",
+                    "fach": "Mathematik",
+                    "lernbereiche": 6,
+                    "lernziele": 24,
+                    "teilziele": 80,
+                    "lerninhalte": 312,
+                    "unterrichtsstunden": 140
+                },
+                ...
+            ],
+            "pagination": {...}
+        }
+    """
+    
+    select_related_fields = ['statistik']
+
+    def serialize_object(self, obj):
+        """
+        Serialisiert einen Lehrplan mit seinen Kennzahlen.
+        
+        Args:
+            obj: Der Lehrplan mit vorgeladener Statistik
+        
+        Returns:
+            dict: Die Felder des Lehrplans und die Kennzahlen (0, falls noch keine Statistik existiert)
+        """
+        data = super().serialize_object(obj)
+        statistik = getattr(obj, 'statistik', None)
+        for field in STATISTIK_FIELDS:
+            data[field] = getattr(statistik, field, 0)
+        return data
+
+
 class LehrplanAllView(View):
     """
     API-Endpunkt für den Abruf aller Lehrpläne ohne Paginierung.
@@ -176,10 +451,10 @@ class LehrplanAllView(View):
     
     Returns:
         JsonResponse: Eine Liste aller Lehrpläne mit ihrer vollständigen Struktur
-        
+    
     Verwendung:
         GET /curriculum/curricula/all/
-        
+    
         Antwort:
         [
             {
@@ -198,35 +473,252 @@ class LehrplanAllView(View):
             },
             ...
         ]
-        
+    
     Warnung:
         Dieser Endpunkt gibt alle Datensätze ohne Paginierung zurück.
         Für große Datensätze sollte stattdessen der paginierte Endpunkt
-        (/curriculum/curricula/) verwendet werden.
+        (/curriculum/curricula/) oder der Streaming-Modus
+        (/curriculum/curricula/all/?stream=1) verwendet werden.
     """
     
+    def get_stream_chunk_size(self):
+        """
+        Gibt die Anzahl der Lehrpläne je Block beim Streamen zurück (CURRICULUM_STREAM_CHUNK_SIZE).
+        """
+        return getattr(settings, 'CURRICULUM_STREAM_CHUNK_SIZE', 50)
+
+    def get_stream_populate_cache(self):
+        """
+        Gibt zurück, ob beim Streamen neu aufgebaute Bäume gecacht werden (CURRICULUM_STREAM_POPULATE_CACHE).
+        """
+        return getattr(settings, 'CURRICULUM_STREAM_POPULATE_CACHE', False)
+
+    def load_trees(self, lehrplan_ids, options=None, versions=None, populate_cache=True):
+        """
+        Lädt die serialisierten Bäume der angegebenen Lehrpläne (siehe load_curriculum_trees).
+        
+        Args:
+            lehrplan_ids (list): Die IDs der zu ladenden Lehrpläne in Ausgabereihenfolge
+            options (dict): Das Ergebnis von CurriculumSerializer.parse_tree_options oder None
+            versions (dict): Lehrplan-ID -> aktuelle Version oder None
+            populate_cache (bool): False, um neu aufgebaute Bäume nicht zu cachen
+        
+        Returns:
+            list: Die serialisierten Lehrpläne in der Reihenfolge von lehrplan_ids
+        """
+        trees = load_curriculum_trees(lehrplan_ids, options, versions, populate_cache)
+        return [trees[lehrplan_id] for lehrplan_id in lehrplan_ids if lehrplan_id in trees]
+
+    def iter_json_chunks(self, lehrplan_ids, options=None, versions=None):
+        """
+        Erzeugt das JSON-Array aller Lehrpläne stückweise.
+        
+        Die Lehrpläne werden in Blöcken von CURRICULUM_STREAM_CHUNK_SIZE geladen und sofort
+        kodiert, sodass immer nur ein Block im Speicher gehalten wird. Die Ausgabe ist
+        byte-identisch mit der nicht gestreamten Antwort.
+        
+        Gecachte Bäume werden gelesen, neu aufgebaute aber nur mit
+        CURRICULUM_STREAM_POPULATE_CACHE = True abgelegt: Ein Abruf aller Lehrpläne würde
+        sonst die häufig abgefragten Bäume aus einem begrenzten Cache verdrängen.
+        
+        Args:
+            lehrplan_ids (list): Die IDs aller auszugebenden Lehrpläne
+            options (dict): Das Ergebnis von CurriculumSerializer.parse_tree_options oder None
+            versions (dict): Lehrplan-ID -> aktuelle Version oder None
+        
+        Yields:
+            str: Aufeinanderfolgende Teile des JSON-Dokuments
+        """
+        chunk_size, populate_cache = self.get_stream_chunk_size(), self.get_stream_populate_cache()
+        first = True
+        for start in range(0, len(lehrplan_ids), chunk_size):
+            chunk_ids = lehrplan_ids[start:start + chunk_size]
+            for tree in self.load_trees(chunk_ids, options, versions, populate_cache=populate_cache):
+                encoded = json.dumps(tree, indent=2, ensure_ascii=False, cls=DjangoJSONEncoder)
+                yield ('[\n' if first else ',\n') + textwrap.indent(encoded, '  ')
+                first = False
+        yield '[]' if first else '\n]'
+
     def get(self, request):
         """
         Verarbeitet GET-Anfragen für alle Lehrpläne ohne Paginierung.
         
         Ruft alle verfügbaren Lehrpläne ab und gibt sie mit ihrer vollständigen
-        hierarchischen Struktur zurück. Da die Methode alle Datensätze auf einmal
-        lädt und serialisiert, kann dies bei großen Datenmengen zu Performance-Problemen
-        führen. Die Daten werden optimiert durch Prefetch-Related-Abfragen geladen,
-        um die Anzahl der Datenbankabfragen zu minimieren.
+        hierarchischen Struktur zurück. Mit ``?stream=1`` wird die Antwort als
+        StreamingHttpResponse blockweise erzeugt, sodass der Speicherbedarf unabhängig
+        von der Anzahl der Lehrpläne konstant bleibt und das erste Byte sofort gesendet wird.
+        Wie bei der Detailansicht schränken depth, fields und exclude die Ausgabe ein.
         
         Args:
             request: Die HTTP-Anfrage
-            
+        
         Returns:
-            JsonResponse: Eine Liste aller Lehrpläne mit ihrer vollständigen Struktur
+            JsonResponse | StreamingHttpResponse: Eine Liste aller Lehrpläne mit ihrer vollständigen Struktur
+                                                  oder eine 304-Antwort, wenn sich nichts geändert hat
         """
-        lehrplaene = Lehrplan.objects.prefetch_related(
-            *CurriculumSerializer.get_prefetch_related_fields()
-        ).all()
+        stamp, last_modified = get_collection_stamp(Lehrplan.objects.all())
+        etag = make_etag(request, 'alle', stamp)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
 
-        result = []
-        for lehrplan in lehrplaene:
-            result.append(CurriculumSerializer.serialize_curriculum(lehrplan))
+        options = CurriculumSerializer.parse_tree_options(request.GET)
+        versions = dict(Lehrplan.objects.values_list('id', 'version'))
+        lehrplan_ids = list(versions)
 
+        if request.GET.get('stream', '').lower() in ('1', 'true'):
+            response = StreamingHttpResponse(
+                self.iter_json_chunks(lehrplan_ids, options, versions),
+                content_type='application/json'
+            )
+        else:
+            result = self.load_trees(lehrplan_ids, options, versions)
+            response = JsonResponse(result, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
+        return set_validators(response, etag, last_modified)
+
+
+class LehrplanBatchView(View):
+    """
+    API-Endpunkt für den Abruf mehrerer Lehrpläne in einer Anfrage.
+    
+    Alle angeforderten Bäume werden mit einem gemeinsamen Cache-Zugriff gelesen; fehlende
+    Bäume werden gemeinsam über die flachen Abfragen des CurriculumSerializer geladen.
+    Die Kosten sind damit unabhängig von der Anzahl der IDs, statt pro Lehrplan eine
+    eigene Anfrage mit eigener Abfragekette zu benötigen.
+    
+    Die maximale Anzahl an IDs pro Anfrage legt CURRICULUM_BATCH_MAX_SIZE fest (Standard: 50).
+    
+    Verwendung:
+        GET /curriculum/curricula/batch/?ids=1,2,3
+    
+        Optionale Abfrageparameter:
+        - depth, fields, exclude: wie bei der Detailansicht
+    
+        Antwort:
+        {
+            "results": {
+                "1": {"Lehrplan_id": 1, "Klassenstufen": "5", ...},
+                "2": {"Lehrplan_id": 2, ...}
+            },
+            "not_found": [3]
+        }
+    """
+    
+    query_budget = 9
+    ID_PATTERN = re.compile(r'^[0-9]{1,18}$')
+
+    def get_max_batch_size(self):
+        """
+        Gibt die maximale Anzahl an IDs pro Anfrage zurück (CURRICULUM_BATCH_MAX_SIZE).
+        """
+        return getattr(settings, 'CURRICULUM_BATCH_MAX_SIZE', 50)
+
+    def parse_ids(self, request):
+        """
+        Liest die kommaseparierten IDs aus dem Parameter ids.
+        
+        Args:
+            request: Die HTTP-Anfrage
+        
+        Returns:
+            list: Die eindeutigen IDs in angefragter Reihenfolge
+        
+        Raises:
+            BadRequest: Wenn keine, ungültige oder zu viele IDs übergeben wurden
+        """
+        raw_ids = [value.strip() for value in request.GET.get('ids', '').split(',') if value.strip()]
+        if not raw_ids:
+            raise BadRequest("Parameter ids fehlt, z. B. ?ids=1,2,3")
+        # Nur ASCII-Ziffern in der Spannweite einer 64-Bit-ID; int() nimmt auch '1_0', '-1' oder
+        # Ziffern anderer Schriften an, zu große Zahlen scheitern erst in der Datenbank
+        if not all(self.ID_PATTERN.match(value) for value in raw_ids):
+            raise BadRequest("ids muss eine kommaseparierte Liste von Zahlen sein")
+        ids = list(dict.fromkeys(int(value) for value in raw_ids))
+        max_batch_size = self.get_max_batch_size()
+        if len(ids) > max_batch_size:
+            raise BadRequest(f"Es können höchstens {max_batch_size} Lehrpläne pro Anfrage abgerufen werden")
+        return ids
+
+    def get(self, request):
+        """
+        Verarbeitet GET-Anfragen für mehrere Lehrpläne.
+        
+        Args:
+            request: Die HTTP-Anfrage mit dem Parameter ids
+        
+        Returns:
+            JsonResponse: Die gefundenen Lehrpläne nach ID und die Liste der nicht gefundenen IDs
+                          oder eine 304-Antwort, wenn sich keiner der Lehrpläne geändert hat
+        """
+        lehrplan_ids = self.parse_ids(request)
+        options = CurriculumSerializer.parse_tree_options(request.GET)
+
+        # Versionen und Stempel mit einer Abfrage; die Versionen bestimmen auch die Cache-Schlüssel
+        rows = list(Lehrplan.objects.filter(id__in=lehrplan_ids).order_by('id').values_list('id', 'version', 'geaendert_am'))
+        versions = {lehrplan_id: version for lehrplan_id, version, _ in rows}
+        stamp = hashlib.md5(
+            ','.join(f"{lehrplan_id}:{version}" for lehrplan_id, version in versions.items()).encode('utf-8')
+        ).hexdigest()
+        last_modified = to_timestamp(max((geaendert_am for _, _, geaendert_am in rows), default=None))
+        etag = make_etag(request, 'batch', stamp)
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        trees = load_curriculum_trees(lehrplan_ids, options, versions)
+        response = JsonResponse({
+            'results': {str(lehrplan_id): trees[lehrplan_id] for lehrplan_id in lehrplan_ids if lehrplan_id in trees},
+            'not_found': [lehrplan_id for lehrplan_id in lehrplan_ids if lehrplan_id not in trees],
+        }, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
+        return set_validators(response, etag, last_modified)
+
+
+class LehrplanFacetView(View):
+    """
+    API-Endpunkt für die Anzahl der Lehrpläne je Bundesland, Fach und Klassenstufe.
+    
+    Die Zählungen stammen aus der materialisierten Tabelle LehrplanFacette und den
+    normalisierten Klassenstufen (siehe curriculum.facets), die bei jedem Speichern und
+    Löschen eines Lehrplans nachgeführt werden; eine Anfrage kostet zwei Abfragen. Es gelten dieselben
+    Filter wie bei LehrplanListView. Die Zählung einer Dimension berücksichtigt die Filter
+    der anderen Dimensionen, aber nicht den eigenen, damit die Filterleiste die
+    Alternativen zum gewählten Wert anzeigen kann.
+    
+    Verwendung:
+        GET /curriculum/curricula/facets/
+        GET /curriculum/curricula/facets/?bundesland=Sachsen&klassenstufe=5-7
+    
+        Antwort:
+        {
+            "total": 12,
+            "facets": {
+                "bundesland": {"Bayern": 4, "Sachsen": 12},
+                "fach": {"Deutsch": 5, "Mathematik": 7},
+                "klassenstufe": {"5": 6, "6": 6, "7": 3}
+            }
+        }
+    
+        "total" ist die Anzahl der Lehrpläne, die alle Filter erfüllen.
+    """
+
+    query_budget = 2
+
+    def get(self, request):
+        """
+        Verarbeitet GET-Anfragen für die Facettenzählungen.
+        
+        Args:
+            request: Die HTTP-Anfrage mit den optionalen Filtern bundesland, fach und klassenstufe
+        
+        Returns:
+            JsonResponse: Die Gesamtzahl und die Zählungen je Dimension
+        
+        Raises:
+            BadRequest: Bei einem ungültigen Klassenstufen-Filter
+        """
+        result = count_facets(
+            bundesland=request.GET.get('bundesland') or None,
+            fach=request.GET.get('fach') or None,
+            klassenstufe=request.GET.get('klassenstufe') or None
+        )
         return JsonResponse(result, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
@@ -0,0 +1,156 @@
+from django.http import Http404
+from curriculum.hierarchy import get_node_lehrplan_id
+from curriculum.models import Lernbereich, Lernziel, Teilziel
+from curriculum.versioning import get_lehrplan_stamp
+from .base_view import BaseGetView, make_etag
+from .serializers import CurriculumSerializer
+
+
+class SubtreeDetailView(BaseGetView):
+    """
+    Basisklasse für Detailansichten, die unterhalb des Lehrplans an einem Knoten ansetzen.
+    
+    Es werden nur die Nachfahren des angefragten Knotens vorgeladen; die Vorfahren bis zum
+    Lehrplan werden per select_related in derselben Abfrage wie der Knoten geladen und als
+    Pfad (Breadcrumb) ausgegeben. Der Teilbaum hat dieselbe Schlüsselform wie die
+    entsprechende Ebene im Ergebnis von CurriculumSerializer.serialize_curriculum.
+    
+    Das Abfragebudget der Unterklassen ergibt sich aus der Zuordnung zum Lehrplan, dem
+    Versionsstempel, dem Knoten selbst und einer Abfrage je vorgeladener Relation.
+    
+    Attribute:
+        serialize_node (callable): Die Serialisierungsmethode des CurriculumSerializer für die Ebene
+    """
+
+    serialize_node = None
+
+    def serialize_object(self, node):
+        """
+        Serialisiert den Knoten mit seinem Teilbaum und dem Pfad seiner Vorfahren.
+        
+        Args:
+            node: Das zu serialisierende Objekt
+        
+        Returns:
+            dict: Der Pfad unter dem Schlüssel "Pfad", gefolgt von der Struktur des Knotens
+        """
+        return {
+            "Pfad": CurriculumSerializer.serialize_ancestors(node),
+            **self.serialize_node(node),
+        }
+
+    def get_detail_validators(self, request, pk):
+        """
+        Liefert ETag und Last-Modified auf Basis des Versionsstempels des besitzenden Lehrplans.
+        
+        Args:
+            request: Die HTTP-Anfrage
+            pk: Die ID des Knotens
+        
+        Returns:
+            tuple: (ETag, Last-Modified-Zeitstempel)
+        
+        Raises:
+            Http404: Wenn der Knoten nicht existiert
+        """
+        lehrplan_id = get_node_lehrplan_id(self.model, pk)
+        stamp = get_lehrplan_stamp(lehrplan_id) if lehrplan_id is not None else None
+        if stamp is None:
+            raise Http404(f"{self.model.__name__} nicht gefunden")
+        version, last_modified = stamp
+        return make_etag(request, self.model.__name__.lower(), pk, lehrplan_id, version), last_modified
+
+    def get(self, request, pk):
+        """
+        Verarbeitet GET-Anfragen für einen Teilbaum.
+        
+        Args:
+            request: Die HTTP-Anfrage
+            pk: Die ID des Knotens
+        
+        Returns:
+            JsonResponse: Die serialisierte Struktur des Knotens mit Pfad
+        """
+        return self.get_detail_response(request, pk)
+
+
+class LernbereichDetailView(SubtreeDetailView):
+    """
+    API-Endpunkt für einen Lernbereich mit seinen Lernzielen, Teilzielen und Lerninhalten.
+    
+    Verwendung:
+        GET /curriculum/lernbereich/<id>/
+    
+        Beispielantwort:
+        {
+            "Pfad": [
+                {"Lehrplan_id": 1, "Klassenstufen": "5", "Bundesland": "Bayern", "Fach": "Mathematik"}
+            ],
+            "Lernbereich_id": 3,
+            "Lernbereich_Nummer": 1,
+            "Lernbereich_name": "Algebra",
+            "Unterrichtsstunden": 20,
+            "Lernziele": [...]
+        }
+    """
+
+    model = Lernbereich
+    serialize_node = staticmethod(CurriculumSerializer.serialize_lernbereich)
+    query_budget = 9
+    select_related_fields = ['lehrplan']
+    prefetch_related_fields = CurriculumSerializer.get_subtree_prefetch_related_fields(1)
+
+
+class LernzielDetailView(SubtreeDetailView):
+    """
+    API-Endpunkt für ein Lernziel mit seinen Teilzielen und Lerninhalten.
+    
+    Verwendung:
+        GET /curriculum/lernziel/<id>/
+    
+        Beispielantwort:
+        {
+            "Pfad": [
+                {"Lehrplan_id": 1, "Klassenstufen": "5", "Bundesland": "Bayern", "Fach": "Mathematik"},
+                {"Lernbereich_id": 3, "Lernbereich_Nummer": 1, "Lernbereich_name": "Algebra"}
+            ],
+            "Lernziel_id": 7,
+            "Lernziel_name": "...",
+            "Lernziel_Beschreibungen": [...],
+            "Teilziele": [...]
+        }
+    """
+
+    model = Lernziel
+    serialize_node = staticmethod(CurriculumSerializer.serialize_lernziel)
+    query_budget = 8
+    select_related_fields = ['lernbereich__lehrplan']
+    prefetch_related_fields = CurriculumSerializer.get_subtree_prefetch_related_fields(2)
+
+
+class TeilzielDetailView(SubtreeDetailView):
+    """
+    API-Endpunkt für ein Teilziel mit seinen Lerninhalten.
+    
+    Verwendung:
+        GET /curriculum/teilziel/<id>/
+    
+        Beispielantwort:
+        {
+            "Pfad": [
+                {"Lehrplan_id": 1, ...},
+                {"Lernbereich_id": 3, ...},
+                {"Lernziel_id": 7, "Lernziel_name": "..."}
+            ],
+            "Teilziel_id": 12,
+            "Teilziel_name": "...",
+            "Teilziel_beschreibungen": [...],
+            "Lerninhalte": [...]
+        }
+    """
+
+    model = Teilziel
+    serialize_node = staticmethod(CurriculumSerializer.serialize_teilziel)
+    query_budget = 6
+    select_related_fields = ['lernziel__lernbereich__lehrplan']
+    prefetch_related_fields = CurriculumSerializer.get_subtree_prefetch_related_fields(3)
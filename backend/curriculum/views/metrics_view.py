@@ -0,0 +1,45 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from curriculum.metrics import registry
+
+
+class MetricsView(View):
+    """
+    Endpunkt für die Betriebskennzahlen im Textformat von Prometheus.
+    
+    Ausgegeben werden Anfragen, Dauer, Antwortgrößen, SQL-Abfragen und Serialisierungszeit
+    je View, Treffer des Lehrplan-Caches, Export und Import über die Admin-Site sowie die
+    importierten Zeilen je Resource (siehe curriculum.metrics). Mit CURRICULUM_METRICS_DIR
+    werden die Werte aller Worker-Prozesse summiert.
+    
+    Verwendung:
+        GET /metrics
+    
+        Ist CURRICULUM_METRICS_TOKEN gesetzt, wird der Header
+        "Authorization: Bearer <Token>" verlangt, sonst ist die Antwort 401.
+    
+        Antwort (Auszug):
+        # HELP curriculum_http_requests_total Anzahl der HTTP-Anfragen je View, Methode und Status.
+        # TYPE curriculum_http_requests_total counter
+        curriculum_http_requests_total{view="curriculum",method="GET",status="200"} 42
+    """
+
+    query_budget = 0
+
+    def get(self, request):
+        """
+        Liefert alle Kennzahlen.
+        
+        Args:
+            request: Die HTTP-Anfrage
+        
+        Returns:
+            HttpResponse: Die Kennzahlen im Textformat 0.0.4 oder 401 ohne gültiges Token
+        """
+        token = getattr(settings, 'CURRICULUM_METRICS_TOKEN', None)
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+        return HttpResponse(registry.generate_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
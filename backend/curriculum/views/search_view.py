@@ -0,0 +1,160 @@
+import math
+from django.core.exceptions import BadRequest
+from django.http import JsonResponse
+from curriculum.hierarchy import EBENEN
+from curriculum.search import KNOTENTYPEN, CurriculumSearchIndex
+from .base_view import BaseGetView
+from .serializers import CurriculumSerializer
+
+
+class CurriculumSearchView(BaseGetView):
+    """
+    API-Endpunkt für die Volltextsuche über Lernziele, Teilziele und Lerninhalte.
+    
+    Durchsucht Namen und Beschreibungen über den FTS5-Index (siehe curriculum.search).
+    Die Treffer werden nach Relevanz sortiert; Treffer im Namen werden stärker gewichtet
+    als Treffer in den Beschreibungen. Jeder Treffer enthält den Pfad vom Lehrplan bis
+    zum Elternknoten in derselben Form wie die Teilbaum-Endpunkte. "Ausschnitt" ist
+    HTML-maskiert; nur die gefundenen Wörter stehen in <mark>-Tags.
+    
+    Attribute:
+        page_size: Anzahl der Treffer pro Seite
+        max_page_size: Obergrenze für den Parameter page_size
+    
+    Verwendung:
+        GET /curriculum/search/?q=Bruchrechnung
+    
+        Optionale Abfrageparameter:
+        - page: Seitennummer (Standard: 1)
+        - page_size: Treffer pro Seite (Standard: 20, höchstens 100)
+        - typ: Kommaseparierte Einschränkung auf lernziel, teilziel und/oder lerninhalt
+    
+        Antwort:
+        {
+            "query": "Bruchrechnung",
+            "results": [
+                {
+                    "Typ": "Teilziel",
+                    "Teilziel_id": 12,
+                    "Teilziel_name": "Bruchrechnung im Alltag",
+                    "Rang": 7.31,
+                    "Ausschnitt": "<mark>Bruchrechnung</mark> im Alltag",
+                    "Pfad": [
+                        {"Lehrplan_id": 1, "Klassenstufen": "6", "Bundesland": "Bayern", "Fach": "Mathematik"},
+                        {"Lernbereich_id": 3, "Lernbereich_Nummer": 2, "Lernbereich_name": "Zahlen"},
+                        {"Lernziel_id": 7, "Lernziel_name": "Brüche"}
+                    ]
+                },
+                ...
+            ],
+            "pagination": {
+                "total_pages": 2,
+                "current_page": 1,
+                "total_items": 27,
+                "has_next": true,
+                "has_previous": false
+            }
+        }
+    """
+
+    page_size = 20
+    max_page_size = 100
+    query_budget = 4
+
+    def parse_knotentypen(self, request):
+        """
+        Liest die optionale Einschränkung auf Knotentypen aus dem Parameter typ.
+        
+        Args:
+            request: Die HTTP-Anfrage
+        
+        Returns:
+            list: Die Modellnamen oder None für alle Knotentypen
+        
+        Raises:
+            BadRequest: Bei unbekannten Knotentypen
+        """
+        names = {model.__name__.lower(): model.__name__ for model in KNOTENTYPEN}
+        requested = [name.strip().lower() for name in request.GET.get('typ', '').split(',') if name.strip()]
+        unknown = [name for name in requested if name not in names]
+        if unknown:
+            raise BadRequest(f"Unbekannte Typen: {', '.join(unknown)}")
+        return [names[name] for name in requested] or None
+
+    def serialize_hits(self, hits):
+        """
+        Serialisiert die Treffer mit ihren Pfaden; Knoten und Vorfahren aller Treffer werden
+        mit einer Abfrage über die Closure-Tabelle geladen.
+        
+        Args:
+            hits (list): Tupel (Modellklasse, Knoten-ID, Relevanz, Textausschnitt) in Rangfolge
+        
+        Returns:
+            list: Die serialisierten Treffer in Rangfolge
+        """
+        paths = CurriculumSerializer.serialize_paths(
+            (EBENEN[model], knoten_id) for model, knoten_id, _, _ in hits
+        )
+
+        results = []
+        for model, knoten_id, rang, ausschnitt in hits:
+            path = paths.get((EBENEN[model], knoten_id))
+            if path is None:
+                continue
+            name = model.__name__
+            results.append({
+                "Typ": name,
+                f"{name}_id": knoten_id,
+                f"{name}_name": path[-1][f"{name}_name"],
+                "Rang": round(rang, 4),
+                "Ausschnitt": ausschnitt,
+                "Pfad": path[:-1],
+            })
+        return results
+
+    def get(self, request):
+        """
+        Verarbeitet GET-Anfragen für die Volltextsuche.
+        
+        Args:
+            request: Die HTTP-Anfrage mit dem Parameter q
+        
+        Returns:
+            JsonResponse: Die Treffer einer Seite mit Paginierungsinformationen
+        
+        Raises:
+            BadRequest: Wenn q fehlt, FTS5-Syntax enthält oder ungültige Parameter übergeben wurden
+        """
+        if not CurriculumSearchIndex.is_available():
+            return JsonResponse({'error': "Die Volltextsuche ist auf dieser Datenbank nicht verfügbar"}, status=501)
+
+        query = request.GET.get('q', '').strip()
+        try:
+            match = CurriculumSearchIndex.build_match_query(query)
+        except ValueError as e:
+            raise BadRequest(str(e))
+        if not match:
+            raise BadRequest("Parameter q fehlt, z. B. ?q=Bruchrechnung")
+        knotentypen = self.parse_knotentypen(request)
+
+        page_size = self.get_page_size(request)
+        total_items = CurriculumSearchIndex.count(match, knotentypen)
+        total_pages = max(1, math.ceil(total_items / page_size))
+        try:
+            page = int(request.GET.get('page', 1))
+        except ValueError:
+            page = 1
+        page = min(max(page, 1), total_pages)
+
+        hits = CurriculumSearchIndex.search(match, (page - 1) * page_size, page_size, knotentypen)
+        return JsonResponse({
+            'query': query,
+            'results': self.serialize_hits(hits),
+            'pagination': {
+                'total_pages': total_pages,
+                'current_page': page,
+                'total_items': total_items,
+                'has_next': page < total_pages,
+                'has_previous': page > 1
+            }
+        }, safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False})
@@ -6,6 +6,12 @@ in JSON-serialisierbare Datenstrukturen. Diese Serialisierer werden von den API-
 verwendet, um konsistente Antwortformate bereitzustellen.
 """
 
+from django.core.exceptions import BadRequest
+
+from curriculum.assembly import CurriculumTreeAssembler
+from curriculum.hierarchy import PARENT_FIELDS, get_paths
+from curriculum.instrumentation import timed
+
 class CurriculumSerializer:
     """
     Hilfsklasse für die Serialisierung von Lehrplandaten mit allen zugehörigen Entitäten.
@@ -14,82 +20,379 @@ class CurriculumSerializer:
     Diese Klasse verwendet einen statischen Ansatz ohne Instanzvariablen, da sie
     hauptsächlich als Utility-Klasse dient. Alle Methoden sind als @staticmethod
     implementiert, um eine einfache Verwendung ohne Instanziierung zu ermöglichen.
+    
+    Die Tiefe eines Baums zählt die Ebenen unterhalb des Lehrplans:
+    0 = nur Lehrplan, 1 = + Lernbereiche, 2 = + Lernziele, 3 = + Teilziele, 4 = + Lerninhalte.
     """
+
+    MAX_DEPTH = 4
+
+    # Logischer Feldname -> Schlüssel in der Ausgabe, je Ebene
+    FIELD_KEYS = [
+        {'id': 'Lehrplan_id', 'klassenstufen': 'Klassenstufen', 'bundesland': 'Bundesland', 'fach': 'Fach'},
+        {'id': 'Lernbereich_id', 'nummer': 'Lernbereich_Nummer', 'name': 'Lernbereich_name',
+         'unterrichtsstunden': 'Unterrichtsstunden'},
+        {'id': 'Lernziel_id', 'name': 'Lernziel_name', 'beschreibungen': 'Lernziel_Beschreibungen'},
+        {'id': 'Teilziel_id', 'name': 'Teilziel_name', 'beschreibungen': 'Teilziel_beschreibungen'},
+        {'id': 'Lerninhalt_id', 'name': 'Lerninhalt_name', 'beschreibungen': 'Lerninhalt_beschreibungen'},
+    ]
+
+    # Schlüssel der Kindliste, je Ebene
+    CHILD_KEYS = ['Lernbereiche', 'Lernziele', 'Teilziele', 'Lerninhalte']
+
+    # Modellname, je Ebene
+    LEVELS = ['Lehrplan', 'Lernbereich', 'Lernziel', 'Teilziel', 'Lerninhalt']
+
+    # Felder, mit denen ein Vorfahre im Pfad (Breadcrumb) ausgegeben wird, je Ebene
+    ANCESTOR_FIELDS = [
+        ['id', 'klassenstufen', 'bundesland', 'fach'],
+        ['id', 'nummer', 'name'],
+        ['id', 'name'],
+        ['id', 'name'],
+    ]
     
     @staticmethod
-    def serialize_curriculum(lehrplan):
+    @timed('serialize')
+    def serialize_curriculum(lehrplan, depth=None, beschreibungen=True):
         """
         Serialisiert ein Lehrplanobjekt mit allen zugehörigen Daten in eine hierarchische Struktur.
         
         Args:
             lehrplan: Das zu serialisierende Lehrplanobjekt
-            
+            depth (int): Anzahl der auszugebenden Ebenen unterhalb des Lehrplans (None = alle)
+            beschreibungen (bool): Ob die Beschreibungstexte ausgegeben werden sollen
+        
         Returns:
             dict: Ein Dictionary mit der vollständigen Lehrplanstruktur
         """
+        depth = CurriculumSerializer.MAX_DEPTH if depth is None else depth
         data = {
             "Lehrplan_id": lehrplan.id,
             "Klassenstufen": lehrplan.klassenstufen,
             "Bundesland": lehrplan.bundesland,
             "Fach": lehrplan.fach,
-            "Lernbereiche": []
         }
-
-        for lb in lehrplan.lernbereiche.all():
-            lb_data = {
-                "Lernbereich_id": lb.id,
-                "Lernbereich_Nummer": lb.nummer,
-                "Lernbereich_name": lb.name,
-                "Unterrichtsstunden": lb.unterrichtsstunden,
-                "Lernziele": []
-            }
-
-            for lz in lb.lernziele.all():
-                lz_data = {
-                    "Lernziel_id": lz.id,
-                    "Lernziel_name": lz.name,
-                    "Lernziel_Beschreibungen": [b.text for b in lz.beschreibungen.all()],
-                    "Teilziele": []
-                }
-
-                for tz in lz.teilziele.all():
-                    tz_data = {
-                        "Teilziel_id": tz.id,
-                        "Teilziel_name": tz.name,
-                        "Teilziel_beschreibungen": [b.text for b in tz.beschreibungen.all()],
-                        "Lerninhalte": []
-                    }
-
-                    for li in tz.lerninhalte.all():
-                        li_data = {
-                            "Lerninhalt_id": li.id,
-                            "Lerninhalt_name": li.name,
-                            "Lerninhalt_beschreibungen": [b.text for b in li.beschreibungen.all()]
-                        }
-                        tz_data["Lerninhalte"].append(li_data)
-
-                    lz_data["Teilziele"].append(tz_data)
-
-                lb_data["Lernziele"].append(lz_data)
-
-            data["Lernbereiche"].append(lb_data)
-
+        if depth >= 1:
+            data["Lernbereiche"] = [
+                CurriculumSerializer.serialize_lernbereich(lb, depth - 1, beschreibungen)
+                for lb in lehrplan.lernbereiche.all()
+            ]
         return data
-
+    
     @staticmethod
-    def get_prefetch_related_fields():
+    def serialize_lernbereich(lernbereich, depth=None, beschreibungen=True):
+        """
+        Serialisiert einen Lernbereich mit seinen Lernzielen, Teilzielen und Lerninhalten.
+        
+        Args:
+            lernbereich: Das zu serialisierende Lernbereichsobjekt
+            depth (int): Anzahl der auszugebenden Ebenen unterhalb des Lernbereichs (None = alle)
+            beschreibungen (bool): Ob die Beschreibungstexte ausgegeben werden sollen
+        
+        Returns:
+            dict: Ein Dictionary mit der Struktur des Lernbereichs
+        """
+        depth = CurriculumSerializer.MAX_DEPTH - 1 if depth is None else depth
+        data = {
+            "Lernbereich_id": lernbereich.id,
+            "Lernbereich_Nummer": lernbereich.nummer,
+            "Lernbereich_name": lernbereich.name,
+            "Unterrichtsstunden": lernbereich.unterrichtsstunden,
+        }
+        if depth >= 1:
+            data["Lernziele"] = [
+                CurriculumSerializer.serialize_lernziel(lz, depth - 1, beschreibungen)
+                for lz in lernbereich.lernziele.all()
+            ]
+        return data
+    
+    @staticmethod
+    def serialize_lernziel(lernziel, depth=None, beschreibungen=True):
+        """
+        Serialisiert ein Lernziel mit seinen Teilzielen und Lerninhalten.
+        
+        Args:
+            lernziel: Das zu serialisierende Lernzielobjekt
+            depth (int): Anzahl der auszugebenden Ebenen unterhalb des Lernziels (None = alle)
+            beschreibungen (bool): Ob die Beschreibungstexte ausgegeben werden sollen
+        
+        Returns:
+            dict: Ein Dictionary mit der Struktur des Lernziels
+        """
+        depth = CurriculumSerializer.MAX_DEPTH - 2 if depth is None else depth
+        data = {
+            "Lernziel_id": lernziel.id,
+            "Lernziel_name": lernziel.name,
+        }
+        if beschreibungen:
+            data["Lernziel_Beschreibungen"] = [b.text for b in lernziel.beschreibungen.all()]
+        if depth >= 1:
+            data["Teilziele"] = [
+                CurriculumSerializer.serialize_teilziel(tz, depth - 1, beschreibungen)
+                for tz in lernziel.teilziele.all()
+            ]
+        return data
+    
+    @staticmethod
+    def serialize_teilziel(teilziel, depth=None, beschreibungen=True):
+        """
+        Serialisiert ein Teilziel mit seinen Lerninhalten.
+        
+        Args:
+            teilziel: Das zu serialisierende Teilzielobjekt
+            depth (int): Anzahl der auszugebenden Ebenen unterhalb des Teilziels (None = alle)
+            beschreibungen (bool): Ob die Beschreibungstexte ausgegeben werden sollen
+        
+        Returns:
+            dict: Ein Dictionary mit der Struktur des Teilziels
+        """
+        depth = CurriculumSerializer.MAX_DEPTH - 3 if depth is None else depth
+        data = {
+            "Teilziel_id": teilziel.id,
+            "Teilziel_name": teilziel.name,
+        }
+        if beschreibungen:
+            data["Teilziel_beschreibungen"] = [b.text for b in teilziel.beschreibungen.all()]
+        if depth >= 1:
+            data["Lerninhalte"] = [
+                CurriculumSerializer.serialize_lerninhalt(li, beschreibungen)
+                for li in teilziel.lerninhalte.all()
+            ]
+        return data
+    
+    @staticmethod
+    def serialize_lerninhalt(lerninhalt, beschreibungen=True):
+        """
+        Serialisiert einen Lerninhalt.
+        
+        Args:
+            lerninhalt: Das zu serialisierende Lerninhaltsobjekt
+            beschreibungen (bool): Ob die Beschreibungstexte ausgegeben werden sollen
+        
+        Returns:
+            dict: Ein Dictionary mit den Daten des Lerninhalts
+        """
+        data = {
+            "Lerninhalt_id": lerninhalt.id,
+            "Lerninhalt_name": lerninhalt.name,
+        }
+        if beschreibungen:
+            data["Lerninhalt_beschreibungen"] = [b.text for b in lerninhalt.beschreibungen.all()]
+        return data
+    
+    @staticmethod
+    def serialize_ancestors(node):
+        """
+        Erzeugt den Pfad (Breadcrumb) von der Wurzel bis zum Elternknoten eines Knotens.
+        
+        Jeder Vorfahre wird nur mit seinen identifizierenden Feldern ausgegeben, in derselben
+        Schlüsselform wie im vollständigen Baum. Die Vorfahren sollten per select_related
+        geladen sein, damit keine zusätzlichen Abfragen entstehen.
+        
+        Args:
+            node: Ein Lernbereich, Lernziel oder Teilziel
+        
+        Returns:
+            list: Die Vorfahren vom Lehrplan abwärts
+        """
+        ancestors = []
+        parent_field = PARENT_FIELDS.get(type(node))
+        while parent_field is not None:
+            node = getattr(node, parent_field)
+            level = CurriculumSerializer.LEVELS.index(type(node).__name__)
+            ancestors.append({
+                CurriculumSerializer.FIELD_KEYS[level][field]: getattr(node, field)
+                for field in CurriculumSerializer.ANCESTOR_FIELDS[level]
+            })
+            parent_field = PARENT_FIELDS.get(type(node))
+        return ancestors[::-1]
+    
+    @staticmethod
+    def serialize_paths(keys):
+        """
+        Erzeugt die Pfade mehrerer Knoten über die Closure-Tabelle mit einer einzigen Abfrage.
+        
+        Im Gegensatz zu serialize_ancestors müssen die Knoten nicht geladen sein; Knoten
+        unterschiedlicher Ebenen können gemeinsam angefragt werden. Der letzte Eintrag jedes
+        Pfads ist der Knoten selbst mit seiner ID und seinem Namen.
+        
+        Args:
+            keys: Iterierbare Menge von Tupeln (Ebene, Knoten-ID), Ebene 1 = Lernbereich bis 4 = Lerninhalt
+        
+        Returns:
+            dict: (Ebene, Knoten-ID) -> Liste vom Lehrplan bis zum Knoten; nicht gefundene Knoten fehlen
+        """
+        fields = CurriculumSerializer.ANCESTOR_FIELDS + [['id', 'name']]
+        return {
+            key: [
+                {CurriculumSerializer.FIELD_KEYS[level][field]: value for field, value in values.items()}
+                for level, values in enumerate(path)
+            ]
+            for key, path in get_paths(keys, fields).items()
+        }
+    
+    @staticmethod
+    def serialize_curricula(lehrplan_ids=None, depth=None, beschreibungen=True, stamps=None):
+        """
+        Serialisiert mehrere Lehrpläne über flache Abfragen pro Hierarchieebene.
+        
+        Liefert dieselbe Struktur wie serialize_curriculum, benötigt aber keine
+        vorgeladenen Modellinstanzen (siehe CurriculumTreeAssembler).
+        
+        Args:
+            lehrplan_ids: Iterierbare Menge von Lehrplan-IDs oder None für alle Lehrpläne
+            depth (int): Anzahl der auszugebenden Ebenen unterhalb des Lehrplans (None = alle)
+            beschreibungen (bool): Ob die Beschreibungstexte geladen werden sollen
+            stamps (dict): Wird, falls angegeben, mit Lehrplan-ID -> (version, geaendert_am) gefüllt
+        
+        Returns:
+            list: Die serialisierten Lehrpläne in der Standardsortierung
+        """
+        return CurriculumTreeAssembler.assemble(lehrplan_ids, depth=depth, beschreibungen=beschreibungen, stamps=stamps)
+    
+    @staticmethod
+    def get_prefetch_related_fields(depth=None, beschreibungen=True):
         """
         Gibt eine Liste von Feldern zurück, die für optimierte Abfragen vorgeladen werden sollen
         
+        Args:
+            depth (int): Anzahl der benötigten Ebenen unterhalb des Lehrplans (None = alle)
+            beschreibungen (bool): Ob die Beschreibungstabellen vorgeladen werden sollen
+        
+        Returns:
+            list: Eine Liste von zugehörigen Feld-Pfaden zum Vorladen
+        """
+        depth = CurriculumSerializer.MAX_DEPTH if depth is None else depth
+        fields = [
+            (1, 'lernbereiche'),
+            (2, 'lernbereiche__lernziele'),
+            (2, 'lernbereiche__lernziele__beschreibungen'),
+            (3, 'lernbereiche__lernziele__teilziele'),
+            (3, 'lernbereiche__lernziele__teilziele__beschreibungen'),
+            (4, 'lernbereiche__lernziele__teilziele__lerninhalte'),
+            (4, 'lernbereiche__lernziele__teilziele__lerninhalte__beschreibungen'),
+        ]
+        return [
+            path for level, path in fields
+            if level <= depth and (beschreibungen or not path.endswith('beschreibungen'))
+        ]
+    
+    @staticmethod
+    def get_subtree_prefetch_related_fields(level, beschreibungen=True):
+        """
+        Gibt die vorzuladenden Felder für einen Teilbaum ab der angegebenen Ebene zurück.
+        
+        Es werden nur die Nachfahren des Wurzelknotens berücksichtigt, z. B. für ein Lernziel
+        (Ebene 2): beschreibungen, teilziele, teilziele__beschreibungen, ...
+        
+        Args:
+            level (int): Die Ebene des Wurzelknotens (1 = Lernbereich, 2 = Lernziel, 3 = Teilziel)
+            beschreibungen (bool): Ob die Beschreibungstabellen vorgeladen werden sollen
+        
         Returns:
             list: Eine Liste von zugehörigen Feld-Pfaden zum Vorladen
         """
+        prefix = '__'.join(['lernbereiche', 'lernziele', 'teilziele'][:level]) + '__'
         return [
-            'lernbereiche',
-            'lernbereiche__lernziele',
-            'lernbereiche__lernziele__beschreibungen',
-            'lernbereiche__lernziele__teilziele',
-            'lernbereiche__lernziele__teilziele__beschreibungen',
-            'lernbereiche__lernziele__teilziele__lerninhalte',
-            'lernbereiche__lernziele__teilziele__lerninhalte__beschreibungen'
-        ] 
\ No newline at end of file
+            path[len(prefix):]
+            for path in CurriculumSerializer.get_prefetch_related_fields(beschreibungen=beschreibungen)
+            if path.startswith(prefix)
+        ]
+    
+    @staticmethod
+    def parse_tree_options(params):
+        """
+        Liest die Parameter depth, fields und exclude aus einer Anfrage.
+        
+        fields und exclude sind kommaseparierte Listen aus logischen Feldnamen
+        (id, name, nummer, unterrichtsstunden, beschreibungen, klassenstufen, bundesland, fach),
+        die auf allen Ebenen gelten, oder aus konkreten Ausgabeschlüsseln wie 'Lernziel_name'.
+        
+        Args:
+            params (QueryDict): Die Abfrageparameter der Anfrage
+        
+        Returns:
+            dict: {'depth': int, 'keys': Liste der beizubehaltenden Schlüssel je Ebene} oder None,
+                  wenn der vollständige Baum angefordert wird
+        
+        Raises:
+            BadRequest: Bei ungültiger Tiefe oder unbekannten Feldnamen
+        """
+        raw_depth = params.get('depth')
+        fields = [name.strip() for name in params.get('fields', '').split(',') if name.strip()]
+        exclude = [name.strip() for name in params.get('exclude', '').split(',') if name.strip()]
+        if raw_depth is None and not fields and not exclude:
+            return None
+
+        depth = CurriculumSerializer.MAX_DEPTH
+        if raw_depth is not None:
+            try:
+                depth = int(raw_depth)
+            except ValueError:
+                raise BadRequest("depth muss eine Zahl sein")
+            if not 0 <= depth <= CurriculumSerializer.MAX_DEPTH:
+                raise BadRequest(f"depth muss zwischen 0 und {CurriculumSerializer.MAX_DEPTH} liegen")
+
+        known = set()
+        for level_keys in CurriculumSerializer.FIELD_KEYS:
+            known.update(level_keys)
+            known.update(level_keys.values())
+        unknown = [name for name in fields + exclude if name not in known]
+        if unknown:
+            raise BadRequest(f"Unbekannte Felder: {', '.join(unknown)}")
+
+        keys = []
+        for level_keys in CurriculumSerializer.FIELD_KEYS:
+            selected = set()
+            for name, key in level_keys.items():
+                if fields and name not in fields and key not in fields:
+                    continue
+                if name in exclude or key in exclude:
+                    continue
+                selected.add(key)
+            keys.append(selected)
+        return {'depth': depth, 'keys': keys}
+    
+    @staticmethod
+    def needs_beschreibungen(options):
+        """
+        Prüft, ob für die angeforderte Darstellung Beschreibungstexte geladen werden müssen.
+        
+        Args:
+            options (dict): Das Ergebnis von parse_tree_options oder None
+        
+        Returns:
+            bool: True, wenn mindestens eine Beschreibungsliste ausgegeben wird
+        """
+        if options is None:
+            return True
+        return any(
+            level_keys['beschreibungen'] in options['keys'][level]
+            for level, level_keys in enumerate(CurriculumSerializer.FIELD_KEYS)
+            if 'beschreibungen' in level_keys and level <= options['depth']
+        )
+    
+    @staticmethod
+    def prune(tree, options, level=0):
+        """
+        Reduziert einen serialisierten Baum auf die angeforderte Tiefe und Felder.
+        
+        Args:
+            tree (dict): Der (vollständige oder bereits eingeschränkt geladene) Baum
+            options (dict): Das Ergebnis von parse_tree_options oder None
+            level (int): Die Ebene von tree (0 = Lehrplan)
+        
+        Returns:
+            dict: Ein neuer, reduzierter Baum; tree selbst wird nicht verändert
+        """
+        if options is None:
+            return tree
+        child_key = CurriculumSerializer.CHILD_KEYS[level] if level < CurriculumSerializer.MAX_DEPTH else None
+        result = {}
+        for key, value in tree.items():
+            if key == child_key:
+                if level < options['depth']:
+                    result[key] = [CurriculumSerializer.prune(child, options, level + 1) for child in value]
+            elif key in options['keys'][level]:
+                result[key] = value
+        return result
@@ -0,0 +1,85 @@
+from django.http import JsonResponse
+from django.views import View
+from curriculum.vergleich import query_kennzahlen
+
+
+def parse_list(request, name):
+    """
+    Liest einen kommaseparierten Abfrageparameter.
+    
+    Args:
+        request: Die HTTP-Anfrage
+        name (str): Der Name des Parameters
+    
+    Returns:
+        list: Die nicht leeren Werte in der angegebenen Reihenfolge
+    """
+    return [value.strip() for value in request.GET.get(name, '').split(',') if value.strip()]
+
+
+class VergleichView(View):
+    """
+    API-Endpunkt für Vergleiche der Lehrpläne über Bundesländer, Fächer und Klassenstufen.
+    
+    Die Werte stammen aus dem Vergleichswürfel VergleichsKennzahl (siehe curriculum.vergleich),
+    der beim Bearbeiten der Lehrpläne nachgeführt wird; eine Anfrage kostet eine
+    Aggregatabfrage auf diese Tabelle, ohne die Knoten der Lehrpläne zu lesen.
+    
+    Verwendung:
+        GET /curriculum/vergleich/?group_by=bundesland&fach=Mathematik
+        GET /curriculum/vergleich/?group_by=bundesland,klassenstufe&fach=Mathematik&klassenstufe=5-7
+    
+        Optionale Abfrageparameter:
+        - group_by: Kommaseparierte Dimensionen bundesland, fach und/oder klassenstufe
+                    (Standard: bundesland; leer für eine Gesamtsumme)
+        - bundesland: Kommaseparierte Einschränkung auf Bundesländer
+        - fach: Kommaseparierte Einschränkung auf Fächer
+        - klassenstufe: Filter wie bei der Liste; ohne group_by=klassenstufe nur eine einzelne Stufe
+    
+        Antwort:
+        {
+            "group_by": ["bundesland"],
+            "results": [
+                {
+                    "bundesland": "Bayern",
+                    "lehrplaene": 4,
+                    "lernbereiche": 23,
+                    "lernziele": 81,
+                    "teilziele": 190,
+                    "lerninhalte": 402,
+                    "unterrichtsstunden": 560
+                },
+                ...
+            ]
+        }
+    
+        Bei Gruppierung nach Klassenstufe zählt ein Lehrplan für mehrere Stufen in jeder
+        dieser Stufen; sonst zählt jeder Lehrplan genau einmal.
+    """
+
+    query_budget = 2
+
+    def get(self, request):
+        """
+        Verarbeitet GET-Anfragen für den Vergleich.
+        
+        Args:
+            request: Die HTTP-Anfrage mit den optionalen Parametern group_by, bundesland, fach und klassenstufe
+        
+        Returns:
+            JsonResponse: Die Kennzahlen je Gruppe
+        
+        Raises:
+            BadRequest: Bei unbekannten Dimensionen oder einem nicht auswertbaren Klassenstufen-Filter
+        """
+        group_by = parse_list(request, 'group_by') if 'group_by' in request.GET else ['bundesland']
+        results = query_kennzahlen(
+            group_by,
+            bundeslaender=parse_list(request, 'bundesland'),
+            faecher=parse_list(request, 'fach'),
+            klassenstufe=request.GET.get('klassenstufe') or None
+        )
+        return JsonResponse(
+            {'group_by': group_by, 'results': results},
+            safe=False, json_dumps_params={'indent': 2, 'ensure_ascii': False}
+        )